@@ -18,7 +18,7 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from playwright.async_api import BrowserContext, BrowserType, Playwright
 
@@ -93,6 +93,13 @@ class AbstractStore(ABC):
     async def store_comment(self, comment_item: Dict):
         pass
 
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        store a batch of comments, stores that support bulk writes override this
+        """
+        for comment_item in comment_items:
+            await self.store_comment(comment_item)
+
     # TODO support all platform
     # only xhs is supported, so @abstractmethod is commented
     @abstractmethod
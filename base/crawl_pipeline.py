@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/base/crawl_pipeline.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 分阶段的爬取流水线：search -> detail -> store -> media -> comments
+
+"""
+原来的 search 按页串行：搜一页 -> 并发取详情 -> 逐条存储、下载媒体 -> 取评论 -> 睡眠，下一页要等这些全部完成。
+流水线把每一步拆成独立的阶段，阶段之间用有界 asyncio.Queue 连接，每个阶段有自己的 worker 数：
+- 下游处理不过来时 put 会阻塞，上游（包括翻页）自然放慢，不会无限堆积；
+- 第 N 页的评论抓取可以和第 N+1 页的详情抓取同时进行。
+
+每条数据进入流水线时会复制当前的 contextvars（例如 source_keyword_var），之后各阶段都在这个上下文里处理它，
+所以存储层读取到的搜索关键词与数据来源一致。
+"""
+
+import asyncio
+import contextvars
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional
+
+import config
+from tools import utils
+
+StageHandler = Callable[[Any], Awaitable[Optional[Any]]]
+
+
+class PipelineStage:
+    """
+    流水线中的一个阶段，handler 返回值会交给下一个阶段，返回 None 表示这条数据到此为止
+    """
+
+    def __init__(self, name: str, handler: StageHandler, workers: int):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.processed = 0
+        self.failed = 0
+
+    def __repr__(self) -> str:
+        return f"{self.name}(workers={self.workers}, processed={self.processed}, failed={self.failed})"
+
+
+class CrawlPipeline:
+    """
+    用法:
+        pipeline = CrawlPipeline("xhs_search")
+        pipeline.add_stage("detail", get_detail).add_stage("store", save)
+        await pipeline.run(source)   # source 为异步可迭代对象，产出交给第一个阶段的数据
+    """
+
+    def __init__(self, name: str, queue_size: Optional[int] = None):
+        self.name = name
+        self.queue_size = queue_size if queue_size is not None else config.PIPELINE_QUEUE_SIZE
+        self.stages: List[PipelineStage] = []
+
+    @staticmethod
+    def stage_workers(name: str) -> int:
+        """
+        阶段的默认 worker 数：PIPELINE_STAGE_WORKERS[name]，没有配置则取 MAX_CONCURRENCY_NUM
+        """
+        return config.PIPELINE_STAGE_WORKERS.get(name, config.MAX_CONCURRENCY_NUM)
+
+    def add_stage(self, name: str, handler: StageHandler, workers: Optional[int] = None) -> "CrawlPipeline":
+        """
+        添加阶段，workers 未指定时取 stage_workers(name)
+        """
+        if workers is None:
+            workers = self.stage_workers(name)
+        self.stages.append(PipelineStage(name, handler, workers))
+        return self
+
+    async def run(self, source: AsyncIterable[Any]) -> Dict[str, PipelineStage]:
+        """
+        运行流水线，source 耗尽且所有阶段处理完后返回各阶段的统计
+        """
+        if not self.stages:
+            raise ValueError(f"[CrawlPipeline.run] pipeline {self.name} has no stage")
+
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        worker_groups: List[List[asyncio.Task]] = []
+        for index, stage in enumerate(self.stages):
+            next_queue = queues[index + 1] if index + 1 < len(queues) else None
+            worker_groups.append([
+                asyncio.create_task(self._worker(stage, queues[index], next_queue),
+                                    name=f"{self.name}:{stage.name}:{i}")
+                for i in range(stage.workers)
+            ])
+
+        try:
+            async for item in source:
+                await queues[0].put((contextvars.copy_context(), item))
+            # 按阶段顺序等待排空：上游处理完的数据都已经进入下游队列后，再等下游
+            for queue, workers in zip(queues, worker_groups):
+                await queue.join()
+                await self._cancel(workers)
+        finally:
+            for workers in worker_groups:
+                await self._cancel(workers)
+
+        utils.logger.info(f"[CrawlPipeline.run] pipeline {self.name} finished, stages: {self.stages}")
+        return {stage.name: stage for stage in self.stages}
+
+    async def _worker(self, stage: PipelineStage, queue: asyncio.Queue, next_queue: Optional[asyncio.Queue]):
+        while True:
+            context, item = await queue.get()
+            try:
+                # 在数据进入流水线时的上下文里执行，保证 contextvars 与数据对应
+                result = await asyncio.create_task(stage.handler(item), context=context)
+                stage.processed += 1
+                if result is not None and next_queue is not None:
+                    await next_queue.put((context, result))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stage.failed += 1
+                utils.logger.error(f"[CrawlPipeline._worker] pipeline {self.name} stage {stage.name} error: {e}")
+            finally:
+                queue.task_done()
+
+    @staticmethod
+    async def _cancel(tasks: List[asyncio.Task]):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
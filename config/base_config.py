@@ -74,8 +74,42 @@ BROWSER_LAUNCH_TIMEOUT = 60
 # 设置为False可以保持浏览器运行，便于调试
 AUTO_CLOSE_BROWSER = True
 
-# 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、excel, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "json"  # csv or db or json or sqlite or excel
+# 数据保存类型选项配置,支持以下类型：csv、db、json、jsonl、sqlite、excel, 最好保存到DB，有排重的功能。
+# jsonl 为追加写入（每条记录一行），适合评论量大的长时间任务；json 每写一条都会重写整个文件
+SAVE_DATA_OPTION = "json"  # csv or db or json or jsonl or sqlite or excel
+
+# jsonl 模式下，爬取结束后是否额外转换一份 JSON 数组格式（与 json 模式的文件布局一致）
+# 也可以离线执行: python -m tools.async_file_writer data/xhs/jsonl/xxx.jsonl
+JSONL_COMPACT_TO_JSON = False
+
+# csv/json/jsonl 文件写入的批量大小与最长缓冲时间（秒），达到任一阈值即落盘，程序结束时会写入剩余数据
+FILE_WRITER_BATCH_SIZE = 50
+FILE_WRITER_FLUSH_INTERVAL_SEC = 3
+
+# 各平台 API client 复用的 httpx 连接池配置
+# HTTP/2 需要额外安装 h2（pip install httpx[http2]），未安装时自动退回 HTTP/1.1
+HTTPX_MAX_CONNECTIONS = 100
+HTTPX_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTPX_KEEPALIVE_EXPIRY = 30  # 空闲连接保留秒数
+HTTPX_ENABLE_HTTP2 = False
+# 代理刷新后旧连接池至少保留的秒数，之后等其上的请求全部结束再关闭
+HTTPX_RETIRED_CLIENT_GRACE_SEC = 10
+
+# 抖音 a_bogus、知乎 x-zse-96 等 JS 签名使用常驻 node 进程池（需要安装 node），关闭后使用 execjs 逐次调用
+ENABLE_JS_SIGN_WORKER_POOL = True
+JS_SIGN_WORKER_NUM = 2
+JS_SIGN_TIMEOUT_SEC = 10
+# 每隔多少秒在取进程时 ping 一次空闲的签名进程，无响应的进程结束后重新拉起；0 表示不检查
+JS_SIGN_HEALTH_CHECK_SEC = 60
+
+# excel 模式下是否使用流式写入（openpyxl write-only），数据行直接写到临时文件，内存占用不随行数增长
+# 大批量评论（10万条以上）推荐开启；列宽根据每个工作表前 EXCEL_COLUMN_WIDTH_SAMPLE_ROWS 行计算
+EXCEL_WRITE_ONLY = False
+EXCEL_COLUMN_WIDTH_SAMPLE_ROWS = 100
+
+# mongodb 批量写入（bulk_write）的批量大小与最长缓冲时间（秒），程序结束时会写入剩余数据
+MONGODB_BULK_WRITE_BATCH_SIZE = 100
+MONGODB_BULK_WRITE_FLUSH_INTERVAL_SEC = 3
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
@@ -89,9 +123,55 @@ CRAWLER_MAX_NOTES_COUNT = 3
 # 并发爬虫数量控制
 MAX_CONCURRENCY_NUM = 1
 
+# 浏览器页面池大小，大于 0 时预先打开这么多个平台首页页面，签名、页面访问等浏览器操作可以并发执行
+# 0 表示所有浏览器操作共用一个页面（抖音视频详情页仍会按 MAX_CONCURRENCY_NUM 按需打开页面）
+BROWSER_PAGE_POOL_SIZE = 0
+# 页面池中空闲超过这么多秒的页面，借出前先探测是否还有响应，无响应时替换为新页面；0 表示不探测
+BROWSER_PAGE_POOL_HEALTH_CHECK_SEC = 60
+
+# 流水线模式：搜索、详情、存储、媒体下载、评论拆成独立阶段，用有界队列连接并发执行（目前支持小红书、B站关键词搜索）
+# 上一页的评论抓取和下一页的详情抓取可以同时进行
+ENABLE_CRAWL_PIPELINE = False
+# 阶段之间队列的容量，下游处理不过来时上游会等待
+PIPELINE_QUEUE_SIZE = 20
+# 各阶段 worker 数，未配置的阶段取 MAX_CONCURRENCY_NUM
+# 数据库存储按自然键 upsert，store 阶段调大并发时同一条数据重复写入也不会失败
+PIPELINE_STAGE_WORKERS = {
+    "store": 1,
+}
+
 # 是否开启爬媒体模式（包含图片或视频资源），默认不开启爬媒体
 ENABLE_GET_MEIDAS = True
 
+# 媒体文件流式下载：按块写入 .part 临时文件，完成后重命名，中断后用 Range 续传
+MEDIA_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# 单个文件下载中断后的续传次数
+MEDIA_DOWNLOAD_MAX_RETRIES = 2
+# 续传前的等待秒数，按 N、2N、4N... 指数退避，避免服务端出错时立刻重试
+MEDIA_DOWNLOAD_RETRY_BACKOFF_SEC = 1.0
+# 每下载多少字节打印一次进度，0 表示不打印
+MEDIA_DOWNLOAD_PROGRESS_LOG_BYTES = 20 * 1024 * 1024
+
+# 媒体下载线程池：爬虫只把下载任务放进队列，由独立的 worker 下载，不阻塞帖子和评论的采集
+# worker 数量，0 表示在调用处直接下载（旧的串行行为）
+MEDIA_DOWNLOAD_WORKERS = 4
+# 同一个 CDN 域名同时下载的文件数
+MEDIA_DOWNLOAD_PER_HOST_CONCURRENCY = 2
+# 下载队列长度，队列满时提交任务的爬虫会等待
+MEDIA_DOWNLOAD_QUEUE_SIZE = 100
+# 每个文件下载完成后，在同一域名上再等待 0~N 秒的随机时间
+MEDIA_DOWNLOAD_HOST_JITTER_SEC = 1.0
+
+# 按内容寻址的媒体存储：文件按 sha256 只保存一份，各帖子目录下的文件是指向它的链接，
+# 同时在 SQLite 中记录 url -> 摘要，重复采集时已下载过的 url 直接创建链接，不再请求网络
+ENABLE_MEDIA_STORE = False
+# 存储目录，blobs/ 下保存文件内容，index.db 为 url 索引
+MEDIA_STORE_PATH = "data/media_store"
+# 帖子目录下文件的链接方式：hardlink | symlink，创建失败时退回复制文件
+MEDIA_STORE_LINK_MODE = "hardlink"
+# 建立 url 索引时忽略查询参数（CDN 地址带签名、过期时间等参数时开启）
+MEDIA_STORE_IGNORE_URL_QUERY = False
+
 # 是否开启爬评论模式, 默认开启爬评论（抖音建议先关闭评论爬取，减少请求）
 ENABLE_GET_COMMENTS = True
 
@@ -121,6 +201,22 @@ FONT_PATH = "./docs/STZHONGS.TTF"
 # 爬取间隔时间（建议抖音设置为5-10秒，避免被封）
 CRAWLER_MAX_SLEEP_SEC = 8
 
+# 请求限速：每个（平台, 接口类别）一个令牌桶，所有并发请求共用，整体请求速率由下面的配置决定
+# 开启后默认不再执行各处按 CRAWLER_MAX_SLEEP_SEC 的固定等待
+ENABLE_RATE_LIMITER = False
+# 默认每秒请求数与突发容量（令牌桶最多积攒的请求数）
+RATE_LIMIT_DEFAULT_RPS = 1.0
+RATE_LIMIT_DEFAULT_BURST = 2
+# 按 "平台" 或 "平台:接口类别" 覆盖 (每秒请求数, 突发容量)，接口类别为 search / comment / default
+# 平台取值与 PLATFORM 相同，例如 "dy": (0.5, 1)、"xhs:comment": (2, 4)
+RATE_LIMIT_RULES = {
+    "dy": (0.5, 1),
+}
+# 每次放行后再随机等待 0~N 秒，避免请求间隔过于规律
+RATE_LIMIT_JITTER_SEC = 0.3
+# 开启限速后是否仍保留 CRAWLER_MAX_SLEEP_SEC 的固定等待
+RATE_LIMIT_KEEP_FIXED_SLEEP = False
+
 from .bilibili_config import *
 from .xhs_config import *
 from .dy_config import *
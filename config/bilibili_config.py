@@ -77,3 +77,6 @@ CRAWLER_MAX_CONTACTS_COUNT_SINGLENOTES = 10
 
 # 单个视频/帖子最大爬取动态数
 CRAWLER_MAX_DYNAMICS_COUNT_SINGLENOTES = 10
+
+# WBI 签名密钥（img_key/sub_key）缓存时间（秒），B站约每天更换一次，签名被拒绝时也会立即刷新
+BILI_WBI_KEY_CACHE_TTL_SEC = 1800
@@ -35,6 +35,21 @@ mysql_db_config = {
     "db_name": MYSQL_DB_NAME,
 }
 
+# mysql 连接池配置，评论并发任务较多时需要保证 pool_size + max_overflow 大于并发数
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 10))
+MYSQL_MAX_OVERFLOW = int(os.getenv("MYSQL_MAX_OVERFLOW", 20))
+MYSQL_POOL_TIMEOUT = int(os.getenv("MYSQL_POOL_TIMEOUT", 30))  # 等待空闲连接的秒数
+MYSQL_POOL_RECYCLE = int(os.getenv("MYSQL_POOL_RECYCLE", 3600))  # 连接回收秒数，需小于服务端 wait_timeout
+MYSQL_POOL_PRE_PING = True  # 取出连接前先 ping，避免使用已被服务端断开的连接
+
+mysql_engine_options = {
+    "pool_size": MYSQL_POOL_SIZE,
+    "max_overflow": MYSQL_MAX_OVERFLOW,
+    "pool_timeout": MYSQL_POOL_TIMEOUT,
+    "pool_recycle": MYSQL_POOL_RECYCLE,
+    "pool_pre_ping": MYSQL_POOL_PRE_PING,
+}
+
 
 # redis config
 REDIS_DB_HOST = "127.0.0.1"  # your redis host
@@ -53,6 +68,18 @@ sqlite_db_config = {
     "db_path": SQLITE_DB_PATH
 }
 
+# sqlite 连接参数：WAL 模式允许读写并发，NORMAL 在 WAL 下足够安全且写入更快，
+# busy_timeout 让并发写入等待锁释放而不是直接报 "database is locked"
+SQLITE_JOURNAL_MODE = "WAL"
+SQLITE_SYNCHRONOUS = "NORMAL"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 30000))
+
+sqlite_pragmas = {
+    "journal_mode": SQLITE_JOURNAL_MODE,
+    "synchronous": SQLITE_SYNCHRONOUS,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+}
+
 # mongodb config
 MONGODB_HOST = os.getenv("MONGODB_HOST", "localhost")
 MONGODB_PORT = os.getenv("MONGODB_PORT", 27017)
@@ -44,4 +44,6 @@ DY_CREATOR_ID_LIST = [
     # "https://www.douyin.com/user/MS4wLjABAAAATJPY7LAlaa5X-c8uNdWkvz0jUGgpw4eeXIwu_8BhvqE?from_tab_name=main",
     # "MS4wLjABAAAATJPY7LAlaa5X-c8uNdWkvz0jUGgpw4eeXIwu_8BhvqE"
     # ........................
-]
\ No newline at end of file
+]
+# msToken（localStorage 中的 xmst）刷新间隔（秒），请求被拦截（响应为空或 blocked）时也会立即刷新
+DY_MS_TOKEN_REFRESH_INTERVAL_SEC = 300
@@ -32,3 +32,17 @@ TIEBA_CREATOR_URL_LIST = [
     "https://tieba.baidu.com/home/main/?id=tb.1.7f139e2e.6CyEwxu3VJruH_-QqpCi6g&fr=frs",
     # ........................
 ]
+
+# 贴吧 API 请求是否使用旧的 requests + 线程池方式（每个请求占用一个默认线程池线程，并发受线程数限制）
+# 默认使用 httpx 异步连接池，遇到兼容问题时可改为 True 回退
+TIEBA_USE_LEGACY_REQUESTS = False
+
+# 页面并发抓取：页面访问分散到多个浏览器页面（页面数取 BROWSER_PAGE_POOL_SIZE，为 0 时取 MAX_CONCURRENCY_NUM），
+# 屏蔽下面类型的资源，并以页面关键元素出现代替每次访问后固定等待 CRAWLER_MAX_SLEEP_SEC
+TIEBA_CONCURRENT_FETCH = False
+TIEBA_BLOCKED_RESOURCE_TYPES = ["image", "font", "media"]
+# 等待页面关键元素出现的超时时间（毫秒），超时后按当前页面内容解析
+TIEBA_PAGE_READY_TIMEOUT_MS = 10000
+
+# 页面解析实现：lxml（整页只解析一次、XPath 预编译）或 parsel（原实现）
+TIEBA_EXTRACTOR_BACKEND = "lxml"
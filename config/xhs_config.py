@@ -41,3 +41,15 @@ XHS_CREATOR_ID_LIST = [
     # "https://www.xiaohongshu.com/user/profile/5f58bd990000000001003753?xsec_token=ABYVg1evluJZZzpMX-VWzchxQ1qSNVW3r-jOEnKqMcgZw=&xsec_source=pc_search"
     # ........................
 ]
+
+# playwright 签名微批处理：窗口期内到达的签名请求合并为一次 page.evaluate 调用
+XHS_SIGN_BATCH_WINDOW_MS = 5
+XHS_SIGN_BATCH_MAX_SIZE = 32
+# localStorage 中 b1 的缓存时间（秒），a1 cookie 变化或更新 cookie 时也会重新读取
+XHS_SIGN_B1_CACHE_TTL_SEC = 300
+
+# 签名方式: playwright（浏览器页面注入 window.mnsv2）| xhshow（纯 Python，不依赖浏览器页面）
+# xhshow 签名被服务端拒绝（出现验证码）时会自动切换回 playwright
+XHS_SIGN_MODE = "playwright"
+# xhshow 签名使用的进程数，0 表示在事件循环线程内直接计算
+XHS_SIGN_PROCESS_NUM = 0
@@ -30,7 +30,7 @@ if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
 from tools import utils
-from database.db_session import create_tables
+from database.db_session import create_tables, dispose_engines
 
 async def init_table_schema(db_type: str):
     """
@@ -48,6 +48,10 @@ async def init_db(db_type: str = None):
 
 async def close():
     """
-    Placeholder for closing database connections if needed in the future.
+    Dispose the cached engines so pooled connections are closed.
     """
-    pass
+    try:
+        await dispose_engines()
+    except Exception as e:
+        # 中断退出时可能在新的事件循环中调用，连接已无法正常关闭
+        utils.logger.warning(f"[close] dispose database engines error: {e}")
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/db_batch_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""批量写入：按模型收集记录，使用数据库原生的 upsert 语句一次性写入"""
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import Table, UniqueConstraint, bindparam, select, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.db_session import get_session
+from tools import utils
+
+# (model, key_columns, update_columns, insert_columns)
+_GroupKey = Tuple[Type, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+
+def has_unique_key(table: Table, key_columns: Sequence[str]) -> bool:
+    """
+    Whether the table has a unique constraint/index exactly on key_columns
+    ON CONFLICT / ON DUPLICATE KEY need one to detect existing rows
+    """
+    wanted = set(key_columns)
+    if len(wanted) == 1 and any(col.unique for col in table.columns if col.name in wanted):
+        return True
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and {col.name for col in constraint.columns} == wanted:
+            return True
+    for index in table.indexes:
+        if index.unique and {col.name for col in index.columns} == wanted:
+            return True
+    return False
+
+
+class DbBatchWriter:
+    """
+    Collect rows per ORM model and flush them with dialect-native bulk upserts:
+    MySQL uses INSERT ... ON DUPLICATE KEY UPDATE, SQLite uses INSERT ... ON CONFLICT DO UPDATE.
+    Rows of a table without a unique key on key_columns fall back to one SELECT plus bulk
+    INSERT/UPDATE, still a single transaction per flush.
+    """
+
+    def __init__(self):
+        self._pending: Dict[_GroupKey, Dict[Tuple, Dict]] = {}
+
+    def add(self, model: Type, row: Dict, key_columns: Sequence[str], update_columns: Optional[Sequence[str]] = None):
+        """
+        Queue one row
+        Args:
+            model: ORM model class
+            row: column -> value, values are inserted as-is
+            key_columns: natural key used to find the existing row
+            update_columns: columns overwritten when the row exists, defaults to every non-key column
+        """
+        if any(row.get(col) is None for col in key_columns):
+            return
+        if update_columns is None:
+            update_columns = [col for col in row.keys() if col not in key_columns]
+        group_key = (model, tuple(key_columns), tuple(update_columns), tuple(row.keys()))
+        group = self._pending.setdefault(group_key, {})
+        # 同一批次内重复的记录以最后一条为准
+        group[tuple(row[col] for col in key_columns)] = row
+
+    def __len__(self):
+        return sum(len(rows) for rows in self._pending.values())
+
+    async def flush(self):
+        """
+        Write all queued rows in one transaction
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        async with get_session() as session:
+            if session is None:
+                return
+            dialect = session.bind.dialect.name
+            for (model, key_columns, update_columns, _), grouped_rows in pending.items():
+                rows = list(grouped_rows.values())
+                table: Table = model.__table__
+                if dialect in ("mysql", "sqlite") and has_unique_key(table, key_columns):
+                    await self._native_upsert(session, dialect, table, rows, key_columns, update_columns)
+                else:
+                    await self._select_then_write(session, table, rows, key_columns, update_columns)
+                utils.logger.info(f"[DbBatchWriter.flush] Upserted {len(rows)} rows into {table.name}")
+
+    @staticmethod
+    async def _native_upsert(session: AsyncSession, dialect: str, table: Table, rows: List[Dict],
+                             key_columns: Sequence[str], update_columns: Sequence[str]):
+        if dialect == "mysql":
+            stmt = mysql_insert(table).values(rows)
+            if update_columns:
+                stmt = stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in update_columns})
+            else:
+                stmt = stmt.prefix_with("IGNORE")
+        else:
+            stmt = sqlite_insert(table).values(rows)
+            if update_columns:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(key_columns),
+                    set_={col: stmt.excluded[col] for col in update_columns},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+        await session.execute(stmt)
+
+    @staticmethod
+    async def _select_then_write(session: AsyncSession, table: Table, rows: List[Dict],
+                                 key_columns: Sequence[str], update_columns: Sequence[str]):
+        key_cols = [table.c[col] for col in key_columns]
+        keys = [tuple(row[col] for col in key_columns) for row in rows]
+        if len(key_cols) == 1:
+            stmt = select(key_cols[0]).where(key_cols[0].in_([key[0] for key in keys]))
+        else:
+            stmt = select(*key_cols).where(tuple_(*key_cols).in_(keys))
+        result = await session.execute(stmt)
+        # 数据库中的类型可能与传入值不同（如 BigInteger 与 str），统一转成字符串比较
+        existing = {tuple(str(value) for value in db_row) for db_row in result.all()}
+
+        new_rows, old_rows = [], []
+        for key, row in zip(keys, rows):
+            (old_rows if tuple(str(value) for value in key) in existing else new_rows).append(row)
+
+        if new_rows:
+            await session.execute(table.insert(), new_rows)
+        if old_rows and update_columns:
+            stmt = update(table).where(*[col == bindparam(f"_key_{col.name}") for col in key_cols]).values(
+                {col: bindparam(f"_val_{col}") for col in update_columns}
+            )
+            params = [
+                {**{f"_key_{col}": row[col] for col in key_columns}, **{f"_val_{col}": row.get(col) for col in update_columns}}
+                for row in old_rows
+            ]
+            await session.execute(stmt, params)
@@ -16,16 +16,18 @@
 # 详细许可条款请参阅项目根目录下的LICENSE文件。
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from contextlib import asynccontextmanager
 from .models import Base
+from .natural_keys import ensure_natural_keys
 import config
-from config.db_config import mysql_db_config, sqlite_db_config
+from config.db_config import mysql_db_config, mysql_engine_options, sqlite_db_config, sqlite_pragmas
 
 # Keep a cache of engines
 _engines = {}
+# Session factories are built once per engine
+_session_factories = {}
 
 
 async def create_database_if_not_exists(db_type: str):
@@ -38,6 +40,14 @@ async def create_database_if_not_exists(db_type: str):
         await engine.dispose()
 
 
+def get_database_url(db_type: str) -> str:
+    if db_type == "sqlite":
+        return f"sqlite+aiosqlite:///{sqlite_db_config['db_path']}"
+    elif db_type == "mysql" or db_type == "db":
+        return f"mysql+asyncmy://{mysql_db_config['user']}:{mysql_db_config['password']}@{mysql_db_config['host']}:{mysql_db_config['port']}/{mysql_db_config['db_name']}"
+    raise ValueError(f"Unsupported database type: {db_type}")
+
+
 def get_async_engine(db_type: str = None):
     if db_type is None:
         db_type = config.SAVE_DATA_OPTION
@@ -45,21 +55,51 @@ def get_async_engine(db_type: str = None):
     if db_type in _engines:
         return _engines[db_type]
 
-    if db_type in ["json", "csv"]:
+    if db_type in ["json", "jsonl", "csv"]:
         return None
 
     if db_type == "sqlite":
-        db_url = f"sqlite+aiosqlite:///{sqlite_db_config['db_path']}"
-    elif db_type == "mysql" or db_type == "db":
-        db_url = f"mysql+asyncmy://{mysql_db_config['user']}:{mysql_db_config['password']}@{mysql_db_config['host']}:{mysql_db_config['port']}/{mysql_db_config['db_name']}"
+        # 连接层的超时与 busy_timeout 保持一致（秒）
+        engine = create_async_engine(
+            get_database_url(db_type),
+            echo=False,
+            connect_args={"timeout": sqlite_pragmas["busy_timeout"] / 1000},
+        )
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
     else:
-        raise ValueError(f"Unsupported database type: {db_type}")
-
-    engine = create_async_engine(db_url, echo=False)
+        engine = create_async_engine(get_database_url(db_type), echo=False, **mysql_engine_options)
     _engines[db_type] = engine
     return engine
 
 
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def get_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    factory = _session_factories.get(engine)
+    if factory is None:
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        _session_factories[engine] = factory
+    return factory
+
+
+async def dispose_engines():
+    """
+    Dispose all cached engines and release their pooled connections
+    """
+    engines = list(_engines.values())
+    _engines.clear()
+    _session_factories.clear()
+    for engine in engines:
+        await engine.dispose()
+
+
 async def create_tables(db_type: str = None):
     if db_type is None:
         db_type = config.SAVE_DATA_OPTION
@@ -68,6 +108,8 @@ async def create_tables(db_type: str = None):
     if engine:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            # create_all 不会修改已存在的表，老库需要去重后补建唯一索引
+            await conn.run_sync(ensure_natural_keys)
 
 
 @asynccontextmanager
@@ -76,8 +118,7 @@ async def get_session() -> AsyncSession:
     if not engine:
         yield None
         return
-    AsyncSessionFactory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    session = AsyncSessionFactory()
+    session = get_session_factory(engine)()
     try:
         yield session
         await session.commit()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/migrations/versions/0001_natural_key_unique_indexes.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""natural key unique indexes
+
+为内容、评论、创作者、联系人、动态表的自然键建立唯一索引，建索引前删除重复行（保留 id 最大的一条）
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-10-17 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# 迁移内容固定在本文件中，不引用 database.models / database.natural_keys，
+# 以后模型变化时这个版本执行的仍是同样的迁移
+# (table, index, columns)
+NATURAL_KEY_INDEXES = [
+    ("bilibili_contact_info", "uq_bilibili_contact_info_up_id_fan_id", ["up_id", "fan_id"]),
+    ("bilibili_up_dynamic", "ix_bilibili_up_dynamic_dynamic_id", ["dynamic_id"]),
+    ("bilibili_up_info", "ix_bilibili_up_info_user_id", ["user_id"]),
+    ("bilibili_video", "ix_bilibili_video_video_id", ["video_id"]),
+    ("bilibili_video_comment", "ix_bilibili_video_comment_comment_id", ["comment_id"]),
+    ("douyin_aweme", "ix_douyin_aweme_aweme_id", ["aweme_id"]),
+    ("douyin_aweme_comment", "ix_douyin_aweme_comment_comment_id", ["comment_id"]),
+    ("dy_creator", "ix_dy_creator_user_id", ["user_id"]),
+    ("kuaishou_video", "ix_kuaishou_video_video_id", ["video_id"]),
+    ("kuaishou_video_comment", "ix_kuaishou_video_comment_comment_id", ["comment_id"]),
+    ("tieba_comment", "ix_tieba_comment_comment_id", ["comment_id"]),
+    ("tieba_creator", "ix_tieba_creator_user_id", ["user_id"]),
+    ("tieba_note", "ix_tieba_note_note_id", ["note_id"]),
+    ("weibo_creator", "ix_weibo_creator_user_id", ["user_id"]),
+    ("weibo_note", "ix_weibo_note_note_id", ["note_id"]),
+    ("weibo_note_comment", "ix_weibo_note_comment_comment_id", ["comment_id"]),
+    ("xhs_creator", "ix_xhs_creator_user_id", ["user_id"]),
+    ("xhs_note", "ix_xhs_note_note_id", ["note_id"]),
+    ("xhs_note_comment", "ix_xhs_note_comment_comment_id", ["comment_id"]),
+    ("zhihu_comment", "ix_zhihu_comment_comment_id", ["comment_id"]),
+    ("zhihu_content", "ix_zhihu_content_content_id", ["content_id"]),
+    ("zhihu_creator", "ix_zhihu_creator_user_id", ["user_id"]),
+]
+
+# 这两个唯一索引在此迁移之前就已存在，downgrade 时保留
+_PRE_EXISTING = {"ix_bilibili_video_video_id", "ix_zhihu_creator_user_id"}
+
+# 此迁移之前已有的同名普通索引，downgrade 时恢复为普通索引；其余（如各创作者表的 user_id）原本没有索引，只删除
+_LEGACY_INDEXES = {
+    "ix_bilibili_up_dynamic_dynamic_id",
+    "ix_bilibili_up_info_user_id",
+    "ix_bilibili_video_comment_comment_id",
+    "ix_douyin_aweme_aweme_id",
+    "ix_douyin_aweme_comment_comment_id",
+    "ix_kuaishou_video_video_id",
+    "ix_kuaishou_video_comment_comment_id",
+    "ix_tieba_comment_comment_id",
+    "ix_tieba_note_note_id",
+    "ix_weibo_note_note_id",
+    "ix_weibo_note_comment_comment_id",
+    "ix_xhs_note_note_id",
+    "ix_xhs_note_comment_comment_id",
+    "ix_zhihu_comment_comment_id",
+    "ix_zhihu_content_content_id",
+}
+
+
+def _dedupe_rows(bind, table: str, columns):
+    """删除自然键重复的行，保留 id 最大的一条；自然键为 NULL 的行不会冲突，保持不动"""
+    preparer = bind.dialect.identifier_preparer
+    table_name = preparer.quote(table)
+    cols = ", ".join(preparer.quote(col) for col in columns)
+    not_null = " AND ".join(f"{preparer.quote(col)} IS NOT NULL" for col in columns)
+    # 套一层派生表，MySQL 不允许 DELETE 的子查询直接引用目标表
+    bind.execute(sa.text(
+        f"DELETE FROM {table_name} WHERE {not_null} AND id NOT IN "
+        f"(SELECT id FROM (SELECT MAX(id) AS id FROM {table_name} WHERE {not_null} GROUP BY {cols}) AS keep_rows)"
+    ))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table, index_name, columns in NATURAL_KEY_INDEXES:
+        if table not in existing_tables:
+            continue
+        db_indexes = inspector.get_indexes(table)
+        if any(db_index.get("unique") and list(db_index["column_names"]) == columns for db_index in db_indexes):
+            continue
+        if any(list(constraint["column_names"]) == columns for constraint in inspector.get_unique_constraints(table)):
+            continue
+        _dedupe_rows(bind, table, columns)
+        # 旧版本建表时同名的普通索引需要先删除
+        if any(db_index["name"] == index_name for db_index in db_indexes):
+            op.drop_index(index_name, table_name=table)
+        op.create_index(index_name, table, columns, unique=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing_tables = set(inspector.get_table_names())
+    for table, index_name, columns in NATURAL_KEY_INDEXES:
+        if index_name in _PRE_EXISTING or table not in existing_tables:
+            continue
+        op.drop_index(index_name, table_name=table)
+        if index_name in _LEGACY_INDEXES:
+            op.create_index(index_name, table, columns, unique=False)
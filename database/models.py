@@ -16,7 +16,7 @@
 # 详细许可条款请参阅项目根目录下的LICENSE文件。
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
-from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger
+from sqlalchemy import create_engine, Column, Index, Integer, Text, String, BigInteger
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -57,7 +57,7 @@ class BilibiliVideoComment(Base):
     avatar = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     video_id = Column(BigInteger, index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
@@ -68,7 +68,7 @@ class BilibiliVideoComment(Base):
 class BilibiliUpInfo(Base):
     __tablename__ = 'bilibili_up_info'
     id = Column(Integer, primary_key=True)
-    user_id = Column(BigInteger, index=True)
+    user_id = Column(BigInteger, index=True, unique=True)
     nickname = Column(Text)
     sex = Column(Text)
     sign = Column(Text)
@@ -82,6 +82,9 @@ class BilibiliUpInfo(Base):
 
 class BilibiliContactInfo(Base):
     __tablename__ = 'bilibili_contact_info'
+    __table_args__ = (
+        Index('uq_bilibili_contact_info_up_id_fan_id', 'up_id', 'fan_id', unique=True),
+    )
     id = Column(Integer, primary_key=True)
     up_id = Column(BigInteger, index=True)
     fan_id = Column(BigInteger, index=True)
@@ -97,7 +100,7 @@ class BilibiliContactInfo(Base):
 class BilibiliUpDynamic(Base):
     __tablename__ = 'bilibili_up_dynamic'
     id = Column(Integer, primary_key=True)
-    dynamic_id = Column(BigInteger, index=True)
+    dynamic_id = Column(BigInteger, index=True, unique=True)
     user_id = Column(String(255))
     user_name = Column(Text)
     text = Column(Text)
@@ -122,7 +125,7 @@ class DouyinAweme(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    aweme_id = Column(BigInteger, index=True)
+    aweme_id = Column(BigInteger, index=True, unique=True)
     aweme_type = Column(Text)
     title = Column(Text)
     desc = Column(Text)
@@ -151,7 +154,7 @@ class DouyinAwemeComment(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     aweme_id = Column(BigInteger, index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
@@ -163,7 +166,7 @@ class DouyinAwemeComment(Base):
 class DyCreator(Base):
     __tablename__ = 'dy_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(255))
+    user_id = Column(String(255), index=True, unique=True)
     nickname = Column(Text)
     avatar = Column(Text)
     ip_location = Column(Text)
@@ -184,7 +187,7 @@ class KuaishouVideo(Base):
     avatar = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    video_id = Column(String(255), index=True)
+    video_id = Column(String(255), index=True, unique=True)
     video_type = Column(Text)
     title = Column(Text)
     desc = Column(Text)
@@ -204,7 +207,7 @@ class KuaishouVideoComment(Base):
     avatar = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     video_id = Column(String(255), index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
@@ -221,7 +224,7 @@ class WeiboNote(Base):
     ip_location = Column(Text, default='')
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    note_id = Column(BigInteger, index=True)
+    note_id = Column(BigInteger, index=True, unique=True)
     content = Column(Text)
     create_time = Column(BigInteger, index=True)
     create_date_time = Column(String(255), index=True)
@@ -242,7 +245,7 @@ class WeiboNoteComment(Base):
     ip_location = Column(Text, default='')
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     note_id = Column(BigInteger, index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
@@ -254,7 +257,7 @@ class WeiboNoteComment(Base):
 class WeiboCreator(Base):
     __tablename__ = 'weibo_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(255))
+    user_id = Column(String(255), index=True, unique=True)
     nickname = Column(Text)
     avatar = Column(Text)
     ip_location = Column(Text)
@@ -269,7 +272,7 @@ class WeiboCreator(Base):
 class XhsCreator(Base):
     __tablename__ = 'xhs_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(255))
+    user_id = Column(String(255), index=True, unique=True)
     nickname = Column(Text)
     avatar = Column(Text)
     ip_location = Column(Text)
@@ -291,7 +294,7 @@ class XhsNote(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    note_id = Column(String(255), index=True)
+    note_id = Column(String(255), index=True, unique=True)
     type = Column(Text)
     title = Column(Text)
     desc = Column(Text)
@@ -317,7 +320,7 @@ class XhsNoteComment(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(String(255), index=True)
+    comment_id = Column(String(255), index=True, unique=True)
     create_time = Column(BigInteger, index=True)
     note_id = Column(String(255))
     content = Column(Text)
@@ -329,7 +332,7 @@ class XhsNoteComment(Base):
 class TiebaNote(Base):
     __tablename__ = 'tieba_note'
     id = Column(Integer, primary_key=True)
-    note_id = Column(String(644), index=True)
+    note_id = Column(String(644), index=True, unique=True)
     title = Column(Text)
     desc = Column(Text)
     note_url = Column(Text)
@@ -350,7 +353,7 @@ class TiebaNote(Base):
 class TiebaComment(Base):
     __tablename__ = 'tieba_comment'
     id = Column(Integer, primary_key=True)
-    comment_id = Column(String(255), index=True)
+    comment_id = Column(String(255), index=True, unique=True)
     parent_comment_id = Column(String(255), default='')
     content = Column(Text)
     user_link = Column(Text, default='')
@@ -370,7 +373,7 @@ class TiebaComment(Base):
 class TiebaCreator(Base):
     __tablename__ = 'tieba_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(64))
+    user_id = Column(String(64), index=True, unique=True)
     user_name = Column(Text)
     nickname = Column(Text)
     avatar = Column(Text)
@@ -385,7 +388,7 @@ class TiebaCreator(Base):
 class ZhihuContent(Base):
     __tablename__ = 'zhihu_content'
     id = Column(Integer, primary_key=True)
-    content_id = Column(String(64), index=True)
+    content_id = Column(String(64), index=True, unique=True)
     content_type = Column(Text)
     content_text = Column(Text)
     content_url = Column(Text)
@@ -413,7 +416,7 @@ class ZhihuContent(Base):
 class ZhihuComment(Base):
     __tablename__ = 'zhihu_comment'
     id = Column(Integer, primary_key=True)
-    comment_id = Column(String(64), index=True)
+    comment_id = Column(String(64), index=True, unique=True)
     parent_comment_id = Column(String(64))
     content = Column(Text)
     publish_time = Column(String(32), index=True)
@@ -18,12 +18,24 @@
 
 """MongoDB存储基类：提供连接管理和通用存储方法"""
 import asyncio
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+import config
 from config import db_config
 from tools import utils
 
 
+class _PendingOps:
+    """单个集合待写入的 upsert 操作，同一查询条件的多次写入会合并"""
+
+    def __init__(self):
+        self.ops: Dict[Tuple, Tuple[Dict, Dict]] = {}
+        self.lock = asyncio.Lock()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
 class MongoDBConnection:
     """MongoDB连接管理（单例模式）"""
     _instance = None
@@ -86,7 +98,18 @@ class MongoDBConnection:
 
 
 class MongoDBStoreBase:
-    """MongoDB存储基类：提供通用的CRUD操作"""
+    """MongoDB存储基类：提供通用的CRUD操作
+
+    save_or_update 写入的数据先缓存在内存中，按集合合并为一次 bulk_write(ordered=False)，
+    达到 MONGODB_BULK_WRITE_BATCH_SIZE 条或等待 MONGODB_BULK_WRITE_FLUSH_INTERVAL_SEC 秒后写入，
+    程序结束时通过 flush_all() 写入剩余数据。
+    存储实现是按条创建的，所以缓冲区和已建索引的记录放在类上，由所有实例共享。
+    """
+
+    _pending: Dict[str, _PendingOps] = {}
+    _indexed_collections: Set[str] = set()
+    # 定时触发的后台写入任务，保留引用避免执行中被回收
+    _flush_tasks: Set[asyncio.Task] = set()
 
     def __init__(self, collection_prefix: str):
         """初始化存储基类
@@ -103,18 +126,115 @@ class MongoDBStoreBase:
         return db[collection_name]
 
     async def save_or_update(self, collection_suffix: str, query: Dict, data: Dict) -> bool:
-        """保存或更新数据（upsert）"""
+        """保存或更新数据（upsert），先进入批量写入缓冲区"""
+        collection_name = f"{self.collection_prefix}_{collection_suffix}"
         try:
-            collection = await self.get_collection(collection_suffix)
-            await collection.update_one(query, {"$set": data}, upsert=True)
-            return True
+            await self.ensure_indexes(collection_suffix, list(query.keys()))
         except Exception as e:
-            utils.logger.error(f"[MongoDBStoreBase] Save failed ({self.collection_prefix}_{collection_suffix}): {e}")
+            utils.logger.error(f"[MongoDBStoreBase] Save failed ({collection_name}): {e}")
             return False
 
+        pending = MongoDBStoreBase._pending.get(collection_name)
+        if pending is None:
+            pending = _PendingOps()
+            MongoDBStoreBase._pending[collection_name] = pending
+        op_key = tuple(sorted(query.items(), key=lambda kv: kv[0]))
+        if op_key in pending.ops:
+            _, merged = pending.ops[op_key]
+            merged.update(data)
+        else:
+            pending.ops[op_key] = (dict(query), dict(data))
+
+        if len(pending.ops) >= config.MONGODB_BULK_WRITE_BATCH_SIZE:
+            return await self._flush_collection(collection_name)
+        if pending.timer is None:
+            loop = asyncio.get_running_loop()
+            pending.timer = loop.call_later(
+                config.MONGODB_BULK_WRITE_FLUSH_INTERVAL_SEC, self._start_background_flush, collection_name
+            )
+        return True
+
+    @classmethod
+    def _start_background_flush(cls, collection_name: str):
+        task = asyncio.ensure_future(cls._flush_collection(collection_name))
+        cls._flush_tasks.add(task)
+        task.add_done_callback(cls._flush_tasks.discard)
+
+    async def ensure_indexes(self, collection_suffix: str, keys: List[str]):
+        """在自然主键上建立唯一索引，每个集合只执行一次"""
+        collection_name = f"{self.collection_prefix}_{collection_suffix}"
+        if collection_name in MongoDBStoreBase._indexed_collections or not keys:
+            return
+        collection = await self.get_collection(collection_suffix)
+        index_keys = [(key, 1) for key in keys]
+        try:
+            await collection.create_index(index_keys, unique=True)
+        except OperationFailure as e:
+            # 历史数据中已有重复记录或已存在同名的普通索引时，退回普通索引保证查询不再全表扫描
+            utils.logger.warning(f"[MongoDBStoreBase] Create unique index on {collection_name} {keys} failed, fallback to normal index: {e}")
+            try:
+                await collection.create_index(index_keys)
+            except OperationFailure as e:
+                utils.logger.warning(f"[MongoDBStoreBase] Create index on {collection_name} {keys} failed: {e}")
+        MongoDBStoreBase._indexed_collections.add(collection_name)
+
+    async def flush(self, collection_suffix: Optional[str] = None) -> bool:
+        """写入当前平台（或指定集合）缓冲区中的数据"""
+        if collection_suffix is not None:
+            return await self._flush_collection(f"{self.collection_prefix}_{collection_suffix}")
+        ok = True
+        for collection_name in list(MongoDBStoreBase._pending.keys()):
+            if collection_name.startswith(f"{self.collection_prefix}_"):
+                ok = await self._flush_collection(collection_name) and ok
+        return ok
+
+    @classmethod
+    async def flush_all(cls) -> bool:
+        """写入所有集合缓冲区中的数据，在爬虫结束时调用"""
+        # 先等已经开始的后台写入完成
+        if cls._flush_tasks:
+            await asyncio.gather(*list(cls._flush_tasks), return_exceptions=True)
+        ok = True
+        for collection_name in list(cls._pending.keys()):
+            ok = await cls._flush_collection(collection_name) and ok
+        # 已写空的缓冲区连同其中的锁和定时器一起丢弃，不留到下一个事件循环
+        for collection_name, pending in list(cls._pending.items()):
+            if pending.ops or pending.lock.locked():
+                continue
+            if pending.timer is not None:
+                pending.timer.cancel()
+            del cls._pending[collection_name]
+        return ok
+
+    @classmethod
+    async def _flush_collection(cls, collection_name: str) -> bool:
+        pending = cls._pending.get(collection_name)
+        if pending is None:
+            return True
+        async with pending.lock:
+            if pending.timer is not None:
+                pending.timer.cancel()
+                pending.timer = None
+            ops, pending.ops = pending.ops, {}
+            if not ops:
+                return True
+            requests = [UpdateOne(query, {"$set": data}, upsert=True) for query, data in ops.values()]
+            try:
+                db = await MongoDBConnection().get_db()
+                await db[collection_name].bulk_write(requests, ordered=False)
+                return True
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                utils.logger.error(f"[MongoDBStoreBase] Bulk write partially failed ({collection_name}): {len(write_errors)}/{len(requests)} errors, first: {write_errors[:1]}")
+                return False
+            except Exception as e:
+                utils.logger.error(f"[MongoDBStoreBase] Bulk write failed ({collection_name}): {e}")
+                return False
+
     async def find_one(self, collection_suffix: str, query: Dict) -> Optional[Dict]:
         """查询单条数据"""
         try:
+            await self.flush(collection_suffix)
             collection = await self.get_collection(collection_suffix)
             return await collection.find_one(query)
         except Exception as e:
@@ -124,6 +244,7 @@ class MongoDBStoreBase:
     async def find_many(self, collection_suffix: str, query: Dict, limit: int = 0) -> List[Dict]:
         """查询多条数据（limit=0表示不限制）"""
         try:
+            await self.flush(collection_suffix)
             collection = await self.get_collection(collection_suffix)
             cursor = collection.find(query)
             if limit > 0:
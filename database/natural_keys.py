@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/natural_keys.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""自然键唯一索引：为已有数据库去重并补建 models.py 中声明的唯一索引"""
+from typing import List, Tuple
+
+from sqlalchemy import Index, Table, inspect, text
+from sqlalchemy.engine import Connection
+
+from database.models import Base
+from tools import utils
+
+
+def get_natural_key_indexes() -> List[Tuple[Table, Index]]:
+    """
+    All unique indexes declared in database/models.py
+    Returns:
+        (table, index) pairs
+    """
+    indexes = []
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.unique:
+                indexes.append((table, index))
+    return indexes
+
+
+def dedupe_rows(connection: Connection, table: Table, columns: List[str]) -> int:
+    """
+    Delete duplicate rows of the natural key, the row with the largest id is kept
+    Rows with a NULL key are left alone, they never conflict
+    Returns:
+        deleted row count
+    """
+    preparer = connection.dialect.identifier_preparer
+    table_name = preparer.quote(table.name)
+    cols = ", ".join(preparer.quote(col) for col in columns)
+    not_null = " AND ".join(f"{preparer.quote(col)} IS NOT NULL" for col in columns)
+    # 套一层派生表，MySQL 不允许 DELETE 的子查询直接引用目标表
+    stmt = text(
+        f"DELETE FROM {table_name} WHERE {not_null} AND id NOT IN "
+        f"(SELECT id FROM (SELECT MAX(id) AS id FROM {table_name} WHERE {not_null} GROUP BY {cols}) AS keep_rows)"
+    )
+    return connection.execute(stmt).rowcount or 0
+
+
+def ensure_natural_keys(connection: Connection):
+    """
+    Make an existing database match the unique indexes of the ORM models
+    Safe to run repeatedly: tables that already have the unique index are skipped
+    Args:
+        connection: sync connection, use AsyncConnection.run_sync from async code
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    for table, index in get_natural_key_indexes():
+        if table.name not in existing_tables:
+            continue
+        columns = [col.name for col in index.columns]
+        db_indexes = inspector.get_indexes(table.name)
+        if any(db_index.get("unique") and list(db_index["column_names"]) == columns for db_index in db_indexes):
+            continue
+        db_unique_constraints = inspector.get_unique_constraints(table.name)
+        if any(list(constraint["column_names"]) == columns for constraint in db_unique_constraints):
+            continue
+
+        deleted = dedupe_rows(connection, table, columns)
+        if deleted:
+            utils.logger.info(f"[ensure_natural_keys] Removed {deleted} duplicate rows from {table.name} on {columns}")
+        # 旧版本建表时同名的普通索引需要先删除
+        if any(db_index["name"] == index.name for db_index in db_indexes):
+            Index(index.name, *[table.c[col] for col in columns]).drop(connection)
+        index.create(connection)
+        utils.logger.info(f"[ensure_natural_keys] Created unique index {index.name} on {table.name}")
@@ -1,6 +1,7 @@
 import asyncio
 import config
-from main import CrawlerFactory
+from main import CrawlerFactory, finish_crawler_run
+from tools.rate_limiter import apply_rate_limit_config
 
 # 全局锁，防止并发修改 config 导致冲突
 CRAWLER_LOCK = asyncio.Lock()
@@ -28,9 +29,16 @@ async def run_crawler(**kwargs):
 
         # 2. 创建并启动爬虫
         try:
+            apply_rate_limit_config()
             crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
             await crawler.start()
             return True
         except Exception as e:
             print(f"❌ Crawler execution failed: {e}")
             raise e
+        finally:
+            # 关闭连接池、写入缓冲区中的数据，失败时不掩盖爬虫本身的异常
+            try:
+                await finish_crawler_run()
+            except Exception as e:
+                print(f"⚠️ Crawler cleanup failed: {e}")
@@ -0,0 +1,55 @@
+// 常驻签名进程：只加载一次签名脚本，通过 stdin/stdout 按行收发 JSON 请求
+// 请求: {"id": 1, "fn": "sign_datail", "args": ["a=1", "Mozilla/5.0 ..."]}
+// 响应: {"id": 1, "result": "..."} 或 {"id": 1, "error": "..."}
+// 由 tools/js_sign_service.py 启动和管理，仅供学习交流使用
+
+const fs = require('fs');
+const readline = require('readline');
+const util = require('util');
+const vm = require('vm');
+
+const scriptPath = process.argv[2];
+if (!scriptPath) {
+    process.stderr.write('usage: node js_sign_worker.js <sign_script.js>\n');
+    process.exit(2);
+}
+
+// stdout 只用来返回结果，脚本里的日志输出改到 stderr
+console.log = (...args) => process.stderr.write(util.format(...args) + '\n');
+
+// 签名脚本是普通脚本（不是模块），在全局上下文执行，顶层函数即成为全局函数
+globalThis.require = require;
+vm.runInThisContext(fs.readFileSync(scriptPath, 'utf-8').replace(/^﻿/, ''), {filename: scriptPath});
+
+function reply(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+const rl = readline.createInterface({input: process.stdin, terminal: false});
+rl.on('line', (line) => {
+    if (!line.trim()) {
+        return;
+    }
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (e) {
+        reply({id: null, error: `invalid request: ${e.message}`});
+        return;
+    }
+    const {id, fn, args} = request;
+    if (fn === '__ping__') {
+        reply({id, result: 'pong'});
+        return;
+    }
+    try {
+        const func = globalThis[fn];
+        if (typeof func !== 'function') {
+            throw new Error(`function ${fn} not found`);
+        }
+        reply({id, result: func(...(args || []))});
+    } catch (e) {
+        reply({id, error: String(e && e.message || e)});
+    }
+});
+rl.on('close', () => process.exit(0));
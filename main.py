@@ -30,6 +30,7 @@ load_dotenv()
 import cmd_arg
 import config
 from database import db
+from database.mongodb_store_base import MongoDBStoreBase
 from base.base_crawler import AbstractCrawler
 from media_platform.bilibili import BilibiliCrawler
 from media_platform.douyin import DouYinCrawler
@@ -38,6 +39,11 @@ from media_platform.tieba import TieBaCrawler
 from media_platform.weibo import WeiboCrawler
 from media_platform.xhs import XiaoHongShuCrawler
 from media_platform.zhihu import ZhihuCrawler
+from proxy.proxy_mixin import ProxyRefreshMixin
+from tools.js_sign_service import JsSignPool
+from tools.media_download_manager import MediaDownloadManager
+from tools.media_store import MediaStore
+from tools.rate_limiter import apply_rate_limit_config
 from tools.async_file_writer import AsyncFileWriter
 from var import crawler_type_var
 
@@ -80,13 +86,31 @@ async def main():
     # init db
     if args.init_db:
         await db.init_db(args.init_db)
+        await db.close()
         print(f"Database {args.init_db} initialized successfully.")
         return  # Exit the main function cleanly
 
 
 
+    # Replace the fixed sleeps with the shared token buckets when enabled
+    apply_rate_limit_config()
+
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
     await crawler.start()
+    await finish_crawler_run()
+
+
+async def finish_crawler_run():
+    """
+    一次爬取正常结束后的收尾：关闭连接池和常驻进程，写入缓冲区中的数据，生成词云等
+    main.py、run_crawler_task.py 和飞书机器人的 crawler_runner 共用
+    """
+    # Close the pooled httpx connections of the API clients
+    await ProxyRefreshMixin.close_all_http_clients()
+    # Stop the resident JS sign workers
+    await JsSignPool.close_all()
+    # Close the media store url index
+    await MediaStore.close_all()
 
     # Flush Excel data if using Excel export
     if config.SAVE_DATA_OPTION == "excel":
@@ -97,11 +121,19 @@ async def main():
         except Exception as e:
             print(f"[Main] Error flushing Excel data: {e}")
 
+    # Write the buffered csv/json/jsonl batches to disk
+    if config.SAVE_DATA_OPTION in ["csv", "json", "jsonl"]:
+        await AsyncFileWriter.flush_all()
+
+    # Write the buffered MongoDB upserts
+    if config.SAVE_DATA_OPTION == "mongodb":
+        await MongoDBStoreBase.flush_all()
+
     # Generate wordcloud after crawling is complete
-    # Only for JSON save mode
-    if config.SAVE_DATA_OPTION == "json" and config.ENABLE_GET_WORDCLOUD:
+    # Only for JSON / JSONL save mode
+    if config.SAVE_DATA_OPTION in ["json", "jsonl"] and config.ENABLE_GET_WORDCLOUD:
         try:
-            file_writer = AsyncFileWriter(
+            file_writer = AsyncFileWriter.get_instance(
                 platform=config.PLATFORM,
                 crawler_type=crawler_type_var.get()
             )
@@ -109,6 +141,18 @@ async def main():
         except Exception as e:
             print(f"Error generating wordcloud: {e}")
 
+    # Optionally compact JSONL files to the JSON array layout
+    if config.SAVE_DATA_OPTION == "jsonl" and config.JSONL_COMPACT_TO_JSON:
+        try:
+            await AsyncFileWriter.compact_written_jsonl_files()
+            print("[Main] JSONL files compacted to JSON successfully")
+        except Exception as e:
+            print(f"[Main] Error compacting JSONL files: {e}")
+
+    # Release pooled database connections on the loop that opened them
+    if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
+        await db.close()
+
 
 async def async_cleanup():
     """异步清理函数，用于处理CDP浏览器等异步资源"""
@@ -136,6 +180,44 @@ async def async_cleanup():
                 if "closed" not in error_msg and "disconnected" not in error_msg:
                     print(f"[Main] 关闭浏览器上下文时出错: {e}")
 
+    # 取消后台未完成的媒体下载（.part 文件保留，下次运行时续传）
+    try:
+        await asyncio.wait_for(MediaDownloadManager.cancel_all(), timeout=5)
+    except Exception as e:
+        print(f"[Main] 取消媒体下载时出错: {e}")
+
+    # 关闭媒体存储的 url 索引
+    try:
+        await asyncio.wait_for(MediaStore.close_all(), timeout=5)
+    except Exception as e:
+        print(f"[Main] 关闭媒体存储索引时出错: {e}")
+
+    # 关闭 API client 的 httpx 连接池
+    try:
+        await asyncio.wait_for(ProxyRefreshMixin.close_all_http_clients(), timeout=5)
+    except Exception as e:
+        print(f"[Main] 关闭HTTP连接池时出错: {e}")
+
+    # 结束常驻的 JS 签名进程
+    try:
+        await asyncio.wait_for(JsSignPool.close_all(), timeout=5)
+    except Exception as e:
+        print(f"[Main] 关闭JS签名进程时出错: {e}")
+
+    # 写入文件缓冲区中剩余的数据（中断退出时保证已采集的数据落盘）
+    if config.SAVE_DATA_OPTION in ["csv", "json", "jsonl"]:
+        try:
+            await asyncio.wait_for(AsyncFileWriter.flush_all(), timeout=10)
+        except Exception as e:
+            print(f"[Main] 写入文件缓冲区时出错: {e}")
+
+    # 写入 MongoDB 批量写入缓冲区中剩余的数据
+    if config.SAVE_DATA_OPTION == "mongodb":
+        try:
+            await asyncio.wait_for(MongoDBStoreBase.flush_all(), timeout=10)
+        except Exception as e:
+            print(f"[Main] 写入MongoDB缓冲区时出错: {e}")
+
     # 关闭数据库连接
     if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
         await db.close()
@@ -34,16 +34,20 @@ import config
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.media_downloader import DownloadResult, stream_download
+from tools.rate_limiter import RateLimiter
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
 
-from .exception import DataFetchError
+from .exception import DataFetchError, WbiSignError
 from .field import CommentOrderType, SearchOrderType
-from .help import BilibiliSign
+from .help import WbiKeyManager
 
 
 class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
+    # -403 访问权限不足 / -352 风控校验失败，WBI key 过期时会返回这两个错误码
+    WBI_SIGN_ERROR_CODES = (-403, -352)
 
     def __init__(
         self,
@@ -61,21 +65,26 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
         self._host = "https://api.bilibili.com"
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
+        self._wbi_key_manager = WbiKeyManager(self.get_wbi_keys)
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
 
     async def request(self, method, url, **kwargs) -> Any:
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
+        # 按平台和接口类别领取限速令牌
+        await RateLimiter.acquire("bili", url)
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
         try:
             data: Dict = response.json()
         except json.JSONDecodeError:
             utils.logger.error(f"[BilibiliClient.request] Failed to decode JSON from response. status_code: {response.status_code}, response_text: {response.text}")
             raise DataFetchError(f"Failed to decode JSON, content: {response.text}")
-        if data.get("code") != 0:
+        code = data.get("code")
+        if code in self.WBI_SIGN_ERROR_CODES:
+            raise WbiSignError(data.get("message", "unkonw error"))
+        if code != 0:
             raise DataFetchError(data.get("message", "unkonw error"))
         else:
             return data.get("data", {})
@@ -90,16 +99,20 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
         """
         if not req_data:
             return {}
-        img_key, sub_key = await self.get_wbi_keys()
-        return BilibiliSign(img_key, sub_key).sign(req_data)
+        # 签名会往参数里加 wts/w_rid，复制一份避免修改调用方的参数
+        return await self._wbi_key_manager.sign(dict(req_data))
 
     async def get_wbi_keys(self) -> Tuple[str, str]:
         """
-        获取最新的 img_key 和 sub_key
+        获取最新的 img_key 和 sub_key，结果由 WbiKeyManager 缓存
         :return:
         """
-        local_storage = await self.playwright_page.evaluate("() => window.localStorage")
-        wbi_img_urls = local_storage.get("wbi_img_urls", "")
+        # 只读取需要的几个 key，不序列化整个 localStorage
+        local_storage = await self.playwright_page.evaluate(
+            "() => Object.fromEntries(['wbi_img_urls', 'wbi_img_url', 'wbi_sub_url']"
+            ".map(key => [key, window.localStorage.getItem(key)]))"
+        )
+        wbi_img_urls = local_storage.get("wbi_img_urls") or ""
         if not wbi_img_urls:
             img_url_from_storage = local_storage.get("wbi_img_url")
             sub_url_from_storage = local_storage.get("wbi_sub_url")
@@ -116,18 +129,36 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
         return img_key, sub_key
 
     async def get(self, uri: str, params=None, enable_params_sign: bool = True) -> Dict:
-        final_uri = uri
-        if enable_params_sign:
-            params = await self.pre_request_data(params)
-        if isinstance(params, dict):
-            final_uri = (f"{uri}?"
-                         f"{urlencode(params)}")
-        return await self.request(method="GET", url=f"{self._host}{final_uri}", headers=self.headers)
+        async def send() -> Dict:
+            final_uri = uri
+            signed_params = await self.pre_request_data(params) if enable_params_sign else params
+            if isinstance(signed_params, dict):
+                final_uri = (f"{uri}?"
+                             f"{urlencode(signed_params)}")
+            return await self.request(method="GET", url=f"{self._host}{final_uri}", headers=self.headers)
+
+        return await self._send_with_wbi_retry(send, enable_params_sign)
 
     async def post(self, uri: str, data: dict) -> Dict:
-        data = await self.pre_request_data(data)
-        json_str = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
-        return await self.request(method="POST", url=f"{self._host}{uri}", data=json_str, headers=self.headers)
+        async def send() -> Dict:
+            signed_data = await self.pre_request_data(data)
+            json_str = json.dumps(signed_data, separators=(',', ':'), ensure_ascii=False)
+            return await self.request(method="POST", url=f"{self._host}{uri}", data=json_str, headers=self.headers)
+
+        return await self._send_with_wbi_retry(send)
+
+    async def _send_with_wbi_retry(self, send: Callable[[], Any], signed: bool = True) -> Dict:
+        """
+        签名被拒绝时刷新 WBI key 后重新签名发送一次
+        """
+        try:
+            return await send()
+        except WbiSignError:
+            if not signed:
+                raise
+            utils.logger.warning("[BilibiliClient._send_with_wbi_retry] wbi sign rejected, refresh wbi keys and retry")
+            self._wbi_key_manager.invalidate()
+            return await send()
 
     async def pong(self) -> bool:
         """get a note to check if login state is ok"""
@@ -222,19 +253,28 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
 
     async def get_video_media(self, url: str) -> Union[bytes, None]:
         # Follow CDN 302 redirects and treat any 2xx as success (some endpoints return 206)
-        async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=True) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
-                response.raise_for_status()
-                if 200 <= response.status_code < 300:
-                    return response.content
-                utils.logger.error(
-                    f"[BilibiliClient.get_video_media] Unexpected status {response.status_code} for {url}"
-                )
-                return None
-            except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
-                utils.logger.error(f"[BilibiliClient.get_video_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
-                return None
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", url, timeout=self.timeout, headers=self.headers, follow_redirects=True)
+            response.raise_for_status()
+            if 200 <= response.status_code < 300:
+                return response.content
+            utils.logger.error(
+                f"[BilibiliClient.get_video_media] Unexpected status {response.status_code} for {url}"
+            )
+            return None
+        except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(f"[BilibiliClient.get_video_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
+            return None
+
+    async def download_video_media(self, url: str, save_path: str) -> Optional[DownloadResult]:
+        """
+        流式下载视频到 save_path，支持断点续传
+        :param url: 视频地址
+        :param save_path: 保存路径
+        :return:
+        """
+        return await stream_download(self.get_http_client(), url, save_path, headers=self.headers, timeout=self.timeout)
 
     async def get_video_comments(
         self,
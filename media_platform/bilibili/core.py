@@ -42,10 +42,14 @@ from playwright._impl._errors import TargetClosedError
 
 import config
 from base.base_crawler import AbstractCrawler
+from base.crawl_pipeline import CrawlPipeline
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import bilibili as bilibili_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.media_download_manager import MediaDownloadManager
+from tools.media_downloader import MediaSource
+from tools.rate_limiter import effective_sleep_sec
 from var import crawler_type_var, source_keyword_var
 
 from .client import BilibiliClient
@@ -138,6 +142,8 @@ class BilibiliCrawler(AbstractCrawler):
                 await self.get_all_creator_details(config.BILI_CREATOR_ID_LIST)
         else:
             pass
+        # 等待后台的视频下载完成
+        await MediaDownloadManager.drain()
         utils.logger.info("[BilibiliCrawler.start] Bilibili Crawler finished ...")
 
     async def search(self):
@@ -192,37 +198,16 @@ class BilibiliCrawler(AbstractCrawler):
         search bilibili video with keywords in normal mode
         :return:
         """
+        if config.ENABLE_CRAWL_PIPELINE:
+            await self.search_by_keywords_with_pipeline()
+            return
+
         utils.logger.info("[BilibiliCrawler.search_by_keywords] Begin search bilibli keywords")
-        bili_limit_count = 20  # bilibili limit page fixed value
-        if config.CRAWLER_MAX_NOTES_COUNT < bili_limit_count:
-            config.CRAWLER_MAX_NOTES_COUNT = bili_limit_count
-        start_page = config.START_PAGE  # start page number
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
             utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Current search keyword: {keyword}")
-            page = 1
-            while (page - start_page + 1) * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
-                if page < start_page:
-                    utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Skip page: {page}")
-                    page += 1
-                    continue
-
-                utils.logger.info(f"[BilibiliCrawler.search_by_keywords] search bilibili keyword: {keyword}, page: {page}")
+            async for page, video_list in self._iter_search_pages(keyword):
                 video_id_list: List[str] = []
-                videos_res = await self.bili_client.search_video_by_keyword(
-                    keyword=keyword,
-                    page=page,
-                    page_size=bili_limit_count,
-                    order=SearchOrderType.DEFAULT,
-                    pubtime_begin_s=0,  # 作品发布日期起始时间戳
-                    pubtime_end_s=0,  # 作品发布日期结束日期时间戳
-                )
-                video_list: List[Dict] = videos_res.get("result")
-
-                if not video_list:
-                    utils.logger.info(f"[BilibiliCrawler.search_by_keywords] No more videos for '{keyword}', moving to next keyword.")
-                    break
-
                 semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
                 task_list = []
                 try:
@@ -236,14 +221,90 @@ class BilibiliCrawler(AbstractCrawler):
                         await bilibili_store.update_bilibili_video(video_item)
                         await bilibili_store.update_up_info(video_item)
                         await self.get_bilibili_video(video_item, semaphore)
-                page += 1
 
                 # Sleep after page navigation
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Sleeping for {effective_sleep_sec()} seconds after page {page}")
 
                 await self.batch_get_video_comments(video_id_list)
 
+    async def _iter_search_pages(self, keyword: str):
+        """
+        逐页搜索关键词，产出 (页码, 视频列表)，normal 模式与流水线模式共用
+        """
+        bili_limit_count = 20  # bilibili limit page fixed value
+        if config.CRAWLER_MAX_NOTES_COUNT < bili_limit_count:
+            config.CRAWLER_MAX_NOTES_COUNT = bili_limit_count
+        start_page = config.START_PAGE  # start page number
+        page = 1
+        while (page - start_page + 1) * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
+            if page < start_page:
+                utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Skip page: {page}")
+                page += 1
+                continue
+
+            utils.logger.info(f"[BilibiliCrawler.search_by_keywords] search bilibili keyword: {keyword}, page: {page}")
+            videos_res = await self.bili_client.search_video_by_keyword(
+                keyword=keyword,
+                page=page,
+                page_size=bili_limit_count,
+                order=SearchOrderType.DEFAULT,
+                pubtime_begin_s=0,  # 作品发布日期起始时间戳
+                pubtime_end_s=0,  # 作品发布日期结束日期时间戳
+            )
+            video_list: List[Dict] = videos_res.get("result")
+
+            if not video_list:
+                utils.logger.info(f"[BilibiliCrawler.search_by_keywords] No more videos for '{keyword}', moving to next keyword.")
+                return
+            yield page, video_list
+            page += 1
+
+    async def search_by_keywords_with_pipeline(self):
+        """
+        流水线模式的关键词搜索：search -> detail -> store -> media -> comments，各阶段并发执行
+        :return:
+        """
+        utils.logger.info("[BilibiliCrawler.search_by_keywords_with_pipeline] Begin search bilibli keywords")
+
+        async def search_video_items():
+            for keyword in config.KEYWORDS.split(","):
+                source_keyword_var.set(keyword)
+                utils.logger.info(f"[BilibiliCrawler.search_by_keywords_with_pipeline] Current search keyword: {keyword}")
+                async for page, video_list in self._iter_search_pages(keyword):
+                    for video_item in video_list:
+                        yield video_item
+                    # 翻页间隔保持不变，详情、评论等由后面的阶段并发处理
+                    await asyncio.sleep(effective_sleep_sec())
+
+        # 并发由阶段的 worker 数控制，信号量只是满足原有方法的参数
+        detail_semaphore = asyncio.Semaphore(CrawlPipeline.stage_workers("detail"))
+        media_semaphore = asyncio.Semaphore(CrawlPipeline.stage_workers("media"))
+        comments_semaphore = asyncio.Semaphore(CrawlPipeline.stage_workers("comments"))
+
+        async def get_detail(video_item: Dict) -> Optional[Dict]:
+            return await self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=detail_semaphore)
+
+        async def store_video(video_detail: Dict) -> Dict:
+            await bilibili_store.update_bilibili_video(video_detail)
+            await bilibili_store.update_up_info(video_detail)
+            return video_detail
+
+        async def get_media(video_detail: Dict) -> Dict:
+            await self.get_bilibili_video(video_detail, media_semaphore)
+            return video_detail
+
+        async def get_comments(video_detail: Dict) -> None:
+            if config.ENABLE_GET_COMMENTS:
+                await self.get_comments(video_detail.get("View").get("aid"), comments_semaphore)
+
+        pipeline = (CrawlPipeline("bilibili_search")
+                    .add_stage("detail", get_detail)
+                    .add_stage("store", store_video)
+                    .add_stage("media", get_media)
+                    .add_stage("comments", get_comments))
+        await pipeline.run(search_video_items())
+
     async def search_by_keywords_in_time_range(self, daily_limit: bool):
         """
         Search bilibili video with keywords in a given time range.
@@ -322,8 +383,8 @@ class BilibiliCrawler(AbstractCrawler):
                         page += 1
 
                         # Sleep after page navigation
-                        await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                        utils.logger.info(f"[BilibiliCrawler.search_by_keywords_in_time_range] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                        await asyncio.sleep(effective_sleep_sec())
+                        utils.logger.info(f"[BilibiliCrawler.search_by_keywords_in_time_range] Sleeping for {effective_sleep_sec()} seconds after page {page-1}")
 
                         await self.batch_get_video_comments(video_id_list)
 
@@ -366,8 +427,8 @@ class BilibiliCrawler(AbstractCrawler):
         async with semaphore:
             try:
                 utils.logger.info(f"[BilibiliCrawler.get_comments] begin get video_id: {video_id} comments ...")
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[BilibiliCrawler.get_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching comments for video {video_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[BilibiliCrawler.get_comments] Sleeping for {effective_sleep_sec()} seconds after fetching comments for video {video_id}")
                 
                 callback = bilibili_store.batch_update_bilibili_video_comments
                 if title:
@@ -375,7 +436,7 @@ class BilibiliCrawler(AbstractCrawler):
 
                 await self.bili_client.get_video_all_comments(
                     video_id=video_id,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=effective_sleep_sec(),
                     is_fetch_sub_comments=config.ENABLE_GET_SUB_COMMENTS,
                     callback=callback,
                     max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
@@ -401,8 +462,8 @@ class BilibiliCrawler(AbstractCrawler):
             await self.get_specified_videos(video_bvids_list)
             if int(result["page"]["count"]) <= pn * ps:
                 break
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-            utils.logger.info(f"[BilibiliCrawler.get_creator_videos] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {pn}")
+            await asyncio.sleep(effective_sleep_sec())
+            utils.logger.info(f"[BilibiliCrawler.get_creator_videos] Sleeping for {effective_sleep_sec()} seconds after page {pn}")
             pn += 1
 
     async def get_specified_videos(self, video_url_list: List[str]):
@@ -451,8 +512,8 @@ class BilibiliCrawler(AbstractCrawler):
                 result = await self.bili_client.get_video_info(aid=aid, bvid=bvid)
 
                 # Sleep after fetching video details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[BilibiliCrawler.get_video_info_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video details {bvid or aid}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[BilibiliCrawler.get_video_info_task] Sleeping for {effective_sleep_sec()} seconds after fetching video details {bvid or aid}")
 
                 return result
             except DataFetchError as ex:
@@ -577,6 +638,9 @@ class BilibiliCrawler(AbstractCrawler):
     async def close(self):
         """Close browser context"""
         try:
+            # 关闭 API client 复用的 httpx 连接池
+            if getattr(self, "bili_client", None):
+                await self.bili_client.close_http_client()
             # 如果使用CDP模式，需要特殊处理
             if self.cdp_manager:
                 await self.cdp_manager.cleanup()
@@ -618,21 +682,30 @@ class BilibiliCrawler(AbstractCrawler):
             utils.logger.info("[BilibiliCrawler.get_bilibili_video] get video url failed")
             return
 
-        content = await self.bili_client.get_video_media(video_url)
-        await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-        utils.logger.info(f"[BilibiliCrawler.get_bilibili_video] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video {aid}")
-        if content is None:
-            return
+        # The download runs in the media worker pool, the semaphore is released right away
+        await MediaDownloadManager.submit(
+            video_url, self.store_bilibili_video,
+            aid, MediaSource(video_url, self.bili_client.download_video_media),
+            video_item_view.get("title"), video_item_view.get("bvid"),
+        )
+
+    async def store_bilibili_video(self, aid: int, source: MediaSource, title: str, bvid: str) -> bool:
+        """
+        download and store bilibili video, then run the AI agent on it
+        :param aid:
+        :param source:
+        :param title:
+        :param bvid:
+        :return:
+        """
         extension_file_name = f"video.mp4"
-        title = video_item_view.get("title")
-        bvid = video_item_view.get("bvid")
-        
-        # Pass bvid to store_video
-        await bilibili_store.store_video(aid, content, extension_file_name, title=title, bvid=bvid)
+        # Pass bvid to store_video, the video is streamed to disk instead of being buffered in memory
+        if not await bilibili_store.store_video(aid, source, extension_file_name, title=title, bvid=bvid):
+            return False
 
         # AI Agent processing
         if config.ENABLE_AI_AGENT:
-            utils.logger.info(f"[BilibiliCrawler.get_bilibili_video] Starting AI summarization for video {bvid or aid}")
+            utils.logger.info(f"[BilibiliCrawler.store_bilibili_video] Starting AI summarization for video {bvid or aid}")
             # Construct the absolute path to the video file
             # Note: The path structure must match what is defined in store/bilibili/bilibilli_store_media.py
             sanitized_title = utils.sanitize_filename(title)
@@ -645,6 +718,7 @@ class BilibiliCrawler(AbstractCrawler):
             summarizer = VideoSummarizer()
             # Run the synchronous summarization in a separate thread to avoid blocking the event loop
             await asyncio.to_thread(summarizer.summarize_video, video_path)
+        return True
 
     async def get_all_creator_details(self, creator_url_list: List[str]):
         """
@@ -708,7 +782,7 @@ class BilibiliCrawler(AbstractCrawler):
                 utils.logger.info(f"[BilibiliCrawler.get_fans] begin get creator_id: {creator_id} fans ...")
                 await self.bili_client.get_creator_all_fans(
                     creator_info=creator_info,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=effective_sleep_sec(),
                     callback=bilibili_store.batch_update_bilibili_creator_fans,
                     max_count=config.CRAWLER_MAX_CONTACTS_COUNT_SINGLENOTES,
                 )
@@ -731,7 +805,7 @@ class BilibiliCrawler(AbstractCrawler):
                 utils.logger.info(f"[BilibiliCrawler.get_followings] begin get creator_id: {creator_id} followings ...")
                 await self.bili_client.get_creator_all_followings(
                     creator_info=creator_info,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=effective_sleep_sec(),
                     callback=bilibili_store.batch_update_bilibili_creator_followings,
                     max_count=config.CRAWLER_MAX_CONTACTS_COUNT_SINGLENOTES,
                 )
@@ -754,7 +828,7 @@ class BilibiliCrawler(AbstractCrawler):
                 utils.logger.info(f"[BilibiliCrawler.get_dynamics] begin get creator_id: {creator_id} dynamics ...")
                 await self.bili_client.get_creator_all_dynamics(
                     creator_info=creator_info,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=effective_sleep_sec(),
                     callback=bilibili_store.batch_update_bilibili_creator_dynamics,
                     max_count=config.CRAWLER_MAX_DYNAMICS_COUNT_SINGLENOTES,
                 )
@@ -23,36 +23,39 @@
 # @Time    : 2023/12/2 23:26
 # @Desc    : bilibili 请求参数签名
 # 逆向实现参考：https://socialsisteryi.github.io/bilibili-API-collect/docs/misc/sign/wbi.html#wbi%E7%AD%BE%E5%90%8D%E7%AE%97%E6%B3%95
+import asyncio
 import re
+import time
 import urllib.parse
 from hashlib import md5
-from typing import Dict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
 
+import config
 from model.m_bilibili import VideoUrlInfo, CreatorUrlInfo
 from tools import utils
 
 
 class BilibiliSign:
+    map_table = [
+        46, 47, 18, 2, 53, 8, 23, 32, 15, 50, 10, 31, 58, 3, 45, 35, 27, 43, 5, 49,
+        33, 9, 42, 19, 29, 28, 14, 39, 12, 38, 41, 13, 37, 48, 7, 16, 24, 55, 40,
+        61, 26, 17, 0, 1, 60, 51, 30, 4, 22, 25, 54, 21, 56, 59, 6, 63, 57, 62, 11,
+        36, 20, 34, 44, 52
+    ]
+
     def __init__(self, img_key: str, sub_key: str):
         self.img_key = img_key
         self.sub_key = sub_key
-        self.map_table = [
-            46, 47, 18, 2, 53, 8, 23, 32, 15, 50, 10, 31, 58, 3, 45, 35, 27, 43, 5, 49,
-            33, 9, 42, 19, 29, 28, 14, 39, 12, 38, 41, 13, 37, 48, 7, 16, 24, 55, 40,
-            61, 26, 17, 0, 1, 60, 51, 30, 4, 22, 25, 54, 21, 56, 59, 6, 63, 57, 62, 11,
-            36, 20, 34, 44, 52
-        ]
+        # salt 只与 key 有关，构造时计算一次
+        mixin_key = img_key + sub_key
+        self.salt = "".join(mixin_key[mt] for mt in self.map_table)[:32]
 
     def get_salt(self) -> str:
         """
         获取加盐的 key
         :return:
         """
-        salt = ""
-        mixin_key = self.img_key + self.sub_key
-        for mt in self.map_table:
-            salt += mixin_key[mt]
-        return salt[:32]
+        return self.salt
 
     def sign(self, req_data: Dict) -> Dict:
         """
@@ -71,12 +74,45 @@ class BilibiliSign:
             in req_data.items()
         }
         query = urllib.parse.urlencode(req_data)
-        salt = self.get_salt()
-        wbi_sign = md5((query + salt).encode()).hexdigest()  # 计算 w_rid
+        wbi_sign = md5((query + self.salt).encode()).hexdigest()  # 计算 w_rid
         req_data['w_rid'] = wbi_sign
         return req_data
 
 
+class WbiKeyManager:
+    """
+    缓存 WBI 签名使用的 img_key/sub_key 以及由其计算出的 salt
+    key 只在首次使用、超过 BILI_WBI_KEY_CACHE_TTL_SEC 或调用 invalidate() 后重新获取，
+    其余时间签名是纯进程内计算
+    """
+
+    def __init__(self, fetch_keys: Callable[[], Awaitable[Tuple[str, str]]], ttl: Optional[float] = None):
+        self._fetch_keys = fetch_keys
+        self.ttl = config.BILI_WBI_KEY_CACHE_TTL_SEC if ttl is None else ttl
+        self._signer: Optional[BilibiliSign] = None
+        self._expire_at: float = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """签名被服务端拒绝时调用，下一次签名前重新获取 key"""
+        self._signer = None
+
+    async def get_signer(self) -> BilibiliSign:
+        if self._signer is not None and time.monotonic() < self._expire_at:
+            return self._signer
+        async with self._lock:
+            # 等锁期间其他协程可能已经刷新过
+            if self._signer is None or time.monotonic() >= self._expire_at:
+                img_key, sub_key = await self._fetch_keys()
+                self._signer = BilibiliSign(img_key, sub_key)
+                self._expire_at = time.monotonic() + self.ttl
+                utils.logger.info(f"[WbiKeyManager.get_signer] wbi keys refreshed, img_key: {img_key}")
+        return self._signer
+
+    async def sign(self, req_data: Dict) -> Dict:
+        return (await self.get_signer()).sign(req_data)
+
+
 def parse_video_info_from_url(url: str) -> VideoUrlInfo:
     """
     从B站视频URL中解析出视频ID
@@ -24,15 +24,19 @@ import urllib.parse
 from typing import TYPE_CHECKING, Any, Callable, Dict, Union, Optional
 
 import httpx
-from playwright.async_api import BrowserContext
+from playwright.async_api import BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.media_downloader import DownloadResult, stream_download
+from tools.rate_limiter import RateLimiter
 from var import request_keyword_var
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
+    from tools.cdp_browser import PagePool
 
 from .exception import *
 from .field import *
@@ -40,6 +44,8 @@ from .help import *
 
 
 class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
+    # 打开视频页后等待详情接口响应的超时时间
+    DETAIL_RESPONSE_TIMEOUT_MS = 15000
 
     def __init__(
         self,
@@ -50,6 +56,7 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         playwright_page: Optional[Page],
         cookie_dict: Dict,
         proxy_ip_pool: Optional["ProxyIpPool"] = None,
+        page_pool: Optional["PagePool"] = None,
     ):
         self.proxy = proxy
         self.timeout = timeout
@@ -57,6 +64,9 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         self._host = "https://www.douyin.com"
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
+        self._request_context = DouyinRequestContext(playwright_page)
+        self.page_pool = page_pool
+        self._shared_page_lock = asyncio.Lock()
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
 
@@ -71,36 +81,11 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         if not params:
             return
         headers = headers or self.headers
-        local_storage: Dict = await self.playwright_page.evaluate("() => window.localStorage")  # type: ignore
-        common_params = {
-            "device_platform": "webapp",
-            "aid": "6383",
-            "channel": "channel_pc_web",
-            "version_code": "190600",
-            "version_name": "19.6.0",
-            "update_version_code": "170400",
-            "pc_client_type": "1",
-            "cookie_enabled": "true",
-            "browser_language": "zh-CN",
-            "browser_platform": "MacIntel",
-            "browser_name": "Chrome",
-            "browser_version": "125.0.0.0",
-            "browser_online": "true",
-            "engine_name": "Blink",
-            "os_name": "Mac OS",
-            "os_version": "10.15.7",
-            "cpu_core_num": "8",
-            "device_memory": "8",
-            "engine_version": "109.0",
-            "platform": "PC",
-            "screen_width": "2560",
-            "screen_height": "1440",
-            'effective_type': '4g',
-            "round_trip_time": "50",
-            "webid": get_web_id(),
-            "msToken": local_storage.get("xmst"),
-        }
-        params.update(common_params)
+        # msToken/webid/公共参数由请求上下文缓存，稳定状态下不需要访问浏览器
+        if self._request_context.page is not self.playwright_page:
+            self._request_context = DouyinRequestContext(self.playwright_page)
+        await self._request_context.ensure_ms_token()
+        self._request_context.build_params(params)
         query_string = urllib.parse.urlencode(params)
 
         # 20240927 a-bogus更新（JS版本）
@@ -115,12 +100,15 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
     async def request(self, method, url, **kwargs):
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
+        # 按平台和接口类别领取限速令牌
+        await RateLimiter.acquire("dy", url)
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
         try:
             if response.text == "" or response.text == "blocked":
                 utils.logger.error(f"request params incrr, response.text: {response.text}")
+                # 被拦截后下一个请求重新读取 msToken
+                self._request_context.mark_stale()
                 raise Exception("account blocked")
             return response.json()
         except Exception as e:
@@ -151,6 +139,7 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         cookie_str, cookie_dict = utils.convert_cookies(await browser_context.cookies())
         self.headers["Cookie"] = cookie_str
         self.cookie_dict = cookie_dict
+        self._request_context.mark_stale()
 
     async def search_info_by_keyword(
         self,
@@ -198,65 +187,56 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         """
         DouYin Video Detail API - 通过拦截浏览器网络请求获取视频数据
         避免直接调用API被反爬虫拦截（返回空响应）
+        传入了 page_pool 时从页面池借用页面，多个详情可以并发获取
         :param aweme_id: 视频ID
         :return: 视频详情数据
         """
+        if self.page_pool is None:
+            # 没有页面池时只能使用共享的 playwright_page，同一时间只能打开一个视频页
+            async with self._shared_page_lock:
+                return await self._get_video_by_id_on_page(self.playwright_page, aweme_id)
+        async with self.page_pool.lease() as page:
+            return await self._get_video_by_id_on_page(page, aweme_id)
+
+    async def _get_video_by_id_on_page(self, page: Page, aweme_id: str) -> Any:
         video_url = f"https://www.douyin.com/video/{aweme_id}"
         utils.logger.info(f"[DouYinClient.get_video_by_id] Navigate to video page: {video_url}")
-        
+
+        def is_detail_response(response) -> bool:
+            return (
+                "/aweme/v1/web/aweme/detail" in response.url
+                and f"aweme_id={aweme_id}" in response.url
+                and response.status == 200
+            )
+
         try:
-            # 设置网络请求拦截器，捕获视频详情API响应
-            intercepted_data = {"data": None}
-            
-            async def handle_response(response):
-                """拦截视频详情API的响应"""
-                try:
-                    if '/aweme/v1/web/aweme/detail' in response.url and response.status == 200:
-                        try:
-                            json_data = await response.json()
-                            if json_data and 'aweme_detail' in json_data:
-                                intercepted_data["data"] = json_data.get("aweme_detail")
-                                utils.logger.info(f"[DouYinClient.get_video_by_id] Successfully intercepted API response")
-                        except:
-                            pass
-                except:
-                    pass
-            
-            # 注册响应监听器
-            self.playwright_page.on("response", handle_response)
-            
-            # 导航到视频页面（浏览器会自动调用视频详情API）
-            await self.playwright_page.goto(video_url, wait_until="domcontentloaded", timeout=15000)
-            
-            # 等待视频元素加载
-            try:
-                await self.playwright_page.wait_for_selector('video', timeout=5000)
-            except:
-                pass
-            
-            # 等待API请求完成
-            await asyncio.sleep(3)
-            
-            # 检查页面是否需要验证
-            page_title = await self.playwright_page.title()
-            if "验证" in page_title or "Verify" in page_title:
-                utils.logger.error(f"[DouYinClient.get_video_by_id] Page requires verification")
-                raise DataFetchError("Page requires verification")
-            
-            # 返回拦截到的数据
-            if intercepted_data["data"]:
-                return intercepted_data["data"]
-            
-            # 如果没有拦截到数据，抛出错误
-            utils.logger.error(f"[DouYinClient.get_video_by_id] Failed to intercept video data")
-            raise DataFetchError("Failed to intercept video data from page")
-            
-        except DataFetchError:
-            raise
+            # expect_response 只等待本次导航触发的详情接口，结束后自动移除监听
+            async with page.expect_response(is_detail_response, timeout=self.DETAIL_RESPONSE_TIMEOUT_MS) as response_info:
+                await page.goto(video_url, wait_until="domcontentloaded", timeout=15000)
+            response = await response_info.value
+            json_data = await response.json()
+            if json_data and json_data.get("aweme_detail"):
+                utils.logger.info(f"[DouYinClient.get_video_by_id] Successfully intercepted API response")
+                return json_data["aweme_detail"]
+        except PlaywrightTimeoutError:
+            pass
         except Exception as e:
             utils.logger.error(f"[DouYinClient.get_video_by_id] Error: {e}")
             raise DataFetchError(f"Failed to get video detail: {e}")
 
+        # 检查页面是否需要验证
+        try:
+            page_title = await page.title()
+        except Exception:
+            page_title = ""
+        if "验证" in page_title or "Verify" in page_title:
+            utils.logger.error(f"[DouYinClient.get_video_by_id] Page requires verification")
+            raise DataFetchError("Page requires verification")
+
+        # 如果没有拦截到数据，抛出错误
+        utils.logger.error(f"[DouYinClient.get_video_by_id] Failed to intercept video data")
+        raise DataFetchError("Failed to intercept video data from page")
+
     async def get_aweme_comments(self, aweme_id: str, cursor: int = 0):
         """get note comments
 
@@ -384,18 +364,30 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         return result
 
     async def get_aweme_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout, follow_redirects=True)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(f"[DouYinClient.get_aweme_media] request {url} err, res:{response.text}")
-                    return None
-                else:
-                    return response.content
-            except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
-                utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", url, timeout=self.timeout, follow_redirects=True)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
+                utils.logger.error(f"[DouYinClient.get_aweme_media] request {url} err, res:{response.text}")
                 return None
+            else:
+                return response.content
+        except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
+            return None
+
+    async def download_aweme_media(self, url: str, save_path: str) -> Optional[DownloadResult]:
+        """
+        流式下载作品图片/视频到 save_path，支持断点续传
+        Args:
+            url: 媒体地址
+            save_path: 保存路径
+
+        Returns:
+
+        """
+        return await stream_download(self.get_http_client(), url, save_path, timeout=self.timeout)
 
     async def resolve_short_url(self, short_url: str) -> str:
         """
@@ -405,19 +397,19 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
             重定向后的完整URL
         """
-        async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=False) as client:
-            try:
-                utils.logger.info(f"[DouYinClient.resolve_short_url] Resolving short URL: {short_url}")
-                response = await client.get(short_url, timeout=10)
-
-                # 短链接通常返回302重定向
-                if response.status_code in [301, 302, 303, 307, 308]:
-                    redirect_url = response.headers.get("Location", "")
-                    utils.logger.info(f"[DouYinClient.resolve_short_url] Resolved to: {redirect_url}")
-                    return redirect_url
-                else:
-                    utils.logger.warning(f"[DouYinClient.resolve_short_url] Unexpected status code: {response.status_code}")
-                    return ""
-            except Exception as e:
-                utils.logger.error(f"[DouYinClient.resolve_short_url] Failed to resolve short URL: {e}")
+        client = self.get_http_client()
+        try:
+            utils.logger.info(f"[DouYinClient.resolve_short_url] Resolving short URL: {short_url}")
+            response = await client.get(short_url, timeout=10)
+
+            # 短链接通常返回302重定向
+            if response.status_code in [301, 302, 303, 307, 308]:
+                redirect_url = response.headers.get("Location", "")
+                utils.logger.info(f"[DouYinClient.resolve_short_url] Resolved to: {redirect_url}")
+                return redirect_url
+            else:
+                utils.logger.warning(f"[DouYinClient.resolve_short_url] Unexpected status code: {response.status_code}")
                 return ""
+        except Exception as e:
+            utils.logger.error(f"[DouYinClient.resolve_short_url] Failed to resolve short URL: {e}")
+            return ""
@@ -19,7 +19,6 @@
 
 import asyncio
 import os
-import random
 from asyncio import Task
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -36,7 +35,10 @@ from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import douyin as douyin_store
 from tools import utils
-from tools.cdp_browser import CDPBrowserManager
+from tools.cdp_browser import CDPBrowserManager, PagePool, create_page_pool
+from tools.media_download_manager import MediaDownloadManager
+from tools.media_downloader import MediaSource
+from tools.rate_limiter import effective_sleep_sec
 from var import crawler_type_var, source_keyword_var
 
 from .client import DouYinClient
@@ -112,6 +114,8 @@ class DouYinCrawler(AbstractCrawler):
                 # Get the information and comments of the specified creator
                 await self.get_creators_and_videos()
 
+            # 等待后台的图片/视频下载完成
+            await MediaDownloadManager.drain()
             utils.logger.info("[DouYinCrawler.start] Douyin Crawler finished ...")
 
     async def search(self) -> None:
@@ -160,8 +164,8 @@ class DouYinCrawler(AbstractCrawler):
                     await douyin_store.update_douyin_aweme(aweme_item=aweme_info)
                     await self.get_aweme_media(aweme_item=aweme_info)
                 # Sleep after each page navigation
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[DouYinCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[DouYinCrawler.search] Sleeping for {effective_sleep_sec()} seconds after page {page-1}")
             utils.logger.info(f"[DouYinCrawler.search] keyword:{keyword}, aweme_list:{aweme_list}")
             await self.batch_get_note_comments(aweme_list)
 
@@ -206,8 +210,8 @@ class DouYinCrawler(AbstractCrawler):
             try:
                 result = await self.dy_client.get_video_by_id(aweme_id)
                 # Sleep after fetching aweme detail
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[DouYinCrawler.get_aweme_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching aweme {aweme_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[DouYinCrawler.get_aweme_detail] Sleeping for {effective_sleep_sec()} seconds after fetching aweme {aweme_id}")
                 return result
             except DataFetchError as ex:
                 utils.logger.error(f"[DouYinCrawler.get_aweme_detail] Get aweme detail error: {ex}")
@@ -237,7 +241,7 @@ class DouYinCrawler(AbstractCrawler):
             try:
                 # 将关键词列表传递给 get_aweme_all_comments 方法
                 # Use fixed crawling interval
-                crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
+                crawl_interval = effective_sleep_sec()
                 await self.dy_client.get_aweme_all_comments(
                     aweme_id=aweme_id,
                     crawl_interval=crawl_interval,
@@ -313,6 +317,11 @@ class DouYinCrawler(AbstractCrawler):
             playwright_page=self.context_page,
             cookie_dict=cookie_dict,
             proxy_ip_pool=self.ip_proxy_pool,  # 传递代理池用于自动刷新
+            # 视频详情通过打开视频页拦截接口获取，没有配置页面池时按并发数按需打开页面
+            page_pool=(
+                await create_page_pool(self.browser_context, origin_url=self.index_url)
+                or PagePool(self.browser_context, size=config.MAX_CONCURRENCY_NUM)
+            ),
         )
         return douyin_client
 
@@ -379,6 +388,11 @@ class DouYinCrawler(AbstractCrawler):
 
     async def close(self) -> None:
         """Close browser context"""
+        # 关闭 API client 复用的 httpx 连接池
+        if getattr(self, "dy_client", None):
+            await self.dy_client.close_http_client()
+            if self.dy_client.page_pool is not None:
+                await self.dy_client.page_pool.close()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -426,13 +440,13 @@ class DouYinCrawler(AbstractCrawler):
         for url in note_download_url:
             if not url:
                 continue
-            content = await self.dy_client.get_aweme_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
+            # 文件名按图片顺序编号，下载中断留下的 .part 文件下次仍能对应到同一个 url 续传
             extension_file_name = f"{picNum:>03d}.jpeg"
             picNum += 1
-            await douyin_store.update_dy_aweme_image(aweme_id, content, extension_file_name)
+            await MediaDownloadManager.submit(
+                url, douyin_store.update_dy_aweme_image,
+                aweme_id, MediaSource(url, self.dy_client.download_aweme_media), extension_file_name
+            )
 
     async def get_aweme_video(self, aweme_item: Dict):
         """
@@ -450,9 +464,8 @@ class DouYinCrawler(AbstractCrawler):
 
         if not video_download_url:
             return
-        content = await self.dy_client.get_aweme_media(video_download_url)
-        await asyncio.sleep(random.random())
-        if content is None:
-            return
         extension_file_name = f"video.mp4"
-        await douyin_store.update_dy_aweme_video(aweme_id, content, extension_file_name)
+        await MediaDownloadManager.submit(
+            video_download_url, douyin_store.update_dy_aweme_video,
+            aweme_id, MediaSource(video_download_url, self.dy_client.download_aweme_media), extension_file_name
+        )
@@ -24,17 +24,23 @@
 # @Time    : 2024/6/10 02:24
 # @Desc    : 获取 a_bogus 参数, 学习交流使用，请勿用作商业用途，侵权联系作者删除
 
+import asyncio
 import random
 import re
-from typing import Optional
+import time
+from typing import Dict, Optional
 
 import execjs
 from playwright.async_api import Page
 
+import config
 from model.m_douyin import VideoUrlInfo, CreatorUrlInfo
+from tools import utils
 from tools.crawler_util import extract_url_params_to_dict
+from tools.js_sign_service import JsSignPool
 
-douyin_sign_obj = execjs.compile(open('libs/douyin.js', encoding='utf-8-sig').read())
+DOUYIN_SIGN_JS_PATH = "libs/douyin.js"
+douyin_sign_obj = None
 
 def get_web_id():
     """
@@ -61,9 +67,18 @@ def get_web_id():
 async def get_a_bogus(url: str, params: str, post_data: dict, user_agent: str, page: Page = None):
     """
     获取 a_bogus 参数, 目前不支持post请求类型的签名
+    优先使用常驻 node 进程池签名，没有 node 或关闭了进程池时使用 execjs
     """
+    if JsSignPool.available():
+        return await JsSignPool.get_instance(DOUYIN_SIGN_JS_PATH).call(_get_sign_js_name(url), params, user_agent)
     return get_a_bogus_from_js(url, params, user_agent)
 
+
+def _get_sign_js_name(url: str) -> str:
+    if "/reply" in url:
+        return "sign_reply"
+    return "sign_datail"
+
 def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     """
     通过js获取 a_bogus 参数
@@ -75,10 +90,11 @@ def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     Returns:
 
     """
-    sign_js_name = "sign_datail"
-    if "/reply" in url:
-        sign_js_name = "sign_reply"
-    return douyin_sign_obj.call(sign_js_name, params, user_agent)
+    global douyin_sign_obj
+    if not douyin_sign_obj:
+        with open(DOUYIN_SIGN_JS_PATH, encoding='utf-8-sig') as f:
+            douyin_sign_obj = execjs.compile(f.read())
+    return douyin_sign_obj.call(_get_sign_js_name(url), params, user_agent)
 
 
 
@@ -98,6 +114,89 @@ async def get_a_bogus_from_playright(params: str, post_data: dict, user_agent: s
     return a_bogus
 
 
+# 每个请求都带上的公共参数，webid 和 msToken 由 DouyinRequestContext 补充
+DOUYIN_COMMON_PARAMS = {
+    "device_platform": "webapp",
+    "aid": "6383",
+    "channel": "channel_pc_web",
+    "version_code": "190600",
+    "version_name": "19.6.0",
+    "update_version_code": "170400",
+    "pc_client_type": "1",
+    "cookie_enabled": "true",
+    "browser_language": "zh-CN",
+    "browser_platform": "MacIntel",
+    "browser_name": "Chrome",
+    "browser_version": "125.0.0.0",
+    "browser_online": "true",
+    "engine_name": "Blink",
+    "os_name": "Mac OS",
+    "os_version": "10.15.7",
+    "cpu_core_num": "8",
+    "device_memory": "8",
+    "engine_version": "109.0",
+    "platform": "PC",
+    "screen_width": "2560",
+    "screen_height": "1440",
+    'effective_type': '4g',
+    "round_trip_time": "50",
+}
+
+
+class DouyinRequestContext:
+    """
+    单个会话内的抖音请求上下文，缓存 webid、msToken 和公共参数
+    msToken 超过 DY_MS_TOKEN_REFRESH_INTERVAL_SEC 后在后台刷新（期间继续使用旧值），
+    请求被拦截后调用 mark_stale()，下一个请求会先等待刷新完成
+    """
+
+    def __init__(self, page: Optional[Page], refresh_interval: Optional[float] = None):
+        self.page = page
+        self.refresh_interval = config.DY_MS_TOKEN_REFRESH_INTERVAL_SEC if refresh_interval is None else refresh_interval
+        self.web_id = get_web_id()
+        self.ms_token: Optional[str] = None
+        self._loaded = False
+        self._refreshed_at: float = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def refresh_ms_token(self):
+        """从页面 localStorage 读取最新的 msToken"""
+        async with self._lock:
+            self.ms_token = await self.page.evaluate("() => window.localStorage.getItem('xmst')")
+            self._loaded = True
+            self._refreshed_at = time.monotonic()
+
+    def mark_stale(self):
+        """请求被拦截时调用，下一个请求前重新读取 msToken"""
+        self._loaded = False
+
+    async def ensure_ms_token(self):
+        """
+        未加载（或被标记失效）时等待读取，过期时在后台刷新，其余情况直接返回
+        """
+        if not self._loaded:
+            await self.refresh_ms_token()
+        elif time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh_ms_token()
+        except Exception as e:
+            # 刷新失败时保留旧值，下个周期再试
+            self._refreshed_at = time.monotonic()
+            utils.logger.warning(f"[DouyinRequestContext] refresh msToken error: {e}")
+
+    def build_params(self, params: Dict) -> Dict:
+        """把公共参数、webid、msToken 合并到请求参数中（同步，不访问浏览器）"""
+        params.update(DOUYIN_COMMON_PARAMS)
+        params["webid"] = self.web_id
+        params["msToken"] = self.ms_token
+        return params
+
+
 def parse_video_info_from_url(url: str) -> VideoUrlInfo:
     """
     从抖音视频URL中解析出视频ID
@@ -24,13 +24,13 @@ import json
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext, Page
 
 import config
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
@@ -63,9 +63,10 @@ class KuaiShouClient(AbstractApiClient, ProxyRefreshMixin):
     async def request(self, method, url, **kwargs) -> Any:
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
+        # 按平台和接口类别领取限速令牌，graphql 请求按 operationName 区分接口类别
+        await RateLimiter.acquire("ks", url, hint=kwargs.get("data") or "")
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
         data: Dict = response.json()
         if data.get("errors"):
             raise DataFetchError(data.get("errors", "unkonw error"))
@@ -19,24 +19,30 @@
 
 import asyncio
 import json
-from typing import Any, Callable, Dict, List, Optional, Union
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode, quote
 
+import httpx
 import requests
 from playwright.async_api import BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import ProxyIpPool
+from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
+from tools.cdp_browser import PagePool
 
 from .field import SearchNoteType, SearchSortType
-from .help import TieBaExtractor
+from .help import create_tieba_extractor
 
 
-class BaiduTieBaClient(AbstractApiClient):
+class BaiduTieBaClient(AbstractApiClient, ProxyRefreshMixin):
 
     def __init__(
         self,
@@ -45,6 +51,7 @@ class BaiduTieBaClient(AbstractApiClient):
         default_ip_proxy=None,
         headers: Dict[str, str] = None,
         playwright_page: Optional[Page] = None,
+        page_pool: Optional[PagePool] = None,
     ):
         self.ip_pool: Optional[ProxyIpPool] = ip_pool
         self.timeout = timeout
@@ -54,9 +61,66 @@ class BaiduTieBaClient(AbstractApiClient):
             "Cookie": "",
         }
         self._host = "https://tieba.baidu.com"
-        self._page_extractor = TieBaExtractor()
+        self._page_extractor = create_tieba_extractor()
         self.default_ip_proxy = default_ip_proxy
         self.playwright_page = playwright_page  # Playwright页面对象
+        # 页面池，传入后页面访问从池中借用页面，可以并发打开多个页面
+        self.page_pool = page_pool
+        self._shared_page_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _lease_page(self) -> AsyncIterator[Page]:
+        """
+        借用一个浏览器页面，没有页面池时独占共享的 playwright_page
+        """
+        if self.page_pool is not None:
+            async with self.page_pool.lease() as page:
+                yield page
+        else:
+            async with self._shared_page_lock:
+                yield self.playwright_page
+
+    async def _fetch_page_content(
+        self, url: str, ready_selector: str = "body", with_inner_text: bool = False
+    ) -> Union[str, Tuple[str, str]]:
+        """
+        打开页面并返回页面HTML
+        TIEBA_CONCURRENT_FETCH 开启时等待 ready_selector 出现，否则固定等待 CRAWLER_MAX_SLEEP_SEC
+        Args:
+            url: 页面URL
+            ready_selector: 页面数据已就绪的标志元素（服务端直出的列表容器）
+            with_inner_text: 是否同时返回 document.body.innerText
+
+        Returns:
+            页面HTML，with_inner_text 为 True 时返回 (HTML, innerText)
+        """
+        # 页面访问同样计入限速，先领取令牌再占用页面
+        await RateLimiter.acquire("tieba", url)
+        async with self._lease_page() as page:
+            await page.goto(url, wait_until="domcontentloaded")
+
+            if config.TIEBA_CONCURRENT_FETCH:
+                try:
+                    await page.wait_for_selector(
+                        ready_selector, state="attached", timeout=config.TIEBA_PAGE_READY_TIMEOUT_MS
+                    )
+                except PlaywrightTimeoutError:
+                    utils.logger.warning(f"[BaiduTieBaClient._fetch_page_content] wait for {ready_selector} timeout, url: {url}")
+            else:
+                # 等待页面加载,使用配置文件中的延时设置
+                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
+
+            page_content = await page.content()
+            if with_inner_text:
+                return page_content, await page.evaluate("() => document.body.innerText")
+            return page_content
+
+    @property
+    def proxy(self) -> Optional[str]:
+        """
+        当前代理，供 ProxyRefreshMixin.get_http_client() 判断是否需要重建连接池
+        """
+        return self.default_ip_proxy
 
     def _sync_request(self, method, url, proxy=None, **kwargs):
         """
@@ -89,6 +153,30 @@ class BaiduTieBaClient(AbstractApiClient):
         )
         return response
 
+    async def _async_request(self, method, url, proxy=None, **kwargs) -> httpx.Response:
+        """
+        异步的httpx请求方法，默认代理的请求复用连接池
+        Args:
+            method: 请求方法
+            url: 请求的URL
+            proxy: 代理IP
+            **kwargs: 其他请求参数
+
+        Returns:
+            response对象
+        """
+        # 与 requests 保持一致：字符串请求体原样发送，默认跟随重定向
+        if isinstance(kwargs.get("data"), str):
+            kwargs["content"] = kwargs.pop("data")
+        kwargs.setdefault("follow_redirects", True)
+
+        if proxy == self.default_ip_proxy:
+            return await self.get_http_client().request(method, url, headers=self.headers, timeout=self.timeout, **kwargs)
+
+        # 重试时临时换用的代理，只用一次，不进入连接池
+        async with httpx.AsyncClient(proxy=proxy) as client:
+            return await client.request(method, url, headers=self.headers, timeout=self.timeout, **kwargs)
+
     async def _refresh_proxy_if_expired(self) -> None:
         """
         检测代理是否过期，如果过期则自动刷新
@@ -110,7 +198,7 @@ class BaiduTieBaClient(AbstractApiClient):
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def request(self, method, url, return_ori_content=False, proxy=None, **kwargs) -> Union[str, Any]:
         """
-        封装requests的公共请求方法，对请求响应做一些处理
+        封装httpx（或旧版requests）的公共请求方法，对请求响应做一些处理
         Args:
             method: 请求方法
             url: 请求的URL
@@ -123,17 +211,22 @@ class BaiduTieBaClient(AbstractApiClient):
         """
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
+        # 按平台和接口类别领取限速令牌
+        await RateLimiter.acquire("tieba", url)
 
         actual_proxy = proxy if proxy else self.default_ip_proxy
 
-        # 在线程池中执行同步的requests请求
-        response = await asyncio.to_thread(
-            self._sync_request,
-            method,
-            url,
-            actual_proxy,
-            **kwargs
-        )
+        if config.TIEBA_USE_LEGACY_REQUESTS:
+            # 在线程池中执行同步的requests请求
+            response = await asyncio.to_thread(
+                self._sync_request,
+                method,
+                url,
+                actual_proxy,
+                **kwargs
+            )
+        else:
+            response = await self._async_request(method, url, actual_proxy, **kwargs)
 
         if response.status_code != 200:
             utils.logger.error(f"Request failed, method: {method}, url: {url}, status code: {response.status_code}")
@@ -259,7 +352,7 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
 
         """
-        if not self.playwright_page:
+        if not self.playwright_page and not self.page_pool:
             utils.logger.error("[BaiduTieBaClient.get_notes_by_keyword] playwright_page is None, cannot use browser mode")
             raise Exception("playwright_page is required for browser-based search")
 
@@ -281,13 +374,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
         try:
             # 使用Playwright访问搜索页面
-            await self.playwright_page.goto(full_url, wait_until="domcontentloaded")
-
-            # 等待页面加载,使用配置文件中的延时设置
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-
-            # 获取页面HTML内容
-            page_content = await self.playwright_page.content()
+            page_content = await self._fetch_page_content(full_url, ready_selector=".s_post_list")
             utils.logger.info(f"[BaiduTieBaClient.get_notes_by_keyword] 成功获取搜索页面HTML,长度: {len(page_content)}")
 
             # 提取搜索结果
@@ -308,7 +395,7 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
             TiebaNote: 帖子详情对象
         """
-        if not self.playwright_page:
+        if not self.playwright_page and not self.page_pool:
             utils.logger.error("[BaiduTieBaClient.get_note_by_id] playwright_page is None, cannot use browser mode")
             raise Exception("playwright_page is required for browser-based note detail fetching")
 
@@ -318,13 +405,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
         try:
             # 使用Playwright访问帖子详情页面
-            await self.playwright_page.goto(note_url, wait_until="domcontentloaded")
-
-            # 等待页面加载,使用配置文件中的延时设置
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-
-            # 获取页面HTML内容
-            page_content = await self.playwright_page.content()
+            page_content = await self._fetch_page_content(note_url, ready_selector="#j_p_postlist")
             utils.logger.info(f"[BaiduTieBaClient.get_note_by_id] 成功获取帖子详情HTML,长度: {len(page_content)}")
 
             # 提取帖子详情
@@ -352,7 +433,7 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
             List[TiebaComment]: 评论列表
         """
-        if not self.playwright_page:
+        if not self.playwright_page and not self.page_pool:
             utils.logger.error("[BaiduTieBaClient.get_note_all_comments] playwright_page is None, cannot use browser mode")
             raise Exception("playwright_page is required for browser-based comment fetching")
 
@@ -366,13 +447,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
             try:
                 # 使用Playwright访问评论页面
-                await self.playwright_page.goto(comment_url, wait_until="domcontentloaded")
-
-                # 等待页面加载,使用配置文件中的延时设置
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-
-                # 获取页面HTML内容
-                page_content = await self.playwright_page.content()
+                page_content = await self._fetch_page_content(comment_url, ready_selector="#j_p_postlist")
 
                 # 提取评论
                 comments = self._page_extractor.extract_tieba_note_parment_comments(
@@ -426,7 +501,7 @@ class BaiduTieBaClient(AbstractApiClient):
         if not config.ENABLE_GET_SUB_COMMENTS:
             return []
 
-        if not self.playwright_page:
+        if not self.playwright_page and not self.page_pool:
             utils.logger.error("[BaiduTieBaClient.get_comments_all_sub_comments] playwright_page is None, cannot use browser mode")
             raise Exception("playwright_page is required for browser-based sub-comment fetching")
 
@@ -452,13 +527,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
                 try:
                     # 使用Playwright访问子评论页面
-                    await self.playwright_page.goto(sub_comment_url, wait_until="domcontentloaded")
-
-                    # 等待页面加载,使用配置文件中的延时设置
-                    await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-
-                    # 获取页面HTML内容
-                    page_content = await self.playwright_page.content()
+                    page_content = await self._fetch_page_content(sub_comment_url)
 
                     # 提取子评论
                     sub_comments = self._page_extractor.extract_tieba_note_sub_comments(
@@ -499,7 +568,7 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
             List[TiebaNote]: 帖子列表
         """
-        if not self.playwright_page:
+        if not self.playwright_page and not self.page_pool:
             utils.logger.error("[BaiduTieBaClient.get_notes_by_tieba_name] playwright_page is None, cannot use browser mode")
             raise Exception("playwright_page is required for browser-based tieba note fetching")
 
@@ -509,13 +578,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
         try:
             # 使用Playwright访问贴吧页面
-            await self.playwright_page.goto(tieba_url, wait_until="domcontentloaded")
-
-            # 等待页面加载,使用配置文件中的延时设置
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-
-            # 获取页面HTML内容
-            page_content = await self.playwright_page.content()
+            page_content = await self._fetch_page_content(tieba_url, ready_selector="#thread_list")
             utils.logger.info(f"[BaiduTieBaClient.get_notes_by_tieba_name] 成功获取贴吧页面HTML,长度: {len(page_content)}")
 
             # 提取帖子列表
@@ -536,7 +599,7 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
             str: 页面HTML内容
         """
-        if not self.playwright_page:
+        if not self.playwright_page and not self.page_pool:
             utils.logger.error("[BaiduTieBaClient.get_creator_info_by_url] playwright_page is None, cannot use browser mode")
             raise Exception("playwright_page is required for browser-based creator info fetching")
 
@@ -544,13 +607,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
         try:
             # 使用Playwright访问创作者主页
-            await self.playwright_page.goto(creator_url, wait_until="domcontentloaded")
-
-            # 等待页面加载,使用配置文件中的延时设置
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-
-            # 获取页面HTML内容
-            page_content = await self.playwright_page.content()
+            page_content = await self._fetch_page_content(creator_url)
             utils.logger.info(f"[BaiduTieBaClient.get_creator_info_by_url] 成功获取创作者主页HTML,长度: {len(page_content)}")
 
             return page_content
@@ -569,7 +626,7 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
             Dict: 包含帖子数据的字典
         """
-        if not self.playwright_page:
+        if not self.playwright_page and not self.page_pool:
             utils.logger.error("[BaiduTieBaClient.get_notes_by_creator] playwright_page is None, cannot use browser mode")
             raise Exception("playwright_page is required for browser-based creator notes fetching")
 
@@ -578,19 +635,11 @@ class BaiduTieBaClient(AbstractApiClient):
         utils.logger.info(f"[BaiduTieBaClient.get_notes_by_creator] 访问创作者帖子列表: {creator_url}")
 
         try:
-            # 使用Playwright访问创作者帖子列表页面
-            await self.playwright_page.goto(creator_url, wait_until="domcontentloaded")
-
-            # 等待页面加载,使用配置文件中的延时设置
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-
-            # 获取页面内容(这个接口返回JSON)
-            page_content = await self.playwright_page.content()
+            # 使用Playwright访问创作者帖子列表页面(这个接口返回JSON，页面会包含<pre>标签或直接是JSON)
+            page_content, json_text = await self._fetch_page_content(creator_url, with_inner_text=True)
 
-            # 提取JSON数据(页面会包含<pre>标签或直接是JSON)
+            # 提取JSON数据
             try:
-                # 尝试从页面中提取JSON
-                json_text = await self.playwright_page.evaluate("() => document.body.innerText")
                 result = json.loads(json_text)
                 utils.logger.info(f"[BaiduTieBaClient.get_notes_by_creator] 成功获取创作者帖子数据")
                 return result
@@ -37,12 +37,13 @@ from model.m_baidu_tieba import TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import tieba as tieba_store
 from tools import utils
-from tools.cdp_browser import CDPBrowserManager
+from tools.cdp_browser import CDPBrowserManager, block_resource_types, create_page_pool
+from tools.rate_limiter import effective_sleep_sec
 from var import crawler_type_var, source_keyword_var
 
 from .client import BaiduTieBaClient
 from .field import SearchNoteType, SearchSortType
-from .help import TieBaExtractor
+from .help import create_tieba_extractor
 from .login import BaiduTieBaLogin
 
 
@@ -55,7 +56,7 @@ class TieBaCrawler(AbstractCrawler):
     def __init__(self) -> None:
         self.index_url = "https://tieba.baidu.com"
         self.user_agent = utils.get_user_agent()
-        self._page_extractor = TieBaExtractor()
+        self._page_extractor = create_tieba_extractor()
         self.cdp_manager = None
 
     async def start(self) -> None:
@@ -193,8 +194,8 @@ class TieBaCrawler(AbstractCrawler):
                     )
 
                     # Sleep after page navigation
-                    await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                    utils.logger.info(f"[TieBaCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page}")
+                    await asyncio.sleep(effective_sleep_sec())
+                    utils.logger.info(f"[TieBaCrawler.search] Sleeping for {effective_sleep_sec()} seconds after page {page}")
 
                     page += 1
                 except Exception as ex:
@@ -235,8 +236,8 @@ class TieBaCrawler(AbstractCrawler):
                 await self.get_specified_notes([note.note_id for note in note_list])
 
                 # Sleep after processing notes
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[TieBaCrawler.get_specified_tieba_notes] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after processing notes from page {page_number}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[TieBaCrawler.get_specified_tieba_notes] Sleeping for {effective_sleep_sec()} seconds after processing notes from page {page_number}")
 
                 page_number += tieba_limit_count
 
@@ -284,8 +285,8 @@ class TieBaCrawler(AbstractCrawler):
                 note_detail: TiebaNote = await self.tieba_client.get_note_by_id(note_id)
 
                 # Sleep after fetching note details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[TieBaCrawler.get_note_detail_async_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching note details {note_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[TieBaCrawler.get_note_detail_async_task] Sleeping for {effective_sleep_sec()} seconds after fetching note details {note_id}")
 
                 if not note_detail:
                     utils.logger.error(
@@ -344,12 +345,12 @@ class TieBaCrawler(AbstractCrawler):
             )
 
             # Sleep before fetching comments
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-            utils.logger.info(f"[TieBaCrawler.get_comments_async_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds before fetching comments for note {note_detail.note_id}")
+            await asyncio.sleep(effective_sleep_sec())
+            utils.logger.info(f"[TieBaCrawler.get_comments_async_task] Sleeping for {effective_sleep_sec()} seconds before fetching comments for note {note_detail.note_id}")
 
             await self.tieba_client.get_note_all_comments(
                 note_detail=note_detail,
-                crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                crawl_interval=effective_sleep_sec(),
                 callback=tieba_store.batch_update_tieba_note_comments,
                 max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
             )
@@ -562,6 +563,13 @@ class TieBaCrawler(AbstractCrawler):
 
         cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
 
+        # 页面并发抓取模式下至少按并发数打开页面，并屏蔽图片、字体等资源
+        page_pool_size = config.BROWSER_PAGE_POOL_SIZE
+        page_setup = None
+        if config.TIEBA_CONCURRENT_FETCH:
+            page_pool_size = page_pool_size or config.MAX_CONCURRENCY_NUM
+            page_setup = block_resource_types(config.TIEBA_BLOCKED_RESOURCE_TYPES)
+
         # 构建完整的浏览器请求头,模拟真实浏览器行为
         tieba_client = BaiduTieBaClient(
             timeout=10,
@@ -586,6 +594,9 @@ class TieBaCrawler(AbstractCrawler):
                 "sec-ch-ua-platform": '"macOS"',
             },
             playwright_page=self.context_page,  # 传入playwright页面对象
+            page_pool=await create_page_pool(
+                self.browser_context, page_pool_size, origin_url=self.index_url, page_setup=page_setup
+            ),
         )
         return tieba_client
 
@@ -672,6 +683,11 @@ class TieBaCrawler(AbstractCrawler):
         Returns:
 
         """
+        # 关闭 API client 复用的 httpx 连接池
+        if getattr(self, "tieba_client", None):
+            await self.tieba_client.close_http_client()
+            if self.tieba_client.page_pool is not None:
+                await self.tieba_client.page_pool.close()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -25,8 +25,10 @@ import re
 from typing import Dict, List, Tuple
 from urllib.parse import parse_qs, unquote
 
+from lxml import etree
 from parsel import Selector
 
+import config
 from constant import baidu_tieba as const
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from tools import utils
@@ -365,6 +367,233 @@ class TieBaExtractor:
         return data_field_dict_value
 
 
+def _first(values: List, default: str = "") -> str:
+    return values[0] if values else default
+
+
+def _outer_html(element) -> str:
+    """与 parsel Selector.get() 一致的元素序列化"""
+    return etree.tostring(element, method="html", encoding="unicode", with_tail=False)
+
+
+def _xpath(expression: str) -> etree.XPath:
+    return etree.XPath(expression, smart_strings=False)
+
+
+class TieBaLxmlExtractor(TieBaExtractor):
+    """
+    基于 lxml 的贴吧页面解析：页面只解析一次，XPath 预先编译，页面级字段（吧名、吧链接等）在循环外只取一次，
+    返回结果与 TieBaExtractor 相同；创作者相关页面仍沿用父类的 parsel 实现
+    """
+
+    # 页面级
+    _FNAME_TEXT = _xpath("//a[@class='card_title_fname']/text()")
+    _FNAME_HREF = _xpath("//a[@class='card_title_fname']/@href")
+    _POST_TAIL_WRAP = _xpath(".//div[@class='post-tail-wrap']")
+
+    # 搜索结果页
+    _SEARCH_POSTS = _xpath("//div[@class='s_post']")
+    _SEARCH_NOTE_ID = _xpath(".//span[@class='p_title']/a/@data-tid")
+    _SEARCH_TITLE = _xpath(".//span[@class='p_title']/a/text()")
+    _SEARCH_NOTE_HREF = _xpath(".//span[@class='p_title']/a/@href")
+    _SEARCH_DESC = _xpath(".//div[@class='p_content']/text()")
+    _SEARCH_USER_NICKNAME = _xpath(".//a[starts-with(@href, '/home/main')]/font/text()")
+    _SEARCH_USER_HREF = _xpath(".//a[starts-with(@href, '/home/main')]/@href")
+    _SEARCH_FORUM_NAME = _xpath(".//a[@class='p_forum']/font/text()")
+    _SEARCH_FORUM_HREF = _xpath(".//a[@class='p_forum']/@href")
+    _SEARCH_PUBLISH_TIME = _xpath(".//font[@class='p_green p_date']/text()")
+
+    # 吧内帖子列表
+    _THREAD_POSTS = _xpath("//ul[@id='thread_list']/li")
+    _THREAD_TITLE = _xpath(".//a[@class='j_th_tit ']/text()")
+    _THREAD_DESC = _xpath(".//div[@class='threadlist_abs threadlist_abs_onlyline ']/text()")
+    _THREAD_AUTHOR_HREF = _xpath(".//a[@class='frs-author-name j_user_card ']/@href")
+
+    # 帖子详情、一级评论
+    _FIRST_FLOOR = _xpath("//div[@class='p_postlist'][1]")
+    _LZ_ONLY_HREF = _xpath("//*[@id='lzonly_cntn']/@href")
+    _REPLY_NUM_INFOS = _xpath("//div[@id='thread_theme_5']//li[@class='l_reply_num']//span[@class='red']")
+    _TITLE = _xpath("//title/text()")
+    _DESCRIPTION = _xpath("//meta[@name='description']/@content")
+    _TEXT = _xpath("./text()")
+    _COMMENT_POSTS = _xpath("//div[@class='l_post l_post_bright j_l_post clearfix  ']")
+    _AUTHOR_FACE_HREF = _xpath(".//a[@class='p_author_face ']/@href")
+    _AUTHOR_FACE_SRC = _xpath(".//a[@class='p_author_face ']/img/@src")
+    _AUTHOR_NAME = _xpath(".//a[@class='p_author_name j_user_card']/text()")
+
+    # 二级评论
+    _SUB_COMMENTS_FIRST = _xpath("//li[@class='lzl_single_post j_lzl_s_p first_no_border']")
+    _SUB_COMMENTS_OTHERS = _xpath("//li[@class='lzl_single_post j_lzl_s_p ']")
+    _SUB_COMMENT_USER_LINK = _xpath("./a[@class='j_user_card lzl_p_p']")
+    _SUB_COMMENT_CONTENT = _xpath(".//span[@class='lzl_content_main']")
+    _SUB_COMMENT_TIME = _xpath(".//span[@class='lzl_time']/text()")
+    _IMG_SRC = _xpath("./img/@src")
+
+    @classmethod
+    def _parse(cls, page_content: str):
+        # 与 parsel 创建根节点的方式保持一致，保证两种实现解析出同样的文档树
+        # lxml 的 parser 对象不能跨线程共享，每次解析单独创建
+        parser = etree.HTMLParser(recover=True, encoding="utf8", huge_tree=True)
+        body = page_content.strip().replace("\x00", "").encode("utf8") or b"<html/>"
+        root = etree.fromstring(body, parser=parser)
+        if root is None:
+            root = etree.fromstring(b"<html/>", parser=parser)
+        return root
+
+    @staticmethod
+    def extract_data_field_value(element) -> Dict:
+        """
+        提取data-field的值，兼容 lxml 元素和 parsel Selector
+        """
+        if isinstance(element, Selector):
+            return TieBaExtractor.extract_data_field_value(element)
+        data_field_value = (element.get("data-field") or "").strip()
+        if not data_field_value or data_field_value == "{}":
+            return {}
+        try:
+            data_field_dict_value = json.loads(html.unescape(data_field_value))
+        except Exception as ex:
+            print(f"extract_data_field_value，错误信息：{ex}, 尝试使用其他方式解析")
+            data_field_dict_value = {}
+        return data_field_dict_value
+
+    def _extract_tieba_name_and_link(self, root) -> Tuple[str, str]:
+        return _first(self._FNAME_TEXT(root)).strip(), _first(self._FNAME_HREF(root))
+
+    @classmethod
+    def extract_search_note_list(cls, page_content: str) -> List[TiebaNote]:
+        result: List[TiebaNote] = []
+        for post in cls._SEARCH_POSTS(cls._parse(page_content)):
+            result.append(TiebaNote(
+                note_id=_first(cls._SEARCH_NOTE_ID(post)).strip(),
+                title=_first(cls._SEARCH_TITLE(post)).strip(),
+                desc=_first(cls._SEARCH_DESC(post)).strip(),
+                note_url=const.TIEBA_URL + _first(cls._SEARCH_NOTE_HREF(post)),
+                user_nickname=_first(cls._SEARCH_USER_NICKNAME(post)).strip(),
+                user_link=const.TIEBA_URL + _first(cls._SEARCH_USER_HREF(post)),
+                tieba_name=_first(cls._SEARCH_FORUM_NAME(post)).strip(),
+                tieba_link=const.TIEBA_URL + _first(cls._SEARCH_FORUM_HREF(post)),
+                publish_time=_first(cls._SEARCH_PUBLISH_TIME(post)).strip(),
+            ))
+        return result
+
+    def extract_tieba_note_list(self, page_content: str) -> List[TiebaNote]:
+        root = self._parse(page_content.replace('<!--', ""))
+        tieba_name, tieba_link = self._extract_tieba_name_and_link(root)
+        result: List[TiebaNote] = []
+        for post in self._THREAD_POSTS(root):
+            post_field_value: Dict = self.extract_data_field_value(post)
+            if not post_field_value:
+                continue
+            note_id = str(post_field_value.get("id"))
+            result.append(TiebaNote(
+                note_id=note_id,
+                title=_first(self._THREAD_TITLE(post)).strip(),
+                desc=_first(self._THREAD_DESC(post)).strip(),
+                note_url=const.TIEBA_URL + f"/p/{note_id}",
+                user_link=const.TIEBA_URL + _first(self._THREAD_AUTHOR_HREF(post)).strip(),
+                user_nickname=post_field_value.get("authoer_nickname") or post_field_value.get("author_name"),
+                tieba_name=tieba_name,
+                tieba_link=const.TIEBA_URL + tieba_link,
+                total_replay_num=post_field_value.get("reply_num", 0),
+            ))
+        return result
+
+    def extract_note_detail(self, page_content: str) -> TiebaNote:
+        root = self._parse(page_content)
+        first_floor = _first(self._FIRST_FLOOR(root), None)
+        only_view_author_link = _first(self._LZ_ONLY_HREF(root)).strip()
+        note_id = only_view_author_link.split("?")[0].split("/")[-1]
+        thread_num_infos = self._REPLY_NUM_INFOS(root)
+        post_tail_wrap = _first(self._POST_TAIL_WRAP(root), None)
+        other_info_content = _outer_html(post_tail_wrap).strip() if post_tail_wrap is not None else ""
+        ip_location, publish_time = self.extract_ip_and_pub_time(other_info_content)
+        tieba_name, tieba_link = self._extract_tieba_name_and_link(root)
+        note = TiebaNote(
+            note_id=note_id,
+            title=_first(self._TITLE(root)).strip(),
+            desc=_first(self._DESCRIPTION(root)).strip(),
+            note_url=const.TIEBA_URL + f"/p/{note_id}",
+            user_link=const.TIEBA_URL + (
+                _first(self._AUTHOR_FACE_HREF(first_floor)).strip() if first_floor is not None else ""),
+            user_nickname=_first(self._AUTHOR_NAME(first_floor)).strip() if first_floor is not None else "",
+            user_avatar=_first(self._AUTHOR_FACE_SRC(first_floor)).strip() if first_floor is not None else "",
+            tieba_name=tieba_name,
+            tieba_link=const.TIEBA_URL + tieba_link,
+            ip_location=ip_location,
+            publish_time=publish_time,
+            total_replay_num=_first(self._TEXT(thread_num_infos[0])).strip(),
+            total_replay_page=_first(self._TEXT(thread_num_infos[1])).strip(),
+        )
+        note.title = note.title.replace(f"【{note.tieba_name}】_百度贴吧", "")
+        return note
+
+    def extract_tieba_note_parment_comments(self, page_content: str, note_id: str) -> List[TiebaComment]:
+        root = self._parse(page_content)
+        # 原实现在每条评论里用 // 查询吧名，结果对整页都一样
+        tieba_name = _first(self._FNAME_TEXT(root)).strip()
+        tieba_link = f"https://tieba.baidu.com/f?kw={tieba_name}"
+        note_url = const.TIEBA_URL + f"/p/{note_id}"
+        result: List[TiebaComment] = []
+        for comment in self._COMMENT_POSTS(root):
+            comment_field_value: Dict = self.extract_data_field_value(comment)
+            if not comment_field_value:
+                continue
+            content_value = comment_field_value.get("content")
+            post_tail_wrap = _first(self._POST_TAIL_WRAP(comment), None)
+            other_info_content = _outer_html(post_tail_wrap).strip() if post_tail_wrap is not None else ""
+            ip_location, publish_time = self.extract_ip_and_pub_time(other_info_content)
+            result.append(TiebaComment(
+                comment_id=str(content_value.get("post_id")),
+                sub_comment_count=content_value.get("comment_num"),
+                content=utils.extract_text_from_html(content_value.get("content")),
+                note_url=note_url,
+                user_link=const.TIEBA_URL + _first(self._AUTHOR_FACE_HREF(comment)).strip(),
+                user_nickname=_first(self._AUTHOR_NAME(comment)).strip(),
+                user_avatar=_first(self._AUTHOR_FACE_SRC(comment)).strip(),
+                tieba_id=str(content_value.get("forum_id", "")),
+                tieba_name=tieba_name,
+                tieba_link=tieba_link,
+                ip_location=ip_location,
+                publish_time=publish_time,
+                note_id=note_id,
+            ))
+        return result
+
+    def extract_tieba_note_sub_comments(self, page_content: str, parent_comment: TiebaComment) -> List[TiebaComment]:
+        root = self._parse(page_content)
+        comments = []
+        for comment_ele in self._SUB_COMMENTS_FIRST(root) + self._SUB_COMMENTS_OTHERS(root):
+            comment_value = self.extract_data_field_value(comment_ele)
+            if not comment_value:
+                continue
+            comment_user_a = self._SUB_COMMENT_USER_LINK(comment_ele)[0]
+            content_element = _first(self._SUB_COMMENT_CONTENT(comment_ele), None)
+            content = utils.extract_text_from_html(
+                _outer_html(content_element) if content_element is not None else "")
+            comments.append(TiebaComment(
+                comment_id=str(comment_value.get("spid")), content=content,
+                user_link=comment_user_a.get("href", ""),
+                user_nickname=comment_value.get("showname"),
+                user_avatar=_first(self._IMG_SRC(comment_user_a)),
+                publish_time=_first(self._SUB_COMMENT_TIME(comment_ele)).strip(),
+                parent_comment_id=parent_comment.comment_id,
+                note_id=parent_comment.note_id, note_url=parent_comment.note_url,
+                tieba_id=parent_comment.tieba_id, tieba_name=parent_comment.tieba_name,
+                tieba_link=parent_comment.tieba_link))
+        return comments
+
+
+def create_tieba_extractor() -> TieBaExtractor:
+    """
+    按 TIEBA_EXTRACTOR_BACKEND 配置创建页面解析器
+    """
+    if config.TIEBA_EXTRACTOR_BACKEND == "lxml":
+        return TieBaLxmlExtractor()
+    return TieBaExtractor()
+
+
+
 def test_extract_search_note_list():
     with open("test_data/search_keyword_notes.html", "r", encoding="utf-8") as f:
         content = f.read()
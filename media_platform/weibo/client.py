@@ -37,6 +37,8 @@ from tenacity import retry, stop_after_attempt, wait_fixed
 import config
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.media_downloader import DownloadResult, stream_download
+from tools.rate_limiter import RateLimiter
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
@@ -71,10 +73,11 @@ class WeiboClient(ProxyRefreshMixin):
     async def request(self, method, url, **kwargs) -> Union[Response, Dict]:
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
+        # 按平台和接口类别领取限速令牌
+        await RateLimiter.acquire("wb", url)
 
         enable_return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
 
         if enable_return_response:
             return response
@@ -261,22 +264,22 @@ class WeiboClient(ProxyRefreshMixin):
         :return:
         """
         url = f"{self._host}/detail/{note_id}"
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
-            if response.status_code != 200:
-                raise DataFetchError(f"get weibo detail err: {response.text}")
-            match = re.search(r'var \$render_data = (\[.*?\])\[0\]', response.text, re.DOTALL)
-            if match:
-                render_data_json = match.group(1)
-                render_data_dict = json.loads(render_data_json)
-                note_detail = render_data_dict[0].get("status")
-                note_item = {"mblog": note_detail}
-                return note_item
-            else:
-                utils.logger.info(f"[WeiboClient.get_note_info_by_id] 未找到$render_data的值")
-                return dict()
+        client = self.get_http_client()
+        response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
+        if response.status_code != 200:
+            raise DataFetchError(f"get weibo detail err: {response.text}")
+        match = re.search(r'var \$render_data = (\[.*?\])\[0\]', response.text, re.DOTALL)
+        if match:
+            render_data_json = match.group(1)
+            render_data_dict = json.loads(render_data_json)
+            note_detail = render_data_dict[0].get("status")
+            note_item = {"mblog": note_detail}
+            return note_item
+        else:
+            utils.logger.info(f"[WeiboClient.get_note_info_by_id] 未找到$render_data的值")
+            return dict()
 
-    async def get_note_image(self, image_url: str) -> bytes:
+    def _build_note_image_url(self, image_url: str) -> str:
         image_url = image_url[8:]  # 去掉 https://
         sub_url = image_url.split("/")
         image_url = ""
@@ -289,20 +292,36 @@ class WeiboClient(ProxyRefreshMixin):
                 image_url += sub_url[i] + "/"
         # 微博图床对外存在防盗链，所以需要代理访问
         # 由于微博图片是通过 i1.wp.com 来访问的，所以需要拼接一下
-        final_uri = (f"{self._image_agent_host}"
-                     f"{image_url}")
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", final_uri, timeout=self.timeout)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(f"[WeiboClient.get_note_image] request {final_uri} err, res:{response.text}")
-                    return None
-                else:
-                    return response.content
-            except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
-                utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")    # 保留原始异常类型名称，以便开发者调试
+        return (f"{self._image_agent_host}"
+                f"{image_url}")
+
+    async def get_note_image(self, image_url: str) -> bytes:
+        final_uri = self._build_note_image_url(image_url)
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", final_uri, timeout=self.timeout)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
+                utils.logger.error(f"[WeiboClient.get_note_image] request {final_uri} err, res:{response.text}")
                 return None
+            else:
+                return response.content
+        except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")    # 保留原始异常类型名称，以便开发者调试
+            return None
+
+    async def download_note_image(self, image_url: str, save_path: str) -> Optional[DownloadResult]:
+        """
+        流式下载微博图片（高清大图）到 save_path，支持断点续传
+        Args:
+            image_url: 图片地址
+            save_path: 保存路径
+
+        Returns:
+
+        """
+        return await stream_download(self.get_http_client(), self._build_note_image_url(image_url), save_path,
+                                     timeout=self.timeout, follow_redirects=False)
 
     async def get_creator_container_info(self, creator_id: str) -> Dict:
         """
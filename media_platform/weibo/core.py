@@ -42,6 +42,9 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import weibo as weibo_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.media_download_manager import MediaDownloadManager
+from tools.media_downloader import MediaSource
+from tools.rate_limiter import effective_sleep_sec
 from var import crawler_type_var, source_keyword_var
 
 from .client import WeiboClient
@@ -131,6 +134,8 @@ class WeiboCrawler(AbstractCrawler):
                 await self.get_creators_and_notes()
             else:
                 pass
+            # 等待后台的图片下载完成
+            await MediaDownloadManager.drain()
             utils.logger.info("[WeiboCrawler.start] Weibo Crawler finished ...")
 
     async def search(self):
@@ -181,8 +186,8 @@ class WeiboCrawler(AbstractCrawler):
                 page += 1
 
                 # Sleep after page navigation
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[WeiboCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[WeiboCrawler.search] Sleeping for {effective_sleep_sec()} seconds after page {page-1}")
 
                 await self.batch_get_notes_comments(note_id_list)
 
@@ -211,8 +216,8 @@ class WeiboCrawler(AbstractCrawler):
                 result = await self.wb_client.get_note_info_by_id(note_id)
 
                 # Sleep after fetching note details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[WeiboCrawler.get_note_info_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching note details {note_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[WeiboCrawler.get_note_info_task] Sleeping for {effective_sleep_sec()} seconds after fetching note details {note_id}")
 
                 return result
             except DataFetchError as ex:
@@ -252,12 +257,12 @@ class WeiboCrawler(AbstractCrawler):
                 utils.logger.info(f"[WeiboCrawler.get_note_comments] begin get note_id: {note_id} comments ...")
 
                 # Sleep before fetching comments
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[WeiboCrawler.get_note_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds before fetching comments for note {note_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[WeiboCrawler.get_note_comments] Sleeping for {effective_sleep_sec()} seconds before fetching comments for note {note_id}")
 
                 await self.wb_client.get_note_all_comments(
                     note_id=note_id,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,  # Use fixed interval instead of random
+                    crawl_interval=effective_sleep_sec(),  # Use fixed interval instead of random
                     callback=weibo_store.batch_update_weibo_note_comments,
                     max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
                 )
@@ -283,12 +288,11 @@ class WeiboCrawler(AbstractCrawler):
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.wb_client.get_note_image(url)
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-            utils.logger.info(f"[WeiboCrawler.get_note_images] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching image")
-            if content != None:
-                extension_file_name = url.split(".")[-1]
-                await weibo_store.update_weibo_note_image(pic["pid"], content, extension_file_name)
+            extension_file_name = url.split(".")[-1]
+            await MediaDownloadManager.submit(
+                url, weibo_store.update_weibo_note_image,
+                pic["pid"], MediaSource(url, self.wb_client.download_note_image), extension_file_name
+            )
 
     async def get_creators_and_notes(self) -> None:
         """
@@ -401,6 +405,9 @@ class WeiboCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        # 关闭 API client 复用的 httpx 连接池
+        if getattr(self, "wb_client", None):
+            await self.wb_client.close_http_client()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -24,21 +24,25 @@ from urllib.parse import urlencode
 
 import httpx
 from playwright.async_api import BrowserContext, Page
-from tenacity import retry, stop_after_attempt, wait_fixed
+from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.media_downloader import DownloadResult, stream_download
+from tools.rate_limiter import RateLimiter
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
+    from tools.cdp_browser import PagePool
 
-from .exception import DataFetchError, IPBlockError
+from .exception import DataFetchError, IPBlockError, SignVerifyError
 from .field import SearchNoteType, SearchSortType
 from .help import get_search_id
 from .extractor import XiaoHongShuExtractor
-from .playwright_sign import sign_with_playwright
+from .playwright_sign import PlaywrightXhsSigner
+from .xhshow_sign import XhshowSigner
 
 
 class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
@@ -52,6 +56,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         playwright_page: Page,
         cookie_dict: Dict[str, str],
         proxy_ip_pool: Optional["ProxyIpPool"] = None,
+        page_pool: Optional["PagePool"] = None,
     ):
         self.proxy = proxy
         self.timeout = timeout
@@ -60,16 +65,23 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         self._domain = "https://www.xiaohongshu.com"
         self.IP_ERROR_STR = "网络连接异常，请检查网络设置或重启试试"
         self.IP_ERROR_CODE = 300012
+        # 签名校验失败：HTTP 406 或业务码 300015
+        self.SIGN_ERROR_STATUS = 406
+        self.SIGN_ERROR_CODE = 300015
         self.NOTE_ABNORMAL_STR = "笔记状态异常，请稍后查看"
         self.NOTE_ABNORMAL_CODE = -510001
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
+        self.page_pool = page_pool
+        self._signer = PlaywrightXhsSigner(playwright_page, page_pool=page_pool)
+        self._xhshow_signer = XhshowSigner()
+        self.sign_mode = config.XHS_SIGN_MODE
         self._extractor = XiaoHongShuExtractor()
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
 
     async def _pre_headers(self, url: str, params: Optional[Dict] = None, payload: Optional[Dict] = None) -> Dict:
-        """请求头参数签名（使用 playwright 注入方式）
+        """请求头参数签名（XHS_SIGN_MODE 为 xhshow 时使用纯 Python 签名，否则使用 playwright 注入方式）
 
         Args:
             url: 请求的URL
@@ -89,13 +101,13 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         else:
             raise ValueError("params or payload is required")
 
-        # 使用 playwright 注入方式生成签名
-        signs = await sign_with_playwright(
-            page=self.playwright_page,
-            uri=url,
-            data=data,
-            a1=a1_value,
-        )
+        if self.sign_mode == "xhshow":
+            signs = await self._xhshow_signer.sign(url, self.cookie_dict, data, is_post=params is None)
+        else:
+            # 使用 playwright 注入方式生成签名，并发请求的签名会合并为一次 evaluate 调用
+            if self._signer.page is not self.playwright_page:
+                self._signer = PlaywrightXhsSigner(self.playwright_page, page_pool=self.page_pool)
+            signs = await self._signer.sign(uri=url, data=data, a1=a1_value)
 
         headers = {
             "X-S": signs["x-s"],
@@ -120,11 +132,12 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         """
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
+        # 按平台和接口类别领取限速令牌
+        await RateLimiter.acquire("xhs", url)
 
         # return response.text
         return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
@@ -134,6 +147,9 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             utils.logger.error(msg)
             raise Exception(msg)
 
+        if response.status_code == self.SIGN_ERROR_STATUS:
+            raise SignVerifyError(f"签名校验失败，Response: {response.text}")
+
         if return_response:
             return response.text
         data: Dict = response.json()
@@ -141,6 +157,8 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             return data.get("data", data.get("success", {}))
         elif data["code"] == self.IP_ERROR_CODE:
             raise IPBlockError(self.IP_ERROR_STR)
+        elif data["code"] == self.SIGN_ERROR_CODE:
+            raise SignVerifyError(data.get("msg", None) or f"{response.text}")
         else:
             err_msg = data.get("msg", None) or f"{response.text}"
             raise DataFetchError(err_msg)
@@ -155,7 +173,6 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
-        headers = await self._pre_headers(uri, params)
         if isinstance(params, dict):
             # 构建带参数的完整 URL
             query_string = urlencode(params)
@@ -163,9 +180,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         else:
             full_url = f"{self._host}{uri}"
 
-        return await self.request(
-            method="GET", url=full_url, headers=headers
-        )
+        return await self._signed_request("GET", full_url, uri, params=params)
 
     async def post(self, uri: str, data: dict, **kwargs) -> Dict:
         """
@@ -177,38 +192,74 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
-        headers = await self._pre_headers(uri, payload=data)
         json_str = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
-        return await self.request(
-            method="POST",
-            url=f"{self._host}{uri}",
-            data=json_str,
-            headers=headers,
-            **kwargs,
+        return await self._signed_request(
+            "POST", f"{self._host}{uri}", uri, payload=data, data=json_str, **kwargs
         )
 
+    async def _signed_request(
+        self,
+        method: str,
+        url: str,
+        uri: str,
+        params: Optional[Dict] = None,
+        payload: Optional[Dict] = None,
+        **kwargs,
+    ) -> Union[str, Any]:
+        """
+        签名并发送请求，xhshow 签名被服务端拒绝时切换回 playwright 签名重试一次
+        验证码（461/471）不是签名问题，直接抛出，不切换签名方式
+        """
+        headers = await self._pre_headers(uri, params=params, payload=payload)
+        try:
+            return await self.request(method=method, url=url, headers=headers, **kwargs)
+        except (SignVerifyError, RetryError) as e:
+            if isinstance(e, RetryError) and not isinstance(e.last_attempt.exception(), SignVerifyError):
+                raise
+            if self.sign_mode != "xhshow":
+                raise
+            utils.logger.warning(
+                "[XiaoHongShuClient._signed_request] xhshow sign rejected by server, fallback to playwright sign"
+            )
+            self.sign_mode = "playwright"
+            headers = await self._pre_headers(uri, params=params, payload=payload)
+            return await self.request(method=method, url=url, headers=headers, **kwargs)
+
     async def get_note_media(self, url: str) -> Union[bytes, None]:
         # 请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(
-                        f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
-                    )
-                    return None
-                else:
-                    return response.content
-            except (
-                httpx.HTTPError
-            ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", url, timeout=self.timeout)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
                 utils.logger.error(
-                    f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
-                )  # 保留原始异常类型名称，以便开发者调试
+                    f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
+                )
                 return None
+            else:
+                return response.content
+        except (
+            httpx.HTTPError
+        ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(
+                f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
+            )  # 保留原始异常类型名称，以便开发者调试
+            return None
+
+    async def download_note_media(self, url: str, save_path: str) -> Optional[DownloadResult]:
+        """
+        流式下载笔记图片/视频到 save_path，支持断点续传
+        Args:
+            url: 媒体地址
+            save_path: 保存路径
+
+        Returns:
+
+        """
+        await self._refresh_proxy_if_expired()
+        return await stream_download(self.get_http_client(), url, save_path, timeout=self.timeout, follow_redirects=False)
 
     async def pong(self) -> bool:
         """
@@ -242,6 +293,8 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         cookie_str, cookie_dict = utils.convert_cookies(await browser_context.cookies())
         self.headers["Cookie"] = cookie_str
         self.cookie_dict = cookie_dict
+        # 登录后 localStorage 中的 b1 可能变化
+        self._signer.invalidate_b1()
 
     async def get_note_by_keyword(
         self,
@@ -19,7 +19,6 @@
 
 import asyncio
 import os
-import random
 from asyncio import Task
 from typing import Dict, List, Optional
 
@@ -34,15 +33,20 @@ from tenacity import RetryError
 
 import config
 from base.base_crawler import AbstractCrawler
+from base.crawl_pipeline import CrawlPipeline
 from config import CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES
 from model.m_xiaohongshu import NoteUrlInfo, CreatorUrlInfo
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import xhs as xhs_store
 from tools import utils
-from tools.cdp_browser import CDPBrowserManager
+from tools.cdp_browser import CDPBrowserManager, create_page_pool
+from tools.media_download_manager import MediaDownloadManager
+from tools.media_downloader import MediaSource
+from tools.rate_limiter import effective_sleep_sec
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
+from .xhshow_sign import XhshowSigner
 from .exception import DataFetchError
 from .field import SearchSortType
 from .help import parse_note_info_from_note_url, parse_creator_info_from_url, get_search_id
@@ -121,40 +125,24 @@ class XiaoHongShuCrawler(AbstractCrawler):
             else:
                 pass
 
+            # 等待后台的图片/视频下载完成
+            await MediaDownloadManager.drain()
             utils.logger.info("[XiaoHongShuCrawler.start] Xhs Crawler finished ...")
 
     async def search(self) -> None:
         """Search for notes and retrieve their comment information."""
+        if config.ENABLE_CRAWL_PIPELINE:
+            await self.search_with_pipeline()
+            return
+
         utils.logger.info("[XiaoHongShuCrawler.search] Begin search xiaohongshu keywords")
-        xhs_limit_count = 20  # xhs limit page fixed value
-        if config.CRAWLER_MAX_NOTES_COUNT < xhs_limit_count:
-            config.CRAWLER_MAX_NOTES_COUNT = xhs_limit_count
-        start_page = config.START_PAGE
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
             utils.logger.info(f"[XiaoHongShuCrawler.search] Current search keyword: {keyword}")
-            page = 1
-            search_id = get_search_id()
-            while (page - start_page + 1) * xhs_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
-                if page < start_page:
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Skip page {page}")
-                    page += 1
-                    continue
-
-                try:
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] search xhs keyword: {keyword}, page: {page}")
+            try:
+                async for page, post_items in self._iter_search_pages(keyword):
                     note_ids: List[str] = []
                     xsec_tokens: List[str] = []
-                    notes_res = await self.xhs_client.get_note_by_keyword(
-                        keyword=keyword,
-                        search_id=search_id,
-                        page=page,
-                        sort=(SearchSortType(config.SORT_TYPE) if config.SORT_TYPE != "" else SearchSortType.GENERAL),
-                    )
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Search notes res:{notes_res}")
-                    if not notes_res or not notes_res.get("has_more", False):
-                        utils.logger.info("No more content!")
-                        break
                     semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
                     task_list = [
                         self.get_note_detail_async_task(
@@ -162,7 +150,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                             xsec_source=post_item.get("xsec_source"),
                             xsec_token=post_item.get("xsec_token"),
                             semaphore=semaphore,
-                        ) for post_item in notes_res.get("items", {}) if post_item.get("model_type") not in ("rec_query", "hot_query")
+                        ) for post_item in post_items
                     ]
                     note_details = await asyncio.gather(*task_list)
                     for note_detail in note_details:
@@ -171,16 +159,97 @@ class XiaoHongShuCrawler(AbstractCrawler):
                             await self.get_notice_media(note_detail)
                             note_ids.append(note_detail.get("note_id"))
                             xsec_tokens.append(note_detail.get("xsec_token"))
-                    page += 1
                     utils.logger.info(f"[XiaoHongShuCrawler.search] Note details: {note_details}")
                     await self.batch_get_note_comments(note_ids, xsec_tokens)
 
                     # Sleep after each page navigation
-                    await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                    await asyncio.sleep(effective_sleep_sec())
+                    utils.logger.info(f"[XiaoHongShuCrawler.search] Sleeping for {effective_sleep_sec()} seconds after page {page}")
+            except DataFetchError:
+                utils.logger.error("[XiaoHongShuCrawler.search] Get note detail error")
+
+    async def _iter_search_pages(self, keyword: str):
+        """
+        逐页搜索关键词，产出 (页码, 笔记列表)，search 与流水线模式共用
+        """
+        xhs_limit_count = 20  # xhs limit page fixed value
+        if config.CRAWLER_MAX_NOTES_COUNT < xhs_limit_count:
+            config.CRAWLER_MAX_NOTES_COUNT = xhs_limit_count
+        start_page = config.START_PAGE
+        page = 1
+        search_id = get_search_id()
+        while (page - start_page + 1) * xhs_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
+            if page < start_page:
+                utils.logger.info(f"[XiaoHongShuCrawler.search] Skip page {page}")
+                page += 1
+                continue
+
+            utils.logger.info(f"[XiaoHongShuCrawler.search] search xhs keyword: {keyword}, page: {page}")
+            notes_res = await self.xhs_client.get_note_by_keyword(
+                keyword=keyword,
+                search_id=search_id,
+                page=page,
+                sort=(SearchSortType(config.SORT_TYPE) if config.SORT_TYPE != "" else SearchSortType.GENERAL),
+            )
+            utils.logger.info(f"[XiaoHongShuCrawler.search] Search notes res:{notes_res}")
+            if not notes_res or not notes_res.get("has_more", False):
+                utils.logger.info("No more content!")
+                return
+            yield page, [
+                post_item for post_item in notes_res.get("items", {})
+                if post_item.get("model_type") not in ("rec_query", "hot_query")
+            ]
+            page += 1
+
+    async def search_with_pipeline(self) -> None:
+        """
+        流水线模式的关键词搜索：search -> detail -> store -> media -> comments，各阶段并发执行
+        """
+        utils.logger.info("[XiaoHongShuCrawler.search_with_pipeline] Begin search xiaohongshu keywords")
+
+        async def search_note_items():
+            for keyword in config.KEYWORDS.split(","):
+                source_keyword_var.set(keyword)
+                utils.logger.info(f"[XiaoHongShuCrawler.search_with_pipeline] Current search keyword: {keyword}")
+                try:
+                    async for page, post_items in self._iter_search_pages(keyword):
+                        for post_item in post_items:
+                            yield post_item
+                        # 翻页间隔保持不变，详情、评论等由后面的阶段并发处理
+                        await asyncio.sleep(effective_sleep_sec())
                 except DataFetchError:
-                    utils.logger.error("[XiaoHongShuCrawler.search] Get note detail error")
-                    break
+                    utils.logger.error("[XiaoHongShuCrawler.search_with_pipeline] Search note error")
+
+        # 并发由阶段的 worker 数控制，信号量只是满足原有方法的参数
+        detail_semaphore = asyncio.Semaphore(CrawlPipeline.stage_workers("detail"))
+        comments_semaphore = asyncio.Semaphore(CrawlPipeline.stage_workers("comments"))
+
+        async def get_detail(post_item: Dict) -> Optional[Dict]:
+            return await self.get_note_detail_async_task(
+                note_id=post_item.get("id"),
+                xsec_source=post_item.get("xsec_source"),
+                xsec_token=post_item.get("xsec_token"),
+                semaphore=detail_semaphore,
+            )
+
+        async def store_note(note_detail: Dict) -> Dict:
+            await xhs_store.update_xhs_note(note_detail)
+            return note_detail
+
+        async def get_media(note_detail: Dict) -> Dict:
+            await self.get_notice_media(note_detail)
+            return note_detail
+
+        async def get_comments(note_detail: Dict) -> None:
+            if config.ENABLE_GET_COMMENTS:
+                await self.get_comments(note_detail.get("note_id"), note_detail.get("xsec_token"), comments_semaphore)
+
+        pipeline = (CrawlPipeline("xhs_search")
+                    .add_stage("detail", get_detail)
+                    .add_stage("store", store_note)
+                    .add_stage("media", get_media)
+                    .add_stage("comments", get_comments))
+        await pipeline.run(search_note_items())
 
     async def get_creators_and_notes(self) -> None:
         """Get creator's notes and retrieve their comment information."""
@@ -205,7 +274,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 continue
 
             # Use fixed crawling interval
-            crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
+            crawl_interval = effective_sleep_sec()
             # Get all note information of the creator
             all_notes_list = await self.xhs_client.get_all_notes_by_creator(
                 user_id=user_id,
@@ -308,8 +377,8 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 note_detail.update({"xsec_token": xsec_token, "xsec_source": xsec_source})
 
                 # Sleep after fetching note detail
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[get_note_detail_async_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching note {note_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[get_note_detail_async_task] Sleeping for {effective_sleep_sec()} seconds after fetching note {note_id}")
 
                 return note_detail
 
@@ -342,7 +411,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         async with semaphore:
             utils.logger.info(f"[XiaoHongShuCrawler.get_comments] Begin get note id comments {note_id}")
             # Use fixed crawling interval
-            crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
+            crawl_interval = effective_sleep_sec()
             await self.xhs_client.get_note_all_comments(
                 note_id=note_id,
                 xsec_token=xsec_token,
@@ -382,6 +451,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
             playwright_page=self.context_page,
             cookie_dict=cookie_dict,
             proxy_ip_pool=self.ip_proxy_pool,  # 传递代理池用于自动刷新
+            page_pool=await create_page_pool(self.browser_context, origin_url=self.index_url),
         )
         return xhs_client_obj
 
@@ -448,6 +518,12 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        # 关闭 API client 复用的 httpx 连接池
+        if getattr(self, "xhs_client", None):
+            await self.xhs_client.close_http_client()
+            if self.xhs_client.page_pool is not None:
+                await self.xhs_client.page_pool.close()
+        XhshowSigner.shutdown()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -485,13 +561,13 @@ class XiaoHongShuCrawler(AbstractCrawler):
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
+            # 文件名按图片顺序编号，下载中断留下的 .part 文件下次仍能对应到同一个 url 续传
             extension_file_name = f"{picNum}.jpg"
             picNum += 1
-            await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
+            await MediaDownloadManager.submit(
+                url, xhs_store.update_xhs_note_image,
+                note_id, MediaSource(url, self.xhs_client.download_note_media), extension_file_name
+            )
 
     async def get_notice_video(self, note_item: Dict):
         """
@@ -507,12 +583,9 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
         if not videos:
             return
-        videoNum = 0
-        for url in videos:
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
+        for videoNum, url in enumerate(videos):
             extension_file_name = f"{videoNum}.mp4"
-            videoNum += 1
-            await xhs_store.update_xhs_note_video(note_id, content, extension_file_name)
+            await MediaDownloadManager.submit(
+                url, xhs_store.update_xhs_note_video,
+                note_id, MediaSource(url, self.xhs_client.download_note_media), extension_file_name
+            )
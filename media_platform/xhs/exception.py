@@ -27,3 +27,7 @@ class DataFetchError(RequestError):
 
 class IPBlockError(RequestError):
     """fetch so fast that the server block us ip"""
+
+
+class SignVerifyError(DataFetchError):
+    """the server rejected the request signature (HTTP 406 or business code 300015)"""
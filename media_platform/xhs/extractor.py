@@ -17,11 +17,9 @@
 # 详细许可条款请参阅项目根目录下的LICENSE文件。
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
-import json
-import re
 from typing import Dict, Optional
 
-import humps
+from tools.embedded_state import decamelize_subtree, extract_window_state, get_subtree, loads_js_object
 
 
 class XiaoHongShuExtractor:
@@ -41,13 +39,12 @@ class XiaoHongShuExtractor:
             # 这种情况要么是出了验证码了，要么是笔记不存在
             return None
 
-        state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[
-            0
-        ].replace("undefined", '""')
-        if state != "{}":
-            note_dict = humps.decamelize(json.loads(state))
-            return note_dict["note"]["note_detail_map"][note_id]["note"]
-        return None
+        state = extract_window_state(html)
+        if not state or state == "{}":
+            return None
+        # 整个 state 只需要 note.noteDetailMap[note_id].note，只对这部分做 decamelize
+        info = loads_js_object(state, undefined_value='""')
+        return decamelize_subtree(info, "note", "noteDetailMap", note_id, "note")
 
     def extract_creator_info_from_html(self, html: str) -> Optional[Dict]:
         """从html中提取用户信息
@@ -58,12 +55,10 @@ class XiaoHongShuExtractor:
         Returns:
             Dict: 用户信息字典
         """
-        match = re.search(
-            r"<script>window.__INITIAL_STATE__=(.+)<\/script>", html, re.M
-        )
-        if match is None:
+        state = extract_window_state(html)
+        if state is None:
             return None
-        info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
+        info = loads_js_object(state)
         if info is None:
             return None
-        return info.get("user").get("userPageData")
+        return get_subtree(info, "user", "userPageData")
@@ -18,14 +18,20 @@
 
 # 通过 Playwright 注入调用 window.mnsv2 生成小红书签名
 
+import asyncio
 import hashlib
 import json
 import time
-from typing import Any, Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 from playwright.async_api import Page
 
+import config
+
+if TYPE_CHECKING:
+    from tools.cdp_browser import PagePool
+
 from .xhs_sign import b64_encode, encode_utf8, get_trace_id, mrc
 
 
@@ -162,6 +168,124 @@ async def sign_with_playwright(
     }
 
 
+# 一次 evaluate 为一批请求计算 mnsv2，需要时顺带读取 b1（只读单个 key，不序列化整个 localStorage）
+_BATCH_SIGN_JS = """
+([items, needB1]) => ({
+    b1: needB1 ? (window.localStorage.getItem("b1") || "") : null,
+    x3: items.map(([signStr, md5Str]) => {
+        try {
+            return window.mnsv2(signStr, md5Str) || "";
+        } catch (e) {
+            return "";
+        }
+    }),
+})
+"""
+
+
+class PlaywrightXhsSigner:
+    """
+    合并签名请求的 playwright 签名器
+
+    - 窗口期（XHS_SIGN_BATCH_WINDOW_MS）内到达的签名请求合并成一次 page.evaluate 调用
+    - b1 缓存在本地，a1 变化、调用 invalidate_b1() 或超过 XHS_SIGN_B1_CACHE_TTL_SEC 后随下一批请求重新读取
+    - 传入 page_pool 时每一批从页面池借用页面执行，多个批次可以在不同页面上并发
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        page_pool: Optional["PagePool"] = None,
+        batch_window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        b1_cache_ttl: Optional[float] = None,
+    ):
+        self.page = page
+        self.page_pool = page_pool
+        self.batch_window = (config.XHS_SIGN_BATCH_WINDOW_MS if batch_window_ms is None else batch_window_ms) / 1000
+        self.max_batch_size = max_batch_size or config.XHS_SIGN_BATCH_MAX_SIZE
+        self.b1_cache_ttl = config.XHS_SIGN_B1_CACHE_TTL_SEC if b1_cache_ttl is None else b1_cache_ttl
+        self._b1: Optional[str] = None
+        self._b1_a1: str = ""
+        self._b1_expire_at: float = 0
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    def invalidate_b1(self):
+        """cookie 或 localStorage 发生变化后调用，下一批签名时重新读取 b1"""
+        self._b1 = None
+
+    def _b1_valid(self, a1: str) -> bool:
+        return self._b1 is not None and self._b1_a1 == a1 and time.monotonic() < self._b1_expire_at
+
+    async def sign(
+        self,
+        uri: str,
+        data: Optional[Union[Dict, str]] = None,
+        a1: str = "",
+    ) -> Dict[str, Any]:
+        """
+        生成完整的签名请求头，返回值与 sign_with_playwright 相同
+        """
+        sign_str = _build_sign_string(uri, data)
+        x3_value = await self._call_mnsv2(sign_str, _md5_hex(sign_str), a1)
+        data_type = "object" if isinstance(data, (dict, list)) else "string"
+        x_s = _build_xs_payload(x3_value, data_type)
+        x_t = str(int(time.time() * 1000))
+
+        return {
+            "x-s": x_s,
+            "x-t": x_t,
+            "x-s-common": _build_xs_common(a1, self._b1 or "", x_s, x_t),
+            "x-b3-traceid": get_trace_id(),
+        }
+
+    async def _call_mnsv2(self, sign_str: str, md5_str: str, a1: str) -> str:
+        if a1 != self._b1_a1:
+            self.invalidate_b1()
+            self._b1_a1 = a1
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((sign_str, md5_str, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._evaluate_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _evaluate_batch(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        need_b1 = not self._b1_valid(self._b1_a1)
+        try:
+            result = await self._evaluate(
+                _BATCH_SIGN_JS, [[[sign_str, md5_str] for sign_str, md5_str, _ in batch], need_b1]
+            )
+            if need_b1:
+                self._b1 = result.get("b1") or ""
+                self._b1_expire_at = time.monotonic() + self.b1_cache_ttl
+            x3_values = result.get("x3") or []
+        except Exception:
+            x3_values = []
+        for index, (_, _, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(x3_values[index] if index < len(x3_values) else "")
+
+    async def _evaluate(self, expression: str, arg: Any) -> Any:
+        if self.page_pool is None:
+            return await self.page.evaluate(expression, arg)
+        async with self.page_pool.lease() as page:
+            return await page.evaluate(expression, arg)
+
+
 async def pre_headers_with_playwright(
     page: Page,
     url: str,
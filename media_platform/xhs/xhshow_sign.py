@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/xhshow_sign.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 基于 xhshow 的纯 Python 小红书签名，不依赖浏览器页面
+# 签名是 CPU 密集型计算，XHS_SIGN_PROCESS_NUM > 0 时放到进程池中执行，吞吐随 CPU 核数扩展
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Union
+
+from xhshow import Xhshow
+
+import config
+
+_xhshow_client: Optional[Xhshow] = None
+
+
+def _get_xhshow_client() -> Xhshow:
+    global _xhshow_client
+    if _xhshow_client is None:
+        _xhshow_client = Xhshow()
+    return _xhshow_client
+
+
+def sign_with_xhshow(
+    uri: str,
+    cookie_dict: Dict[str, str],
+    params: Optional[Dict] = None,
+    payload: Optional[Dict] = None,
+) -> Dict[str, Any]:
+    """
+    通过 xhshow 生成完整的签名请求头
+
+    Args:
+        uri: API 路径
+        cookie_dict: cookie 字典（至少包含 a1）
+        params: GET 请求参数
+        payload: POST 请求参数
+
+    Returns:
+        包含 x-s, x-t, x-s-common, x-b3-traceid 的字典，与 sign_with_playwright 相同
+    """
+    client = _get_xhshow_client()
+    if payload is not None:
+        headers = client.sign_headers_post(uri, cookie_dict, payload=payload)
+    else:
+        headers = client.sign_headers_get(uri, cookie_dict, params=params)
+    return {
+        "x-s": headers["x-s"],
+        "x-t": str(headers["x-t"]),
+        "x-s-common": headers["x-s-common"],
+        "x-b3-traceid": headers["x-b3-traceid"],
+    }
+
+
+class XhshowSigner:
+    """
+    xhshow 签名器，进程池在所有客户端间共享
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def _get_executor(cls) -> Optional[ProcessPoolExecutor]:
+        if config.XHS_SIGN_PROCESS_NUM <= 0:
+            return None
+        if cls._executor is None:
+            cls._executor = ProcessPoolExecutor(max_workers=config.XHS_SIGN_PROCESS_NUM)
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    async def sign(
+        self,
+        uri: str,
+        cookie_dict: Dict[str, str],
+        data: Optional[Union[Dict, str]] = None,
+        is_post: bool = False,
+    ) -> Dict[str, Any]:
+        params, payload = (None, data) if is_post else (data, None)
+        executor = self._get_executor()
+        if executor is None:
+            return sign_with_xhshow(uri, cookie_dict, params, payload)
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, sign_with_xhshow, uri, dict(cookie_dict), params, payload
+        )
@@ -41,6 +41,7 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import zhihu as zhihu_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.rate_limiter import effective_sleep_sec
 from var import crawler_type_var, source_keyword_var
 
 from .client import ZhiHuClient
@@ -181,8 +182,8 @@ class ZhihuCrawler(AbstractCrawler):
                         break
 
                     # Sleep after page navigation
-                    await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                    utils.logger.info(f"[ZhihuCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                    await asyncio.sleep(effective_sleep_sec())
+                    utils.logger.info(f"[ZhihuCrawler.search] Sleeping for {effective_sleep_sec()} seconds after page {page-1}")
 
                     page += 1
                     for content in content_list:
@@ -235,12 +236,12 @@ class ZhihuCrawler(AbstractCrawler):
             )
 
             # Sleep before fetching comments
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-            utils.logger.info(f"[ZhihuCrawler.get_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds before fetching comments for content {content_item.content_id}")
+            await asyncio.sleep(effective_sleep_sec())
+            utils.logger.info(f"[ZhihuCrawler.get_comments] Sleeping for {effective_sleep_sec()} seconds before fetching comments for content {content_item.content_id}")
 
             await self.zhihu_client.get_note_all_comments(
                 content=content_item,
-                crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                crawl_interval=effective_sleep_sec(),
                 callback=zhihu_store.batch_update_zhihu_note_comments,
             )
 
@@ -278,21 +279,21 @@ class ZhihuCrawler(AbstractCrawler):
             # Get all anwser information of the creator
             all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
                 creator=createor_info,
-                crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                crawl_interval=effective_sleep_sec(),
                 callback=zhihu_store.batch_update_zhihu_contents,
             )
 
             # Get all articles of the creator's contents
             # all_content_list = await self.zhihu_client.get_all_articles_by_creator(
             #     creator=createor_info,
-            #     crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+            #     crawl_interval=effective_sleep_sec(),
             #     callback=zhihu_store.batch_update_zhihu_contents
             # )
 
             # Get all videos of the creator's contents
             # all_content_list = await self.zhihu_client.get_all_videos_by_creator(
             #     creator=createor_info,
-            #     crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+            #     crawl_interval=effective_sleep_sec(),
             #     callback=zhihu_store.batch_update_zhihu_contents
             # )
 
@@ -326,8 +327,8 @@ class ZhihuCrawler(AbstractCrawler):
                 result = await self.zhihu_client.get_answer_info(question_id, answer_id)
 
                 # Sleep after fetching answer details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching answer details {answer_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {effective_sleep_sec()} seconds after fetching answer details {answer_id}")
 
                 return result
 
@@ -339,8 +340,8 @@ class ZhihuCrawler(AbstractCrawler):
                 result = await self.zhihu_client.get_article_info(article_id)
 
                 # Sleep after fetching article details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching article details {article_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {effective_sleep_sec()} seconds after fetching article details {article_id}")
 
                 return result
 
@@ -352,8 +353,8 @@ class ZhihuCrawler(AbstractCrawler):
                 result = await self.zhihu_client.get_video_info(video_id)
 
                 # Sleep after fetching video details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video details {video_id}")
+                await asyncio.sleep(effective_sleep_sec())
+                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {effective_sleep_sec()} seconds after fetching video details {video_id}")
 
                 return result
 
@@ -485,6 +486,9 @@ class ZhihuCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        # 关闭 API client 复用的 httpx 连接池
+        if getattr(self, "zhihu_client", None):
+            await self.zhihu_client.close_http_client()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -24,13 +24,15 @@ from typing import Dict, List, Optional
 from urllib.parse import parse_qs, urlparse
 
 import execjs
-from parsel import Selector
 
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from tools import utils
 from tools.crawler_util import extract_text_from_html
+from tools.embedded_state import extract_script_text_by_id
+from tools.js_sign_service import JsSignPool
 
+ZHIHU_SIGN_JS_PATH = "libs/zhihu.js"
 ZHIHU_SGIN_JS = None
 
 
@@ -46,12 +48,27 @@ def sign(url: str, cookies: str) -> Dict:
     """
     global ZHIHU_SGIN_JS
     if not ZHIHU_SGIN_JS:
-        with open("libs/zhihu.js", mode="r", encoding="utf-8-sig") as f:
+        with open(ZHIHU_SIGN_JS_PATH, mode="r", encoding="utf-8-sig") as f:
             ZHIHU_SGIN_JS = execjs.compile(f.read())
 
     return ZHIHU_SGIN_JS.call("get_sign", url, cookies)
 
 
+async def sign_async(url: str, cookies: str) -> Dict:
+    """
+    zhihu sign algorithm, 优先使用常驻 node 进程池，没有 node 或关闭了进程池时使用 execjs
+    Args:
+        url: request url with query string
+        cookies: request cookies with d_c0 key
+
+    Returns:
+
+    """
+    if JsSignPool.available():
+        return await JsSignPool.get_instance(ZHIHU_SIGN_JS_PATH).call("get_sign", url, cookies)
+    return sign(url, cookies)
+
+
 class ZhihuExtractor:
     def __init__(self):
         pass
@@ -338,7 +355,7 @@ class ZhihuExtractor:
         if not html_content:
             return None
 
-        js_init_data = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="").strip()
+        js_init_data = (extract_script_text_by_id(html_content, "js-initialData") or "").strip()
         if not js_init_data:
             return None
 
@@ -396,7 +413,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
+        js_init_data: str = (extract_script_text_by_id(html_content, "js-initialData") or "").strip()
         if not js_init_data:
             return None
         json_data: Dict = json.loads(js_init_data)
@@ -415,7 +432,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
+        js_init_data: str = (extract_script_text_by_id(html_content, "js-initialData") or "").strip()
         if not js_init_data:
             return None
         json_data: Dict = json.loads(js_init_data)
@@ -434,7 +451,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
+        js_init_data: str = (extract_script_text_by_id(html_content, "js-initialData") or "").strip()
         if not js_init_data:
             return None
         json_data: Dict = json.loads(js_init_data)
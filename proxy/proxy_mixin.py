@@ -23,13 +23,22 @@
 # @Time    : 2025/11/25
 # @Desc    : 代理自动刷新 Mixin 类，供各平台 client 使用
 
-from typing import TYPE_CHECKING, Optional
+import asyncio
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import TYPE_CHECKING, List, Optional, Set
 
+import httpx
+
+import config
 from tools import utils
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
 
+# 宽限期过后检查旧连接池上请求是否结束的间隔（秒）
+_RETIRED_CLIENT_POLL_SEC = 1
+
 
 class ProxyRefreshMixin:
     """
@@ -39,12 +48,20 @@ class ProxyRefreshMixin:
     1. 让 client 类继承此 Mixin
     2. 在 client 的 __init__ 中调用 init_proxy_pool(proxy_ip_pool)
     3. 在每次 request 方法调用前调用 await _refresh_proxy_if_expired()
+    4. 通过 get_http_client() 获取长连接复用的 httpx.AsyncClient 发起请求
 
     要求：
     - client 类必须有 self.proxy 属性来存储当前代理URL
     """
 
     _proxy_ip_pool: Optional["ProxyIpPool"] = None
+    _http_client: Optional[httpx.AsyncClient] = None
+    _http_client_proxy: Optional[str] = None
+    _retired_http_clients: Optional[List[httpx.AsyncClient]] = None
+    _retire_tasks: Optional[Set[asyncio.Task]] = None
+
+    # 所有创建过连接池的 client，程序结束时统一关闭
+    _live_clients: "weakref.WeakSet[ProxyRefreshMixin]" = weakref.WeakSet()
 
     def init_proxy_pool(self, proxy_ip_pool: Optional["ProxyIpPool"]) -> None:
         """
@@ -75,3 +92,107 @@ class ProxyRefreshMixin:
             utils.logger.info(
                 f"[{self.__class__.__name__}._refresh_proxy_if_expired] New proxy: {new_proxy.ip}:{new_proxy.port}"
             )
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        """
+        获取当前代理对应的 httpx.AsyncClient（连接池 + keep-alive，可选 HTTP/2）
+        代理被刷新后会自动重建，旧连接池在 HTTPX_RETIRED_CLIENT_GRACE_SEC 秒后、其上的请求全部结束时关闭，避免打断正在进行的请求
+        Returns:
+            httpx.AsyncClient
+        """
+        if self._http_client is not None and self._http_client_proxy == self.proxy:
+            return self._http_client
+
+        if self._http_client is not None:
+            self._retire_http_client(self._http_client)
+        self._http_client = _create_http_client(self.proxy)
+        self._http_client_proxy = self.proxy
+        ProxyRefreshMixin._live_clients.add(self)
+        return self._http_client
+
+    def _retire_http_client(self, client: httpx.AsyncClient) -> None:
+        if self._retired_http_clients is None:
+            self._retired_http_clients = []
+        self._retired_http_clients.append(client)
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_retired_http_client(client))
+        except RuntimeError:
+            # 没有运行中的事件循环时留到 close_http_client() 再关闭
+            return
+        if self._retire_tasks is None:
+            self._retire_tasks = set()
+        self._retire_tasks.add(task)
+        task.add_done_callback(self._retire_tasks.discard)
+
+    async def _close_retired_http_client(self, client: httpx.AsyncClient) -> None:
+        """
+        等待宽限期和旧连接池上的请求结束后关闭它
+        """
+        await asyncio.sleep(config.HTTPX_RETIRED_CLIENT_GRACE_SEC)
+        while _has_active_connections(client):
+            await asyncio.sleep(_RETIRED_CLIENT_POLL_SEC)
+        if self._retired_http_clients and client in self._retired_http_clients:
+            self._retired_http_clients.remove(client)
+        try:
+            await client.aclose()
+        except Exception as e:
+            utils.logger.warning(f"[{self.__class__.__name__}._close_retired_http_client] close httpx client error: {e}")
+
+    async def close_http_client(self) -> None:
+        """
+        关闭连接池
+        """
+        clients = (self._retired_http_clients or []) + ([self._http_client] if self._http_client else [])
+        tasks = list(self._retire_tasks or [])
+        self._http_client = None
+        self._http_client_proxy = None
+        self._retired_http_clients = None
+        self._retire_tasks = None
+        for task in tasks:
+            task.cancel()
+        ProxyRefreshMixin._live_clients.discard(self)
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                utils.logger.warning(f"[{self.__class__.__name__}.close_http_client] close httpx client error: {e}")
+
+    @classmethod
+    async def close_all_http_clients(cls) -> None:
+        """
+        关闭所有 client 的连接池，在爬虫结束时调用
+        """
+        for client in list(cls._live_clients):
+            await client.close_http_client()
+
+
+def _has_active_connections(client: httpx.AsyncClient) -> bool:
+    """
+    连接池中是否还有正在进行的请求（读取 httpcore 连接池的连接状态）
+    """
+    for transport in [client._transport, *client._mounts.values()]:
+        pool = getattr(transport, "_pool", None)
+        for connection in getattr(pool, "connections", []):
+            if not connection.is_idle():
+                return True
+    return False
+
+
+def _create_http_client(proxy: Optional[str]) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=config.HTTPX_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTPX_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTPX_KEEPALIVE_EXPIRY,
+    )
+    http2 = config.HTTPX_ENABLE_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            utils.logger.warning("[ProxyRefreshMixin] HTTPX_ENABLE_HTTP2 requires the h2 package (pip install httpx[http2]), fallback to HTTP/1.1")
+            http2 = False
+    client = httpx.AsyncClient(proxy=proxy, limits=limits, http2=http2)
+    # 请求头里已经带了 Cookie，不让连接池在请求之间记住服务端下发的 Set-Cookie，
+    # 保持和每次请求新建 AsyncClient 时一样的行为
+    client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return client
@@ -3,8 +3,9 @@ import asyncio
 import argparse
 import os
 import glob
-from main import CrawlerFactory
+from main import CrawlerFactory, finish_crawler_run
 import config
+from tools.rate_limiter import apply_rate_limit_config
 from tools.ai_agent import VideoSummarizer
 
 async def main():
@@ -48,8 +49,10 @@ async def main():
     print(f"Configured crawler for {platform}.")
 
     try:
+        apply_rate_limit_config()
         crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
         await crawler.start()
+        await finish_crawler_run()
         print("Crawler finished successfully.")
         
         # --- AI Summarization Logic ---
@@ -36,6 +36,7 @@ class BiliStoreFactory:
         "csv": BiliCsvStoreImplement,
         "db": BiliDbStoreImplement,
         "json": BiliJsonStoreImplement,
+        "jsonl": BiliJsonlStoreImplement,
         "sqlite": BiliSqliteStoreImplement,
         "mongodb": BiliMongoStoreImplement,
         "excel": BiliExcelStoreImplement,
@@ -45,7 +46,7 @@ class BiliStoreFactory:
     def create_store() -> AbstractStore:
         store_class = BiliStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
+            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
         return store_class()
 
 
@@ -102,11 +103,20 @@ async def update_up_info(video_item: Dict):
 async def batch_update_bilibili_video_comments(video_id: str, comments: List[Dict], title: str = None):
     if not comments:
         return
-    for comment_item in comments:
-        await update_bilibili_video_comment(video_id, comment_item, title)
+    comment_items = [_build_bilibili_video_comment_item(video_id, comment_item, title) for comment_item in comments]
+    # 一次交给存储层，数据库存储会合并成一条批量 upsert
+    await BiliStoreFactory.create_store().store_comments([item for item in comment_items if item])
 
 
 async def update_bilibili_video_comment(video_id: str, comment_item: Dict, title: str = None):
+    save_comment_item = _build_bilibili_video_comment_item(video_id, comment_item, title)
+    await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+
+
+def _build_bilibili_video_comment_item(video_id: str, comment_item: Dict, title: str = None) -> Dict:
+    """
+    convert a raw comment to the storage item used by update_bilibili_video_comment
+    """
     comment_id = str(comment_item.get("rpid"))
     parent_comment_id = str(comment_item.get("parent", 0))
     content: Dict = comment_item.get("content")
@@ -130,7 +140,7 @@ async def update_bilibili_video_comment(video_id: str, comment_item: Dict, title
     if title:
         save_comment_item["title_for_filename"] = title
     utils.logger.info(f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}")
-    await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 
 async def store_video(aid, video_content, extension_file_name, title=None, bvid=None):
@@ -143,7 +153,7 @@ async def store_video(aid, video_content, extension_file_name, title=None, bvid=
         title:
         bvid:
     """
-    await BilibiliVideo().store_video({
+    return await BilibiliVideo().store_video({
         "aid": aid,
         "bvid": bvid,
         "video_content": video_content,
@@ -27,15 +27,14 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict
+from typing import Dict, List
 
 import aiofiles
-from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 
 import config
 from base.base_crawler import AbstractStore
-from database.db_session import get_session
+from database.db_batch_writer import DbBatchWriter
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
 from tools.async_file_writer import AsyncFileWriter
 from tools import utils, words
@@ -45,7 +44,7 @@ from database.mongodb_store_base import MongoDBStoreBase
 
 class BiliCsvStoreImplement(AbstractStore):
     def __init__(self):
-        self.file_writer = AsyncFileWriter(
+        self.file_writer = AsyncFileWriter.get_instance(
             crawler_type=crawler_type_var.get(),
             platform="bili"
         )
@@ -136,19 +135,10 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
-        video_id = content_item.get("video_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideo).where(BilibiliVideo.video_id == video_id))
-            video_detail = result.scalar_one_or_none()
-
-            if not video_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                new_content = BilibiliVideo(**content_item)
-                session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(video_detail, key, value)
-            await session.commit()
+        writer = DbBatchWriter()
+        update_columns = [key for key in content_item.keys() if key != "video_id"]
+        writer.add(BilibiliVideo, {**content_item, "add_ts": utils.get_current_timestamp()}, ["video_id"], update_columns)
+        await writer.flush()
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -156,20 +146,22 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_item.pop("title_for_filename", None) # Remove extra key
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideoComment).where(BilibiliVideoComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = BilibiliVideoComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        if not comment_item:
+            return
+        await self.store_comments([comment_item])
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Bilibili comment DB bulk storage implementation
+        Args:
+            comment_items: comment item dict list
+        """
+        writer = DbBatchWriter()
+        for comment_item in comment_items:
+            comment_item.pop("title_for_filename", None)
+            update_columns = [key for key in comment_item.keys() if key != "comment_id"]
+            writer.add(BilibiliVideoComment, {**comment_item, "add_ts": utils.get_current_timestamp()}, ["comment_id"], update_columns)
+        await writer.flush()
 
     async def store_creator(self, creator: Dict):
         """
@@ -177,19 +169,10 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             creator: creator item dict
         """
-        creator_id = creator.get("user_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpInfo).where(BilibiliUpInfo.user_id == creator_id))
-            creator_detail = result.scalar_one_or_none()
-
-            if not creator_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = BilibiliUpInfo(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(creator_detail, key, value)
-            await session.commit()
+        writer = DbBatchWriter()
+        update_columns = [key for key in creator.keys() if key != "user_id"]
+        writer.add(BilibiliUpInfo, {**creator, "add_ts": utils.get_current_timestamp()}, ["user_id"], update_columns)
+        await writer.flush()
 
     async def store_contact(self, contact_item: Dict):
         """
@@ -197,22 +180,10 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             contact_item: contact item dict
         """
-        up_id = contact_item.get("up_id")
-        fan_id = contact_item.get("fan_id")
-        async with get_session() as session:
-            result = await session.execute(
-                select(BilibiliContactInfo).where(BilibiliContactInfo.up_id == up_id, BilibiliContactInfo.fan_id == fan_id)
-            )
-            contact_detail = result.scalar_one_or_none()
-
-            if not contact_detail:
-                contact_item["add_ts"] = utils.get_current_timestamp()
-                new_contact = BilibiliContactInfo(**contact_item)
-                session.add(new_contact)
-            else:
-                for key, value in contact_item.items():
-                    setattr(contact_detail, key, value)
-            await session.commit()
+        writer = DbBatchWriter()
+        update_columns = [key for key in contact_item.keys() if key not in ("up_id", "fan_id")]
+        writer.add(BilibiliContactInfo, {**contact_item, "add_ts": utils.get_current_timestamp()}, ["up_id", "fan_id"], update_columns)
+        await writer.flush()
 
     async def store_dynamic(self, dynamic_item):
         """
@@ -220,24 +191,14 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             dynamic_item: dynamic item dict
         """
-        dynamic_id = dynamic_item.get("dynamic_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpDynamic).where(BilibiliUpDynamic.dynamic_id == dynamic_id))
-            dynamic_detail = result.scalar_one_or_none()
-
-            if not dynamic_detail:
-                dynamic_item["add_ts"] = utils.get_current_timestamp()
-                new_dynamic = BilibiliUpDynamic(**dynamic_item)
-                session.add(new_dynamic)
-            else:
-                for key, value in dynamic_item.items():
-                    setattr(dynamic_detail, key, value)
-            await session.commit()
-
+        writer = DbBatchWriter()
+        update_columns = [key for key in dynamic_item.keys() if key != "dynamic_id"]
+        writer.add(BilibiliUpDynamic, {**dynamic_item, "add_ts": utils.get_current_timestamp()}, ["dynamic_id"], update_columns)
+        await writer.flush()
 
 class BiliJsonStoreImplement(AbstractStore):
     def __init__(self):
-        self.file_writer = AsyncFileWriter(
+        self.file_writer = AsyncFileWriter.get_instance(
             crawler_type=crawler_type_var.get(),
             platform="bili"
         )
@@ -321,6 +282,91 @@ class BiliJsonStoreImplement(AbstractStore):
         )
 
 
+class BiliJsonlStoreImplement(AbstractStore):
+    def __init__(self):
+        self.file_writer = AsyncFileWriter.get_instance(
+            crawler_type=crawler_type_var.get(),
+            platform="bili"
+        )
+
+    async def store_content(self, content_item: Dict):
+        """
+        content JSONL storage implementation
+        Args:
+            content_item:
+
+        Returns:
+
+        """
+        await self.file_writer.write_single_item_to_jsonl(
+            item=content_item,
+            item_type="contents"
+        )
+
+    async def store_comment(self, comment_item: Dict):
+        """
+        comment JSONL storage implementation
+        Args:
+            comment_item:
+
+        Returns:
+
+        """
+        title = comment_item.pop("title_for_filename", None)
+        filename = None
+        if title:
+             sanitized_title = utils.sanitize_filename(title)
+             if len(sanitized_title) > 50: sanitized_title = sanitized_title[:50]
+             filename = f"{sanitized_title}_comments"
+
+        await self.file_writer.write_single_item_to_jsonl(
+            item=comment_item,
+            item_type="comments",
+            filename=filename
+        )
+
+    async def store_creator(self, creator: Dict):
+        """
+        creator JSONL storage implementation
+        Args:
+            creator:
+
+        Returns:
+
+        """
+        await self.file_writer.write_single_item_to_jsonl(
+            item=creator,
+            item_type="creators"
+        )
+
+    async def store_contact(self, contact_item: Dict):
+        """
+        creator contact JSONL storage implementation
+        Args:
+            contact_item: creator's contact item dict
+
+        Returns:
+
+        """
+        await self.file_writer.write_single_item_to_jsonl(
+            item=contact_item,
+            item_type="contacts"
+        )
+
+    async def store_dynamic(self, dynamic_item: Dict):
+        """
+        creator dynamic JSONL storage implementation
+        Args:
+            dynamic_item: creator's contact item dict
+
+        Returns:
+
+        """
+        await self.file_writer.write_single_item_to_jsonl(
+            item=dynamic_item,
+            item_type="dynamics"
+        )
+
 
 class BiliSqliteStoreImplement(BiliDbStoreImplement):
     pass
@@ -22,12 +22,11 @@
 # @Time    : 2024/7/12 20:01
 # @Desc    : bilibili 媒体保存
 import pathlib
-from typing import Dict
-
-import aiofiles
+from typing import Dict, Union
 
 from base.base_crawler import AbstractStoreImage, AbstractStoreVideo
 from tools import utils
+from tools.media_downloader import MediaSource, save_media
 
 
 class BilibiliVideo(AbstractStoreVideo):
@@ -46,7 +45,7 @@ class BilibiliVideo(AbstractStoreVideo):
         # Prefer using bvid if available, otherwise fallback to aid
         folder_name = video_content_item.get("bvid") or video_content_item.get("aid")
         
-        await self.save_video(
+        return await self.save_video(
             folder_name, 
             video_content_item.get("video_content"), 
             video_content_item.get("extension_file_name"),
@@ -73,7 +72,7 @@ class BilibiliVideo(AbstractStoreVideo):
             return f"{self.video_store_path}/{folder_name}/{sanitized_title}_{extension_file_name}"
         return f"{self.video_store_path}/{folder_name}/{extension_file_name}"
 
-    async def save_video(self, folder_name: str, video_content: str, extension_file_name="mp4", title: str = None):
+    async def save_video(self, folder_name: str, video_content: Union[bytes, MediaSource], extension_file_name="mp4", title: str = None):
         """
         save video to local
 
@@ -88,6 +87,7 @@ class BilibiliVideo(AbstractStoreVideo):
         """
         pathlib.Path(self.video_store_path + "/" + str(folder_name)).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(str(folder_name), extension_file_name, title)
-        async with aiofiles.open(save_file_name, 'wb') as f:
-            await f.write(video_content)
-            utils.logger.info(f"[BilibiliVideoImplement.save_video] save save_video {save_file_name} success ...")
+        if not await save_media(video_content, save_file_name):
+            return False
+        utils.logger.info(f"[BilibiliVideoImplement.save_video] save save_video {save_file_name} success ...")
+        return True
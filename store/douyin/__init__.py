@@ -21,7 +21,7 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 18:46
 # @Desc    :
-from typing import List
+from typing import List, Optional
 
 import config
 from var import source_keyword_var
@@ -35,6 +35,7 @@ class DouyinStoreFactory:
         "csv": DouyinCsvStoreImplement,
         "db": DouyinDbStoreImplement,
         "json": DouyinJsonStoreImplement,
+        "jsonl": DouyinJsonlStoreImplement,
         "sqlite": DouyinSqliteStoreImplement,
         "mongodb": DouyinMongoStoreImplement,
         "excel": DouyinExcelStoreImplement,
@@ -44,7 +45,7 @@ class DouyinStoreFactory:
     def create_store() -> AbstractStore:
         store_class = DouyinStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[DouyinStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
+            raise ValueError("[DouyinStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
         return store_class()
 
 
@@ -189,15 +190,26 @@ async def update_douyin_aweme(aweme_item: Dict):
 async def batch_update_dy_aweme_comments(aweme_id: str, comments: List[Dict]):
     if not comments:
         return
-    for comment_item in comments:
-        await update_dy_aweme_comment(aweme_id, comment_item)
+    comment_items = [_build_dy_aweme_comment_item(aweme_id, comment_item) for comment_item in comments]
+    # 一次交给存储层，数据库存储会合并成一条批量 upsert
+    await DouyinStoreFactory.create_store().store_comments([item for item in comment_items if item])
 
 
 async def update_dy_aweme_comment(aweme_id: str, comment_item: Dict):
+    save_comment_item = _build_dy_aweme_comment_item(aweme_id, comment_item)
+    if not save_comment_item:
+        return
+    await DouyinStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+
+
+def _build_dy_aweme_comment_item(aweme_id: str, comment_item: Dict) -> Optional[Dict]:
+    """
+    convert a raw comment to the storage item used by update_dy_aweme_comment
+    """
     comment_aweme_id = comment_item.get("aweme_id")
     if aweme_id != comment_aweme_id:
         utils.logger.error(f"[store.douyin.update_dy_aweme_comment] comment_aweme_id: {comment_aweme_id} != aweme_id: {aweme_id}")
-        return
+        return None
     user_info = comment_item.get("user", {})
     comment_id = comment_item.get("cid")
     parent_comment_id = comment_item.get("reply_id", "0")
@@ -222,8 +234,7 @@ async def update_dy_aweme_comment(aweme_id: str, comment_item: Dict):
         "pictures": ",".join(_extract_comment_image_list(comment_item)),
     }
     utils.logger.info(f"[store.douyin.update_dy_aweme_comment] douyin aweme comment: {comment_id}, content: {save_comment_item.get('content')}")
-
-    await DouyinStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -259,7 +270,7 @@ async def update_dy_aweme_image(aweme_id, pic_content, extension_file_name):
 
     """
 
-    await DouYinImage().store_image({"aweme_id": aweme_id, "pic_content": pic_content, "extension_file_name": extension_file_name})
+    return await DouYinImage().store_image({"aweme_id": aweme_id, "pic_content": pic_content, "extension_file_name": extension_file_name})
 
 
 async def update_dy_aweme_video(aweme_id, video_content, extension_file_name):
@@ -274,4 +285,4 @@ async def update_dy_aweme_video(aweme_id, video_content, extension_file_name):
 
     """
 
-    await DouYinVideo().store_video({"aweme_id": aweme_id, "video_content": video_content, "extension_file_name": extension_file_name})
+    return await DouYinVideo().store_video({"aweme_id": aweme_id, "video_content": video_content, "extension_file_name": extension_file_name})
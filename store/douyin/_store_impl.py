@@ -26,12 +26,13 @@ import asyncio
 import json
 import os
 import pathlib
-from typing import Dict
+from typing import Dict, List
 
-from sqlalchemy import select
+from sqlalchemy import update
 
 import config
 from base.base_crawler import AbstractStore
+from database.db_batch_writer import DbBatchWriter
 from database.db_session import get_session
 from database.models import DouyinAweme, DouyinAwemeComment, DyCreator
 from tools import utils, words
@@ -42,7 +43,7 @@ from database.mongodb_store_base import MongoDBStoreBase
 
 class DouyinCsvStoreImplement(AbstractStore):
     def __init__(self):
-        self.file_writer = AsyncFileWriter(
+        self.file_writer = AsyncFileWriter.get_instance(
             crawler_type=crawler_type_var.get(),
             platform="douyin"
         )
@@ -98,19 +99,15 @@ class DouyinDbStoreImplement(AbstractStore):
             content_item: content item dict
         """
         aweme_id = content_item.get("aweme_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id))
-            aweme_detail = result.scalar_one_or_none()
-
-            if not aweme_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                if content_item.get("title"):
-                    new_content = DouyinAweme(**content_item)
-                    session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(aweme_detail, key, value)
-            await session.commit()
+        if not content_item.get("title"):
+            # 没有标题的作品不新增，只刷新已有的记录
+            async with get_session() as session:
+                await session.execute(update(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id).values(**content_item))
+            return
+        writer = DbBatchWriter()
+        update_columns = [key for key in content_item.keys() if key != "aweme_id"]
+        writer.add(DouyinAweme, {**content_item, "add_ts": utils.get_current_timestamp()}, ["aweme_id"], update_columns)
+        await writer.flush()
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -118,19 +115,21 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAwemeComment).where(DouyinAwemeComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = DouyinAwemeComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        if not comment_item:
+            return
+        await self.store_comments([comment_item])
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Douyin comment DB bulk storage implementation
+        Args:
+            comment_items: comment item dict list
+        """
+        writer = DbBatchWriter()
+        for comment_item in comment_items:
+            update_columns = [key for key in comment_item.keys() if key != "comment_id"]
+            writer.add(DouyinAwemeComment, {**comment_item, "add_ts": utils.get_current_timestamp()}, ["comment_id"], update_columns)
+        await writer.flush()
 
     async def store_creator(self, creator: Dict):
         """
@@ -138,24 +137,14 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             creator: creator dict
         """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            result = await session.execute(select(DyCreator).where(DyCreator.user_id == user_id))
-            user_detail = result.scalar_one_or_none()
-
-            if not user_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = DyCreator(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(user_detail, key, value)
-            await session.commit()
-
+        writer = DbBatchWriter()
+        update_columns = [key for key in creator.keys() if key != "user_id"]
+        writer.add(DyCreator, {**creator, "add_ts": utils.get_current_timestamp()}, ["user_id"], update_columns)
+        await writer.flush()
 
 class DouyinJsonStoreImplement(AbstractStore):
     def __init__(self):
-        self.file_writer = AsyncFileWriter(
+        self.file_writer = AsyncFileWriter.get_instance(
             crawler_type=crawler_type_var.get(),
             platform="douyin"
         )
@@ -203,6 +192,55 @@ class DouyinJsonStoreImplement(AbstractStore):
         )
 
 
+class DouyinJsonlStoreImplement(AbstractStore):
+    def __init__(self):
+        self.file_writer = AsyncFileWriter.get_instance(
+            crawler_type=crawler_type_var.get(),
+            platform="douyin"
+        )
+
+    async def store_content(self, content_item: Dict):
+        """
+        content JSONL storage implementation
+        Args:
+            content_item:
+
+        Returns:
+
+        """
+        await self.file_writer.write_single_item_to_jsonl(
+            item=content_item,
+            item_type="contents"
+        )
+
+    async def store_comment(self, comment_item: Dict):
+        """
+        comment JSONL storage implementation
+        Args:
+            comment_item:
+
+        Returns:
+
+        """
+        await self.file_writer.write_single_item_to_jsonl(
+            item=comment_item,
+            item_type="comments"
+        )
+
+    async def store_creator(self, creator: Dict):
+        """
+        creator JSONL storage implementation
+        Args:
+            creator:
+
+        Returns:
+
+        """
+        await self.file_writer.write_single_item_to_jsonl(
+            item=creator,
+            item_type="creators"
+        )
+
 
 class DouyinSqliteStoreImplement(DouyinDbStoreImplement):
     pass
@@ -18,12 +18,11 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 import pathlib
-from typing import Dict
-
-import aiofiles
+from typing import Dict, Union
 
 from base.base_crawler import AbstractStoreImage, AbstractStoreVideo
 from tools import utils
+from tools.media_downloader import MediaSource, save_media
 
 
 class DouYinImage(AbstractStoreImage):
@@ -39,7 +38,7 @@ class DouYinImage(AbstractStoreImage):
         Returns:
 
         """
-        await self.save_image(image_content_item.get("aweme_id"), image_content_item.get("pic_content"), image_content_item.get("extension_file_name"))
+        return await self.save_image(image_content_item.get("aweme_id"), image_content_item.get("pic_content"), image_content_item.get("extension_file_name"))
 
     def make_save_file_name(self, aweme_id: str, extension_file_name: str) -> str:
         """
@@ -54,7 +53,7 @@ class DouYinImage(AbstractStoreImage):
         """
         return f"{self.image_store_path}/{aweme_id}/{extension_file_name}"
 
-    async def save_image(self, aweme_id: str, pic_content: str, extension_file_name):
+    async def save_image(self, aweme_id: str, pic_content: Union[bytes, MediaSource], extension_file_name):
         """
         save image to local
 
@@ -68,9 +67,10 @@ class DouYinImage(AbstractStoreImage):
         """
         pathlib.Path(self.image_store_path + "/" + aweme_id).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(aweme_id, extension_file_name)
-        async with aiofiles.open(save_file_name, 'wb') as f:
-            await f.write(pic_content)
-            utils.logger.info(f"[DouYinImageStoreImplement.save_image] save image {save_file_name} success ...")
+        if not await save_media(pic_content, save_file_name):
+            return False
+        utils.logger.info(f"[DouYinImageStoreImplement.save_image] save image {save_file_name} success ...")
+        return True
 
 
 class DouYinVideo(AbstractStoreVideo):
@@ -86,7 +86,7 @@ class DouYinVideo(AbstractStoreVideo):
         Returns:
 
         """
-        await self.save_video(video_content_item.get("aweme_id"), video_content_item.get("video_content"), video_content_item.get("extension_file_name"))
+        return await self.save_video(video_content_item.get("aweme_id"), video_content_item.get("video_content"), video_content_item.get("extension_file_name"))
 
     def make_save_file_name(self, aweme_id: str, extension_file_name: str) -> str:
         """
@@ -101,7 +101,7 @@ class DouYinVideo(AbstractStoreVideo):
         """
         return f"{self.video_store_path}/{aweme_id}/{extension_file_name}"
 
-    async def save_video(self, aweme_id: str, video_content: str, extension_file_name):
+    async def save_video(self, aweme_id: str, video_content: Union[bytes, MediaSource], extension_file_name):
         """
         save video to local
 
@@ -115,6 +115,7 @@ class DouYinVideo(AbstractStoreVideo):
         """
         pathlib.Path(self.video_store_path + "/" + aweme_id).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(aweme_id, extension_file_name)
-        async with aiofiles.open(save_file_name, 'wb') as f:
-            await f.write(video_content)
-            utils.logger.info(f"[DouYinVideoStoreImplement.save_video] save video {save_file_name} success ...")
+        if not await save_media(video_content, save_file_name):
+            return False
+        utils.logger.info(f"[DouYinVideoStoreImplement.save_video] save video {save_file_name} success ...")
+        return True
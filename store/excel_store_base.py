@@ -33,20 +33,57 @@ Provides Excel export functionality for crawled data with formatted sheets
 
 import threading
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from pathlib import Path
 
 try:
     import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
     from openpyxl.utils import get_column_letter
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
 
+import config
 from base.base_crawler import AbstractStore
 from tools import utils
 
+if EXCEL_AVAILABLE:
+    # Style objects are immutable in openpyxl, build them once and share them across cells
+    _THIN_SIDE = Side(style='thin')
+    _BORDER = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+    _HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    _HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+    _HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    _BODY_ALIGNMENT = Alignment(vertical="top", wrap_text=True)
+
+HEADER_STYLE_NAME = "mc_header"
+BODY_STYLE_NAME = "mc_body"
+
+
+class _StreamingSheet:
+    """
+    State of one sheet in write-only mode
+    Rows are held back only until the column widths are sampled, afterwards they go straight to disk
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self.headers: Optional[List[str]] = None
+        self.worksheet = None
+        self.pending_rows: List[List[Any]] = []
+        self.widths: List[int] = []
+        self.row_count = 0
+
+    def track_widths(self, values: List[Any]):
+        for index, value in enumerate(values):
+            length = len(str(value)) if value not in (None, "") else 0
+            if index >= len(self.widths):
+                self.widths.append(length)
+            elif length > self.widths[index]:
+                self.widths[index] = length
+
 
 class ExcelStoreBase(AbstractStore):
     """
@@ -92,13 +129,15 @@ class ExcelStoreBase(AbstractStore):
                     utils.logger.error(f"[ExcelStoreBase] Error flushing {key}: {e}")
             cls._instances.clear()
 
-    def __init__(self, platform: str, crawler_type: str = "search"):
+    def __init__(self, platform: str, crawler_type: str = "search", write_only: Optional[bool] = None):
         """
         Initialize Excel store
 
         Args:
             platform: Platform name (xhs, dy, ks, etc.)
             crawler_type: Type of crawler (search, detail, creator)
+            write_only: Stream rows to disk with openpyxl write-only worksheets,
+                defaults to config.EXCEL_WRITE_ONLY
         """
         if not EXCEL_AVAILABLE:
             raise ImportError(
@@ -114,14 +153,26 @@ class ExcelStoreBase(AbstractStore):
         self.data_dir = Path("data") / platform
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
-        # Initialize workbook
-        self.workbook = openpyxl.Workbook()
-        self.workbook.remove(self.workbook.active)  # Remove default sheet
+        self.write_only = config.EXCEL_WRITE_ONLY if write_only is None else write_only
+        self._streaming_sheets: Dict[str, _StreamingSheet] = {}
+        self._saved = False
 
-        # Create sheets
-        self.contents_sheet = self.workbook.create_sheet("Contents")
-        self.comments_sheet = self.workbook.create_sheet("Comments")
-        self.creators_sheet = self.workbook.create_sheet("Creators")
+        # Initialize workbook
+        if self.write_only:
+            # Write-only sheets can only append rows, they are created when their first row arrives
+            self.workbook = openpyxl.Workbook(write_only=True)
+            self._register_named_styles()
+            self.contents_sheet = None
+            self.comments_sheet = None
+            self.creators_sheet = None
+        else:
+            self.workbook = openpyxl.Workbook()
+            self.workbook.remove(self.workbook.active)  # Remove default sheet
+
+            # Create sheets
+            self.contents_sheet = self.workbook.create_sheet("Contents")
+            self.comments_sheet = self.workbook.create_sheet("Comments")
+            self.creators_sheet = self.workbook.create_sheet("Creators")
 
         # Track if headers are written
         self.contents_headers_written = False
@@ -148,21 +199,11 @@ class ExcelStoreBase(AbstractStore):
             sheet: Worksheet object
             row_num: Row number for headers (default: 1)
         """
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
         for cell in sheet[row_num]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = border
+            cell.fill = _HEADER_FILL
+            cell.font = _HEADER_FONT
+            cell.alignment = _HEADER_ALIGNMENT
+            cell.border = _BORDER
 
     def _auto_adjust_column_width(self, sheet):
         """
@@ -182,9 +223,25 @@ class ExcelStoreBase(AbstractStore):
                 except (TypeError, AttributeError):
                     pass
 
-            # Set width with min/max constraints
-            adjusted_width = min(max(max_length + 2, 10), 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
+            sheet.column_dimensions[column_letter].width = self._column_width(max_length)
+
+    @staticmethod
+    def _column_width(max_length: int) -> int:
+        """
+        Column width with min/max constraints
+        """
+        return min(max(max_length + 2, 10), 50)
+
+    @staticmethod
+    def _cell_value(value: Any) -> Any:
+        """
+        Convert a field value to something openpyxl can write
+        """
+        if isinstance(value, (list, dict)):
+            return str(value)
+        if value is None:
+            return ""
+        return value
 
     def _write_headers(self, sheet, headers: List[str]):
         """
@@ -211,24 +268,76 @@ class ExcelStoreBase(AbstractStore):
         row_num = sheet.max_row + 1
 
         for col_num, header in enumerate(headers, 1):
-            value = data.get(header, "")
-
-            # Handle different data types
-            if isinstance(value, (list, dict)):
-                value = str(value)
-            elif value is None:
-                value = ""
-
+            value = self._cell_value(data.get(header, ""))
             cell = sheet.cell(row=row_num, column=col_num, value=value)
 
             # Apply basic formatting
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+            cell.alignment = _BODY_ALIGNMENT
+            cell.border = _BORDER
+
+    def _register_named_styles(self):
+        """
+        Register the header/body styles once so write-only cells only reference them by name
+        """
+        self.workbook.add_named_style(NamedStyle(
+            name=HEADER_STYLE_NAME, font=_HEADER_FONT, fill=_HEADER_FILL,
+            alignment=_HEADER_ALIGNMENT, border=_BORDER,
+        ))
+        self.workbook.add_named_style(NamedStyle(
+            name=BODY_STYLE_NAME, alignment=_BODY_ALIGNMENT, border=_BORDER,
+        ))
+
+    def _styled_row(self, worksheet, values: List[Any], style_name: str) -> List[Any]:
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.style = style_name
+            cells.append(cell)
+        return cells
+
+    def _stream_row(self, title: str, data: Dict[str, Any]) -> _StreamingSheet:
+        """
+        Append a row in write-only mode
+
+        The first EXCEL_COLUMN_WIDTH_SAMPLE_ROWS rows are kept in memory to measure column widths,
+        because a write-only sheet writes its column definitions before the first row.
+        Every later row is written to openpyxl's temporary sheet file right away.
+
+        Args:
+            title: Sheet title
+            data: Data dictionary
+        """
+        sheet = self._streaming_sheets.get(title)
+        if sheet is None:
+            sheet = _StreamingSheet(title)
+            sheet.headers = list(data.keys())
+            sheet.track_widths(sheet.headers)
+            self._streaming_sheets[title] = sheet
+
+        values = [self._cell_value(data.get(header, "")) for header in sheet.headers]
+        sheet.row_count += 1
+        if sheet.worksheet is not None:
+            sheet.worksheet.append(self._styled_row(sheet.worksheet, values, BODY_STYLE_NAME))
+            return sheet
+
+        sheet.track_widths(values)
+        sheet.pending_rows.append(values)
+        if len(sheet.pending_rows) >= config.EXCEL_COLUMN_WIDTH_SAMPLE_ROWS:
+            self._open_streaming_sheet(sheet)
+        return sheet
+
+    def _open_streaming_sheet(self, sheet: _StreamingSheet):
+        """
+        Create the write-only worksheet with the sampled column widths and write the held back rows
+        """
+        worksheet = self.workbook.create_sheet(sheet.title)
+        for index, width in enumerate(sheet.widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = self._column_width(width)
+        worksheet.append(self._styled_row(worksheet, sheet.headers, HEADER_STYLE_NAME))
+        for values in sheet.pending_rows:
+            worksheet.append(self._styled_row(worksheet, values, BODY_STYLE_NAME))
+        sheet.pending_rows = []
+        sheet.worksheet = worksheet
 
     async def store_content(self, content_item: Dict):
         """
@@ -237,16 +346,19 @@ class ExcelStoreBase(AbstractStore):
         Args:
             content_item: Content data dictionary
         """
-        # Define headers (customize based on platform)
-        headers = list(content_item.keys())
+        if self.write_only:
+            self._stream_row("Contents", content_item)
+        else:
+            # Define headers (customize based on platform)
+            headers = list(content_item.keys())
 
-        # Write headers if first time
-        if not self.contents_headers_written:
-            self._write_headers(self.contents_sheet, headers)
-            self.contents_headers_written = True
+            # Write headers if first time
+            if not self.contents_headers_written:
+                self._write_headers(self.contents_sheet, headers)
+                self.contents_headers_written = True
 
-        # Write data row
-        self._write_row(self.contents_sheet, content_item, headers)
+            # Write data row
+            self._write_row(self.contents_sheet, content_item, headers)
 
         # Get ID from various possible field names
         content_id = content_item.get('note_id') or content_item.get('aweme_id') or content_item.get('video_id') or content_item.get('content_id') or 'N/A'
@@ -259,16 +371,19 @@ class ExcelStoreBase(AbstractStore):
         Args:
             comment_item: Comment data dictionary
         """
-        # Define headers
-        headers = list(comment_item.keys())
+        if self.write_only:
+            self._stream_row("Comments", comment_item)
+        else:
+            # Define headers
+            headers = list(comment_item.keys())
 
-        # Write headers if first time
-        if not self.comments_headers_written:
-            self._write_headers(self.comments_sheet, headers)
-            self.comments_headers_written = True
+            # Write headers if first time
+            if not self.comments_headers_written:
+                self._write_headers(self.comments_sheet, headers)
+                self.comments_headers_written = True
 
-        # Write data row
-        self._write_row(self.comments_sheet, comment_item, headers)
+            # Write data row
+            self._write_row(self.comments_sheet, comment_item, headers)
 
         utils.logger.info(f"[ExcelStoreBase] Stored comment to Excel: {comment_item.get('comment_id', 'N/A')}")
 
@@ -279,16 +394,19 @@ class ExcelStoreBase(AbstractStore):
         Args:
             creator: Creator data dictionary
         """
-        # Define headers
-        headers = list(creator.keys())
+        if self.write_only:
+            self._stream_row("Creators", creator)
+        else:
+            # Define headers
+            headers = list(creator.keys())
 
-        # Write headers if first time
-        if not self.creators_headers_written:
-            self._write_headers(self.creators_sheet, headers)
-            self.creators_headers_written = True
+            # Write headers if first time
+            if not self.creators_headers_written:
+                self._write_headers(self.creators_sheet, headers)
+                self.creators_headers_written = True
 
-        # Write data row
-        self._write_row(self.creators_sheet, creator, headers)
+            # Write data row
+            self._write_row(self.creators_sheet, creator, headers)
 
         utils.logger.info(f"[ExcelStoreBase] Stored creator to Excel: {creator.get('user_id', 'N/A')}")
 
@@ -299,20 +417,23 @@ class ExcelStoreBase(AbstractStore):
         Args:
             contact_item: Contact data dictionary
         """
-        # Create contacts sheet if not exists
-        if self.contacts_sheet is None:
-            self.contacts_sheet = self.workbook.create_sheet("Contacts")
+        if self.write_only:
+            self._stream_row("Contacts", contact_item)
+        else:
+            # Create contacts sheet if not exists
+            if self.contacts_sheet is None:
+                self.contacts_sheet = self.workbook.create_sheet("Contacts")
 
-        # Define headers
-        headers = list(contact_item.keys())
+            # Define headers
+            headers = list(contact_item.keys())
 
-        # Write headers if first time
-        if not self.contacts_headers_written:
-            self._write_headers(self.contacts_sheet, headers)
-            self.contacts_headers_written = True
+            # Write headers if first time
+            if not self.contacts_headers_written:
+                self._write_headers(self.contacts_sheet, headers)
+                self.contacts_headers_written = True
 
-        # Write data row
-        self._write_row(self.contacts_sheet, contact_item, headers)
+            # Write data row
+            self._write_row(self.contacts_sheet, contact_item, headers)
 
         utils.logger.info(f"[ExcelStoreBase] Stored contact to Excel: up_id={contact_item.get('up_id', 'N/A')}, fan_id={contact_item.get('fan_id', 'N/A')}")
 
@@ -323,20 +444,23 @@ class ExcelStoreBase(AbstractStore):
         Args:
             dynamic_item: Dynamic data dictionary
         """
-        # Create dynamics sheet if not exists
-        if self.dynamics_sheet is None:
-            self.dynamics_sheet = self.workbook.create_sheet("Dynamics")
+        if self.write_only:
+            self._stream_row("Dynamics", dynamic_item)
+        else:
+            # Create dynamics sheet if not exists
+            if self.dynamics_sheet is None:
+                self.dynamics_sheet = self.workbook.create_sheet("Dynamics")
 
-        # Define headers
-        headers = list(dynamic_item.keys())
+            # Define headers
+            headers = list(dynamic_item.keys())
 
-        # Write headers if first time
-        if not self.dynamics_headers_written:
-            self._write_headers(self.dynamics_sheet, headers)
-            self.dynamics_headers_written = True
+            # Write headers if first time
+            if not self.dynamics_headers_written:
+                self._write_headers(self.dynamics_sheet, headers)
+                self.dynamics_headers_written = True
 
-        # Write data row
-        self._write_row(self.dynamics_sheet, dynamic_item, headers)
+            # Write data row
+            self._write_row(self.dynamics_sheet, dynamic_item, headers)
 
         utils.logger.info(f"[ExcelStoreBase] Stored dynamic to Excel: {dynamic_item.get('dynamic_id', 'N/A')}")
 
@@ -344,6 +468,10 @@ class ExcelStoreBase(AbstractStore):
         """
         Save workbook to file
         """
+        if self.write_only:
+            self._flush_write_only()
+            return
+
         try:
             # Auto-adjust column widths for all sheets
             self._auto_adjust_column_width(self.contents_sheet)
@@ -378,3 +506,29 @@ class ExcelStoreBase(AbstractStore):
         except Exception as e:
             utils.logger.error(f"[ExcelStoreBase] Error saving Excel file: {e}")
             raise
+
+    def _flush_write_only(self):
+        """
+        Save a write-only workbook, rows are already on disk so this only zips the sheet files
+        A write-only workbook can be saved once
+        """
+        if self._saved:
+            utils.logger.warning(f"[ExcelStoreBase] Write-only workbook already saved: {self.filename}")
+            return
+        try:
+            # Sheets with fewer rows than the width sample size are still held in memory
+            for sheet in self._streaming_sheets.values():
+                if sheet.worksheet is None:
+                    self._open_streaming_sheet(sheet)
+
+            if not self._streaming_sheets:
+                utils.logger.info(f"[ExcelStoreBase] No data to save, skipping file creation: {self.filename}")
+                return
+
+            self.workbook.save(self.filename)
+            self._saved = True
+            utils.logger.info(f"[ExcelStoreBase] Excel file saved successfully: {self.filename}")
+
+        except Exception as e:
+            utils.logger.error(f"[ExcelStoreBase] Error saving Excel file: {e}")
+            raise
@@ -32,6 +32,7 @@ class TieBaStoreFactory:
         "csv": TieBaCsvStoreImplement,
         "db": TieBaDbStoreImplement,
         "json": TieBaJsonStoreImplement,
+        "jsonl": TieBaJsonlStoreImplement,
         "sqlite": TieBaSqliteStoreImplement,
         "mongodb": TieBaMongoStoreImplement,
         "excel": TieBaExcelStoreImplement,
@@ -42,7 +43,7 @@ class TieBaStoreFactory:
         store_class = TieBaStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
+                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
         return store_class()
 
 
@@ -90,8 +91,9 @@ async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaCom
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_tieba_note_comment(note_id, comment_item)
+    comment_items = [_build_tieba_note_comment_item(note_id, comment_item) for comment_item in comments]
+    # 一次交给存储层，数据库存储会合并成一条批量 upsert
+    await TieBaStoreFactory.create_store().store_comments([item for item in comment_items if item])
 
 
 async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
@@ -103,11 +105,19 @@ async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
 
     Returns:
 
+    """
+    save_comment_item = _build_tieba_note_comment_item(note_id, comment_item)
+    await TieBaStoreFactory.create_store().store_comment(save_comment_item)
+
+
+def _build_tieba_note_comment_item(note_id: str, comment_item: TiebaComment) -> Dict:
+    """
+    convert a raw comment to the storage item used by update_tieba_note_comment
     """
     save_comment_item = comment_item.model_dump()
     save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
     utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
-    await TieBaStoreFactory.create_store().store_comment(save_comment_item)
+    return save_comment_item
 
 
 async def save_creator(user_info: TiebaCreator):
@@ -23,7 +23,7 @@
 # @Desc    :
 
 import re
-from typing import List
+from typing import List, Optional
 
 from var import source_keyword_var
 
@@ -36,6 +36,7 @@ class WeibostoreFactory:
         "csv": WeiboCsvStoreImplement,
         "db": WeiboDbStoreImplement,
         "json": WeiboJsonStoreImplement,
+        "jsonl": WeiboJsonlStoreImplement,
         "sqlite": WeiboSqliteStoreImplement,
         "mongodb": WeiboMongoStoreImplement,
         "excel": WeiboExcelStoreImplement,
@@ -45,7 +46,7 @@ class WeibostoreFactory:
     def create_store() -> AbstractStore:
         store_class = WeibostoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[WeibotoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
+            raise ValueError("[WeibotoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
         return store_class()
 
 
@@ -118,8 +119,9 @@ async def batch_update_weibo_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_weibo_note_comment(note_id, comment_item)
+    comment_items = [_build_weibo_note_comment_item(note_id, comment_item) for comment_item in comments]
+    # 一次交给存储层，数据库存储会合并成一条批量 upsert
+    await WeibostoreFactory.create_store().store_comments([item for item in comment_items if item])
 
 
 async def update_weibo_note_comment(note_id: str, comment_item: Dict):
@@ -132,8 +134,18 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
     Returns:
 
     """
-    if not comment_item or not note_id:
+    save_comment_item = _build_weibo_note_comment_item(note_id, comment_item)
+    if not save_comment_item:
         return
+    await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
+
+
+def _build_weibo_note_comment_item(note_id: str, comment_item: Dict) -> Optional[Dict]:
+    """
+    convert a raw comment to the storage item used by update_weibo_note_comment
+    """
+    if not comment_item or not note_id:
+        return None
     comment_id = str(comment_item.get("id"))
     user_info: Dict = comment_item.get("user")
     content_text = comment_item.get("text")
@@ -158,7 +170,7 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
         "avatar": user_info.get("profile_image_url", ""),
     }
     utils.logger.info(f"[store.weibo.update_weibo_note_comment] Weibo note comment: {comment_id}, content: {save_comment_item.get('content', '')[:24]} ...")
-    await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 
 async def update_weibo_note_image(picid: str, pic_content, extension_file_name):
@@ -172,7 +184,7 @@ async def update_weibo_note_image(picid: str, pic_content, extension_file_name):
     Returns:
 
     """
-    await WeiboStoreImage().store_image({"pic_id": picid, "pic_content": pic_content, "extension_file_name": extension_file_name})
+    return await WeiboStoreImage().store_image({"pic_id": picid, "pic_content": pic_content, "extension_file_name": extension_file_name})
 
 
 async def save_creator(user_id: str, user_info: Dict):
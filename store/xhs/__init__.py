@@ -35,6 +35,7 @@ class XhsStoreFactory:
         "csv": XhsCsvStoreImplement,
         "db": XhsDbStoreImplement,
         "json": XhsJsonStoreImplement,
+        "jsonl": XhsJsonlStoreImplement,
         "sqlite": XhsSqliteStoreImplement,
         "mongodb": XhsMongoStoreImplement,
         "excel": XhsExcelStoreImplement,
@@ -44,7 +45,7 @@ class XhsStoreFactory:
     def create_store() -> AbstractStore:
         store_class = XhsStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
+            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
         return store_class()
 
 
@@ -135,8 +136,9 @@ async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_xhs_note_comment(note_id, comment_item)
+    comment_items = [_build_xhs_note_comment_item(note_id, comment_item) for comment_item in comments]
+    # 一次交给存储层，数据库存储会合并成一条批量 upsert
+    await XhsStoreFactory.create_store().store_comments([item for item in comment_items if item])
 
 
 async def update_xhs_note_comment(note_id: str, comment_item: Dict):
@@ -148,6 +150,14 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
 
     Returns:
 
+    """
+    local_db_item = _build_xhs_note_comment_item(note_id, comment_item)
+    await XhsStoreFactory.create_store().store_comment(local_db_item)
+
+
+def _build_xhs_note_comment_item(note_id: str, comment_item: Dict) -> Dict:
+    """
+    convert a raw comment to the storage item used by update_xhs_note_comment
     """
     user_info = comment_item.get("user_info", {})
     comment_id = comment_item.get("id")
@@ -169,7 +179,7 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
         "like_count": comment_item.get("like_count", 0),
     }
     utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
-    await XhsStoreFactory.create_store().store_comment(local_db_item)
+    return local_db_item
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -233,7 +243,7 @@ async def update_xhs_note_image(note_id, pic_content, extension_file_name):
 
     """
 
-    await XiaoHongShuImage().store_image({"notice_id": note_id, "pic_content": pic_content, "extension_file_name": extension_file_name})
+    return await XiaoHongShuImage().store_image({"notice_id": note_id, "pic_content": pic_content, "extension_file_name": extension_file_name})
 
 
 async def update_xhs_note_video(note_id, video_content, extension_file_name):
@@ -248,4 +258,4 @@ async def update_xhs_note_video(note_id, video_content, extension_file_name):
 
     """
 
-    await XiaoHongShuVideo().store_video({"notice_id": note_id, "video_content": video_content, "extension_file_name": extension_file_name})
+    return await XiaoHongShuVideo().store_video({"notice_id": note_id, "video_content": video_content, "extension_file_name": extension_file_name})
@@ -22,12 +22,11 @@
 # @Time    : 2024/7/11 22:35
 # @Desc    : 小红书媒体保存
 import pathlib
-from typing import Dict
-
-import aiofiles
+from typing import Dict, Union
 
 from base.base_crawler import AbstractStoreImage, AbstractStoreVideo
 from tools import utils
+from tools.media_downloader import MediaSource, save_media
 
 
 class XiaoHongShuImage(AbstractStoreImage):
@@ -43,7 +42,7 @@ class XiaoHongShuImage(AbstractStoreImage):
         Returns:
 
         """
-        await self.save_image(image_content_item.get("notice_id"), image_content_item.get("pic_content"), image_content_item.get("extension_file_name"))
+        return await self.save_image(image_content_item.get("notice_id"), image_content_item.get("pic_content"), image_content_item.get("extension_file_name"))
 
     def make_save_file_name(self, notice_id: str, extension_file_name: str) -> str:
         """
@@ -58,7 +57,7 @@ class XiaoHongShuImage(AbstractStoreImage):
         """
         return f"{self.image_store_path}/{notice_id}/{extension_file_name}"
 
-    async def save_image(self, notice_id: str, pic_content: str, extension_file_name):
+    async def save_image(self, notice_id: str, pic_content: Union[bytes, MediaSource], extension_file_name):
         """
         save image to local
 
@@ -72,9 +71,10 @@ class XiaoHongShuImage(AbstractStoreImage):
         """
         pathlib.Path(self.image_store_path + "/" + notice_id).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(notice_id, extension_file_name)
-        async with aiofiles.open(save_file_name, 'wb') as f:
-            await f.write(pic_content)
-            utils.logger.info(f"[XiaoHongShuImageStoreImplement.save_image] save image {save_file_name} success ...")
+        if not await save_media(pic_content, save_file_name):
+            return False
+        utils.logger.info(f"[XiaoHongShuImageStoreImplement.save_image] save image {save_file_name} success ...")
+        return True
 
 
 class XiaoHongShuVideo(AbstractStoreVideo):
@@ -90,7 +90,7 @@ class XiaoHongShuVideo(AbstractStoreVideo):
         Returns:
 
         """
-        await self.save_video(video_content_item.get("notice_id"), video_content_item.get("video_content"), video_content_item.get("extension_file_name"))
+        return await self.save_video(video_content_item.get("notice_id"), video_content_item.get("video_content"), video_content_item.get("extension_file_name"))
 
     def make_save_file_name(self, notice_id: str, extension_file_name: str) -> str:
         """
@@ -105,7 +105,7 @@ class XiaoHongShuVideo(AbstractStoreVideo):
         """
         return f"{self.video_store_path}/{notice_id}/{extension_file_name}"
 
-    async def save_video(self, notice_id: str, video_content: str, extension_file_name):
+    async def save_video(self, notice_id: str, video_content: Union[bytes, MediaSource], extension_file_name):
         """
         save video to local
 
@@ -119,6 +119,7 @@ class XiaoHongShuVideo(AbstractStoreVideo):
         """
         pathlib.Path(self.video_store_path + "/" + notice_id).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(notice_id, extension_file_name)
-        async with aiofiles.open(save_file_name, 'wb') as f:
-            await f.write(video_content)
-            utils.logger.info(f"[XiaoHongShuVideoStoreImplement.save_video] save video {save_file_name} success ...")
+        if not await save_media(video_content, save_file_name):
+            return False
+        utils.logger.info(f"[XiaoHongShuVideoStoreImplement.save_video] save video {save_file_name} success ...")
+        return True
@@ -19,7 +19,7 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 import config
 from base.base_crawler import AbstractStore
@@ -27,6 +27,7 @@ from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from ._store_impl import (ZhihuCsvStoreImplement,
                                           ZhihuDbStoreImplement,
                                           ZhihuJsonStoreImplement,
+                                          ZhihuJsonlStoreImplement,
                                           ZhihuSqliteStoreImplement,
                                           ZhihuMongoStoreImplement,
                                           ZhihuExcelStoreImplement)
@@ -39,6 +40,7 @@ class ZhihuStoreFactory:
         "csv": ZhihuCsvStoreImplement,
         "db": ZhihuDbStoreImplement,
         "json": ZhihuJsonStoreImplement,
+        "jsonl": ZhihuJsonlStoreImplement,
         "sqlite": ZhihuSqliteStoreImplement,
         "mongodb": ZhihuMongoStoreImplement,
         "excel": ZhihuExcelStoreImplement,
@@ -48,7 +50,7 @@ class ZhihuStoreFactory:
     def create_store() -> AbstractStore:
         store_class = ZhihuStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
+            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
         return store_class()
 
 async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
@@ -95,8 +97,9 @@ async def batch_update_zhihu_note_comments(comments: List[ZhihuComment]):
     if not comments:
         return
 
-    for comment_item in comments:
-        await update_zhihu_content_comment(comment_item)
+    comment_items = [_build_zhihu_content_comment_item(comment_item) for comment_item in comments]
+    # 一次交给存储层，数据库存储会合并成一条批量 upsert
+    await ZhihuStoreFactory.create_store().store_comments([item for item in comment_items if item])
 
 
 async def update_zhihu_content_comment(comment_item: ZhihuComment):
@@ -107,11 +110,19 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
 
     Returns:
 
+    """
+    local_db_item = _build_zhihu_content_comment_item(comment_item)
+    await ZhihuStoreFactory.create_store().store_comment(local_db_item)
+
+
+def _build_zhihu_content_comment_item(comment_item: ZhihuComment) -> Dict:
+    """
+    convert a raw comment to the storage item used by update_zhihu_content_comment
     """
     local_db_item = comment_item.model_dump()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
     utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
-    await ZhihuStoreFactory.create_store().store_comment(local_db_item)
+    return local_db_item
 
 
 async def save_creator(creator: ZhihuCreator):
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_bilibili_wbi.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : B站 WBI key 缓存与签名测试
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from media_platform.bilibili.client import BilibiliClient
+from media_platform.bilibili.exception import WbiSignError
+from media_platform.bilibili.help import BilibiliSign, WbiKeyManager
+
+IMG_KEY = "7cd084941338484aae1ad9425b84077c"
+SUB_KEY = "4932caff0ff746eab6f01bf08b70ac45"
+
+
+class TestBilibiliSign(TestCase):
+
+    def test_salt(self):
+        # 来自 bilibili-API-collect 文档中的示例
+        self.assertEqual(BilibiliSign(IMG_KEY, SUB_KEY).get_salt(), "ea1db124af3c7062474693fa704f4ff8")
+
+    def test_sign(self):
+        with patch("media_platform.bilibili.help.utils.get_unix_timestamp", return_value=1702204169):
+            signed = BilibiliSign(IMG_KEY, SUB_KEY).sign({"foo": "114", "bar": "514", "zab": 1919810})
+        self.assertEqual(signed["wts"], "1702204169")
+        self.assertEqual(signed["w_rid"], "8f6f2b5b3d485fe1886cec6a0be8c5d4")
+
+
+class TestWbiKeyManager(IsolatedAsyncioTestCase):
+
+    async def test_keys_fetched_once(self):
+        fetch_keys = AsyncMock(return_value=(IMG_KEY, SUB_KEY))
+        manager = WbiKeyManager(fetch_keys, ttl=60)
+
+        await asyncio.gather(*[manager.sign({"page": i}) for i in range(20)])
+
+        fetch_keys.assert_awaited_once()
+
+    async def test_refresh_after_ttl_and_invalidate(self):
+        fetch_keys = AsyncMock(return_value=(IMG_KEY, SUB_KEY))
+        manager = WbiKeyManager(fetch_keys, ttl=0)
+        await manager.sign({"a": 1})
+        await manager.sign({"a": 1})
+        self.assertEqual(fetch_keys.await_count, 2)
+
+        manager.ttl = 60
+        await manager.sign({"a": 1})
+        manager.invalidate()
+        await manager.sign({"a": 1})
+        self.assertEqual(fetch_keys.await_count, 4)
+
+
+class TestBilibiliClientWbi(IsolatedAsyncioTestCase):
+
+    def _make_client(self) -> BilibiliClient:
+        client = BilibiliClient(headers={}, playwright_page=MagicMock(), cookie_dict={})
+        client.get_wbi_keys = AsyncMock(return_value=(IMG_KEY, SUB_KEY))
+        client._wbi_key_manager._fetch_keys = client.get_wbi_keys
+        return client
+
+    async def test_no_browser_round_trip_in_steady_state(self):
+        client = self._make_client()
+        client.request = AsyncMock(return_value={})
+        params = {"keyword": "python"}
+
+        for _ in range(5):
+            await client.get("/x/web-interface/wbi/search/type", params)
+
+        client.get_wbi_keys.assert_awaited_once()
+        self.assertEqual(params, {"keyword": "python"})
+        self.assertIn("w_rid=", client.request.call_args.kwargs["url"])
+
+    async def test_refresh_keys_on_sign_error(self):
+        client = self._make_client()
+        client.request = AsyncMock(side_effect=[WbiSignError("风控校验失败"), {"ok": True}])
+
+        result = await client.post("/x/v2/reply/add", {"oid": 1})
+
+        self.assertEqual(result, {"ok": True})
+        self.assertEqual(client.get_wbi_keys.await_count, 2)
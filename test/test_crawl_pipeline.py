@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_crawl_pipeline.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 分阶段爬取流水线测试
+#            python -m test.test_crawl_pipeline 用模拟延迟对比按页串行与流水线的耗时
+import asyncio
+import os
+import tempfile
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+
+from base.crawl_pipeline import CrawlPipeline
+from config.db_config import sqlite_db_config
+from database import db_session
+from database.models import XhsNote
+from store.xhs._store_impl import XhsSqliteStoreImplement
+from var import source_keyword_var
+
+
+async def iterate(items, delay: float = 0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+class TestCrawlPipeline(IsolatedAsyncioTestCase):
+
+    async def test_items_flow_through_stages(self):
+        stored = []
+
+        async def detail(item):
+            return None if item % 3 == 0 else {"id": item}
+
+        async def store(note):
+            stored.append(note["id"])
+            return note
+
+        stats = await (CrawlPipeline("test", queue_size=2)
+                       .add_stage("detail", detail, workers=3)
+                       .add_stage("store", store, workers=1)
+                       .run(iterate(range(10))))
+
+        self.assertEqual(sorted(stored), [1, 2, 4, 5, 7, 8])
+        self.assertEqual(stats["detail"].processed, 10)
+        self.assertEqual(stats["store"].processed, 6)
+
+    async def test_stage_error_does_not_stop_pipeline(self):
+        done = []
+
+        async def detail(item):
+            if item == 2:
+                raise ValueError("boom")
+            return item
+
+        async def comments(item):
+            done.append(item)
+
+        stats = await (CrawlPipeline("test").add_stage("detail", detail, workers=2)
+                       .add_stage("comments", comments, workers=2).run(iterate(range(5))))
+
+        self.assertEqual(sorted(done), [0, 1, 3, 4])
+        self.assertEqual(stats["detail"].failed, 1)
+
+    async def test_backpressure_limits_source(self):
+        produced = []
+        release = asyncio.Event()
+
+        async def source():
+            for i in range(20):
+                produced.append(i)
+                yield i
+
+        async def slow_store(item):
+            await release.wait()
+
+        task = asyncio.create_task(CrawlPipeline("test", queue_size=2)
+                                   .add_stage("detail", lambda item: asyncio.sleep(0, item), workers=1)
+                                   .add_stage("store", slow_store, workers=1)
+                                   .run(source()))
+        await asyncio.sleep(0.05)
+        # store 阻塞时，最多：store 处理中 1 条 + store 队列 2 条 + detail 等待 put 1 条 + detail 队列 2 条 + source 等待 put 1 条
+        self.assertLessEqual(len(produced), 7)
+
+        release.set()
+        await task
+        self.assertEqual(len(produced), 20)
+
+    async def test_comments_overlap_next_page_detail(self):
+        events = []
+
+        async def pages():
+            for page in (1, 2):
+                for note in range(2):
+                    yield (page, note)
+                await asyncio.sleep(0.01)
+
+        async def detail(item):
+            events.append(("detail", item[0]))
+            await asyncio.sleep(0.02)
+            return item
+
+        async def comments(item):
+            events.append(("comments_start", item[0]))
+            await asyncio.sleep(0.05)
+            events.append(("comments_end", item[0]))
+
+        await (CrawlPipeline("test").add_stage("detail", detail, workers=2)
+               .add_stage("comments", comments, workers=2).run(pages()))
+
+        # 第 1 页的评论还没有结束时，第 2 页的详情已经开始
+        last_page1_comments_end = max(i for i, event in enumerate(events) if event == ("comments_end", 1))
+        self.assertLess(events.index(("detail", 2)), last_page1_comments_end)
+
+    async def test_context_vars_follow_items(self):
+        seen = {}
+
+        async def source():
+            for keyword in ("a", "b"):
+                source_keyword_var.set(keyword)
+                for i in range(3):
+                    yield f"{keyword}{i}"
+
+        async def detail(item):
+            await asyncio.sleep(0.01)
+            return item
+
+        async def store(item):
+            seen[item] = source_keyword_var.get()
+
+        await (CrawlPipeline("test").add_stage("detail", detail, workers=4)
+               .add_stage("store", store, workers=2).run(source()))
+
+        self.assertEqual(seen, {"a0": "a", "a1": "a", "a2": "a", "b0": "b", "b1": "b", "b2": "b"})
+
+    async def test_source_error_cancels_workers(self):
+        started = asyncio.Event()
+
+        async def source():
+            yield 1
+            await started.wait()
+            raise RuntimeError("search failed")
+
+        async def detail(item):
+            started.set()
+            await asyncio.sleep(10)
+
+        pipeline = CrawlPipeline("test").add_stage("detail", detail, workers=1)
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(pipeline.run(source()), 1)
+        self.assertEqual(pipeline.stages[0].processed, 0)
+
+    async def test_concurrent_db_store_stage_keeps_duplicates_flowing(self):
+        # 同一篇笔记可能在多页搜索结果中出现，多个 store worker 同时写入时不能因唯一索引冲突被丢弃
+        media = []
+
+        async def store(note):
+            await XhsSqliteStoreImplement().store_content(note)
+            return note
+
+        async def get_media(note):
+            media.append(note["note_id"])
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("config.SAVE_DATA_OPTION", "sqlite"), \
+                patch.dict(sqlite_db_config, {"db_path": os.path.join(tmpdir, "test.db")}):
+            await db_session.dispose_engines()
+            await db_session.create_tables("sqlite")
+            try:
+                notes = [{"note_id": f"n{i % 3}", "title": "t", "liked_count": i} for i in range(12)]
+                stats = await (CrawlPipeline("test").add_stage("store", store, workers=4)
+                               .add_stage("media", get_media, workers=2).run(iterate(notes)))
+                async with db_session.get_session() as session:
+                    row_count = (await session.execute(select(func.count()).select_from(XhsNote))).scalar()
+            finally:
+                await db_session.dispose_engines()
+
+        self.assertEqual(stats["store"].failed, 0)
+        self.assertEqual(len(media), 12)
+        self.assertEqual(row_count, 3)
+
+    async def test_run_without_stage(self):
+        with self.assertRaises(ValueError):
+            await CrawlPipeline("test").run(iterate([]))
+
+
+async def _benchmark(pages: int = 5, notes_per_page: int = 20, concurrency: int = 4):
+    """模拟：搜索 0.2s/页，详情 0.1s，存储 0.01s，评论 0.3s"""
+
+    async def search(page):
+        await asyncio.sleep(0.2)
+        return [(page, i) for i in range(notes_per_page)]
+
+    async def detail(item):
+        await asyncio.sleep(0.1)
+        return item
+
+    async def store(item):
+        await asyncio.sleep(0.01)
+        return item
+
+    async def comments(item):
+        await asyncio.sleep(0.3)
+
+    async def lockstep():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(func, item):
+            async with semaphore:
+                return await func(item)
+
+        for page in range(pages):
+            items = await asyncio.gather(*[limited(detail, item) for item in await search(page)])
+            for item in items:
+                await store(item)
+            await asyncio.gather(*[limited(comments, item) for item in items])
+
+    async def source():
+        for page in range(pages):
+            for item in await search(page):
+                yield item
+
+    start = time.perf_counter()
+    await lockstep()
+    lockstep_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await (CrawlPipeline("bench", queue_size=notes_per_page)
+           .add_stage("detail", detail, workers=concurrency)
+           .add_stage("store", store, workers=1)
+           .add_stage("comments", comments, workers=concurrency)
+           .run(source()))
+    pipeline_cost = time.perf_counter() - start
+
+    print(f"{pages} pages x {notes_per_page} notes, concurrency {concurrency}: "
+          f"lockstep {lockstep_cost:.2f}s, pipeline {pipeline_cost:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
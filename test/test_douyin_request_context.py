@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_douyin_request_context.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 抖音请求上下文（msToken/webid/公共参数缓存）测试
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock
+
+from media_platform.douyin.client import DouYinClient
+from media_platform.douyin.exception import DataFetchError
+from media_platform.douyin.help import DOUYIN_COMMON_PARAMS, DouyinRequestContext
+
+
+class FakePage:
+
+    def __init__(self):
+        self.ms_token = "token-1"
+        self.evaluate = AsyncMock(side_effect=lambda expression: self.ms_token)
+
+
+class TestDouyinRequestContext(IsolatedAsyncioTestCase):
+
+    async def test_params_built_without_browser_round_trip(self):
+        page = FakePage()
+        context = DouyinRequestContext(page, refresh_interval=60)
+
+        for i in range(5):
+            await context.ensure_ms_token()
+            params = context.build_params({"cursor": i})
+
+        page.evaluate.assert_awaited_once()
+        self.assertEqual(params["msToken"], "token-1")
+        self.assertEqual(params["webid"], context.web_id)
+        self.assertEqual(params["cursor"], 4)
+        for key, value in DOUYIN_COMMON_PARAMS.items():
+            self.assertEqual(params[key], value)
+
+    async def test_background_refresh_after_interval(self):
+        page = FakePage()
+        context = DouyinRequestContext(page, refresh_interval=0)
+        await context.ensure_ms_token()
+        page.ms_token = "token-2"
+
+        # 过期后不阻塞当前请求，仍使用旧值，后台刷新完成后使用新值
+        await context.ensure_ms_token()
+        self.assertEqual(context.build_params({})["msToken"], "token-1")
+        await context._refresh_task
+        self.assertEqual(context.build_params({})["msToken"], "token-2")
+
+    async def test_mark_stale_forces_refresh(self):
+        page = FakePage()
+        context = DouyinRequestContext(page, refresh_interval=60)
+        await context.ensure_ms_token()
+        page.ms_token = "token-2"
+
+        context.mark_stale()
+        await context.ensure_ms_token()
+
+        self.assertEqual(context.ms_token, "token-2")
+        self.assertEqual(page.evaluate.await_count, 2)
+
+
+class TestDouYinClientBlocked(IsolatedAsyncioTestCase):
+
+    async def test_blocked_response_marks_context_stale(self):
+        page = FakePage()
+        client = DouYinClient(headers={"User-Agent": "ua"}, playwright_page=page, cookie_dict={})
+        await client._request_context.ensure_ms_token()
+        http_client = MagicMock()
+        http_client.request = AsyncMock(return_value=MagicMock(text="blocked"))
+        client.get_http_client = MagicMock(return_value=http_client)
+
+        with self.assertRaises(DataFetchError):
+            await client.request("GET", "https://www.douyin.com/aweme/v1/web/comment/list/")
+
+        page.ms_token = "token-2"
+        await client._request_context.ensure_ms_token()
+        self.assertEqual(client._request_context.ms_token, "token-2")
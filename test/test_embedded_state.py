@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_embedded_state.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 页面内嵌状态提取测试
+#            python -m test.test_embedded_state 对比原先的正则/DOM 解析与按位置截取的耗时
+import json
+import re
+import time
+import unittest
+
+import humps
+from parsel import Selector
+
+from media_platform.xhs.extractor import XiaoHongShuExtractor
+from media_platform.zhihu.help import ZhihuExtractor
+from tools.embedded_state import (extract_script_text_by_id, extract_window_state, find_script_payload,
+                                  get_subtree, loads_js_object)
+
+NOTE_ID = "65f0c1a2000000001203b1c4"
+
+
+def _filler_markup(blocks: int) -> str:
+    return "".join(
+        f'<div class="feeds-container"><section class="note-item" data-index="{i}">'
+        f'<a href="/explore/{i:024x}"><img src="https://sns-img.xhscdn.com/{i}.jpg"></a>'
+        f'<span class="title">title {i}</span></section></div>\n'
+        for i in range(blocks)
+    )
+
+
+def build_xhs_note_page(feed_size: int = 200) -> str:
+    """构造一个与小红书笔记详情页结构相同的页面：大量 feed 数据 + noteDetailMap"""
+    feeds = [{
+        "id": f"{i:024x}", "modelType": "note",
+        "noteCard": {"displayTitle": f"note {i}", "interactInfo": {"likedCount": str(i), "isLiked": False},
+                     "user": {"userId": f"{i:024x}", "nickName": f"user{i}", "avatar": "https://x/a.jpg"},
+                     "cover": {"urlDefault": "https://x/c.jpg", "infoList": [{"imageScene": "WB_DFT"}]}},
+    } for i in range(feed_size)]
+    note = {
+        "noteId": NOTE_ID, "type": "normal", "title": "标题", "desc": "正文 #话题#",
+        "user": {"userId": "5f1e", "nickname": "作者", "avatar": "https://x/u.jpg"},
+        "interactInfo": {"likedCount": "10", "collectedCount": "2", "commentCount": "3", "shareCount": "1"},
+        "imageList": [{"urlDefault": "https://x/1.jpg", "width": 1080, "height": 1440}],
+        "tagList": [{"id": "t1", "name": "话题", "type": "topic"}],
+        "lastUpdateTime": 1710000000000, "ipLocation": "上海", "xsecToken": "ABtoken",
+    }
+    state = (json.dumps({
+        "global": {"appSettings": {"notificationInterval": 30}},
+        "feed": {"feeds": feeds, "currentQueryParams": None},
+        "note": {"noteDetailMap": {NOTE_ID: {"comments": {"list": [], "cursor": ""}, "note": note}},
+                 "currentNoteId": NOTE_ID},
+        "user": {"userPageData": {}},
+    }, ensure_ascii=False, separators=(",", ":"))
+             .replace('"currentQueryParams":null', '"currentQueryParams":undefined'))
+    return (f"<!doctype html><html><head><title>小红书</title></head><body>{_filler_markup(feed_size)}"
+            f"<script>window.__INITIAL_STATE__={state}</script><script src=\"/main.js\"></script></body></html>")
+
+
+def build_zhihu_answer_page(answer_count: int = 200) -> str:
+    """构造一个与知乎回答页结构相同的页面：大量 DOM + js-initialData"""
+    answers = {str(1000 + i): {
+        "id": 1000 + i, "type": "answer", "content": f"<p>回答 {i}</p>" * 20, "excerpt": f"摘要 {i}",
+        "question": {"id": 42, "title": "问题"}, "author": {"id": f"a{i}", "name": f"答主{i}", "urlToken": f"u{i}"},
+        "createdTime": 1700000000, "updatedTime": 1700000100, "voteupCount": i, "commentCount": 1,
+    } for i in range(answer_count)}
+    users = {f"u{i}": {"id": f"a{i}", "name": f"答主{i}", "urlToken": f"u{i}", "gender": i % 2,
+                       "followerCount": i, "answerCount": i} for i in range(answer_count)}
+    init_data = json.dumps({"initialState": {"entities": {"answers": answers, "users": users}}},
+                           ensure_ascii=False)
+    return (f"<!doctype html><html><head><title>知乎</title></head><body><div id=\"root\">"
+            f"{_filler_markup(answer_count * 2)}</div>"
+            f"<script id=\"js-initialData\" type=\"text/json\">{init_data}</script></body></html>")
+
+
+def legacy_xhs_note_detail(note_id: str, html: str):
+    state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""')
+    if state != "{}":
+        note_dict = humps.decamelize(json.loads(state))
+        return note_dict["note"]["note_detail_map"][note_id]["note"]
+    return None
+
+
+def legacy_zhihu_init_data(html: str) -> str:
+    return Selector(text=html).xpath("//script[@id='js-initialData']/text()").get(default="")
+
+
+class TestEmbeddedState(unittest.TestCase):
+
+    def test_find_script_payload(self):
+        html = "<script>var a=1</script><script>window.x={\"a\":1}</script>"
+        self.assertEqual(find_script_payload(html, "window.x="), '{"a":1}')
+        self.assertIsNone(find_script_payload(html, "window.y="))
+        self.assertIsNone(find_script_payload("<script>window.x={", "window.x="))
+        self.assertIsNone(find_script_payload("", "window.x="))
+
+    def test_extract_window_state(self):
+        self.assertEqual(extract_window_state("<script>window.__INITIAL_STATE__={\"a\":1};</script>"), '{"a":1}')
+        self.assertIsNone(extract_window_state("<html></html>"))
+
+    def test_extract_script_text_by_id(self):
+        html = "<div id=\"x\"></div><script id='js-initialData' type=\"text/json\">{\"a\": 1}</script>"
+        self.assertEqual(extract_script_text_by_id(html, "js-initialData"), '{"a": 1}')
+        self.assertIsNone(extract_script_text_by_id(html, "missing"))
+
+    def test_loads_js_object_only_replaces_undefined_values(self):
+        data = loads_js_object('{"a":undefined,"b":[undefined,1],"c":"undefined value"}')
+        self.assertEqual(data, {"a": None, "b": [None, 1], "c": "undefined value"})
+        self.assertEqual(loads_js_object('{"a":undefined}', undefined_value='""'), {"a": ""})
+
+    def test_get_subtree(self):
+        data = {"a": {"b": {"c": 1}}}
+        self.assertEqual(get_subtree(data, "a", "b", "c"), 1)
+        self.assertIsNone(get_subtree(data, "a", "x", "c"))
+        self.assertEqual(get_subtree(data, "a", "b", "c", "d", default={}), {})
+
+    def test_xhs_note_detail_matches_legacy(self):
+        html = build_xhs_note_page(20)
+        note = XiaoHongShuExtractor().extract_note_detail_from_html(NOTE_ID, html)
+
+        self.assertEqual(note, legacy_xhs_note_detail(NOTE_ID, html))
+        self.assertEqual(note["interact_info"]["liked_count"], "10")
+
+    def test_xhs_note_detail_keeps_undefined_in_strings(self):
+        # 原实现把所有 undefined 都替换成 ""，字符串里出现 undefined 时 JSON 解析失败
+        html = build_xhs_note_page(1).replace('"title":"标题"', '"title":"undefined behavior"')
+        note = XiaoHongShuExtractor().extract_note_detail_from_html(NOTE_ID, html)
+        self.assertEqual(note["title"], "undefined behavior")
+
+    def test_xhs_note_detail_missing_state(self):
+        extractor = XiaoHongShuExtractor()
+        self.assertIsNone(extractor.extract_note_detail_from_html(NOTE_ID, "<html>验证码</html>"))
+        self.assertIsNone(extractor.extract_note_detail_from_html(
+            NOTE_ID, "<script>window.__INITIAL_STATE__={}</script><!-- noteDetailMap -->"))
+        # 页面里有 state 但没有这篇笔记时同样返回 None，而不是抛 KeyError
+        self.assertIsNone(extractor.extract_note_detail_from_html("other_note_id", build_xhs_note_page(1)))
+
+    def test_xhs_creator_info(self):
+        html = ("<script>window.__INITIAL_STATE__={\"user\":{\"userPageData\":"
+                "{\"basicInfo\":{\"nickname\":\"n\",\"desc\":undefined}}}}</script>")
+        self.assertEqual(XiaoHongShuExtractor().extract_creator_info_from_html(html),
+                         {"basicInfo": {"nickname": "n", "desc": None}})
+        self.assertIsNone(XiaoHongShuExtractor().extract_creator_info_from_html("<html></html>"))
+
+    def test_zhihu_init_data_matches_legacy(self):
+        html = build_zhihu_answer_page(5)
+        self.assertEqual(extract_script_text_by_id(html, "js-initialData"), legacy_zhihu_init_data(html))
+
+        answer = ZhihuExtractor().extract_answer_content_from_html(html)
+        self.assertEqual(str(answer.content_id), "1000")
+        self.assertIsNone(ZhihuExtractor().extract_answer_content_from_html("<html></html>"))
+
+    def test_zhihu_creator(self):
+        creator = ZhihuExtractor().extract_creator("u1", build_zhihu_answer_page(3))
+        self.assertEqual(creator.user_nickname, "答主1")
+        self.assertEqual(creator.fans, 1)
+
+
+def _timeit(func, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def _benchmark(rounds: int = 20):
+    xhs_html = build_xhs_note_page(2000)
+    zhihu_html = build_zhihu_answer_page(500)
+    extractor = XiaoHongShuExtractor()
+    print(f"xhs note page {len(xhs_html) / 1024:.0f}KB: "
+          f"legacy {_timeit(lambda: legacy_xhs_note_detail(NOTE_ID, xhs_html), rounds):.2f}ms, "
+          f"embedded state {_timeit(lambda: extractor.extract_note_detail_from_html(NOTE_ID, xhs_html), rounds):.2f}ms")
+    print(f"zhihu answer page {len(zhihu_html) / 1024:.0f}KB (locate js-initialData): "
+          f"parsel {_timeit(lambda: legacy_zhihu_init_data(zhihu_html), rounds):.2f}ms, "
+          f"embedded state {_timeit(lambda: extract_script_text_by_id(zhihu_html, 'js-initialData'), rounds):.3f}ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
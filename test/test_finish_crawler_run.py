@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_finish_crawler_run.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+# -*- coding: utf-8 -*-
+# @Desc    : 爬取结束后的收尾流程测试，main.py、run_crawler_task.py 和飞书机器人共用
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+import main
+
+
+@patch("config.ENABLE_GET_WORDCLOUD", False)
+@patch("config.JSONL_COMPACT_TO_JSON", False)
+class TestFinishCrawlerRun(IsolatedAsyncioTestCase):
+
+    def _patch(self, target: str) -> AsyncMock:
+        patcher = patch(target, new_callable=AsyncMock)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def setUp(self):
+        self.close_http = self._patch("main.ProxyRefreshMixin.close_all_http_clients")
+        self.close_sign = self._patch("main.JsSignPool.close_all")
+        self.close_media = self._patch("main.MediaStore.close_all")
+        self.flush_files = self._patch("main.AsyncFileWriter.flush_all")
+        self.close_db = self._patch("main.db.close")
+        self.flush_mongo = self._patch("main.MongoDBStoreBase.flush_all")
+
+    @patch("config.SAVE_DATA_OPTION", "jsonl")
+    async def test_file_buffers_are_flushed(self):
+        await main.finish_crawler_run()
+        for mock in (self.close_http, self.close_sign, self.close_media, self.flush_files):
+            mock.assert_awaited_once()
+        self.close_db.assert_not_awaited()
+
+    @patch("config.SAVE_DATA_OPTION", "sqlite")
+    async def test_db_connections_are_closed(self):
+        await main.finish_crawler_run()
+        self.flush_files.assert_not_awaited()
+        self.close_db.assert_awaited_once()
+
+    @patch("config.SAVE_DATA_OPTION", "mongodb")
+    async def test_mongodb_buffer_is_flushed(self):
+        await main.finish_crawler_run()
+        self.flush_mongo.assert_awaited_once()
+        self.flush_files.assert_not_awaited()
+
+    @patch("config.SAVE_DATA_OPTION", "excel")
+    async def test_excel_is_flushed(self):
+        with patch("store.excel_store_base.ExcelStoreBase.flush_all") as flush_excel:
+            await main.finish_crawler_run()
+        flush_excel.assert_called_once()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_js_sign_service.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 常驻 node 签名进程池测试
+import asyncio
+import os
+import shutil
+import signal
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import execjs
+
+from tools.js_sign_service import JsSignError, JsSignPool
+
+ZHIHU_SIGN_JS_PATH = "libs/zhihu.js"
+DOUYIN_SIGN_JS_PATH = "libs/douyin.js"
+ZHIHU_URL = "/api/v4/search_v3?gk_version=gz-gaokao&t=general&q=python&correction=1&offset=0&limit=20"
+ZHIHU_COOKIES = "d_c0=AbCdEfGhIjKlMnOpQrStUvWxYz0123456789|1700000000"
+
+
+@unittest.skipUnless(shutil.which("node"), "node is not installed")
+class TestJsSignPool(IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await JsSignPool.close_all()
+
+    async def test_same_sign_as_execjs(self):
+        with open(ZHIHU_SIGN_JS_PATH, encoding="utf-8-sig") as f:
+            expected = execjs.compile(f.read()).call("get_sign", ZHIHU_URL, ZHIHU_COOKIES)
+
+        result = await JsSignPool.get_instance(ZHIHU_SIGN_JS_PATH).call("get_sign", ZHIHU_URL, ZHIHU_COOKIES)
+
+        # x-zse-96 带随机填充，只比较确定部分和格式
+        self.assertEqual(result.keys(), expected.keys())
+        self.assertEqual(result["x-zst-81"], expected["x-zst-81"])
+        self.assertTrue(result["x-zse-96"].startswith("2.0_"))
+        self.assertEqual(len(result["x-zse-96"]), len(expected["x-zse-96"]))
+
+    async def test_concurrent_calls(self):
+        pool = JsSignPool.get_instance(DOUYIN_SIGN_JS_PATH)
+        params = [f"aweme_id={i}&device_platform=webapp" for i in range(50)]
+
+        results = await asyncio.gather(*[pool.call("sign_datail", p, "Mozilla/5.0") for p in params])
+
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(isinstance(r, str) and r for r in results))
+
+    async def test_script_error_is_raised(self):
+        pool = JsSignPool.get_instance(ZHIHU_SIGN_JS_PATH)
+        with self.assertRaises(JsSignError):
+            await pool.call("not_exist_function")
+        # 脚本异常不影响进程继续服务
+        self.assertEqual(await pool.health_check(), 0)
+
+    async def test_restart_crashed_worker(self):
+        pool = JsSignPool.get_instance(ZHIHU_SIGN_JS_PATH)
+        await pool.call("get_sign", ZHIHU_URL, ZHIHU_COOKIES)
+        for worker in pool._workers:
+            worker.kill()
+            await worker._process.wait()
+
+        result = await pool.call("get_sign", ZHIHU_URL, ZHIHU_COOKIES)
+
+        self.assertIn("x-zse-96", result)
+        self.assertTrue(all(worker.alive for worker in pool._workers))
+
+    async def test_health_check_restarts_dead_worker(self):
+        pool = JsSignPool.get_instance(ZHIHU_SIGN_JS_PATH)
+        self.assertEqual(await pool.health_check(), pool.size)
+        pool._workers[0].kill()
+        await pool._workers[0]._process.wait()
+
+        self.assertEqual(await pool.health_check(), 1)
+        self.assertTrue(await pool._workers[0].ping())
+
+    @patch("config.JS_SIGN_TIMEOUT_SEC", 0.5)
+    @patch("config.JS_SIGN_HEALTH_CHECK_SEC", 0.05)
+    async def test_hung_worker_restarted_on_acquire(self):
+        pool = JsSignPool.get_instance(ZHIHU_SIGN_JS_PATH)
+        await pool.health_check()
+        hung = pool._workers[0]
+        os.kill(hung._process.pid, signal.SIGSTOP)
+        await asyncio.sleep(0.1)
+
+        result = await pool.call("get_sign", ZHIHU_URL, ZHIHU_COOKIES)
+
+        self.assertIn("x-zse-96", result)
+        self.assertIsNot(pool._workers[0], hung)
+        self.assertFalse(hung.alive)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_media_download_manager.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+# -*- coding: utf-8 -*-
+# @Desc    : 媒体下载线程池测试
+#            python -m test.test_media_download_manager 用模拟延迟对比串行下载与后台下载时帖子采集的耗时
+import asyncio
+import time
+from collections import defaultdict
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from tools.media_download_manager import MediaDownloadManager
+from var import crawler_type_var
+
+
+class FakeCdn:
+    """
+    记录每个域名同时下载的文件数
+    """
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.active = defaultdict(int)
+        self.max_active = defaultdict(int)
+        self.max_total = 0
+        self.saved = []
+
+    async def save(self, url: str, name: str) -> bool:
+        host = url.split("/")[2]
+        self.active[host] += 1
+        self.max_active[host] = max(self.max_active[host], self.active[host])
+        self.max_total = max(self.max_total, sum(self.active.values()))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active[host] -= 1
+        self.saved.append(name)
+        return True
+
+
+@patch("config.MEDIA_DOWNLOAD_HOST_JITTER_SEC", 0)
+class TestMediaDownloadManager(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        MediaDownloadManager._reset()
+
+    async def asyncTearDown(self):
+        await MediaDownloadManager.cancel_all()
+
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 2)
+    async def test_submit_returns_before_download(self):
+        cdn = FakeCdn(delay=0.2)
+        start = time.perf_counter()
+        await MediaDownloadManager.submit("https://cdn-a.test/0.jpg", cdn.save, "https://cdn-a.test/0.jpg", "0.jpg")
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertEqual(cdn.saved, [])
+
+        await MediaDownloadManager.drain()
+        self.assertEqual(cdn.saved, ["0.jpg"])
+        self.assertEqual(MediaDownloadManager.queue_depth(), 0)
+
+    @patch("config.MEDIA_DOWNLOAD_PER_HOST_CONCURRENCY", 2)
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 6)
+    async def test_per_host_concurrency(self):
+        cdn = FakeCdn()
+        for i in range(12):
+            url = f"https://cdn-{'ab'[i % 2]}.test/{i}.jpg"
+            await MediaDownloadManager.submit(url, cdn.save, url, f"{i}.jpg")
+        await MediaDownloadManager.drain()
+        self.assertEqual(len(cdn.saved), 12)
+        self.assertEqual(dict(cdn.max_active), {"cdn-a.test": 2, "cdn-b.test": 2})
+        self.assertEqual(cdn.max_total, 4)
+
+    @patch("config.MEDIA_DOWNLOAD_QUEUE_SIZE", 2)
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 1)
+    async def test_bounded_queue_and_stats(self):
+        release = asyncio.Event()
+
+        async def blocked_job() -> bool:
+            await release.wait()
+            return True
+
+        await MediaDownloadManager.submit("https://cdn-a.test/0.jpg", blocked_job)
+        await asyncio.sleep(0)
+        await MediaDownloadManager.submit("https://cdn-a.test/1.jpg", blocked_job)
+        await MediaDownloadManager.submit("https://cdn-a.test/2.jpg", blocked_job)
+        self.assertEqual(MediaDownloadManager.queue_depth(), 2)
+
+        # 队列已满，再提交时会等待 worker 取走任务
+        extra = asyncio.create_task(MediaDownloadManager.submit("https://cdn-a.test/3.jpg", blocked_job))
+        await asyncio.sleep(0.05)
+        self.assertFalse(extra.done())
+        self.assertEqual(MediaDownloadManager.stats()["active"], 1)
+
+        release.set()
+        await extra
+        await MediaDownloadManager.drain()
+        self.assertIsNone(MediaDownloadManager._queue)
+
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 2)
+    async def test_failures_are_counted(self):
+        async def failed() -> bool:
+            return False
+
+        async def broken():
+            raise RuntimeError("disk full")
+
+        async def ok():
+            return None
+
+        for job in (failed, broken, ok):
+            await MediaDownloadManager.submit("https://cdn-a.test/x.jpg", job)
+        await asyncio.sleep(0.05)
+        stats = MediaDownloadManager.stats()
+        self.assertEqual((stats["submitted"], stats["completed"], stats["failed"]), (3, 1, 2))
+        await MediaDownloadManager.drain()
+
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 2)
+    async def test_context_is_copied_on_submit(self):
+        seen = []
+
+        async def job():
+            seen.append(crawler_type_var.get())
+
+        token = crawler_type_var.set("creator")
+        try:
+            await MediaDownloadManager.submit("https://cdn-a.test/0.jpg", job)
+        finally:
+            crawler_type_var.reset(token)
+        await MediaDownloadManager.drain()
+        self.assertEqual(seen, ["creator"])
+
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 0)
+    async def test_zero_workers_downloads_inline(self):
+        cdn = FakeCdn()
+        await MediaDownloadManager.submit("https://cdn-a.test/0.jpg", cdn.save, "https://cdn-a.test/0.jpg", "0.jpg")
+        self.assertEqual(cdn.saved, ["0.jpg"])
+
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 1)
+    async def test_cancel_all_drops_queued_jobs(self):
+        cdn = FakeCdn(delay=1)
+        for i in range(3):
+            await MediaDownloadManager.submit("https://cdn-a.test/x.jpg", cdn.save, "https://cdn-a.test/x.jpg", str(i))
+        await asyncio.sleep(0.05)
+        await MediaDownloadManager.cancel_all()
+        self.assertEqual(cdn.saved, [])
+        self.assertEqual(MediaDownloadManager.queue_depth(), 0)
+
+
+async def _crawl(notes: int, images: int, metadata_delay: float, cdn: FakeCdn) -> float:
+    """
+    模拟采集：每条帖子先请求详情和评论，再提交图片下载，返回帖子和评论采集完成的耗时
+    """
+    start = time.perf_counter()
+    for note in range(notes):
+        await asyncio.sleep(metadata_delay)
+        for image in range(images):
+            url = f"https://cdn-{'ab'[image % 2]}.test/{note}/{image}.jpg"
+            await MediaDownloadManager.submit(url, cdn.save, url, f"{note}_{image}")
+    return time.perf_counter() - start
+
+
+async def _benchmark():
+    notes, images, metadata_delay, image_delay = 20, 4, 0.05, 0.1
+    with patch("config.MEDIA_DOWNLOAD_HOST_JITTER_SEC", 0):
+        results = {}
+        for workers in (0, 4):
+            with patch("config.MEDIA_DOWNLOAD_WORKERS", workers):
+                start = time.perf_counter()
+                metadata_cost = await _crawl(notes, images, metadata_delay, FakeCdn(image_delay))
+                await MediaDownloadManager.drain()
+                results[workers] = (metadata_cost, time.perf_counter() - start)
+
+    print(f"{notes} notes x {images} images, metadata {metadata_delay}s/note, image {image_delay}s")
+    for workers, (metadata_cost, total_cost) in results.items():
+        label = "inline      " if workers == 0 else f"{workers} workers   "
+        print(f"{label}: notes and comments done in {metadata_cost:.2f}s, all media done in {total_cost:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
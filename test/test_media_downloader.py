@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_media_downloader.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+# -*- coding: utf-8 -*-
+# @Desc    : 媒体流式下载测试
+#            python -m test.test_media_downloader 对比整包读入内存与流式写盘的内存峰值
+import asyncio
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from store.xhs.xhs_store_media import XiaoHongShuImage
+from tools.media_downloader import PART_SUFFIX, MediaSource, _progress_logger, save_media, stream_download
+
+PAYLOAD = bytes(range(256)) * 64  # 16KB
+
+
+class _ChunkStream(httpx.AsyncByteStream):
+    """
+    按块返回内容，fail_after 不为 None 时在输出这么多字节后模拟连接中断
+    """
+
+    def __init__(self, data: bytes, chunk_size: int = 1024, fail_after: int = None):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.fail_after = fail_after
+
+    async def __aiter__(self):
+        for start in range(0, len(self.data), self.chunk_size):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise httpx.ReadError("connection reset")
+            yield self.data[start:start + self.chunk_size]
+
+
+class _StreamingTransport(httpx.AsyncBaseTransport):
+    """
+    httpx.MockTransport 会先把响应整个读完，这里直接返回未读取的流，才能模拟下载到一半时断开
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return self.handler(request)
+
+
+class FakeMediaServer:
+    """
+    支持 Range 请求的假媒体服务，记录每次请求的 Range 头
+    """
+
+    def __init__(self, data: bytes, support_range: bool = True, fail_first_after: int = None, status_code: int = 200):
+        self.data = data
+        self.support_range = support_range
+        self.fail_first_after = fail_first_after
+        self.status_code = status_code
+        self.ranges = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("range")
+        self.ranges.append(range_header)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+        fail_after, self.fail_first_after = self.fail_first_after, None
+        if range_header and self.support_range:
+            start = int(re.match(r"bytes=(\d+)-", range_header).group(1))
+            if start >= len(self.data):
+                return httpx.Response(416)
+            body = self.data[start:]
+            headers = {
+                "content-length": str(len(body)),
+                "content-range": f"bytes {start}-{len(self.data) - 1}/{len(self.data)}",
+            }
+            return httpx.Response(206, headers=headers, stream=_ChunkStream(body, fail_after=fail_after))
+        headers = {"content-length": str(len(self.data))}
+        return httpx.Response(200, headers=headers, stream=_ChunkStream(self.data, fail_after=fail_after))
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=_StreamingTransport(self.handler))
+
+
+@patch("config.MEDIA_DOWNLOAD_RETRY_BACKOFF_SEC", 0)
+@patch("config.MEDIA_DOWNLOAD_CHUNK_SIZE", 1024)
+class TestStreamDownload(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.save_path = os.path.join(self.tmpdir.name, "video.mp4")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _read(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    async def test_stream_to_part_then_rename(self):
+        server = FakeMediaServer(PAYLOAD)
+        reports = []
+        async with server.client() as client:
+            result = await stream_download(client, "https://media.test/v.mp4", self.save_path,
+                                           progress=lambda written, total: reports.append((written, total)))
+        self.assertEqual(self._read(self.save_path), PAYLOAD)
+        self.assertFalse(os.path.exists(self.save_path + PART_SUFFIX))
+        self.assertEqual((result.bytes_written, result.total_bytes, result.resumed_from), (len(PAYLOAD), len(PAYLOAD), 0))
+        self.assertEqual(server.ranges, [None])
+        self.assertEqual(reports[-1], (len(PAYLOAD), len(PAYLOAD)))
+        self.assertEqual(len(reports), len(PAYLOAD) // 1024)
+
+    async def test_resume_with_range_after_interruption(self):
+        server = FakeMediaServer(PAYLOAD, fail_first_after=5 * 1024)
+        async with server.client() as client:
+            result = await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertEqual(self._read(self.save_path), PAYLOAD)
+        self.assertEqual(server.ranges, [None, "bytes=5120-"])
+        self.assertEqual(result.resumed_from, 5 * 1024)
+
+    async def test_resume_from_existing_part_file(self):
+        with open(self.save_path + PART_SUFFIX, "wb") as f:
+            f.write(PAYLOAD[:3000])
+        server = FakeMediaServer(PAYLOAD)
+        async with server.client() as client:
+            await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertEqual(self._read(self.save_path), PAYLOAD)
+        self.assertEqual(server.ranges, ["bytes=3000-"])
+
+    async def test_restart_when_range_not_supported(self):
+        with open(self.save_path + PART_SUFFIX, "wb") as f:
+            f.write(b"x" * 3000)
+        server = FakeMediaServer(PAYLOAD, support_range=False)
+        async with server.client() as client:
+            result = await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertEqual(self._read(self.save_path), PAYLOAD)
+        self.assertEqual(result.resumed_from, 0)
+
+    async def test_restart_when_range_not_satisfiable(self):
+        with open(self.save_path + PART_SUFFIX, "wb") as f:
+            f.write(b"x" * (len(PAYLOAD) + 10))
+        server = FakeMediaServer(PAYLOAD)
+        async with server.client() as client:
+            await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertEqual(self._read(self.save_path), PAYLOAD)
+        self.assertEqual(server.ranges, [f"bytes={len(PAYLOAD) + 10}-", None])
+
+    @patch("config.MEDIA_DOWNLOAD_MAX_RETRIES", 3)
+    async def test_client_error_is_not_retried(self):
+        server = FakeMediaServer(PAYLOAD, status_code=403)
+        async with server.client() as client:
+            result = await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertIsNone(result)
+        self.assertEqual(len(server.ranges), 1)
+        self.assertFalse(os.path.exists(self.save_path))
+
+    @patch("config.MEDIA_DOWNLOAD_MAX_RETRIES", 1)
+    async def test_keep_part_file_when_retries_exhausted(self):
+        server = FakeMediaServer(PAYLOAD, fail_first_after=4 * 1024)
+        server_handler = server.handler
+
+        def always_fail(request):
+            server.fail_first_after = 4 * 1024 + len(server.ranges) * 1024
+            return server_handler(request)
+
+        async with httpx.AsyncClient(transport=_StreamingTransport(always_fail)) as client:
+            result = await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertIsNone(result)
+        self.assertFalse(os.path.exists(self.save_path))
+        self.assertEqual(os.path.getsize(self.save_path + PART_SUFFIX), 4 * 1024 + 5 * 1024)
+
+
+    @patch("config.MEDIA_DOWNLOAD_MAX_RETRIES", 3)
+    async def test_retry_backs_off_exponentially(self):
+        server = FakeMediaServer(PAYLOAD, status_code=503)
+        # 类上的 patch 最后生效，退避时间在这里单独设置
+        with patch("config.MEDIA_DOWNLOAD_RETRY_BACKOFF_SEC", 0.5), patch("tools.media_downloader.asyncio") as mock_asyncio:
+            mock_asyncio.sleep = AsyncMock()
+            async with server.client() as client:
+                result = await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertIsNone(result)
+        self.assertEqual(len(server.ranges), 4)
+        self.assertEqual([c.args[0] for c in mock_asyncio.sleep.call_args_list], [0.5, 1.0, 2.0])
+
+    @patch("config.MEDIA_DOWNLOAD_MAX_RETRIES", 0)
+    async def test_range_not_satisfiable_is_not_counted_as_attempt(self):
+        with open(self.save_path + PART_SUFFIX, "wb") as f:
+            f.write(b"x" * (len(PAYLOAD) + 10))
+        server = FakeMediaServer(PAYLOAD)
+        async with server.client() as client:
+            result = await stream_download(client, "https://media.test/v.mp4", self.save_path)
+        self.assertIsNotNone(result)
+        self.assertEqual(self._read(self.save_path), PAYLOAD)
+
+    @patch("config.MEDIA_DOWNLOAD_PROGRESS_LOG_BYTES", 1024)
+    async def test_progress_log_restarts_with_download(self):
+        with patch("tools.media_downloader.utils") as mock_utils:
+            mock_utils.logger = MagicMock()
+            report = _progress_logger(self.save_path)
+            report(2500, None)
+            # 从头重新下载后，进度日志同样从头开始输出
+            report(100, None)
+            report(1100, None)
+            report(2100, None)
+        self.assertEqual(mock_utils.logger.info.call_count, 3)
+
+class TestSaveMedia(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_save_bytes_and_source(self):
+        bytes_path = os.path.join(self.tmpdir.name, "a.jpg")
+        self.assertTrue(await save_media(PAYLOAD, bytes_path))
+        self.assertFalse(os.path.exists(bytes_path + PART_SUFFIX))
+        self.assertFalse(await save_media(None, bytes_path + ".none"))
+
+        server = FakeMediaServer(PAYLOAD)
+        async with server.client() as client:
+            source = MediaSource("https://media.test/b.jpg", lambda url, path: stream_download(client, url, path))
+            source_path = os.path.join(self.tmpdir.name, "b.jpg")
+            self.assertTrue(await save_media(source, source_path))
+        with open(source_path, "rb") as f:
+            self.assertEqual(f.read(), PAYLOAD)
+
+    async def test_store_reports_download_failure(self):
+        store = XiaoHongShuImage()
+        store.image_store_path = self.tmpdir.name
+        server = FakeMediaServer(PAYLOAD, status_code=404)
+        async with server.client() as client:
+            source = MediaSource("https://media.test/c.jpg", lambda url, path: stream_download(client, url, path))
+            saved = await store.store_image({"notice_id": "n1", "pic_content": source, "extension_file_name": "0.jpg"})
+        self.assertFalse(saved)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "n1", "0.jpg")))
+
+
+async def _benchmark():
+    size = 64 * 1024 * 1024
+    chunk = os.urandom(256 * 1024)
+
+    class _LazyStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for _ in range(size // len(chunk)):
+                yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-length": str(size)}, stream=_LazyStream())
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        async with httpx.AsyncClient(transport=_StreamingTransport(handler)) as client:
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = await client.get("https://media.test/big.mp4")
+            content = response.content
+            assert await save_media(content, os.path.join(tmpdir, "buffered.mp4"))
+            buffered = (time.perf_counter() - start, tracemalloc.get_traced_memory()[1])
+            del response, content
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            assert await stream_download(client, "https://media.test/big.mp4", os.path.join(tmpdir, "stream.mp4"),
+                                         progress=lambda written, total: None)
+            streamed = (time.perf_counter() - start, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    print(f"download {size // 1024 // 1024}MB")
+    print(f"buffered : {buffered[0]:.2f}s, peak memory {buffered[1] / 1024 / 1024:.1f}MB")
+    print(f"streaming: {streamed[0]:.2f}s, peak memory {streamed[1] / 1024 / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_media_store.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+# -*- coding: utf-8 -*-
+# @Desc    : 按内容寻址的媒体存储测试
+#            python -m test.test_media_store 对比重复采集时开启去重前后的下载次数和耗时
+import asyncio
+import os
+import tempfile
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from tools.media_download_manager import MediaDownloadManager
+from tools.media_downloader import MediaSource, save_media
+from tools.media_store import MediaStore
+
+
+class FakeDownloader:
+    """
+    按 url 返回固定内容，记录真正发起下载的 url
+    """
+
+    def __init__(self, contents: dict, delay: float = 0):
+        self.contents = contents
+        self.delay = delay
+        self.requested = []
+
+    async def download(self, url: str, save_path: str):
+        self.requested.append(url)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        content = self.contents.get(url.split("?")[0])
+        if content is None:
+            return None
+        with open(save_path, "wb") as f:
+            f.write(content)
+        return save_path
+
+
+class TestMediaStore(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmpdir.name, "data")
+        os.makedirs(self.data_dir)
+        self.patchers = [
+            patch("config.ENABLE_MEDIA_STORE", True),
+            patch("config.MEDIA_STORE_PATH", os.path.join(self.tmpdir.name, "media_store")),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    async def asyncTearDown(self):
+        await MediaStore.close_all()
+        for patcher in self.patchers:
+            patcher.stop()
+        self.tmpdir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+
+    def _blobs(self):
+        blob_dir = MediaStore.get_instance().blob_dir
+        return sorted(name for _, _, files in os.walk(blob_dir) for name in files)
+
+    async def test_repeat_url_is_linked_without_download(self):
+        downloader = FakeDownloader({"https://cdn.test/a.jpg": b"aaa"})
+        source = MediaSource("https://cdn.test/a.jpg", downloader.download)
+        self.assertTrue(await save_media(source, self._path("0.jpg")))
+        self.assertTrue(await save_media(source, self._path("1.jpg")))
+
+        self.assertEqual(downloader.requested, ["https://cdn.test/a.jpg"])
+        self.assertTrue(os.path.samefile(self._path("0.jpg"), self._path("1.jpg")))
+        with open(self._path("1.jpg"), "rb") as f:
+            self.assertEqual(f.read(), b"aaa")
+        self.assertEqual(len(self._blobs()), 1)
+
+    async def test_index_persists_across_runs(self):
+        downloader = FakeDownloader({"https://cdn.test/a.jpg": b"aaa"})
+        await save_media(MediaSource("https://cdn.test/a.jpg", downloader.download), self._path("0.jpg"))
+        await MediaStore.close_all()
+
+        self.assertTrue(await MediaStore.is_cached("https://cdn.test/a.jpg"))
+        os.remove(self._path("0.jpg"))
+        await save_media(MediaSource("https://cdn.test/a.jpg", downloader.download), self._path("0.jpg"))
+        self.assertEqual(len(downloader.requested), 1)
+        self.assertTrue(os.path.exists(self._path("0.jpg")))
+
+    async def test_same_content_from_different_urls_is_stored_once(self):
+        downloader = FakeDownloader({"https://cdn-a.test/x.jpg": b"same", "https://cdn-b.test/y.jpg": b"same"})
+        await save_media(MediaSource("https://cdn-a.test/x.jpg", downloader.download), self._path("a.jpg"))
+        await save_media(MediaSource("https://cdn-b.test/y.jpg", downloader.download), self._path("b.jpg"))
+        self.assertEqual(len(downloader.requested), 2)
+        self.assertEqual(len(self._blobs()), 1)
+        self.assertTrue(os.path.samefile(self._path("a.jpg"), self._path("b.jpg")))
+
+    async def test_missing_blob_is_downloaded_again(self):
+        downloader = FakeDownloader({"https://cdn.test/a.jpg": b"aaa"})
+        source = MediaSource("https://cdn.test/a.jpg", downloader.download)
+        await save_media(source, self._path("0.jpg"))
+        blob = await MediaStore.get_instance().lookup(source.url)
+        os.remove(blob)
+        os.remove(self._path("0.jpg"))
+
+        self.assertFalse(await MediaStore.is_cached(source.url))
+        self.assertTrue(await save_media(source, self._path("0.jpg")))
+        self.assertEqual(len(downloader.requested), 2)
+
+    async def test_failed_download_is_not_indexed(self):
+        downloader = FakeDownloader({})
+        self.assertFalse(await save_media(MediaSource("https://cdn.test/404.jpg", downloader.download), self._path("0.jpg")))
+        self.assertFalse(await MediaStore.is_cached("https://cdn.test/404.jpg"))
+        self.assertEqual(self._blobs(), [])
+
+    @patch("config.MEDIA_STORE_IGNORE_URL_QUERY", True)
+    async def test_ignore_url_query(self):
+        downloader = FakeDownloader({"https://cdn.test/a.jpg": b"aaa"})
+        await save_media(MediaSource("https://cdn.test/a.jpg?sign=1&t=1", downloader.download), self._path("0.jpg"))
+        self.assertTrue(await MediaStore.is_cached("https://cdn.test/a.jpg?sign=2&t=2"))
+
+    @patch("config.MEDIA_STORE_LINK_MODE", "symlink")
+    async def test_symlink_mode(self):
+        downloader = FakeDownloader({"https://cdn.test/a.jpg": b"aaa"})
+        await save_media(MediaSource("https://cdn.test/a.jpg", downloader.download), self._path("0.jpg"))
+        self.assertTrue(os.path.islink(self._path("0.jpg")))
+        with open(self._path("0.jpg"), "rb") as f:
+            self.assertEqual(f.read(), b"aaa")
+
+    async def test_bytes_are_deduplicated(self):
+        self.assertTrue(await save_media(b"bbb", self._path("0.jpg")))
+        self.assertTrue(await save_media(b"bbb", self._path("1.jpg")))
+        self.assertEqual(len(self._blobs()), 1)
+        self.assertTrue(os.path.samefile(self._path("0.jpg"), self._path("1.jpg")))
+
+    @patch("config.MEDIA_DOWNLOAD_HOST_JITTER_SEC", 0)
+    @patch("config.MEDIA_DOWNLOAD_WORKERS", 2)
+    async def test_cached_url_skips_download_queue(self):
+        downloader = FakeDownloader({"https://cdn.test/a.jpg": b"aaa"})
+        await save_media(MediaSource("https://cdn.test/a.jpg", downloader.download), self._path("0.jpg"))
+
+        MediaDownloadManager._reset()
+        source = MediaSource("https://cdn.test/a.jpg", downloader.download)
+        await MediaDownloadManager.submit(source.url, save_media, source, self._path("1.jpg"))
+        # 命中索引时直接在调用处创建链接，不启动下载队列
+        self.assertIsNone(MediaDownloadManager._queue)
+        self.assertEqual(MediaDownloadManager.stats()["cached"], 1)
+        self.assertTrue(os.path.exists(self._path("1.jpg")))
+        self.assertEqual(len(downloader.requested), 1)
+        MediaDownloadManager._reset()
+
+
+async def _crawl(downloader: FakeDownloader, urls, data_dir: str) -> float:
+    start = time.perf_counter()
+    for i, url in enumerate(urls):
+        await save_media(MediaSource(url, downloader.download), os.path.join(data_dir, f"{i}.jpg"))
+    return time.perf_counter() - start
+
+
+async def _benchmark():
+    count, delay = 50, 0.02
+    urls = [f"https://cdn.test/{i}.jpg" for i in range(count)]
+    contents = {url: os.urandom(64 * 1024) for url in urls}
+    print(f"repeat crawl of {count} images, {delay}s per download")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for enabled in (False, True):
+            with patch("config.ENABLE_MEDIA_STORE", enabled), \
+                    patch("config.MEDIA_STORE_PATH", os.path.join(tmpdir, f"media_store_{enabled}")):
+                downloader = FakeDownloader(contents, delay)
+                costs = []
+                for run in range(2):
+                    data_dir = os.path.join(tmpdir, f"run_{enabled}_{run}")
+                    os.makedirs(data_dir)
+                    costs.append(await _crawl(downloader, urls, data_dir))
+                await MediaStore.close_all()
+            label = "media store" if enabled else "plain      "
+            print(f"{label}: first run {costs[0]:.2f}s, second run {costs[1]:.2f}s, "
+                  f"downloads {len(downloader.requested)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_page_pool.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 页面池与抖音详情页并发获取测试，使用假的 BrowserContext/Page
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from media_platform.douyin.client import DouYinClient
+from media_platform.douyin.exception import DataFetchError
+from media_platform.tieba.client import BaiduTieBaClient
+from tools.cdp_browser import PagePool
+
+
+class FakeResponse:
+
+    def __init__(self, url: str, aweme_id: str):
+        self.url = url
+        self.status = 200
+        self._aweme_id = aweme_id
+
+    async def json(self):
+        return {"aweme_detail": {"aweme_id": self._aweme_id}}
+
+
+class FakeResponseInfo:
+
+    def __init__(self):
+        self.future = asyncio.get_running_loop().create_future()
+
+    @property
+    def value(self):
+        return self.future
+
+
+class FakePage:
+    """goto 后经过 delay 秒触发详情接口响应，记录当前挂着的监听数"""
+
+    def __init__(self, delay: float = 0.05, respond: bool = True):
+        self.delay = delay
+        self.respond = respond
+        self.waiters = []
+        self.closed = False
+        self.title_text = "抖音"
+        self.visited = []
+        self.handlers = {}
+        self.hang = False
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def crash(self):
+        for handler in self.handlers.get("crash", []):
+            handler(self)
+
+    def is_closed(self):
+        return self.closed
+
+    async def evaluate(self, expression, arg=None):
+        if self.hang:
+            await asyncio.sleep(10)
+        return 1
+
+    @asynccontextmanager
+    async def expect_response(self, predicate, timeout=None):
+        info = FakeResponseInfo()
+        self.waiters.append((predicate, info))
+        try:
+            yield info
+            try:
+                await asyncio.wait_for(asyncio.shield(info.future), timeout=timeout / 1000)
+            except asyncio.TimeoutError:
+                raise PlaywrightTimeoutError("Timeout")
+        finally:
+            self.waiters.remove((predicate, info))
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.visited.append(url)
+        aweme_id = url.rsplit("/", 1)[1]
+        if self.respond and "/video/" in url:
+            asyncio.get_running_loop().call_later(self.delay, self._emit, aweme_id)
+
+    def _emit(self, aweme_id: str):
+        response = FakeResponse(f"https://www.douyin.com/aweme/v1/web/aweme/detail/?aweme_id={aweme_id}", aweme_id)
+        for predicate, info in list(self.waiters):
+            if predicate(response) and not info.future.done():
+                info.future.set_result(response)
+
+    async def title(self):
+        return self.title_text
+
+    async def content(self):
+        return f"<html>{self.visited[-1]}</html>"
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowserContext:
+
+    def __init__(self, **page_kwargs):
+        self.pages = []
+        self.page_kwargs = page_kwargs
+        self.fail_goto = 0
+
+    async def new_page(self):
+        page = FakePage(**self.page_kwargs)
+        if self.fail_goto:
+            self.fail_goto -= 1
+
+            async def broken_goto(*args, **kwargs):
+                raise PlaywrightTimeoutError("Timeout")
+
+            page.goto = broken_goto
+        self.pages.append(page)
+        return page
+
+
+class TestPagePool(IsolatedAsyncioTestCase):
+
+    async def test_pages_created_lazily_up_to_size(self):
+        context = FakeBrowserContext()
+        pool = PagePool(context, size=2)
+
+        async def use():
+            async with pool.lease():
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[use() for _ in range(6)])
+
+        self.assertEqual(len(context.pages), 2)
+
+    async def test_lease_is_exclusive(self):
+        pool = PagePool(FakeBrowserContext(), size=1)
+        async with pool.lease() as first:
+            waiter = asyncio.create_task(self._lease_once(pool))
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiter.done())
+        self.assertIs(await waiter, first)
+
+    async def test_close(self):
+        context = FakeBrowserContext()
+        pool = PagePool(context, size=1)
+        async with pool.lease():
+            pass
+        await pool.close()
+        self.assertTrue(context.pages[0].closed)
+        with self.assertRaises(RuntimeError):
+            async with pool.lease():
+                pass
+
+    async def test_start_preopens_pages_on_origin(self):
+        context = FakeBrowserContext()
+        pool = await PagePool(context, size=3, origin_url="https://www.douyin.com").start()
+
+        self.assertEqual(len(context.pages), 3)
+        self.assertTrue(all(page.visited == ["https://www.douyin.com"] for page in context.pages))
+
+    async def test_crashed_page_is_replaced(self):
+        context = FakeBrowserContext()
+        pool = await PagePool(context, size=1, origin_url="https://www.douyin.com").start()
+
+        async with pool.lease() as page:
+            page.crash()
+        async with pool.lease() as replacement:
+            self.assertIsNot(replacement, page)
+        self.assertTrue(page.closed)
+
+        # 空闲时被关闭的页面在借出时替换
+        replacement.closed = True
+        async with pool.lease() as third:
+            self.assertFalse(third.closed)
+        self.assertEqual(len(context.pages), 3)
+
+    async def test_health_check_replaces_unresponsive_page(self):
+        context = FakeBrowserContext()
+        pool = await PagePool(context, size=2).start()
+        context.pages[0].hang = True
+
+        self.assertEqual(await pool.health_check(timeout=0.05), 1)
+        self.assertTrue(context.pages[0].closed)
+        self.assertEqual(len(context.pages), 3)
+
+    async def test_failed_page_setup_returns_slot(self):
+        context = FakeBrowserContext()
+        context.fail_goto = 1
+        pool = PagePool(context, size=1, origin_url="https://www.douyin.com")
+
+        with self.assertRaises(PlaywrightTimeoutError):
+            async with pool.lease():
+                pass
+        self.assertTrue(context.pages[0].closed)
+        # 名额已归还，下一次借用可以正常创建页面
+        page = await asyncio.wait_for(self._lease_once(pool), timeout=1)
+        self.assertIs(page, context.pages[1])
+
+    async def test_waiter_not_blocked_when_replacement_fails(self):
+        context = FakeBrowserContext()
+        pool = await PagePool(context, size=1, origin_url="https://www.douyin.com").start()
+
+        async with pool.lease() as page:
+            waiter = asyncio.create_task(self._lease_once(pool))
+            await asyncio.sleep(0.01)
+            page.crash()
+            context.fail_goto = 1
+        # 第一次重建失败时错误抛给等待的借用方，之后的借用恢复正常
+        with self.assertRaises(PlaywrightTimeoutError):
+            await asyncio.wait_for(waiter, timeout=1)
+        self.assertFalse((await asyncio.wait_for(self._lease_once(pool), timeout=1)).closed)
+
+    @patch("config.BROWSER_PAGE_POOL_HEALTH_CHECK_SEC", 0.01)
+    async def test_stale_idle_page_is_probed_on_acquire(self):
+        context = FakeBrowserContext()
+        pool = await PagePool(context, size=1).start()
+        pool.PROBE_TIMEOUT_SEC = 0.05
+        context.pages[0].hang = True
+        await asyncio.sleep(0.02)
+
+        page = await self._lease_once(pool)
+        self.assertIsNot(page, context.pages[0])
+        self.assertTrue(context.pages[0].closed)
+
+    @staticmethod
+    async def _lease_once(pool: PagePool):
+        async with pool.lease() as page:
+            return page
+
+
+class TestDouyinDetailOverPagePool(IsolatedAsyncioTestCase):
+
+    def _make_client(self, context: FakeBrowserContext, size: int) -> DouYinClient:
+        return DouYinClient(
+            headers={}, playwright_page=FakePage(), cookie_dict={}, page_pool=PagePool(context, size=size)
+        )
+
+    async def test_detail_throughput_scales_with_pool_size(self):
+        elapsed = {}
+        for size in (1, 4):
+            client = self._make_client(FakeBrowserContext(delay=0.05), size)
+            start = time.perf_counter()
+            results = await asyncio.gather(*[client.get_video_by_id(str(i)) for i in range(8)])
+            elapsed[size] = time.perf_counter() - start
+            self.assertEqual([r["aweme_id"] for r in results], [str(i) for i in range(8)])
+        self.assertLess(elapsed[4], elapsed[1] / 2)
+
+    async def test_listeners_are_detached(self):
+        context = FakeBrowserContext(delay=0.01)
+        client = self._make_client(context, 1)
+
+        for i in range(5):
+            await client.get_video_by_id(str(i))
+
+        self.assertEqual(context.pages[0].waiters, [])
+
+    async def test_timeout_raises_data_fetch_error(self):
+        context = FakeBrowserContext(respond=False)
+        client = self._make_client(context, 1)
+        client.DETAIL_RESPONSE_TIMEOUT_MS = 50
+
+        with self.assertRaises(DataFetchError):
+            await client.get_video_by_id("1")
+        self.assertEqual(context.pages[0].waiters, [])
+
+
+class TestTiebaClientPagePool(IsolatedAsyncioTestCase):
+
+    async def _fetch_all(self, client: BaiduTieBaClient) -> float:
+        start = time.perf_counter()
+        with patch("config.CRAWLER_MAX_SLEEP_SEC", 0.05):
+            contents = await asyncio.gather(*[
+                client._fetch_page_content(f"https://tieba.baidu.com/p/{i}") for i in range(4)
+            ])
+        self.assertEqual(contents, [f"<html>https://tieba.baidu.com/p/{i}</html>" for i in range(4)])
+        return time.perf_counter() - start
+
+    async def test_pages_fetched_concurrently_with_pool(self):
+        client = BaiduTieBaClient(page_pool=PagePool(FakeBrowserContext(), size=4))
+        self.assertLess(await self._fetch_all(client), 0.15)
+
+    async def test_shared_page_is_not_used_concurrently(self):
+        client = BaiduTieBaClient(playwright_page=FakePage())
+        self.assertGreaterEqual(await self._fetch_all(client), 0.2)
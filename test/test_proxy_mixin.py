@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_proxy_mixin.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : ProxyRefreshMixin 连接池测试，使用本地 mock 服务统计 TCP 连接数
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from proxy.proxy_mixin import ProxyRefreshMixin
+from proxy.types import IpInfoModel
+
+
+class LocalHttpServer:
+    """最简单的 HTTP/1.1 keep-alive 服务，记录建立过的连接数"""
+
+    def __init__(self):
+        self.connections = 0
+        self.delay = 0
+        self.server = None
+        self.port = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_head = await reader.readuntil(b"\r\n\r\n")
+                if not request_head:
+                    break
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                body = b'{"success": true}'
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Set-Cookie: server_cookie=1\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+class DemoClient(ProxyRefreshMixin):
+    def __init__(self, proxy=None):
+        self.proxy = proxy
+
+    async def get(self, url: str) -> httpx.Response:
+        await self._refresh_proxy_if_expired()
+        return await self.get_http_client().get(url)
+
+
+class TestProxyMixinHttpClient(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = LocalHttpServer()
+        await self.server.start()
+        self.url = f"http://127.0.0.1:{self.server.port}/api"
+
+    async def asyncTearDown(self):
+        await ProxyRefreshMixin.close_all_http_clients()
+        await self.server.stop()
+
+    async def test_connection_reused(self):
+        """同一个 client 的连续请求复用一条 TCP 连接"""
+        client = DemoClient()
+        for _ in range(20):
+            response = await client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.connections, 1)
+
+    async def test_cookies_not_persisted(self):
+        """服务端下发的 Set-Cookie 不会被带到后续请求中"""
+        client = DemoClient()
+        await client.get(self.url)
+        self.assertEqual(len(client.get_http_client().cookies.jar), 0)
+
+    async def test_rebuild_on_proxy_refresh(self):
+        """代理刷新后自动换新的连接池，旧连接池在关闭时统一释放"""
+        client = DemoClient(proxy="http://127.0.0.1:1")
+        old_http_client = client.get_http_client()
+
+        pool = MagicMock()
+        pool.is_current_proxy_expired.return_value = True
+        pool.get_or_refresh_proxy = AsyncMock(return_value=IpInfoModel(
+            ip="127.0.0.2", port=8888, user="", password="", protocol="http://",
+            expired_time_ts=int(time.time()) + 60,
+        ))
+        client.init_proxy_pool(pool)
+        await client._refresh_proxy_if_expired()
+
+        new_http_client = client.get_http_client()
+        self.assertIsNot(new_http_client, old_http_client)
+        self.assertEqual(client.proxy, "http://127.0.0.2:8888")
+        self.assertFalse(old_http_client.is_closed)
+
+        await client.close_http_client()
+        self.assertTrue(old_http_client.is_closed)
+        self.assertTrue(new_http_client.is_closed)
+
+    @patch("proxy.proxy_mixin._RETIRED_CLIENT_POLL_SEC", 0.02)
+    @patch("config.HTTPX_RETIRED_CLIENT_GRACE_SEC", 0.05)
+    async def test_retired_client_closed_after_inflight_requests(self):
+        """旧连接池在宽限期后、正在进行的请求结束时关闭，并从 retired 列表中移除"""
+        client = DemoClient()
+        old_http_client = client.get_http_client()
+        self.server.delay = 0.3
+        inflight = asyncio.create_task(old_http_client.get(self.url))
+        await asyncio.sleep(0.05)
+
+        client.proxy = "http://127.0.0.1:1"
+        self.assertIsNot(client.get_http_client(), old_http_client)
+        await asyncio.sleep(0.15)
+        self.assertFalse(old_http_client.is_closed)
+
+        self.assertEqual((await inflight).status_code, 200)
+        await asyncio.sleep(0.1)
+        self.assertTrue(old_http_client.is_closed)
+        self.assertEqual(client._retired_http_clients, [])
+
+    async def test_pooled_faster_than_per_request_client(self):
+        """对比每次新建 AsyncClient，连接池减少了建连开销（仅打印耗时，不做断言）"""
+        rounds = 50
+        start = time.perf_counter()
+        for _ in range(rounds):
+            async with httpx.AsyncClient() as fresh_client:
+                await fresh_client.get(self.url)
+        per_request = time.perf_counter() - start
+        fresh_connections = self.server.connections
+
+        client = DemoClient()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await client.get(self.url)
+        pooled = time.perf_counter() - start
+
+        print(f"\nper-request client: {per_request * 1000 / rounds:.2f}ms/req, pooled client: {pooled * 1000 / rounds:.2f}ms/req")
+        self.assertEqual(fresh_connections, rounds)
+        self.assertEqual(self.server.connections - fresh_connections, 1)
+
+
+class TestTiebaClientHttp(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = LocalHttpServer()
+        await self.server.start()
+        self.url = f"http://127.0.0.1:{self.server.port}/api"
+
+    async def asyncTearDown(self):
+        await ProxyRefreshMixin.close_all_http_clients()
+        await self.server.stop()
+
+    async def test_async_path_reuses_connection(self):
+        """贴吧 API 请求默认走 httpx 连接池"""
+        from media_platform.tieba.client import BaiduTieBaClient
+
+        client = BaiduTieBaClient(headers={"User-Agent": "test", "Cookie": ""})
+        for _ in range(5):
+            self.assertEqual(await client.request("GET", self.url), {"success": True})
+        self.assertEqual(self.server.connections, 1)
+
+    async def test_legacy_requests_path(self):
+        """TIEBA_USE_LEGACY_REQUESTS 打开时仍使用 requests + 线程池"""
+        import config
+        from media_platform.tieba.client import BaiduTieBaClient
+
+        client = BaiduTieBaClient(headers={"User-Agent": "test", "Cookie": ""})
+        legacy = config.TIEBA_USE_LEGACY_REQUESTS
+        config.TIEBA_USE_LEGACY_REQUESTS = True
+        try:
+            self.assertEqual(await client.request("GET", self.url), {"success": True})
+        finally:
+            config.TIEBA_USE_LEGACY_REQUESTS = legacy
+        self.assertIsNone(client._http_client)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_rate_limiter.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 令牌桶限速测试
+#            python -m test.test_rate_limiter 对比固定等待与令牌桶下的实际请求速率
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import config
+from tools.rate_limiter import (RateLimiter, TokenBucket, apply_rate_limit_config, classify_endpoint,
+                                effective_sleep_sec)
+
+
+class TestClassifyEndpoint(IsolatedAsyncioTestCase):
+
+    async def test_classify(self):
+        self.assertEqual(classify_endpoint("https://edith.xiaohongshu.com/api/sns/web/v2/comment/page"), "comment")
+        self.assertEqual(classify_endpoint("https://api.bilibili.com/x/v2/reply/wbi/main"), "comment")
+        self.assertEqual(classify_endpoint("https://www.douyin.com/aweme/v1/web/general/search/single/"), "search")
+        self.assertEqual(classify_endpoint("https://www.kuaishou.com/graphql", hint='{"operationName":"visionSearchPhoto"}'),
+                         "search")
+        self.assertEqual(classify_endpoint("https://edith.xiaohongshu.com/api/sns/web/v1/feed"), "default")
+
+
+class TestTokenBucket(IsolatedAsyncioTestCase):
+
+    async def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 1 / 50, delta=0.005)
+        self.assertAlmostEqual(bucket.reserve(), 2 / 50, delta=0.005)
+
+    async def test_concurrent_acquire_follows_rate(self):
+        bucket = TokenBucket(rate=100, capacity=5)
+        start = time.perf_counter()
+        await asyncio.gather(*[bucket.acquire() for _ in range(25)])
+        cost = time.perf_counter() - start
+        # 前 5 个来自突发容量，剩下 20 个按 100/s 放行
+        self.assertGreaterEqual(cost, 0.18)
+        self.assertLess(cost, 0.5)
+
+    async def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0, capacity=1)
+        self.assertEqual([bucket.reserve() for _ in range(5)], [0] * 5)
+
+
+class TestRateLimiter(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        RateLimiter.reset()
+
+    def tearDown(self):
+        RateLimiter.reset()
+
+    @patch("config.RATE_LIMIT_DEFAULT_BURST", 3)
+    @patch("config.RATE_LIMIT_DEFAULT_RPS", 1.5)
+    @patch("config.RATE_LIMIT_RULES", {"xhs:comment": (4, 8), "xhs": (2, 1)})
+    async def test_rule_precedence(self):
+        self.assertEqual(RateLimiter.get_rule("xhs", "comment"), (4, 8))
+        self.assertEqual(RateLimiter.get_rule("xhs", "search"), (2, 1))
+        self.assertEqual(RateLimiter.get_rule("dy", "search"), (1.5, 3))
+
+    @patch("config.ENABLE_RATE_LIMITER", False)
+    async def test_disabled(self):
+        self.assertEqual(await RateLimiter.acquire("xhs", "https://x/search"), 0)
+        self.assertEqual(RateLimiter._buckets, {})
+
+    @patch("config.RATE_LIMIT_JITTER_SEC", 0)
+    @patch("config.RATE_LIMIT_RULES", {"xhs:search": (20, 1)})
+    @patch("config.ENABLE_RATE_LIMITER", True)
+    async def test_buckets_are_per_platform_and_endpoint(self):
+        await RateLimiter.acquire("xhs", "https://x/api/search/notes")
+        self.assertGreater(await RateLimiter.acquire("xhs", "https://x/api/search/notes"), 0)
+        # 其他接口类别、其他平台不受影响
+        self.assertEqual(await RateLimiter.acquire("xhs", "https://x/api/comment/page"), 0)
+        self.assertEqual(await RateLimiter.acquire("dy", "https://x/api/search"), 0)
+        self.assertIs(RateLimiter.get_bucket("xhs", "search"), RateLimiter.get_bucket("xhs", "search"))
+
+    @patch("config.RATE_LIMIT_JITTER_SEC", 0.05)
+    @patch("config.RATE_LIMIT_RULES", {"xhs": (0, 1)})
+    @patch("config.ENABLE_RATE_LIMITER", True)
+    async def test_jitter(self):
+        wait_seconds = await RateLimiter.acquire("xhs", "https://x/api/feed")
+        self.assertLessEqual(wait_seconds, 0.05)
+
+    @patch("config.CRAWLER_MAX_SLEEP_SEC", 8)
+    async def test_effective_sleep_sec(self):
+        with patch("config.ENABLE_RATE_LIMITER", False):
+            self.assertEqual(effective_sleep_sec(), 8)
+        with patch("config.ENABLE_RATE_LIMITER", True), patch("config.RATE_LIMIT_KEEP_FIXED_SLEEP", True):
+            self.assertEqual(effective_sleep_sec(), 8)
+        with patch("config.ENABLE_RATE_LIMITER", True), patch("config.RATE_LIMIT_KEEP_FIXED_SLEEP", False):
+            self.assertEqual(effective_sleep_sec(), 0)
+
+    @patch("config.RATE_LIMIT_KEEP_FIXED_SLEEP", False)
+    @patch("config.ENABLE_RATE_LIMITER", True)
+    @patch("config.CRAWLER_MAX_SLEEP_SEC", 8)
+    async def test_apply_rate_limit_config_keeps_sleep_config(self):
+        # 贴吧等待页面加载等非限速用途仍读取 CRAWLER_MAX_SLEEP_SEC，这里不能改写配置
+        bucket = RateLimiter.get_bucket("xhs", "search")
+        apply_rate_limit_config()
+        self.assertEqual(config.CRAWLER_MAX_SLEEP_SEC, 8)
+        self.assertIsNot(RateLimiter.get_bucket("xhs", "search"), bucket)
+
+async def _benchmark(requests: int = 60, budget_rps: float = 10, sleep_sec: float = 0.5):
+    """模拟请求耗时 50ms：每个任务固定等待 sleep_sec 与共用 budget_rps 令牌桶时的实际速率"""
+
+    async def fake_request():
+        await asyncio.sleep(0.05)
+
+    async def run(worker, concurrency: int) -> float:
+        remaining = [requests]
+
+        async def consume():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                await worker()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[consume() for _ in range(concurrency)])
+        return requests / (time.perf_counter() - start)
+
+    async def with_fixed_sleep():
+        await fake_request()
+        await asyncio.sleep(sleep_sec)
+
+    for concurrency in (1, 4, 16):
+        bucket = TokenBucket(budget_rps, 1)
+
+        async def with_token_bucket():
+            await bucket.acquire()
+            await fake_request()
+
+        print(f"concurrency {concurrency:>2}: fixed sleep {sleep_sec}s {await run(with_fixed_sleep, concurrency):6.2f} req/s, "
+              f"token bucket {budget_rps}/s {await run(with_token_bucket, concurrency):6.2f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
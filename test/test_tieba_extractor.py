@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_tieba_extractor.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 贴吧 lxml 解析器与 parsel 解析器的一致性测试
+#            python -m test.test_tieba_extractor 对 test_data 中的页面做解析耗时对比
+import os
+import time
+import unittest
+
+from media_platform.tieba.help import TieBaExtractor, TieBaLxmlExtractor
+from model.m_baidu_tieba import TiebaComment
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "media_platform", "tieba", "test_data")
+
+
+def load_test_data(file_name: str) -> str:
+    with open(os.path.join(TEST_DATA_DIR, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+PARENT_COMMENT = TiebaComment(comment_id="123456", content="content", user_link="user_link",
+                              user_nickname="user_nickname", user_avatar="user_avatar",
+                              publish_time="publish_time", parent_comment_id="parent_comment_id",
+                              note_id="note_id", note_url="note_url", tieba_id="tieba_id",
+                              tieba_name="tieba_name", tieba_link="tieba_link")
+
+# (测试页面, 解析方法名, 额外参数)
+EXTRACT_CASES = [
+    ("search_keyword_notes.html", "extract_search_note_list", ()),
+    ("tieba_note_list.html", "extract_tieba_note_list", ()),
+    ("note_detail.html", "extract_note_detail", ()),
+    ("note_comments.html", "extract_tieba_note_parment_comments", ("123456",)),
+    ("note_sub_comments.html", "extract_tieba_note_sub_comments", (PARENT_COMMENT,)),
+]
+
+
+def _dump(result):
+    if isinstance(result, list):
+        return [item.model_dump() for item in result]
+    return result.model_dump()
+
+
+class TestTieBaLxmlExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.parsel_extractor = TieBaExtractor()
+        self.lxml_extractor = TieBaLxmlExtractor()
+
+    def test_same_result_as_parsel(self):
+        for file_name, method, args in EXTRACT_CASES:
+            with self.subTest(method=method):
+                content = load_test_data(file_name)
+                expected = getattr(self.parsel_extractor, method)(content, *args)
+                actual = getattr(self.lxml_extractor, method)(content, *args)
+                self.assertEqual(_dump(actual), _dump(expected))
+                if isinstance(expected, list):
+                    self.assertTrue(expected, f"{file_name} 没有解析出数据")
+
+    def test_page_level_fields_are_shared(self):
+        comments = self.lxml_extractor.extract_tieba_note_parment_comments(load_test_data("note_comments.html"),
+                                                                           "123456")
+
+        self.assertTrue(comments)
+        self.assertEqual({comment.tieba_name for comment in comments}, {"网球风云吧"})
+
+    def test_empty_page(self):
+        self.assertEqual(self.lxml_extractor.extract_search_note_list(""), [])
+        self.assertEqual(self.lxml_extractor.extract_tieba_note_list("<html></html>"), [])
+        self.assertEqual(self.lxml_extractor.extract_tieba_note_sub_comments("", PARENT_COMMENT), [])
+
+
+def _benchmark(rounds: int = 50):
+    extractors = {"parsel": TieBaExtractor(), "lxml": TieBaLxmlExtractor()}
+    for file_name, method, args in EXTRACT_CASES:
+        content = load_test_data(file_name)
+        costs = {}
+        for name, extractor in extractors.items():
+            start = time.perf_counter()
+            for _ in range(rounds):
+                getattr(extractor, method)(content, *args)
+            costs[name] = (time.perf_counter() - start) / rounds * 1000
+        print(f"{method:<40} parsel {costs['parsel']:7.2f}ms  lxml {costs['lxml']:7.2f}ms  "
+              f"x{costs['parsel'] / costs['lxml']:.2f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
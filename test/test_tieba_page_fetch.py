@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_tieba_page_fetch.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 贴吧页面并发抓取测试
+#            python -m test.test_tieba_page_fetch 使用 media_platform/tieba/test_data 搭建本地页面服务，
+#            对比单页面固定等待与页面池并发抓取的耗时（需要已安装 playwright 浏览器）
+import asyncio
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from media_platform.tieba.client import BaiduTieBaClient
+from tools.cdp_browser import PagePool, block_resource_types
+
+TEST_DATA_DIR = os.path.join("media_platform", "tieba", "test_data")
+
+
+class FakePage:
+
+    def __init__(self, ready: bool = True):
+        self.ready = ready
+        self.url = ""
+        self.waited_selectors = []
+
+    def on(self, event, handler):
+        pass
+
+    def is_closed(self):
+        return False
+
+    async def goto(self, url, wait_until=None):
+        self.url = url
+        await asyncio.sleep(0.01)
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        self.waited_selectors.append(selector)
+        if not self.ready:
+            raise PlaywrightTimeoutError("Timeout")
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+
+class FakeBrowserContext:
+
+    def __init__(self, **page_kwargs):
+        self.pages = []
+        self.page_kwargs = page_kwargs
+
+    async def new_page(self):
+        page = FakePage(**self.page_kwargs)
+        self.pages.append(page)
+        return page
+
+
+class FakeRoute:
+
+    def __init__(self, resource_type: str):
+        self.request = type("Request", (), {"resource_type": resource_type})()
+        self.result = None
+
+    async def abort(self):
+        self.result = "abort"
+
+    async def continue_(self):
+        self.result = "continue"
+
+
+class RoutePage:
+
+    def __init__(self):
+        self.handler = None
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+class TestTiebaConcurrentFetch(IsolatedAsyncioTestCase):
+
+    @patch("config.CRAWLER_MAX_SLEEP_SEC", 5)
+    @patch("config.TIEBA_CONCURRENT_FETCH", True)
+    async def test_waits_on_ready_selector_instead_of_fixed_sleep(self):
+        context = FakeBrowserContext()
+        client = BaiduTieBaClient(page_pool=PagePool(context, size=4))
+
+        start = time.perf_counter()
+        contents = await asyncio.gather(*[
+            client._fetch_page_content(f"https://tieba.baidu.com/p/{i}", ready_selector="#j_p_postlist")
+            for i in range(8)
+        ])
+
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(len(context.pages), 4)
+        self.assertEqual(contents[3], "<html>https://tieba.baidu.com/p/3</html>")
+        self.assertTrue(all(page.waited_selectors[0] == "#j_p_postlist" for page in context.pages))
+
+    @patch("config.TIEBA_CONCURRENT_FETCH", True)
+    async def test_ready_timeout_still_returns_content(self):
+        client = BaiduTieBaClient(page_pool=PagePool(FakeBrowserContext(ready=False), size=1))
+
+        content = await client._fetch_page_content("https://tieba.baidu.com/p/1", ready_selector="#j_p_postlist")
+
+        self.assertEqual(content, "<html>https://tieba.baidu.com/p/1</html>")
+
+    @patch("config.CRAWLER_MAX_SLEEP_SEC", 0.05)
+    @patch("config.TIEBA_CONCURRENT_FETCH", False)
+    async def test_legacy_mode_keeps_fixed_sleep(self):
+        page = FakePage()
+        client = BaiduTieBaClient(playwright_page=page)
+
+        start = time.perf_counter()
+        await client._fetch_page_content("https://tieba.baidu.com/p/1", ready_selector="#j_p_postlist")
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        self.assertEqual(page.waited_selectors, [])
+
+    async def test_block_resource_types(self):
+        page = RoutePage()
+        await block_resource_types(["image", "font", "media"])(page)
+
+        results = {}
+        for resource_type in ("image", "font", "media", "document", "script"):
+            route = FakeRoute(resource_type)
+            await page.handler(route)
+            results[resource_type] = route.result
+
+        self.assertEqual(results, {
+            "image": "abort", "font": "abort", "media": "abort", "document": "continue", "script": "continue",
+        })
+
+
+# ---- 本地页面服务基准测试 ----
+
+class _TestDataHandler(SimpleHTTPRequestHandler):
+    """把贴吧的几类页面映射到 test_data 中保存的 HTML"""
+
+    ROUTES = {
+        "/f/search/res": "search_keyword_notes.html",
+        "/f": "tieba_note_list.html",
+        "/p/comment": "note_sub_comments.html",
+        "/p/": "note_detail.html",
+    }
+
+    def translate_path(self, path):
+        path = path.split("?", 1)[0]
+        for prefix, file_name in self.ROUTES.items():
+            if path == prefix or (prefix.endswith("/") and path.startswith(prefix)):
+                return os.path.join(TEST_DATA_DIR, file_name)
+        return super().translate_path(path)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def _benchmark(note_count: int = 20, pool_size: int = 4):
+    import config
+    from playwright.async_api import async_playwright
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_TestDataHandler, directory=TEST_DATA_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{host}/p/{note_id}" for note_id in range(note_count)]
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        context = await browser.new_context()
+
+        # 原方式：单页面 + 固定等待
+        config.TIEBA_CONCURRENT_FETCH = False
+        client = BaiduTieBaClient(playwright_page=await context.new_page())
+        start = time.perf_counter()
+        await asyncio.gather(*[client._fetch_page_content(url) for url in urls])
+        legacy = time.perf_counter() - start
+
+        # 并发方式：页面池 + 屏蔽资源 + 等待列表容器
+        config.TIEBA_CONCURRENT_FETCH = True
+        pool = await PagePool(context, pool_size, page_setup=block_resource_types(config.TIEBA_BLOCKED_RESOURCE_TYPES)).start()
+        client = BaiduTieBaClient(page_pool=pool)
+        start = time.perf_counter()
+        await asyncio.gather(*[client._fetch_page_content(url, ready_selector="#j_p_postlist") for url in urls])
+        concurrent = time.perf_counter() - start
+
+        await browser.close()
+    server.shutdown()
+
+    print(f"single page + {config.CRAWLER_MAX_SLEEP_SEC}s sleep: {note_count / legacy:.2f} pages/s ({legacy:.1f}s)")
+    print(f"page pool ({pool_size}) + ready selector: {note_count / concurrent:.2f} pages/s ({concurrent:.1f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
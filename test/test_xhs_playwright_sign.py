@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_xhs_playwright_sign.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 小红书 playwright 微批签名测试，使用假的 Page 统计 evaluate 调用次数
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from media_platform.xhs.playwright_sign import PlaywrightXhsSigner, _build_xs_common
+
+
+class FakePage:
+    """按 _BATCH_SIGN_JS 的约定返回结果，x3 取 md5 作为签名"""
+
+    def __init__(self, b1: str = "b1-value"):
+        self.b1 = b1
+        self.evaluate_calls = []
+
+    async def evaluate(self, expression, arg=None):
+        items, need_b1 = arg
+        self.evaluate_calls.append((len(items), need_b1))
+        await asyncio.sleep(0.001)
+        return {"b1": self.b1 if need_b1 else None, "x3": [f"mns_{md5}" for _, md5 in items]}
+
+
+class TestPlaywrightXhsSigner(IsolatedAsyncioTestCase):
+
+    async def test_concurrent_requests_share_one_evaluate(self):
+        page = FakePage()
+        signer = PlaywrightXhsSigner(page, batch_window_ms=5, max_batch_size=32)
+
+        results = await asyncio.gather(*[
+            signer.sign("/api/sns/web/v1/search/notes", {"page": i}, a1="a1") for i in range(10)
+        ])
+
+        self.assertEqual(page.evaluate_calls, [(10, True)])
+        self.assertEqual(len({r["x-s"] for r in results}), 10)
+        self.assertTrue(all(r["x-s"].startswith("XYS_") for r in results))
+
+    async def test_max_batch_size_flushes_immediately(self):
+        page = FakePage()
+        signer = PlaywrightXhsSigner(page, batch_window_ms=1000, max_batch_size=4)
+
+        await asyncio.wait_for(
+            asyncio.gather(*[signer.sign("/api/x", {"i": i}, a1="a1") for i in range(8)]), timeout=0.5
+        )
+
+        self.assertEqual([size for size, _ in page.evaluate_calls], [4, 4])
+
+    async def test_b1_is_cached_until_invalidated(self):
+        page = FakePage()
+        signer = PlaywrightXhsSigner(page, batch_window_ms=1)
+
+        first = await signer.sign("/api/x", {"a": 1}, a1="a1")
+        await signer.sign("/api/x", {"a": 2}, a1="a1")
+        self.assertEqual([need_b1 for _, need_b1 in page.evaluate_calls], [True, False])
+
+        page.b1 = "new-b1"
+        signer.invalidate_b1()
+        second = await signer.sign("/api/x", {"a": 3}, a1="a1")
+        self.assertTrue(page.evaluate_calls[-1][1])
+        self.assertEqual(
+            second["x-s-common"], _build_xs_common("a1", "new-b1", second["x-s"], second["x-t"])
+        )
+        self.assertNotEqual(first["x-s-common"], second["x-s-common"])
+
+        # a1 变化（重新登录）时也会重新读取 b1
+        await signer.sign("/api/x", {"a": 4}, a1="other-a1")
+        self.assertTrue(page.evaluate_calls[-1][1])
+
+    async def test_evaluate_error_returns_empty_x3(self):
+        page = FakePage()
+
+        async def broken_evaluate(expression, arg=None):
+            raise RuntimeError("page closed")
+
+        page.evaluate = broken_evaluate
+        signer = PlaywrightXhsSigner(page, batch_window_ms=1)
+
+        result = await signer.sign("/api/x", {"a": 1}, a1="a1")
+
+        self.assertTrue(result["x-s"].startswith("XYS_"))
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_xhs_sign_codec.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : xhs_sign 字节编解码与旧实现的逐字节对比（随机输入），以及性能对比
+#            python -m test.test_xhs_sign_codec 运行微基准测试
+import ctypes
+import random
+import string
+import timeit
+import unittest
+import zlib
+from urllib.parse import quote
+
+from media_platform.xhs import xhs_sign
+from media_platform.xhs.xhs_sign import BASE64_CHARS, b64_encode, encode_utf8, mrc
+
+
+# ---- 旧实现，作为对照 ----
+
+# 旧实现使用的 CRC32 查表
+LEGACY_CRC32_TABLE = [
+    0, 1996959894, 3993919788, 2567524794, 124634137, 1886057615, 3915621685,
+    2657392035, 249268274, 2044508324, 3772115230, 2547177864, 162941995,
+    2125561021, 3887607047, 2428444049, 498536548, 1789927666, 4089016648,
+    2227061214, 450548861, 1843258603, 4107580753, 2211677639, 325883990,
+    1684777152, 4251122042, 2321926636, 335633487, 1661365465, 4195302755,
+    2366115317, 997073096, 1281953886, 3579855332, 2724688242, 1006888145,
+    1258607687, 3524101629, 2768942443, 901097722, 1119000684, 3686517206,
+    2898065728, 853044451, 1172266101, 3705015759, 2882616665, 651767980,
+    1373503546, 3369554304, 3218104598, 565507253, 1454621731, 3485111705,
+    3099436303, 671266974, 1594198024, 3322730930, 2970347812, 795835527,
+    1483230225, 3244367275, 3060149565, 1994146192, 31158534, 2563907772,
+    4023717930, 1907459465, 112637215, 2680153253, 3904427059, 2013776290,
+    251722036, 2517215374, 3775830040, 2137656763, 141376813, 2439277719,
+    3865271297, 1802195444, 476864866, 2238001368, 4066508878, 1812370925,
+    453092731, 2181625025, 4111451223, 1706088902, 314042704, 2344532202,
+    4240017532, 1658658271, 366619977, 2362670323, 4224994405, 1303535960,
+    984961486, 2747007092, 3569037538, 1256170817, 1037604311, 2765210733,
+    3554079995, 1131014506, 879679996, 2909243462, 3663771856, 1141124467,
+    855842277, 2852801631, 3708648649, 1342533948, 654459306, 3188396048,
+    3373015174, 1466479909, 544179635, 3110523913, 3462522015, 1591671054,
+    702138776, 2966460450, 3352799412, 1504918807, 783551873, 3082640443,
+    3233442989, 3988292384, 2596254646, 62317068, 1957810842, 3939845945,
+    2647816111, 81470997, 1943803523, 3814918930, 2489596804, 225274430,
+    2053790376, 3826175755, 2466906013, 167816743, 2097651377, 4027552580,
+    2265490386, 503444072, 1762050814, 4150417245, 2154129355, 426522225,
+    1852507879, 4275313526, 2312317920, 282753626, 1742555852, 4189708143,
+    2394877945, 397917763, 1622183637, 3604390888, 2714866558, 953729732,
+    1340076626, 3518719985, 2797360999, 1068828381, 1219638859, 3624741850,
+    2936675148, 906185462, 1090812512, 3747672003, 2825379669, 829329135,
+    1181335161, 3412177804, 3160834842, 628085408, 1382605366, 3423369109,
+    3138078467, 570562233, 1426400815, 3317316542, 2998733608, 733239954,
+    1555261956, 3268935591, 3050360625, 752459403, 1541320221, 2607071920,
+    3965973030, 1969922972, 40735498, 2617837225, 3943577151, 1913087877,
+    83908371, 2512341634, 3803740692, 2075208622, 213261112, 2463272603,
+    3855990285, 2094854071, 198958881, 2262029012, 4057260610, 1759359992,
+    534414190, 2176718541, 4139329115, 1873836001, 414664567, 2282248934,
+    4279200368, 1711684554, 285281116, 2405801727, 4167216745, 1634467795,
+    376229701, 2685067896, 3608007406, 1308918612, 956543938, 2808555105,
+    3495958263, 1231636301, 1047427035, 2932959818, 3654703836, 1088359270,
+    936918000, 2847714899, 3736837829, 1202900863, 817233897, 3183342108,
+    3401237130, 1404277552, 615818150, 3134207493, 3453421203, 1423857449,
+    601450431, 3009837614, 3294710456, 1567103746, 711928724, 3020668471,
+    3272380065, 1510334235, 755167117,
+]
+
+
+def legacy_mrc(e: str) -> int:
+    def right_shift_unsigned(num: int, bit: int = 0) -> int:
+        val = ctypes.c_uint32(num).value >> bit
+        max32int = 4294967295
+        return (val + (max32int + 1)) % (2 * (max32int + 1)) - max32int - 1
+
+    o = -1
+    for n in range(min(57, len(e))):
+        o = LEGACY_CRC32_TABLE[(o & 255) ^ ord(e[n])] ^ right_shift_unsigned(o, 8)
+    return o ^ -1 ^ 3988292384
+
+
+def legacy_encode_utf8(s: str) -> list:
+    encoded = quote(s, safe="~()*!.'")
+    result = []
+    i = 0
+    while i < len(encoded):
+        if encoded[i] == "%":
+            result.append(int(encoded[i + 1: i + 3], 16))
+            i += 3
+        else:
+            result.append(ord(encoded[i]))
+            i += 1
+    return result
+
+
+def legacy_b64_encode(data: list) -> str:
+    def triplet_to_base64(e: int) -> str:
+        return (
+            BASE64_CHARS[(e >> 18) & 63]
+            + BASE64_CHARS[(e >> 12) & 63]
+            + BASE64_CHARS[(e >> 6) & 63]
+            + BASE64_CHARS[e & 63]
+        )
+
+    length = len(data)
+    remainder = length % 3
+    chunks = []
+    for i in range(0, length - remainder, 3):
+        c = ((data[i] << 16) & 0xFF0000) + ((data[i + 1] << 8) & 0xFF00) + (data[i + 2] & 0xFF)
+        chunks.append(triplet_to_base64(c))
+    if remainder == 1:
+        a = data[length - 1]
+        chunks.append(BASE64_CHARS[a >> 2] + BASE64_CHARS[(a << 4) & 63] + "==")
+    elif remainder == 2:
+        a = (data[length - 2] << 8) + data[length - 1]
+        chunks.append(
+            BASE64_CHARS[a >> 10] + BASE64_CHARS[(a >> 4) & 63] + BASE64_CHARS[(a << 2) & 63] + "="
+        )
+    return "".join(chunks)
+
+
+# ---- 随机输入 ----
+
+_TEXT_ALPHABET = string.printable + "小红书美食旅行🍜😀é~()*!.'%"
+
+
+def random_text(rng: random.Random, max_len: int = 200) -> str:
+    return "".join(rng.choice(_TEXT_ALPHABET) for _ in range(rng.randint(0, max_len)))
+
+
+def random_latin1(rng: random.Random, max_len: int = 120) -> str:
+    return "".join(chr(rng.randint(0, 255)) for _ in range(rng.randint(0, max_len)))
+
+
+class TestXhsSignCodecParity(unittest.TestCase):
+    EXAMPLES = 500
+
+    def setUp(self):
+        self.rng = random.Random(20251017)
+
+    def test_crc_table_is_standard_crc32(self):
+        # mrc 用 zlib.crc32 替代查表，前提是旧实现的查表就是标准多项式 0xEDB88320 的表
+        expected = []
+        for i in range(256):
+            c = i
+            for _ in range(8):
+                c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+            expected.append(c)
+        self.assertEqual(LEGACY_CRC32_TABLE, expected)
+
+    def test_encode_utf8_matches_legacy(self):
+        for _ in range(self.EXAMPLES):
+            text = random_text(self.rng)
+            self.assertEqual(list(encode_utf8(text)), legacy_encode_utf8(text), text)
+
+    def test_b64_encode_matches_legacy(self):
+        for _ in range(self.EXAMPLES):
+            data = [self.rng.randint(0, 255) for _ in range(self.rng.randint(0, 300))]
+            self.assertEqual(b64_encode(data), legacy_b64_encode(data))
+            self.assertEqual(b64_encode(bytes(data)), legacy_b64_encode(data))
+
+    def test_b64_encode_of_text_matches_legacy(self):
+        for _ in range(self.EXAMPLES):
+            text = random_text(self.rng)
+            self.assertEqual(b64_encode(encode_utf8(text)), legacy_b64_encode(legacy_encode_utf8(text)), text)
+
+    def test_mrc_matches_legacy(self):
+        self.assertEqual(mrc(""), legacy_mrc(""))
+        for _ in range(self.EXAMPLES):
+            text = random_latin1(self.rng)
+            self.assertEqual(mrc(text), legacy_mrc(text), text)
+
+    def test_mrc_only_uses_first_57_chars(self):
+        text = random_latin1(self.rng, 57) + "x" * 57
+        self.assertEqual(mrc(text[:57] + "tail"), mrc(text[:57]))
+
+
+def _benchmark():
+    rng = random.Random(1)
+    text = '{"s0":3,"s1":"","x0":"1","x1":"4.2.2","x2":"Mac OS","x3":"xhs-pc-web","x4":"4.74.0","x5":"' + \
+        "".join(rng.choice(string.hexdigits) for _ in range(300)) + '"}'
+    crc_input = random_latin1(rng, 120).ljust(120, "a")
+    number = 20000
+    cases = [
+        ("encode_utf8", lambda: legacy_encode_utf8(text), lambda: xhs_sign.encode_utf8(text)),
+        ("b64_encode", lambda: legacy_b64_encode(legacy_encode_utf8(text)),
+         lambda: xhs_sign.b64_encode(xhs_sign.encode_utf8(text))),
+        ("mrc", lambda: legacy_mrc(crc_input), lambda: xhs_sign.mrc(crc_input)),
+    ]
+    for name, legacy, current in cases:
+        legacy_us = min(timeit.repeat(legacy, number=number, repeat=3)) / number * 1e6
+        current_us = min(timeit.repeat(current, number=number, repeat=3)) / number * 1e6
+        print(f"{name:<12} legacy {legacy_us:8.2f} us  bytes {current_us:8.2f} us  x{legacy_us / current_us:.1f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_xhs_sign_vectors.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 小红书签名固定测试向量，playwright 与 xhshow 两种签名方式可以离线对比
+import inspect
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from tenacity import wait_none
+from xhshow import Xhshow
+
+from media_platform.xhs.client import XiaoHongShuClient
+from media_platform.xhs.exception import SignVerifyError
+from media_platform.xhs.playwright_sign import (
+    _build_sign_string,
+    _build_xs_common,
+    _build_xs_payload,
+    _md5_hex,
+)
+from media_platform.xhs.xhs_sign import b64_encode, encode_utf8, mrc
+from media_platform.xhs.xhshow_sign import sign_with_xhshow
+
+X3_VALUE = "mns0301_abcdefghijklmnopqrstuvwxyz0123456789"
+A1 = "18c1a2b3c4d5e6f7a8b9c0d1e2f3a4b5c6d7e8f9"
+B1 = "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwErFeexd0ekncAzMPYIxGbDs"
+
+XS_PAYLOAD_VECTORS = [
+    (
+        "object",
+        "XYS_2UQhPsHCH0c1PjhlHjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQ+GnPW/MPjNsQhPUHCHfM1qAZAPebKGnQ08Bpf89YkyfTVJn"
+        "E6qobUq7zM4d4h2giIP/HA+eL9+AWEHjIj2ecjwjQ6GfkSG7cjKc==",
+    ),
+    (
+        "string",
+        "XYS_2UQhPsHCH0c1PjhlHjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQ+GnPW/MPjNsQhPUHCHfM1qAZAPebKGnQ08Bpf89YkyfTVJn"
+        "E6qobUq7zM4d4h2giIP/HA+eL9+AWEHjIj2ecjwjQA4oQkJfqjKc==",
+    ),
+]
+
+XS_COMMON_VECTOR = (
+    "2UQAPsHCPUIjqArjwjHjNsQhPsHCH0rjNsQhPaHCH0c1PjhUHjIj2eHjwjQ+GnPW/MPjNsQhPUHCHdYiqUMIGUM78nHjNsQh+sHCH0c1+Ac1"
+    "PsHVHdWMH0ijP/Y0PnrUG0+0+BcM8/8f+9rhG0S0PBcl8/QfP9rFG0p0+fc78/YfwaHVHdW9H0ijP/qIPeZIPeZIPeZIPsHVHdW7H0ijnbS/"
+    "gAQpLnYcqFYeaem0PaHVHdWhH0ija/PhqDYD87+xJ7mdag8Sq9zn494QcUT6aLpPJLQy+nLApd4G/B4BprShLA+jqg4bqD8S8gYDPBp3Jf+m"
+    "2DMcnLShz9QrqUHVHdWEH0iTP/WUw/c9+eWEwsIj2erIH0il+/cVHdWlPaHCHfE6qfMYJsQR"
+)
+
+MRC_VECTORS = [
+    ("", 3988292384),
+    ("hello", -609737306),
+    ("1700000000000XYS_abcb1", -1817302176),
+    ("0123456789" * 10, -614507527),
+]
+
+
+class TestXhsSignGoldenVectors(unittest.TestCase):
+
+    def test_mrc(self):
+        for text, expected in MRC_VECTORS:
+            with self.subTest(text=text):
+                self.assertEqual(mrc(text), expected)
+
+    def test_b64_encode(self):
+        self.assertEqual(b64_encode(encode_utf8("小红书 xhs")), "EJsOEvxjENffHoYiqI==")
+
+    def test_sign_string_and_md5(self):
+        sign_str = _build_sign_string("/api/sns/web/v1/search/notes", {"keyword": "美食", "page": 1})
+        self.assertEqual(sign_str, '/api/sns/web/v1/search/notes{"keyword":"美食","page":1}')
+        self.assertEqual(_md5_hex(sign_str), "f8b661252d8ad2c688916815f76b1ed5")
+
+    def test_build_xs_payload(self):
+        for data_type, expected in XS_PAYLOAD_VECTORS:
+            with self.subTest(data_type=data_type):
+                self.assertEqual(_build_xs_payload(X3_VALUE, data_type), expected)
+
+    def test_build_xs_common(self):
+        self.assertEqual(_build_xs_common(A1, B1, "XYS_2UQhPsHCH0c1", "1700000000000"), XS_COMMON_VECTOR)
+
+
+class TestXhshowParity(unittest.TestCase):
+    """xhshow 与 playwright 路径生成的 x-s 使用相同的编码，可以互相解码对比"""
+
+    def test_xs_payload_decodes_with_xhshow(self):
+        decoded = Xhshow().decode_xs(XS_PAYLOAD_VECTORS[0][1])
+        self.assertEqual(decoded["x3"], X3_VALUE)
+        self.assertEqual(decoded["x4"], "object")
+
+    def test_xhshow_headers_match_playwright_layout(self):
+        signs = sign_with_xhshow("/api/sns/web/v1/search/notes", {"a1": A1}, payload={"keyword": "美食"})
+        self.assertEqual(set(signs), {"x-s", "x-t", "x-s-common", "x-b3-traceid"})
+        self.assertTrue(signs["x-t"].isdigit())
+
+        xhshow_fields = Xhshow().decode_xs(signs["x-s"])
+        playwright_fields = Xhshow().decode_xs(XS_PAYLOAD_VECTORS[0][1])
+        self.assertEqual(xhshow_fields.keys(), playwright_fields.keys())
+        self.assertEqual(xhshow_fields["x1"], playwright_fields["x1"])
+        self.assertEqual(xhshow_fields["x4"], "object")
+
+
+class TestXhsSignModeFallback(IsolatedAsyncioTestCase):
+
+    def _make_client(self) -> XiaoHongShuClient:
+        client = XiaoHongShuClient(
+            headers={}, playwright_page=MagicMock(), cookie_dict={"a1": A1}
+        )
+        client.sign_mode = "xhshow"
+        client._signer.sign = AsyncMock(return_value={
+            "x-s": "XYS_playwright", "x-t": "1", "x-s-common": "common", "x-b3-traceid": "trace",
+        })
+        return client
+
+    async def test_xhshow_mode_does_not_touch_page(self):
+        client = self._make_client()
+        client.request = AsyncMock(return_value={"ok": True})
+
+        await client.get("/api/sns/web/v1/search/notes", {"keyword": "美食"})
+
+        client._signer.sign.assert_not_called()
+        self.assertTrue(client.request.call_args.kwargs["headers"]["X-S"].startswith("XYS_"))
+
+    async def test_fallback_to_playwright_on_verify_error(self):
+        client = self._make_client()
+        client.request = AsyncMock(side_effect=[SignVerifyError("captcha"), {"ok": True}])
+
+        result = await client.post("/api/sns/web/v1/feed", {"source_note_id": "1"})
+
+        self.assertEqual(result, {"ok": True})
+        self.assertEqual(client.sign_mode, "playwright")
+        self.assertEqual(client.request.call_args.kwargs["headers"]["X-S"], "XYS_playwright")
+
+    def _mock_http_response(self, client: XiaoHongShuClient, response: httpx.Response):
+        http_client = MagicMock()
+        http_client.request = AsyncMock(return_value=response)
+        client.get_http_client = MagicMock(return_value=http_client)
+        return http_client
+
+    async def test_signature_rejection_raises_sign_verify_error(self):
+        client = self._make_client()
+        self._mock_http_response(client, httpx.Response(406, json={"code": -1, "success": False}))
+
+        with self.assertRaises(SignVerifyError):
+            await inspect.unwrap(XiaoHongShuClient.request)(client, "GET", "https://edith.xiaohongshu.com/api")
+
+    async def test_captcha_is_not_retried_with_playwright(self):
+        client = self._make_client()
+        http_client = self._mock_http_response(
+            client, httpx.Response(461, headers={"Verifytype": "102", "Verifyuuid": "uuid"})
+        )
+
+        with self.assertRaises(Exception) as ctx, patch.object(XiaoHongShuClient.request.retry, "wait", wait_none()):
+            await client.get("/api/sns/web/v1/search/notes", {"keyword": "美食"})
+
+        self.assertNotIsInstance(ctx.exception, SignVerifyError)
+        self.assertEqual(client.sign_mode, "xhshow")
+        client._signer.sign.assert_not_called()
+        self.assertTrue(all(
+            call.kwargs["headers"]["X-S"].startswith("XYS_") for call in http_client.request.call_args_list
+        ))
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_async_file_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""
+Unit tests for AsyncFileWriter
+"""
+
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from tools.async_file_writer import AsyncFileWriter, compact_jsonl_to_json
+
+
+class TestAsyncFileWriterJsonl:
+    """Test cases for the JSONL output mode"""
+
+    @pytest.fixture(autouse=True)
+    def work_dir(self, tmp_path, monkeypatch):
+        """Run each test in an isolated data directory"""
+        monkeypatch.chdir(tmp_path)
+        AsyncFileWriter._instances.clear()
+        AsyncFileWriter._jsonl_paths.clear()
+        yield tmp_path
+        AsyncFileWriter.close_jsonl_handles()
+        AsyncFileWriter._instances.clear()
+        AsyncFileWriter._jsonl_paths.clear()
+
+    @pytest.mark.asyncio
+    async def test_write_jsonl_appends_lines(self, sample_xhs_comment):
+        """Each record becomes one line and the handle is reused"""
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        for i in range(3):
+            await writer.write_single_item_to_jsonl({**sample_xhs_comment, "comment_id": str(i)}, "comments")
+            await writer.flush()
+
+        assert len(AsyncFileWriter._jsonl_handles) == 1
+        AsyncFileWriter.close_jsonl_handles()
+
+        file_path = writer._get_file_path("jsonl", "comments")
+        lines = Path(file_path).read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["comment_id"] for line in lines] == ["0", "1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_write_jsonl_off_event_loop(self, monkeypatch):
+        """The batch is written in a worker thread, not on the event loop thread"""
+        append_jsonl_lines = AsyncFileWriter._append_jsonl_lines
+        write_threads = []
+
+        def record_thread(file_path, items):
+            write_threads.append(threading.get_ident())
+            append_jsonl_lines(file_path, items)
+
+        monkeypatch.setattr(AsyncFileWriter, "_append_jsonl_lines", staticmethod(record_thread))
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        await writer.write_single_item_to_jsonl({"note_id": "1"}, "contents")
+        await writer.flush()
+
+        assert write_threads and threading.get_ident() not in write_threads
+        AsyncFileWriter.close_jsonl_handles()
+        assert Path(writer._get_file_path("jsonl", "contents")).read_text(encoding="utf-8") == '{"note_id": "1"}\n'
+
+    @pytest.mark.asyncio
+    async def test_compact_matches_json_layout(self, sample_xhs_note):
+        """Compacted output is byte-identical to the legacy JSON writer"""
+        items = [{**sample_xhs_note, "note_id": f"note_{i}"} for i in range(3)]
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        for item in items:
+            await writer.write_single_item_to_jsonl(item, "contents")
+
+        legacy_path = writer._get_file_path("json", "contents")
+        Path(legacy_path).write_text(json.dumps(items, ensure_ascii=False, indent=4), encoding="utf-8")
+        legacy_content = Path(legacy_path).read_text(encoding="utf-8")
+
+        json_paths = await AsyncFileWriter.compact_written_jsonl_files()
+        assert json_paths == [legacy_path]
+        assert Path(legacy_path).read_text(encoding="utf-8") == legacy_content
+
+    def test_compact_skips_broken_line(self, work_dir):
+        """A truncated trailing line is skipped instead of failing the whole file"""
+        jsonl_path = work_dir / "items.jsonl"
+        jsonl_path.write_text('{"id": 1}\n{"id": 2}\n{"id": 3', encoding="utf-8")
+
+        json_path = compact_jsonl_to_json(str(jsonl_path), str(work_dir / "items.json"))
+        assert json.loads(Path(json_path).read_text(encoding="utf-8")) == [{"id": 1}, {"id": 2}]
+
+    def test_compact_empty_file(self, work_dir):
+        """An empty JSONL file compacts to an empty array"""
+        jsonl_path = work_dir / "empty.jsonl"
+        jsonl_path.write_text("", encoding="utf-8")
+
+        json_path = compact_jsonl_to_json(str(jsonl_path), str(work_dir / "empty.json"))
+        assert Path(json_path).read_text(encoding="utf-8") == "[]"
+
+
+class TestAsyncFileWriterBuffering:
+    """Test cases for the shared, buffered writer registry"""
+
+    @pytest.fixture(autouse=True)
+    def work_dir(self, tmp_path, monkeypatch):
+        """Run each test in an isolated data directory with a small batch size"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("config.FILE_WRITER_BATCH_SIZE", 2)
+        monkeypatch.setattr("config.FILE_WRITER_FLUSH_INTERVAL_SEC", 60)
+        AsyncFileWriter._instances.clear()
+        yield tmp_path
+        AsyncFileWriter.close_jsonl_handles()
+        AsyncFileWriter._instances.clear()
+
+    def test_get_instance_is_shared(self):
+        """The same platform and crawler type share one writer"""
+        first = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        second = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        other = AsyncFileWriter.get_instance(platform="xhs", crawler_type="detail")
+        assert first is second
+        assert first is not other
+
+    @pytest.mark.asyncio
+    async def test_json_batches_match_legacy_layout(self, sample_xhs_comment):
+        """In-place appends produce the same file as rewriting the whole array"""
+        items = [{**sample_xhs_comment, "comment_id": str(i)} for i in range(5)]
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        for item in items:
+            await writer.write_single_item_to_json(item, "comments")
+
+        file_path = writer._get_file_path("json", "comments")
+        # batch size 2: four items are on disk, the fifth is still buffered
+        assert len(json.loads(Path(file_path).read_text(encoding="utf-8"))) == 4
+
+        await AsyncFileWriter.flush_all()
+        assert Path(file_path).read_text(encoding="utf-8") == json.dumps(items, ensure_ascii=False, indent=4)
+
+    @pytest.mark.asyncio
+    async def test_json_append_to_foreign_file(self, work_dir):
+        """Files not written as an indented array fall back to a full rewrite"""
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        file_path = writer._get_file_path("json", "contents")
+        Path(file_path).write_text('{"note_id": "0"}', encoding="utf-8")
+
+        await writer.write_single_item_to_json({"note_id": "1"}, "contents")
+        await writer.flush()
+        assert json.loads(Path(file_path).read_text(encoding="utf-8")) == [{"note_id": "0"}, {"note_id": "1"}]
+
+    @pytest.mark.asyncio
+    async def test_csv_header_written_once(self):
+        """The csv header is written only for the first batch"""
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        for i in range(3):
+            await writer.write_to_csv({"comment_id": str(i), "content": f"c{i}"}, "comments")
+        await writer.flush()
+
+        file_path = writer._get_file_path("csv", "comments")
+        lines = Path(file_path).read_text(encoding="utf-8-sig").splitlines()
+        assert lines == ["comment_id,content", "0,c0", "1,c1", "2,c2"]
+
+    @pytest.mark.asyncio
+    async def test_flush_on_interval(self, monkeypatch):
+        """A partial batch is written after the flush interval"""
+        monkeypatch.setattr("config.FILE_WRITER_FLUSH_INTERVAL_SEC", 0.01)
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        await writer.write_single_item_to_jsonl({"note_id": "1"}, "contents")
+
+        await asyncio.sleep(0.05)
+        file_path = writer._get_file_path("jsonl", "contents")
+        assert Path(file_path).read_text(encoding="utf-8") == '{"note_id": "1"}\n'
+
+    @pytest.mark.asyncio
+    async def test_background_flush_task_is_tracked(self, monkeypatch):
+        """The interval flush task is referenced until it finishes, flush_all waits for it"""
+        monkeypatch.setattr("config.FILE_WRITER_FLUSH_INTERVAL_SEC", 0.01)
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        release = asyncio.Event()
+        flush_batch = writer._flush_batch
+
+        async def slow_flush(file_path):
+            await release.wait()
+            await flush_batch(file_path)
+
+        monkeypatch.setattr(writer, "_flush_batch", slow_flush)
+        await writer.write_single_item_to_jsonl({"note_id": "1"}, "contents")
+        await asyncio.sleep(0.05)
+        assert len(writer._flush_tasks) == 1
+
+        release.set()
+        await AsyncFileWriter.flush_all()
+        assert not writer._flush_tasks
+        file_path = writer._get_file_path("jsonl", "contents")
+        assert Path(file_path).read_text(encoding="utf-8") == '{"note_id": "1"}\n'
+
+    @pytest.mark.asyncio
+    async def test_flush_all_discards_timers_and_batches(self):
+        """Batches and their timers do not outlive the event loop that created them"""
+        writer = AsyncFileWriter.get_instance(platform="xhs", crawler_type="search")
+        await writer.write_single_item_to_json({"note_id": "1"}, "contents")
+        timer = writer._batches[writer._get_file_path("json", "contents")].timer
+        assert timer is not None
+
+        await AsyncFileWriter.flush_all()
+        assert timer.cancelled()
+        assert writer._batches == {}
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_db_batch_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""
+Unit tests for DbBatchWriter bulk upserts (SQLite)
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+
+import config
+from config.db_config import sqlite_db_config, sqlite_pragmas
+from database import db_session
+from database.db_batch_writer import DbBatchWriter, has_unique_key
+from database.models import DouyinAweme, TiebaNote, XhsCreator, XhsNote, XhsNoteComment, ZhihuCreator
+from store.douyin._store_impl import DouyinSqliteStoreImplement
+from store.tieba._store_impl import TieBaSqliteStoreImplement
+from store.xhs._store_impl import XhsSqliteStoreImplement
+
+
+@pytest_asyncio.fixture
+async def sqlite_db(tmp_path, monkeypatch):
+    """Point the sqlite store at a temporary database"""
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+    monkeypatch.setitem(sqlite_db_config, "db_path", str(tmp_path / "test.db"))
+    await db_session.dispose_engines()
+    await db_session.create_tables("sqlite")
+    yield
+    await db_session.dispose_engines()
+
+
+async def _fetch_all(model):
+    async with db_session.get_session() as session:
+        result = await session.execute(select(model).order_by(model.id))
+        return result.scalars().all()
+
+
+def _xhs_comment(comment_id: str, like_count: int, content: str = "content"):
+    return {
+        "comment_id": comment_id,
+        "create_time": 1700000000,
+        "ip_location": "上海",
+        "note_id": "note_1",
+        "content": content,
+        "user_id": "user_1",
+        "nickname": "nick",
+        "avatar": "",
+        "sub_comment_count": 0,
+        "pictures": "",
+        "parent_comment_id": 0,
+        "like_count": like_count,
+    }
+
+
+class TestDbBatchWriter:
+    """Test cases for DbBatchWriter"""
+
+    @pytest.mark.asyncio
+    async def test_store_comments_insert_then_update(self, sqlite_db):
+        """Existing rows only refresh the columns update_comment used to touch"""
+        store = XhsSqliteStoreImplement()
+        await store.store_comments([_xhs_comment("c1", 1), _xhs_comment("c2", 2)])
+        await store.store_comments([_xhs_comment("c1", 10, content="changed"), _xhs_comment("c3", 3)])
+
+        rows = {row.comment_id: row for row in await _fetch_all(XhsNoteComment)}
+        assert sorted(rows) == ["c1", "c2", "c3"]
+        assert rows["c1"].like_count == "10"
+        assert rows["c1"].content == "content"
+
+    @pytest.mark.asyncio
+    async def test_duplicates_in_one_batch(self, sqlite_db):
+        """The last row wins when a batch contains the same key twice"""
+        store = XhsSqliteStoreImplement()
+        await store.store_comments([_xhs_comment("c1", 1), _xhs_comment("c1", 5)])
+
+        rows = await _fetch_all(XhsNoteComment)
+        assert [(row.comment_id, row.like_count) for row in rows] == [("c1", "5")]
+
+    @pytest.mark.asyncio
+    async def test_native_upsert_on_unique_key(self, sqlite_db):
+        """Tables with a unique natural key use ON CONFLICT DO UPDATE"""
+        assert has_unique_key(ZhihuCreator.__table__, ["user_id"])
+
+        writer = DbBatchWriter()
+        writer.add(ZhihuCreator, {"user_id": "u1", "user_nickname": "a", "fans": 1}, ["user_id"])
+        writer.add(ZhihuCreator, {"user_id": "u2", "user_nickname": "b", "fans": 2}, ["user_id"])
+        await writer.flush()
+        writer.add(ZhihuCreator, {"user_id": "u1", "user_nickname": "a2", "fans": 3}, ["user_id"])
+        await writer.flush()
+
+        rows = await _fetch_all(ZhihuCreator)
+        assert [(row.user_id, row.user_nickname, row.fans) for row in rows] == [("u1", "a2", 3), ("u2", "b", 2)]
+
+    @pytest.mark.asyncio
+    async def test_rows_without_key_are_skipped(self, sqlite_db):
+        """Rows missing the natural key are not written"""
+        writer = DbBatchWriter()
+        writer.add(ZhihuCreator, {"user_id": None, "user_nickname": "a"}, ["user_id"])
+        assert len(writer) == 0
+
+
+class TestConcurrentStoreWrites:
+    """Concurrent content/creator writes of the same natural key upsert instead of failing"""
+
+    @pytest.mark.asyncio
+    async def test_xhs_content_and_creator(self, sqlite_db):
+        """Interleaved writes of one note_id/user_id leave one row with the last counts"""
+        store = XhsSqliteStoreImplement()
+        await asyncio.gather(*[
+            store.store_content({"note_id": "n1", "title": "t", "liked_count": i}) for i in range(3)
+        ])
+        await asyncio.gather(*[store.store_creator({"user_id": "u1", "fans": i}) for i in range(3)])
+        await store.store_content({"note_id": "n1", "title": "changed", "liked_count": 9})
+
+        notes = await _fetch_all(XhsNote)
+        assert [(row.note_id, row.title, row.liked_count) for row in notes] == [("n1", "t", "9")]
+        assert [row.user_id for row in await _fetch_all(XhsCreator)] == ["u1"]
+
+    @pytest.mark.asyncio
+    async def test_other_platforms(self, sqlite_db):
+        """The other DB stores use the same single-statement upsert"""
+        tieba = TieBaSqliteStoreImplement()
+        await asyncio.gather(*[tieba.store_content({"note_id": "t1", "title": f"title{i}"}) for i in range(3)])
+        assert [row.note_id for row in await _fetch_all(TiebaNote)] == ["t1"]
+
+        douyin = DouyinSqliteStoreImplement()
+        await asyncio.gather(*[douyin.store_content({"aweme_id": 1, "title": "a", "liked_count": str(i)}) for i in range(3)])
+        # 没有标题的作品只刷新已有记录，不会新增
+        await douyin.store_content({"aweme_id": 1, "title": "", "liked_count": "7"})
+        await douyin.store_content({"aweme_id": 2, "title": "", "liked_count": "1"})
+        awemes = await _fetch_all(DouyinAweme)
+        assert [(row.aweme_id, row.liked_count) for row in awemes] == [(1, "7")]
+
+
+class TestDbSession:
+    """Test cases for engine and session caching"""
+
+    @pytest.mark.asyncio
+    async def test_session_factory_cached_per_engine(self, sqlite_db):
+        """The sessionmaker is built once per engine"""
+        engine = db_session.get_async_engine("sqlite")
+        assert db_session.get_session_factory(engine) is db_session.get_session_factory(engine)
+
+    @pytest.mark.asyncio
+    async def test_sqlite_pragmas_applied(self, sqlite_db):
+        """New sqlite connections use WAL, synchronous=NORMAL and a busy timeout"""
+        async with db_session.get_session() as session:
+            journal_mode = (await session.execute(text("PRAGMA journal_mode"))).scalar()
+            synchronous = (await session.execute(text("PRAGMA synchronous"))).scalar()
+            busy_timeout = (await session.execute(text("PRAGMA busy_timeout"))).scalar()
+        assert journal_mode.lower() == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout == sqlite_pragmas["busy_timeout"]
+
+    @pytest.mark.asyncio
+    async def test_dispose_engines(self, sqlite_db):
+        """dispose_engines clears the engine and session factory caches"""
+        engine = db_session.get_async_engine("sqlite")
+        db_session.get_session_factory(engine)
+        await db_session.dispose_engines()
+        assert not db_session._engines
+        assert not db_session._session_factories
@@ -273,3 +273,59 @@ class TestSingletonPattern:
 
         # Verify instances are cleared
         assert len(ExcelStoreBase._instances) == 0
+
+
+@pytest.mark.skipif(not EXCEL_AVAILABLE, reason="openpyxl not installed")
+class TestExcelStoreWriteOnly:
+    """Test cases for the streaming (write-only) mode"""
+
+    @pytest.fixture
+    def stream_store(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("config.EXCEL_COLUMN_WIDTH_SAMPLE_ROWS", 3)
+        return ExcelStoreBase(platform="test", crawler_type="search", write_only=True)
+
+    @pytest.mark.asyncio
+    async def test_rows_and_styles(self, stream_store):
+        """Rows, header style and body style survive the round trip"""
+        for i in range(10):
+            await stream_store.store_comment({"comment_id": f"c{i}", "content": "x" * i, "tags": [i]})
+        stream_store.flush()
+
+        wb = openpyxl.load_workbook(stream_store.filename)
+        assert wb.sheetnames == ["Comments"]
+        sheet = wb["Comments"]
+        assert sheet.max_row == 11
+        assert [cell.value for cell in sheet[1]] == ["comment_id", "content", "tags"]
+        assert sheet.cell(row=11, column=3).value == "[9]"
+        assert sheet.cell(row=1, column=1).font.bold is True
+        assert sheet.cell(row=1, column=1).fill.start_color.rgb[-6:] == "366092"
+        assert sheet.cell(row=2, column=1).alignment.wrap_text is True
+        wb.close()
+
+    @pytest.mark.asyncio
+    async def test_rows_streamed_after_sample(self, stream_store):
+        """Only the width sample is held in memory, later rows go to the worksheet"""
+        for i in range(5):
+            await stream_store.store_content({"note_id": f"n{i}"})
+        sheet = stream_store._streaming_sheets["Contents"]
+        assert sheet.worksheet is not None
+        assert sheet.pending_rows == []
+        assert sheet.row_count == 5
+
+    @pytest.mark.asyncio
+    async def test_column_width_from_sample(self, stream_store):
+        """Column widths come from the header and the sampled rows"""
+        await stream_store.store_content({"note_id": "n1", "desc": "d" * 30})
+        stream_store.flush()
+
+        wb = openpyxl.load_workbook(stream_store.filename)
+        sheet = wb["Contents"]
+        assert sheet.column_dimensions["A"].width == 10
+        assert sheet.column_dimensions["B"].width == 32
+        wb.close()
+
+    def test_empty_workbook_not_saved(self, stream_store):
+        """Nothing is written when no rows were stored"""
+        stream_store.flush()
+        assert not stream_store.filename.exists()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_mongodb_store_base.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""
+Unit tests for the buffered bulk_write path of MongoDBStoreBase
+Uses an in-memory stand-in for the motor database so no mongod is required
+"""
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+from pymongo.errors import OperationFailure
+
+import config
+from database.mongodb_store_base import MongoDBConnection, MongoDBStoreBase
+from store.xhs._store_impl import XhsMongoStoreImplement
+
+
+class FakeCollection:
+    """Minimal async collection supporting the calls used by MongoDBStoreBase"""
+
+    def __init__(self):
+        self.docs: List[Dict] = []
+        self.indexes: List[Dict] = []
+        self.bulk_calls: List[int] = []
+
+    async def create_index(self, keys, unique=False):
+        if unique:
+            fields = [key for key, _ in keys]
+            seen = set()
+            for doc in self.docs:
+                value = tuple(doc.get(field) for field in fields)
+                if value in seen:
+                    raise OperationFailure("E11000 duplicate key error")
+                seen.add(value)
+        self.indexes.append({"keys": keys, "unique": unique})
+
+    async def bulk_write(self, requests, ordered=True):
+        assert ordered is False
+        self.bulk_calls.append(len(requests))
+        for request in requests:
+            doc = await self.find_one(request._filter)
+            if doc is None:
+                doc = dict(request._filter)
+                self.docs.append(doc)
+            doc.update(request._doc["$set"])
+
+    async def find_one(self, query):
+        for doc in self.docs:
+            if all(doc.get(key) == value for key, value in query.items()):
+                return doc
+        return None
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        collection = FakeCollection()
+        self[name] = collection
+        return collection
+
+
+class TestMongoDBStoreBaseBulkWrite:
+    """Test cases for ensure indexes and buffered bulk writes"""
+
+    @pytest.fixture(autouse=True)
+    def fake_db(self, monkeypatch):
+        db = FakeDatabase()
+
+        async def get_db(_self):
+            return db
+
+        monkeypatch.setattr(MongoDBConnection, "get_db", get_db)
+        monkeypatch.setattr(MongoDBStoreBase, "_pending", {})
+        monkeypatch.setattr(MongoDBStoreBase, "_indexed_collections", set())
+        monkeypatch.setattr(MongoDBStoreBase, "_flush_tasks", set())
+        monkeypatch.setattr(config, "MONGODB_BULK_WRITE_BATCH_SIZE", 3)
+        monkeypatch.setattr(config, "MONGODB_BULK_WRITE_FLUSH_INTERVAL_SEC", 0.05)
+        return db
+
+    @pytest.mark.asyncio
+    async def test_unique_index_created_once(self, fake_db):
+        """A unique index on the query keys is created on first write only"""
+        store = MongoDBStoreBase(collection_prefix="xhs")
+        for i in range(5):
+            await store.save_or_update("comments", {"comment_id": str(i)}, {"comment_id": str(i)})
+        assert fake_db["xhs_comments"].indexes == [{"keys": [("comment_id", 1)], "unique": True}]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_data_falls_back_to_normal_index(self, fake_db):
+        """Existing duplicates keep the store usable with a non unique index"""
+        fake_db["xhs_contents"].docs = [{"note_id": "1"}, {"note_id": "1"}]
+        store = MongoDBStoreBase(collection_prefix="xhs")
+        assert await store.save_or_update("contents", {"note_id": "2"}, {"note_id": "2"})
+        assert fake_db["xhs_contents"].indexes == [{"keys": [("note_id", 1)], "unique": False}]
+
+    @pytest.mark.asyncio
+    async def test_flush_on_batch_size(self, fake_db):
+        """Writes are sent as one bulk_write once the batch size is reached"""
+        store = MongoDBStoreBase(collection_prefix="xhs")
+        for i in range(3):
+            await store.save_or_update("comments", {"comment_id": str(i)}, {"comment_id": str(i)})
+        assert fake_db["xhs_comments"].bulk_calls == [3]
+
+    @pytest.mark.asyncio
+    async def test_flush_on_interval(self, fake_db):
+        """Pending writes are flushed after the flush interval"""
+        store = MongoDBStoreBase(collection_prefix="xhs")
+        await store.save_or_update("comments", {"comment_id": "1"}, {"comment_id": "1"})
+        assert fake_db["xhs_comments"].bulk_calls == []
+        await asyncio.sleep(0.2)
+        assert fake_db["xhs_comments"].bulk_calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_same_key_merged(self, fake_db):
+        """Updates to the same document inside one batch are merged"""
+        store = MongoDBStoreBase(collection_prefix="xhs")
+        await store.save_or_update("comments", {"comment_id": "1"}, {"comment_id": "1", "like_count": 1})
+        await store.save_or_update("comments", {"comment_id": "1"}, {"like_count": 2})
+        await MongoDBStoreBase.flush_all()
+        assert fake_db["xhs_comments"].bulk_calls == [1]
+        assert fake_db["xhs_comments"].docs == [{"comment_id": "1", "like_count": 2}]
+
+    @pytest.mark.asyncio
+    async def test_find_sees_buffered_writes(self, fake_db):
+        """Queries flush the collection first so reads see earlier writes"""
+        store = XhsMongoStoreImplement()
+        await store.store_content({"note_id": "n1", "title": "t"})
+        found = await store.mongo_store.find_one("contents", {"note_id": "n1"})
+        assert found["title"] == "t"
+
+    @pytest.mark.asyncio
+    async def test_flush_all_across_store_instances(self, fake_db):
+        """Store implementations are created per record but share one buffer"""
+        for i in range(2):
+            await XhsMongoStoreImplement().store_comment({"comment_id": str(i), "content": "c"})
+        assert fake_db["xhs_comments"].bulk_calls == []
+        await MongoDBStoreBase.flush_all()
+        assert fake_db["xhs_comments"].bulk_calls == [2]
+
+    @pytest.mark.asyncio
+    async def test_background_flush_task_is_tracked(self, fake_db, monkeypatch):
+        """The interval flush task is referenced until it finishes, flush_all waits for it"""
+        release = asyncio.Event()
+        bulk_write = FakeCollection.bulk_write
+
+        async def slow_bulk_write(collection, requests, ordered=True):
+            await release.wait()
+            await bulk_write(collection, requests, ordered)
+
+        monkeypatch.setattr(FakeCollection, "bulk_write", slow_bulk_write)
+        store = MongoDBStoreBase(collection_prefix="xhs")
+        await store.save_or_update("comments", {"comment_id": "1"}, {"comment_id": "1"})
+        await asyncio.sleep(0.1)
+        assert len(MongoDBStoreBase._flush_tasks) == 1
+
+        release.set()
+        assert await MongoDBStoreBase.flush_all()
+        assert not MongoDBStoreBase._flush_tasks
+        assert fake_db["xhs_comments"].bulk_calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_flush_all_discards_timers_and_buffers(self, fake_db, monkeypatch):
+        """Buffers and their timers do not outlive the event loop that created them"""
+        monkeypatch.setattr(config, "MONGODB_BULK_WRITE_FLUSH_INTERVAL_SEC", 60)
+        store = MongoDBStoreBase(collection_prefix="xhs")
+        await store.save_or_update("comments", {"comment_id": "1"}, {"comment_id": "1"})
+        timer = MongoDBStoreBase._pending["xhs_comments"].timer
+
+        await MongoDBStoreBase.flush_all()
+        assert timer.cancelled()
+        assert MongoDBStoreBase._pending == {}
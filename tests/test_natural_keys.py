@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_natural_keys.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""
+Unit tests for natural key unique indexes on existing databases
+"""
+
+import importlib.util
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, inspect, text
+
+from database.models import XhsNoteComment
+from database.natural_keys import ensure_natural_keys, get_natural_key_indexes
+
+
+def _create_legacy_schema(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE xhs_note_comment (id INTEGER PRIMARY KEY, comment_id VARCHAR(255), like_count TEXT)"))
+        conn.execute(text("CREATE INDEX ix_xhs_note_comment_comment_id ON xhs_note_comment (comment_id)"))
+        conn.execute(text(
+            "INSERT INTO xhs_note_comment (comment_id, like_count) VALUES "
+            "('a', '1'), ('a', '2'), ('b', '1'), (NULL, 'x'), (NULL, 'y')"
+        ))
+
+
+def _load_migration():
+    path = Path(__file__).resolve().parents[1] / "database/migrations/versions/0001_natural_key_unique_indexes.py"
+    spec = importlib.util.spec_from_file_location("natural_key_migration", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestNaturalKeys:
+    """Test cases for ensure_natural_keys"""
+
+    def test_every_comment_table_has_unique_key(self):
+        """Comment tables are covered by a unique natural key"""
+        tables = {table.name for table, _ in get_natural_key_indexes()}
+        assert {"xhs_note_comment", "douyin_aweme_comment", "bilibili_video_comment",
+                "kuaishou_video_comment", "weibo_note_comment", "tieba_comment", "zhihu_comment"} <= tables
+        assert XhsNoteComment.__table__.c.comment_id.unique
+
+    def test_dedupe_and_create_unique_index(self, tmp_path):
+        """Duplicates are removed (largest id kept) and the plain index becomes unique"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        _create_legacy_schema(engine)
+
+        with engine.begin() as conn:
+            ensure_natural_keys(conn)
+            rows = conn.execute(text("SELECT id, comment_id, like_count FROM xhs_note_comment ORDER BY id")).all()
+
+        assert [tuple(row) for row in rows] == [(2, "a", "2"), (3, "b", "1"), (4, None, "x"), (5, None, "y")]
+        indexes = inspect(engine).get_indexes("xhs_note_comment")
+        assert [(index["name"], bool(index["unique"])) for index in indexes] == [("ix_xhs_note_comment_comment_id", True)]
+
+    def test_idempotent(self, tmp_path):
+        """Running twice does not fail or change anything"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        _create_legacy_schema(engine)
+        with engine.begin() as conn:
+            ensure_natural_keys(conn)
+        with engine.begin() as conn:
+            ensure_natural_keys(conn)
+        assert len(inspect(engine).get_indexes("xhs_note_comment")) == 1
+
+
+class TestNaturalKeyMigration:
+    """Test cases for the frozen 0001 alembic revision"""
+
+    def test_upgrade_and_downgrade(self, tmp_path):
+        """The revision dedupes and swaps the plain index for a unique one, downgrade restores it"""
+        migration = _load_migration()
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        _create_legacy_schema(engine)
+
+        with engine.begin() as conn:
+            with Operations.context(MigrationContext.configure(conn)):
+                migration.upgrade()
+                rows = conn.execute(text("SELECT id FROM xhs_note_comment ORDER BY id")).all()
+                assert [row[0] for row in rows] == [2, 3, 4, 5]
+                assert inspect(conn).get_indexes("xhs_note_comment")[0]["unique"]
+
+                migration.downgrade()
+                assert not inspect(conn).get_indexes("xhs_note_comment")[0]["unique"]
+
+    def test_downgrade_restores_baseline_indexes_only(self, tmp_path):
+        """Creator tables had no user_id index before the revision, downgrade leaves them without one"""
+        migration = _load_migration()
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE xhs_creator (id INTEGER PRIMARY KEY, user_id VARCHAR(255))"))
+
+        with engine.begin() as conn:
+            with Operations.context(MigrationContext.configure(conn)):
+                migration.upgrade()
+                assert inspect(conn).get_indexes("xhs_creator")[0]["unique"]
+
+                migration.downgrade()
+                assert inspect(conn).get_indexes("xhs_creator") == []
+
+    def test_revision_does_not_import_live_models(self):
+        """The revision keeps its own index list instead of reading database.models"""
+        source = (Path(__file__).resolve().parents[1] / "database/migrations/versions/0001_natural_key_unique_indexes.py").read_text(encoding="utf-8")
+        assert "from database" not in source and "import database" not in source
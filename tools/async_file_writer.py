@@ -18,25 +18,102 @@
 
 import asyncio
 import csv
+import io
 import json
 import os
 import pathlib
-from typing import Dict, List
+import sys
+import threading
+import time
+from typing import Dict, IO, List, Optional, Set, Tuple
 import aiofiles
 import config
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
+
+class _PendingBatch:
+    """
+    一个输出文件的待写入缓冲区，写入方只追加到内存，由 flush 统一落盘
+    """
+
+    def __init__(self, file_type: str):
+        self.file_type = file_type
+        self.items: List[Dict] = []
+        # 同一文件的落盘操作串行执行，所有并发调用方共享这把锁
+        self.lock = asyncio.Lock()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
 class AsyncFileWriter:
+    # 进程内共享的写入器，key 为 (platform, crawler_type)
+    _instances: Dict[Tuple[str, str], "AsyncFileWriter"] = {}
+    _instances_lock = threading.Lock()
+    # JSONL 模式下按文件路径复用的长连接句柄，避免每条记录重新打开/重写整个文件
+    _jsonl_handles: Dict[str, IO[str]] = {}
+    # 本次运行写过的 JSONL 文件，供结束时的 compact 使用
+    _jsonl_paths: Set[str] = set()
+
+    @classmethod
+    def get_instance(cls, platform: str, crawler_type: str) -> "AsyncFileWriter":
+        """
+        Get or create the shared writer for the given platform and crawler type
+        Store implementations are created per record, the writer (and its buffers) must not be
+        Args:
+            platform: platform name (xhs, douyin, bili ...)
+            crawler_type: search | detail | creator
+
+        Returns:
+            AsyncFileWriter instance
+        """
+        key = (platform, crawler_type)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(platform, crawler_type)
+            return cls._instances[key]
+
+    @classmethod
+    async def flush_all(cls):
+        """
+        Flush the pending batches of every shared writer and close JSONL handles
+        Should be called at the end of crawler execution
+        """
+        with cls._instances_lock:
+            instances = list(cls._instances.values())
+        for instance in instances:
+            try:
+                await instance.flush()
+            except Exception as e:
+                utils.logger.error(f"[AsyncFileWriter.flush_all] Flush {instance.platform} error: {e}")
+            instance._discard_idle_batches()
+        cls.close_jsonl_handles()
+
     def __init__(self, platform: str, crawler_type: str):
-        self.lock = asyncio.Lock()
         self.platform = platform
         self.crawler_type = crawler_type
-        self.wordcloud_generator = AsyncWordCloudGenerator() if config.ENABLE_GET_WORDCLOUD else None
+        self._wordcloud_generator: Optional[AsyncWordCloudGenerator] = None
+        # key 为输出文件路径，路径中已包含 item_type 和日期
+        self._batches: Dict[str, _PendingBatch] = {}
+        self._created_dirs: Set[str] = set()
+        # 定时触发的后台落盘任务，保留引用避免执行中被回收
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def wordcloud_generator(self) -> Optional[AsyncWordCloudGenerator]:
+        """
+        Lazily created, loading stop words and custom words is only needed for the final wordcloud
+        """
+        if not config.ENABLE_GET_WORDCLOUD:
+            return None
+        if self._wordcloud_generator is None:
+            self._wordcloud_generator = AsyncWordCloudGenerator()
+        return self._wordcloud_generator
 
     def _get_file_path(self, file_type: str, item_type: str, custom_filename: str = None) -> str:
         base_path = f"data/{self.platform}/{file_type}"
-        pathlib.Path(base_path).mkdir(parents=True, exist_ok=True)
+        if base_path not in self._created_dirs:
+            pathlib.Path(base_path).mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(base_path)
         if custom_filename:
             file_name = f"{custom_filename}.{file_type}"
         else:
@@ -45,34 +122,187 @@ class AsyncFileWriter:
 
     async def write_to_csv(self, item: Dict, item_type: str, filename: str = None):
         file_path = self._get_file_path('csv', item_type, custom_filename=filename)
-        async with self.lock:
-            file_exists = os.path.exists(file_path)
-            async with aiofiles.open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=item.keys())
-                if not file_exists or await f.tell() == 0:
-                    await writer.writeheader()
-                await writer.writerow(item)
+        await self._enqueue(file_path, 'csv', item)
 
     async def write_single_item_to_json(self, item: Dict, item_type: str, filename: str = None):
         file_path = self._get_file_path('json', item_type, custom_filename=filename)
+        await self._enqueue(file_path, 'json', item)
+
+    async def write_single_item_to_jsonl(self, item: Dict, item_type: str, filename: str = None):
+        """
+        Append one record as a single JSON line through a long-lived file handle
+        Each write costs O(1) no matter how many records the file already holds
+        """
+        file_path = self._get_file_path('jsonl', item_type, custom_filename=filename)
+        await self._enqueue(file_path, 'jsonl', item)
+
+    async def _enqueue(self, file_path: str, file_type: str, item: Dict):
+        """
+        Buffer an item in memory, flush when the batch is full or after FILE_WRITER_FLUSH_INTERVAL_SEC
+        """
+        batch = self._batches.get(file_path)
+        if batch is None:
+            batch = _PendingBatch(file_type)
+            self._batches[file_path] = batch
+        batch.items.append(item)
+
+        if len(batch.items) >= config.FILE_WRITER_BATCH_SIZE:
+            await self._flush_batch(file_path)
+        elif batch.timer is None:
+            loop = asyncio.get_running_loop()
+            batch.timer = loop.call_later(
+                config.FILE_WRITER_FLUSH_INTERVAL_SEC, self._start_background_flush, file_path
+            )
+
+    def _start_background_flush(self, file_path: str):
+        task = asyncio.ensure_future(self._flush_batch_in_background(file_path))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        """
+        Write all pending batches of this writer to disk
+        """
+        # 先等已经开始的后台落盘写完，再写剩余的数据
+        if self._flush_tasks:
+            await asyncio.gather(*list(self._flush_tasks), return_exceptions=True)
+        for file_path in list(self._batches.keys()):
+            await self._flush_batch(file_path)
+
+    def _discard_idle_batches(self):
+        """
+        Drop empty batches so their asyncio.Lock and timer do not outlive the current event loop
+        """
+        for file_path, batch in list(self._batches.items()):
+            if batch.items or batch.lock.locked():
+                continue
+            if batch.timer is not None:
+                batch.timer.cancel()
+            del self._batches[file_path]
+
+    async def _flush_batch(self, file_path: str):
+        batch = self._batches.get(file_path)
+        if batch is None:
+            return
+        async with batch.lock:
+            if batch.timer is not None:
+                batch.timer.cancel()
+                batch.timer = None
+            items, batch.items = batch.items, []
+            if not items:
+                return
+            if batch.file_type == 'csv':
+                await self._write_csv_rows(file_path, items)
+            elif batch.file_type == 'json':
+                await self._append_json_items(file_path, items)
+            else:
+                await self._write_jsonl_lines(file_path, items)
+
+    async def _flush_batch_in_background(self, file_path: str):
+        try:
+            await self._flush_batch(file_path)
+        except Exception as e:
+            utils.logger.error(f"[AsyncFileWriter._flush_batch_in_background] Flush {file_path} error: {e}")
 
-        async with self.lock:
-            existing_data = []
-            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                    try:
-                        content = await f.read()
-                        if content:
-                            existing_data = json.loads(content)
-                        if not isinstance(existing_data, list):
-                            existing_data = [existing_data]
-                    except json.JSONDecodeError:
-                        existing_data = []
-
-            existing_data.append(item)
+    async def _write_csv_rows(self, file_path: str, items: List[Dict]):
+        file_exists = os.path.exists(file_path)
+        async with aiofiles.open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
+            buffer = io.StringIO()
+            write_header = not file_exists or await f.tell() == 0
+            for item in items:
+                writer = csv.DictWriter(buffer, fieldnames=item.keys())
+                if write_header:
+                    writer.writeheader()
+                    write_header = False
+                writer.writerow(item)
+            await f.write(buffer.getvalue())
 
+    async def _append_json_items(self, file_path: str, items: List[Dict]):
+        """
+        Append items to a JSON array file in place
+        The file is produced by json.dumps(indent=4), so it ends with "\\n]" and new items can be
+        spliced in front of the closing bracket without reading the existing content
+        """
+        body = ",\n    ".join(
+            json.dumps(item, ensure_ascii=False, indent=4).replace("\n", "\n    ") for item in items
+        )
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
+                await f.write("[\n    " + body + "\n]")
+            return
+
+        async with aiofiles.open(file_path, 'r+b') as f:
+            await f.seek(0, os.SEEK_END)
+            size = await f.tell()
+            await f.seek(max(size - 3, 0))
+            tail = await f.read()
+            closing = b"\r\n]" if tail.endswith(b"\r\n]") else b"\n]"
+            if size > len(closing) + 1 and tail.endswith(closing):
+                await f.seek(size - len(closing))
+                await f.write((",\n    " + body + "\n]").encode('utf-8'))
+                return
+
+        # 非本写入器生成的文件（如空数组或单个对象），回退到完整重写
+        await self._rewrite_json_file(file_path, items)
+
+    async def _rewrite_json_file(self, file_path: str, items: List[Dict]):
+        existing_data = []
+        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+            try:
+                content = await f.read()
+                if content:
+                    existing_data = json.loads(content)
+                if not isinstance(existing_data, list):
+                    existing_data = [existing_data]
+            except json.JSONDecodeError:
+                existing_data = []
+
+        existing_data.extend(items)
+
+        async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
+            await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
+
+    async def _write_jsonl_lines(self, file_path: str, items: List[Dict]):
+        """
+        Serialize and append a batch in a worker thread, a large flush does not block the event loop
+        Writes to one file are serialized by the batch lock, so the shared handle is never used concurrently
+        """
+        await asyncio.to_thread(self._append_jsonl_lines, file_path, items)
+
+    @staticmethod
+    def _append_jsonl_lines(file_path: str, items: List[Dict]):
+        handle = AsyncFileWriter._jsonl_handles.get(file_path)
+        if handle is None:
+            handle = open(file_path, 'a', encoding='utf-8')
+            AsyncFileWriter._jsonl_handles[file_path] = handle
+            AsyncFileWriter._jsonl_paths.add(file_path)
+        handle.write("".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items))
+        handle.flush()
+
+    @classmethod
+    def close_jsonl_handles(cls):
+        """
+        Flush and close all JSONL file handles, safe to call more than once
+        """
+        for file_path, handle in list(cls._jsonl_handles.items()):
+            try:
+                handle.close()
+            except Exception as e:
+                utils.logger.error(f"[AsyncFileWriter.close_jsonl_handles] Close {file_path} error: {e}")
+        cls._jsonl_handles.clear()
+
+    @classmethod
+    async def compact_written_jsonl_files(cls) -> List[str]:
+        """
+        Compact every JSONL file written in this run into the legacy JSON array layout
+        Returns:
+            generated json file paths
+        """
+        await cls.flush_all()
+        json_paths = []
+        for jsonl_path in sorted(cls._jsonl_paths):
+            json_paths.append(compact_jsonl_to_json(jsonl_path))
+        return json_paths
 
     async def generate_wordcloud_from_comments(self):
         """
@@ -86,8 +316,10 @@ class AsyncFileWriter:
             return
 
         try:
-            # Read comments from JSON file
-            comments_file_path = self._get_file_path('json', 'comments')
+            # Read comments from JSON (or JSONL) file
+            file_type = 'jsonl' if config.SAVE_DATA_OPTION == 'jsonl' else 'json'
+            comments_file_path = self._get_file_path(file_type, 'comments')
+            await self.flush()
             if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
                 utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
                 return
@@ -98,7 +330,10 @@ class AsyncFileWriter:
                     utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Comments file is empty")
                     return
 
-                comments_data = json.loads(content)
+                if file_type == 'jsonl':
+                    comments_data = [json.loads(line) for line in content.splitlines() if line.strip()]
+                else:
+                    comments_data = json.loads(content)
                 if not isinstance(comments_data, list):
                     comments_data = [comments_data]
 
@@ -127,3 +362,47 @@ class AsyncFileWriter:
 
         except Exception as e:
             utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
+
+
+def compact_jsonl_to_json(jsonl_path: str, json_path: Optional[str] = None) -> str:
+    """
+    Convert a JSONL file into the JSON array layout written by write_single_item_to_json
+    The file is processed line by line, so memory stays flat for large files
+    Args:
+        jsonl_path: source .jsonl file, e.g. data/xhs/jsonl/search_comments_2025-01-01.jsonl
+        json_path: target file, defaults to the sibling json directory with the same file name
+
+    Returns:
+        target json file path
+    """
+    if not json_path:
+        source = pathlib.Path(jsonl_path)
+        target_dir = source.parent.parent / "json"
+        target_dir.mkdir(parents=True, exist_ok=True)
+        json_path = str(target_dir / f"{source.stem}.json")
+
+    count = 0
+    with open(jsonl_path, 'r', encoding='utf-8') as src, open(json_path, 'w', encoding='utf-8') as dst:
+        dst.write("[")
+        for line_no, line in enumerate(src, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                # 进程被强制中断时最后一行可能不完整，跳过即可
+                utils.logger.warning(f"[compact_jsonl_to_json] Skip broken line {line_no} in {jsonl_path}")
+                continue
+            body = json.dumps(item, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+            dst.write(("," if count else "") + "\n    " + body)
+            count += 1
+        dst.write("\n]" if count else "]")
+
+    utils.logger.info(f"[compact_jsonl_to_json] Compacted {count} items from {jsonl_path} to {json_path}")
+    return json_path
+
+
+if __name__ == '__main__':
+    # 离线转换: python -m tools.async_file_writer data/xhs/jsonl/search_comments_2025-01-01.jsonl ...
+    for path in sys.argv[1:]:
+        compact_jsonl_to_json(path)
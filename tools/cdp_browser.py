@@ -24,14 +24,208 @@ import socket
 import httpx
 import signal
 import atexit
-from typing import Optional, Dict, Any
-from playwright.async_api import Browser, BrowserContext, Playwright
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Iterable, List, Optional, Dict, Any, Tuple
+from playwright.async_api import Browser, BrowserContext, Page, Playwright
 
 import config
 from tools.browser_launcher import BrowserLauncher
 from tools import utils
 
 
+class PagePool:
+    """
+    同一个 BrowserContext 下的页面池，最多 size 个页面，通过 lease() 独占借用
+    CDP 模式和普通 launch_browser 模式都可以使用
+
+    - start() 预先打开全部页面并导航到 origin_url（平台首页），签名函数、localStorage 等即可直接使用
+    - 没有调用 start() 时按需创建页面
+    - 崩溃或被关闭的页面在借出和归还时检测，归还时丢弃，下次借用时按需创建新页面
+    - 空闲超过 BROWSER_PAGE_POOL_HEALTH_CHECK_SEC 的页面在借出前先探测是否还有响应；health_check() 可主动探测全部空闲页面
+    - page_setup 在每个新页面打开后、导航前调用，可用于设置路由拦截等
+    - 页面创建（page_setup、导航）失败时关闭该页面并把名额还给池，错误抛给借用方
+    """
+
+    # 借出前探测空闲页面的超时时间（秒）
+    PROBE_TIMEOUT_SEC = 5
+
+    def __init__(
+        self,
+        browser_context: BrowserContext,
+        size: int,
+        origin_url: Optional[str] = None,
+        page_setup: Optional[Callable[[Page], Awaitable[None]]] = None,
+    ):
+        self.browser_context = browser_context
+        self.size = max(1, size)
+        self.origin_url = origin_url
+        self.page_setup = page_setup
+        self._pages: List[Page] = []
+        self._crashed = set()
+        # 空闲页面及其归还时间
+        self._idle: Deque[Tuple[Page, float]] = deque()
+        # 每个借出的页面占用一个名额，页面总数不会超过 size
+        self._slots = asyncio.Semaphore(self.size)
+        self._closed = False
+
+    async def start(self) -> "PagePool":
+        """预先打开所有页面"""
+        while len(self._pages) < self.size:
+            self._idle.append((await self._new_page(), time.monotonic()))
+        return self
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Page]:
+        """借用一个页面，退出上下文时归还"""
+        page = await self._acquire()
+        try:
+            yield page
+        finally:
+            await self._release(page)
+
+    async def health_check(self, timeout: float = 5) -> int:
+        """
+        探测所有空闲页面，无响应的页面关闭后替换
+        Returns:
+            替换的页面数
+        """
+        replaced = 0
+        for _ in range(len(self._idle)):
+            async with self._slots:
+                if not self._idle:
+                    break
+                page, _ = self._idle.popleft()
+                if await self._probe(page, timeout):
+                    self._idle.append((page, time.monotonic()))
+                    continue
+                await self._discard(page)
+                replaced += 1
+                try:
+                    self._idle.append((await self._new_page(), time.monotonic()))
+                except Exception as e:
+                    # 替换失败时少一个页面，下次借用时会按需重新创建
+                    utils.logger.warning(f"[PagePool.health_check] replace unresponsive page error: {e}")
+        return replaced
+
+    async def _acquire(self) -> Page:
+        if self._closed:
+            raise RuntimeError("page pool is closed")
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                page, idle_since = self._idle.popleft()
+                if await self._check_idle_page(page, idle_since):
+                    return page
+                utils.logger.warning("[PagePool] page crashed or unresponsive, replace it with a new page")
+                await self._discard(page)
+            return await self._new_page()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _release(self, page: Page):
+        if self._closed:
+            return
+        try:
+            if self._is_healthy(page):
+                self._idle.append((page, time.monotonic()))
+            else:
+                # 崩溃的页面直接丢弃，名额归还后由下一次借用按需创建新页面
+                await self._discard(page)
+        finally:
+            self._slots.release()
+
+    def _is_healthy(self, page: Page) -> bool:
+        return id(page) not in self._crashed and not page.is_closed()
+
+    async def _check_idle_page(self, page: Page, idle_since: float) -> bool:
+        if not self._is_healthy(page):
+            return False
+        interval = config.BROWSER_PAGE_POOL_HEALTH_CHECK_SEC
+        if interval <= 0 or time.monotonic() - idle_since < interval:
+            return True
+        return await self._probe(page, self.PROBE_TIMEOUT_SEC)
+
+    async def _probe(self, page: Page, timeout: float) -> bool:
+        if not self._is_healthy(page):
+            return False
+        try:
+            await asyncio.wait_for(page.evaluate("1"), timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _new_page(self) -> Page:
+        page = await self.browser_context.new_page()
+        page.on("crash", lambda _: self._crashed.add(id(page)))
+        try:
+            if self.page_setup is not None:
+                await self.page_setup(page)
+            if self.origin_url:
+                await page.goto(self.origin_url, wait_until="domcontentloaded")
+        except BaseException:
+            await self._discard(page)
+            raise
+        self._pages.append(page)
+        return page
+
+    async def _discard(self, page: Page):
+        if page in self._pages:
+            self._pages.remove(page)
+        self._crashed.discard(id(page))
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        """关闭池中所有页面"""
+        self._closed = True
+        pages, self._pages = self._pages, []
+        self._idle.clear()
+        for page in pages:
+            try:
+                await page.close()
+            except Exception as e:
+                utils.logger.warning(f"[PagePool.close] close page error: {e}")
+
+
+async def create_page_pool(
+    browser_context: BrowserContext,
+    size: Optional[int] = None,
+    origin_url: Optional[str] = None,
+    page_setup: Optional[Callable[[Page], Awaitable[None]]] = None,
+) -> Optional[PagePool]:
+    """
+    创建页面池并预先打开页面，size 默认为 BROWSER_PAGE_POOL_SIZE，不大于 0 时返回 None
+    """
+    size = config.BROWSER_PAGE_POOL_SIZE if size is None else size
+    if size <= 0:
+        return None
+    utils.logger.info(f"[create_page_pool] open {size} pages on {origin_url}")
+    return await PagePool(browser_context, size, origin_url, page_setup).start()
+
+
+def block_resource_types(resource_types: Iterable[str]) -> Callable[[Page], Awaitable[None]]:
+    """
+    生成 PagePool 的 page_setup：通过 page.route 拦截指定类型的资源（如 image、font、media）
+    """
+    blocked = frozenset(resource_types)
+
+    async def handle_route(route):
+        if route.request.resource_type in blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def setup(page: Page):
+        await page.route("**/*", handle_route)
+
+    return setup
+
+
 class CDPBrowserManager:
     """
     CDP浏览器管理器，负责启动和管理通过CDP连接的浏览器
@@ -402,6 +596,14 @@ class CDPBrowserManager:
 
         return browser_context
 
+    async def create_page_pool(self, size: int, origin_url: Optional[str] = None) -> Optional[PagePool]:
+        """
+        在当前浏览器上下文中创建页面池并预先打开页面，size 不大于 0 时返回 None
+        """
+        if not self.browser_context:
+            raise RuntimeError("浏览器上下文未创建")
+        return await create_page_pool(self.browser_context, size, origin_url)
+
     async def add_stealth_script(self, script_path: str = "libs/stealth.min.js"):
         """
         添加反检测脚本
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/embedded_state.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 页面内嵌状态（window.__INITIAL_STATE__、<script id="js-initialData"> 等）提取
+
+"""
+接口被限流时会回退到解析网页，页面往往有几百 KB 到数 MB，其中需要的只是某个 <script> 里的一段 JSON。
+这里用 str.find 定位脚本内容的起止位置（不构建 DOM、不跑贪婪正则），JSON 只解析一次，
+调用方再按路径取出需要的子树，只对这部分做 decamelize。
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+import humps
+
+SCRIPT_END = "</script>"
+
+# 定位 <script> 起始标签结束位置时最多向后扫描的字符数
+_TAG_SCAN_LIMIT = 1024
+
+# JS 对象里的 undefined 不是合法 JSON，只替换出现在值位置上的 undefined，字符串内容不受影响
+_UNDEFINED_VALUE_PATTERN = re.compile(r"(?<=[:,\[])undefined(?=[,}\]])")
+
+
+def find_script_payload(html: str, start_marker: str, end_marker: str = SCRIPT_END) -> Optional[str]:
+    """
+    返回 start_marker 之后到 end_marker 之前的内容，找不到时返回 None
+    Args:
+        html: 页面内容
+        start_marker: 内容起始标记，例如 "window.__INITIAL_STATE__="
+        end_marker: 内容结束标记
+
+    Returns:
+
+    """
+    if not html:
+        return None
+    start = html.find(start_marker)
+    if start == -1:
+        return None
+    start += len(start_marker)
+    end = html.find(end_marker, start)
+    if end == -1:
+        return None
+    return html[start:end]
+
+
+def extract_window_state(html: str, name: str = "__INITIAL_STATE__") -> Optional[str]:
+    """
+    提取 <script>window.<name>=...</script> 中的对象字面量
+    """
+    payload = find_script_payload(html, f"window.{name}=")
+    if payload is None:
+        return None
+    return payload.strip().rstrip(";")
+
+
+def extract_script_text_by_id(html: str, script_id: str) -> Optional[str]:
+    """
+    提取 <script id="script_id" ...>...</script> 的文本内容
+    """
+    if not html:
+        return None
+    for attr in (f'id="{script_id}"', f"id='{script_id}'"):
+        attr_pos = html.find(attr)
+        if attr_pos == -1:
+            continue
+        tag_end = html.find(">", attr_pos, attr_pos + _TAG_SCAN_LIMIT)
+        if tag_end == -1:
+            return None
+        end = html.find(SCRIPT_END, tag_end + 1)
+        if end == -1:
+            return None
+        return html[tag_end + 1:end]
+    return None
+
+
+def loads_js_object(payload: str, undefined_value: str = "null") -> Any:
+    """
+    解析页面内嵌的 JS 对象字面量，undefined 替换为 undefined_value（JSON 片段）
+    """
+    if "undefined" in payload:
+        payload = _UNDEFINED_VALUE_PATTERN.sub(undefined_value, payload)
+    return json.loads(payload, strict=False)
+
+
+def get_subtree(data: Any, *path: Any, default: Any = None) -> Any:
+    """
+    按 key 路径取子树，任意一级不存在时返回 default
+    """
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return default
+        data = data[key]
+    return data
+
+
+def decamelize_subtree(data: Any, *path: Any) -> Any:
+    """
+    只对 path 指向的子树做 decamelize，子树不存在时返回 None
+    """
+    subtree = get_subtree(data, *path)
+    if subtree is None:
+        return None
+    return humps.decamelize(subtree)
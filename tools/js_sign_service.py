@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/js_sign_service.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 常驻 node 进程池，用于抖音 a_bogus、知乎 x-zse-96 等 JS 签名
+
+"""
+PyExecJS 在 Node 运行时下每次 .call() 都会启动一个新的 node 进程并重新执行整个签名脚本，
+而且是同步调用，会阻塞事件循环。这里改为启动若干常驻 node 进程（libs/js_sign_worker.js），
+每个进程只加载一次签名脚本，通过 stdin/stdout 按行收发 JSON，调用方可以并发 await。
+
+基准测试:
+    python -m tools.js_sign_service --bench
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional
+
+import config
+from tools import utils
+
+WORKER_SCRIPT_PATH = os.path.join("libs", "js_sign_worker.js")
+
+
+class JsSignError(Exception):
+    """签名进程调用失败"""
+
+
+class JsSignWorker:
+    """
+    单个常驻 node 签名进程，请求通过自增 id 与响应对应，同一进程上可以有多个未完成的请求
+    """
+
+    def __init__(self, script_path: str, node_path: str = "node"):
+        self.script_path = script_path
+        self.node_path = node_path
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def start(self):
+        self._process = await asyncio.create_subprocess_exec(
+            self.node_path, WORKER_SCRIPT_PATH, self.script_path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=1024 * 1024,
+        )
+        self._reader_task = asyncio.create_task(self._read_responses(self._process))
+
+    async def call(self, fn: str, *args: Any, timeout: float = None) -> Any:
+        """
+        调用签名脚本中的全局函数
+        Args:
+            fn: 函数名
+            *args: 函数参数（需要能被 JSON 序列化）
+            timeout: 超时秒数，超时后进程会被结束，由进程池重新拉起
+
+        Returns:
+            函数返回值
+        """
+        if not self.alive:
+            raise JsSignError(f"sign worker for {self.script_path} is not running")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        line = json.dumps({"id": request_id, "fn": fn, "args": list(args)}, ensure_ascii=False) + "\n"
+        try:
+            self._process.stdin.write(line.encode("utf-8"))
+            await self._process.stdin.drain()
+            return await asyncio.wait_for(future, timeout=timeout or config.JS_SIGN_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            # 进程卡住时直接结束它，避免后续请求继续排在它后面
+            self.kill()
+            raise JsSignError(f"sign worker call {fn} timeout")
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise JsSignError(f"sign worker for {self.script_path} exited: {e}")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def ping(self, timeout: float = 3) -> bool:
+        try:
+            return await self.call("__ping__", timeout=timeout) == "pong"
+        except JsSignError:
+            return False
+
+    def kill(self):
+        if self.alive:
+            try:
+                self._process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def close(self):
+        if self._process is None:
+            return
+        if self.alive:
+            try:
+                self._process.stdin.close()
+                await asyncio.wait_for(self._process.wait(), timeout=3)
+            except Exception:
+                self.kill()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._fail_pending(JsSignError("sign worker closed"))
+
+    async def _read_responses(self, process: asyncio.subprocess.Process):
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    utils.logger.warning(f"[JsSignWorker] invalid response line: {line[:200]!r}")
+                    continue
+                future = self._pending.get(message.get("id"))
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(JsSignError(message["error"]))
+                else:
+                    future.set_result(message.get("result"))
+        finally:
+            self._fail_pending(JsSignError(f"sign worker for {self.script_path} exited"))
+
+    def _fail_pending(self, error: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class JsSignPool:
+    """
+    某个签名脚本的常驻进程池，每个脚本一个单例
+    退出的进程会在下一次调用时重新拉起，调用失败时换一个进程重试一次
+    每隔 JS_SIGN_HEALTH_CHECK_SEC 秒在取进程时 ping 一次空闲进程，卡住的进程会被结束并重新拉起
+    """
+
+    _instances: Dict[str, "JsSignPool"] = {}
+    _node_path: Optional[str] = None
+
+    @classmethod
+    def available(cls) -> bool:
+        """是否可以使用进程池（配置开启且安装了 node）"""
+        if not config.ENABLE_JS_SIGN_WORKER_POOL:
+            return False
+        if cls._node_path is None:
+            cls._node_path = shutil.which("node") or ""
+        return bool(cls._node_path)
+
+    @classmethod
+    def get_instance(cls, script_path: str) -> "JsSignPool":
+        loop = asyncio.get_running_loop()
+        pool = cls._instances.get(script_path)
+        if pool is None or pool._loop is not loop:
+            # 子进程管道绑定在创建它的事件循环上，换了事件循环需要重新创建
+            if pool is not None:
+                pool.kill_all()
+            pool = cls(script_path, config.JS_SIGN_WORKER_NUM)
+            cls._instances[script_path] = pool
+        return pool
+
+    @classmethod
+    async def close_all(cls):
+        """关闭所有签名进程，在爬虫结束时调用"""
+        pools = list(cls._instances.values())
+        cls._instances.clear()
+        loop = asyncio.get_running_loop()
+        for pool in pools:
+            if pool._loop is loop:
+                await pool.close()
+            else:
+                # 中断退出时在新的事件循环中清理，旧循环上的管道已不可用，直接结束进程
+                pool.kill_all()
+
+    def __init__(self, script_path: str, size: int):
+        self.script_path = script_path
+        self.size = max(1, size)
+        self._workers: List[Optional[JsSignWorker]] = [None] * self.size
+        self._start_lock = asyncio.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._last_health_check = time.monotonic()
+
+    async def call(self, fn: str, *args: Any) -> Any:
+        """
+        调用签名函数，优先选择未完成请求最少的进程
+        """
+        worker = await self._pick_worker()
+        try:
+            return await worker.call(fn, *args)
+        except JsSignError:
+            if worker.alive:
+                # 脚本本身抛出的异常，重试没有意义
+                raise
+            utils.logger.warning(f"[JsSignPool.call] sign worker for {self.script_path} crashed, retry with a new worker")
+            worker = await self._pick_worker()
+            return await worker.call(fn, *args)
+
+    async def health_check(self) -> int:
+        """
+        ping 所有进程，无响应的进程结束后重新拉起
+        Returns:
+            重启的进程数
+        """
+        async with self._start_lock:
+            return await self._check_workers()
+
+    async def _check_workers(self) -> int:
+        self._last_health_check = time.monotonic()
+        restarted = 0
+        for index, worker in enumerate(self._workers):
+            # 有未完成请求的进程由调用超时处理，这里只 ping 空闲进程
+            if worker is not None and worker.alive and (
+                    worker.pending_count or await worker.ping(timeout=min(3, config.JS_SIGN_TIMEOUT_SEC))):
+                continue
+            if worker is not None:
+                utils.logger.warning(f"[JsSignPool] sign worker {index} for {self.script_path} is not responding, restart it")
+                worker.kill()
+                await worker.close()
+            self._workers[index] = await self._start_worker()
+            restarted += 1
+        return restarted
+
+    async def _pick_worker(self) -> JsSignWorker:
+        async with self._start_lock:
+            interval = config.JS_SIGN_HEALTH_CHECK_SEC
+            if interval > 0 and time.monotonic() - self._last_health_check >= interval:
+                await self._check_workers()
+            for index, worker in enumerate(self._workers):
+                if worker is None or not worker.alive:
+                    if worker is not None:
+                        await worker.close()
+                        utils.logger.warning(f"[JsSignPool] restart sign worker {index} for {self.script_path}")
+                    self._workers[index] = await self._start_worker()
+        return min(self._workers, key=lambda w: w.pending_count)
+
+    async def _start_worker(self) -> JsSignWorker:
+        worker = JsSignWorker(self.script_path, node_path=JsSignPool._node_path or "node")
+        await worker.start()
+        return worker
+
+    def kill_all(self):
+        for worker in self._workers:
+            if worker is not None:
+                worker.kill()
+
+    async def close(self):
+        for worker in self._workers:
+            if worker is not None:
+                await worker.close()
+        self._workers = [None] * self.size
+
+
+async def _benchmark(total: int):
+    import execjs
+
+    script_path = os.path.join("libs", "zhihu.js")
+    url = "/api/v4/search_v3?gk_version=gz-gaokao&t=general&q=python&correction=1&offset=0&limit=20"
+    cookies = "d_c0=AbCdEfGhIjKlMnOpQrStUvWxYz0123456789|1700000000"
+
+    with open(script_path, encoding="utf-8-sig") as f:
+        ctx = execjs.compile(f.read())
+    legacy_total = max(1, total // 10)
+    start = time.perf_counter()
+    for _ in range(legacy_total):
+        ctx.call("get_sign", url, cookies)
+    legacy_rate = legacy_total / (time.perf_counter() - start)
+
+    pool = JsSignPool.get_instance(script_path)
+    await pool.call("get_sign", url, cookies)  # 预热，启动进程
+    start = time.perf_counter()
+    await asyncio.gather(*[pool.call("get_sign", url, cookies) for _ in range(total)])
+    pool_rate = total / (time.perf_counter() - start)
+    await JsSignPool.close_all()
+
+    print(f"execjs ({execjs.get().name}): {legacy_rate:.1f} signs/s ({legacy_total} calls)")
+    print(f"worker pool ({config.JS_SIGN_WORKER_NUM} workers): {pool_rate:.1f} signs/s ({total} calls)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JS sign worker pool")
+    parser.add_argument("--bench", action="store_true", help="compare signatures/sec with execjs")
+    parser.add_argument("--count", type=int, default=1000, help="number of pool calls in the benchmark")
+    args = parser.parse_args()
+    if args.bench:
+        asyncio.run(_benchmark(args.count))
+    else:
+        parser.print_help()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/media_download_manager.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+# -*- coding: utf-8 -*-
+# @Desc    : 媒体下载线程池：与帖子/评论采集解耦，按 CDN 域名限制并发
+
+"""
+原来图片/视频在采集帖子的流程里逐个下载，每个文件后还要 sleep，Bilibili 下载视频时还占着详情接口的信号量，
+媒体 I/O 直接拖慢了帖子和评论的采集。这里把下载放到独立的 worker 中执行：
+
+    await MediaDownloadManager.submit(url, xhs_store.update_xhs_note_image, note_id, source, "0.jpg")
+
+submit 把任务放进有界队列后立即返回（队列满时等待，避免积压过多任务），worker 按 CDN 域名限制并发，
+每个文件下载完成后在该域名上随机等待 0~MEDIA_DOWNLOAD_HOST_JITTER_SEC 秒。
+爬虫结束前调用 drain() 等待队列中的下载全部完成，中断退出时调用 cancel_all() 直接取消（.part 文件保留以便续传）。
+"""
+
+import asyncio
+import contextvars
+import functools
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import config
+from tools import utils
+from tools.media_store import MediaStore
+
+MediaJob = Callable[[], Awaitable[Any]]
+
+
+class MediaDownloadManager:
+    """
+    全局的媒体下载队列和 worker，第一次提交任务时在当前事件循环中启动
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _queue: Optional[asyncio.Queue] = None
+    _workers: List[asyncio.Task] = []
+    _host_semaphores: Dict[str, asyncio.Semaphore] = {}
+    _stats: Dict[str, int] = {"submitted": 0, "active": 0, "completed": 0, "cached": 0, "failed": 0}
+
+    @classmethod
+    def _ensure_started(cls):
+        loop = asyncio.get_running_loop()
+        if cls._queue is not None and cls._loop is loop:
+            return
+        if cls._queue is not None:
+            # 换了事件循环，旧循环中的 worker 已无法使用
+            cls._reset()
+        cls._loop = loop
+        cls._queue = asyncio.Queue(maxsize=config.MEDIA_DOWNLOAD_QUEUE_SIZE)
+        cls._workers = [loop.create_task(cls._worker()) for _ in range(config.MEDIA_DOWNLOAD_WORKERS)]
+
+    @classmethod
+    def _reset(cls):
+        cls._loop = None
+        cls._queue = None
+        cls._workers = []
+        cls._host_semaphores = {}
+        cls._stats = {"submitted": 0, "active": 0, "completed": 0, "cached": 0, "failed": 0}
+
+    @classmethod
+    async def submit(cls, url: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """
+        提交一个下载任务
+        Args:
+            url: 媒体地址，用于按域名限制并发
+            func: 执行下载和保存的协程函数，返回 False 表示失败
+            *args: func 的参数
+            **kwargs: func 的参数
+
+        Returns:
+
+        """
+        job = functools.partial(func, *args, **kwargs)
+        if await MediaStore.is_cached(url):
+            # 之前已经下载过，只需要创建链接，不占用下载队列和域名并发
+            await cls._run_cached(url, job)
+            return
+        if config.MEDIA_DOWNLOAD_WORKERS <= 0:
+            await cls._run_job(url, job)
+            return
+        cls._ensure_started()
+        if cls._queue.full():
+            utils.logger.info(f"[MediaDownloadManager.submit] media queue is full ({cls._queue.qsize()}), waiting for downloads")
+        # 在提交时复制上下文，保证下载任务中读取到的 crawler_type_var 等变量与提交时一致
+        await cls._queue.put((url, job, contextvars.copy_context()))
+        cls._stats["submitted"] += 1
+
+    @classmethod
+    async def _worker(cls):
+        while True:
+            url, job, context = await cls._queue.get()
+            try:
+                await asyncio.get_running_loop().create_task(cls._run_job(url, job), context=context)
+            finally:
+                cls._queue.task_done()
+
+    @classmethod
+    async def _run_cached(cls, url: str, job: MediaJob):
+        try:
+            result = await job()
+        except Exception as e:
+            result = False
+            utils.logger.error(f"[MediaDownloadManager._run_cached] link {url} error: {e}")
+        cls._stats["failed" if result is False else "cached"] += 1
+
+    @classmethod
+    def _get_host_semaphore(cls, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        semaphore = cls._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, config.MEDIA_DOWNLOAD_PER_HOST_CONCURRENCY))
+            cls._host_semaphores[host] = semaphore
+        return semaphore
+
+    @classmethod
+    async def _run_job(cls, url: str, job: MediaJob):
+        async with cls._get_host_semaphore(url):
+            cls._stats["active"] += 1
+            try:
+                result = await job()
+            except Exception as e:
+                result = False
+                utils.logger.error(f"[MediaDownloadManager._run_job] download {url} error: {e}")
+            finally:
+                cls._stats["active"] -= 1
+            cls._stats["failed" if result is False else "completed"] += 1
+            if config.MEDIA_DOWNLOAD_HOST_JITTER_SEC > 0:
+                await asyncio.sleep(random.random() * config.MEDIA_DOWNLOAD_HOST_JITTER_SEC)
+
+    @classmethod
+    def queue_depth(cls) -> int:
+        """
+        队列中等待下载的任务数
+        """
+        return cls._queue.qsize() if cls._queue is not None else 0
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """
+        下载统计：已提交、排队中、下载中、完成、已下载过直接链接、失败的任务数
+        """
+        return {**cls._stats, "queued": cls.queue_depth()}
+
+    @classmethod
+    async def drain(cls):
+        """
+        等待队列中的下载全部完成后停止 worker，爬虫结束前调用
+        """
+        if cls._queue is None:
+            return
+        if cls._loop is asyncio.get_running_loop():
+            utils.logger.info(f"[MediaDownloadManager.drain] waiting for media downloads: {cls.stats()}")
+            await cls._queue.join()
+            await cls._stop_workers()
+        utils.logger.info(f"[MediaDownloadManager.drain] media downloads finished: {cls.stats()}")
+        cls._reset()
+
+    @classmethod
+    async def cancel_all(cls):
+        """
+        取消排队中和下载中的任务，中断退出时调用，未完成的 .part 文件保留以便下次续传
+        """
+        if cls._queue is None:
+            return
+        dropped = cls.queue_depth()
+        # 中断退出时可能已经换了事件循环，旧循环中的 worker 无法再等待
+        if cls._loop is asyncio.get_running_loop():
+            await cls._stop_workers()
+        if dropped:
+            utils.logger.warning(f"[MediaDownloadManager.cancel_all] dropped {dropped} queued media downloads")
+        cls._reset()
+
+    @classmethod
+    async def _stop_workers(cls):
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/media_downloader.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 媒体文件流式下载：边下载边写入 .part 临时文件，完成后原子重命名，中断后用 Range 续传
+
+"""
+原来的媒体下载先把整个文件读进内存（response.content），再交给存储层写盘，并发下载视频时内存占用会很高。
+这里改为 client.stream() 按块写入 <保存路径>.part，下载完成并校验长度后 os.replace 为最终文件，
+每个下载任务的内存占用只与块大小有关。下载中断时 .part 文件保留，按 MEDIA_DOWNLOAD_RETRY_BACKOFF_SEC 指数退避后
+带 Range 头续传。
+
+用法：
+    source = MediaSource(url, xhs_client.download_note_media)
+    await xhs_store.update_xhs_note_image(note_id, source, "0.jpg")   # 存储层决定保存路径后调用 source.save_to(path)
+"""
+
+import asyncio
+import os
+import re
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+import aiofiles
+import httpx
+
+import config
+from tools import utils
+from tools.media_store import MediaStore
+
+PART_SUFFIX = ".part"
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+_CONTENT_RANGE_PATTERN = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadResult:
+    """
+    一次下载的结果
+    """
+
+    def __init__(self, path: str, bytes_written: int, total_bytes: Optional[int], resumed_from: int = 0):
+        self.path = path
+        self.bytes_written = bytes_written
+        self.total_bytes = total_bytes
+        self.resumed_from = resumed_from
+
+    def __repr__(self) -> str:
+        return (f"DownloadResult(path={self.path!r}, bytes_written={self.bytes_written}, "
+                f"total_bytes={self.total_bytes}, resumed_from={self.resumed_from})")
+
+
+class MediaSource:
+    """
+    待下载的媒体，保存路径由存储层决定，下载方法由各平台 client 提供（带上各自的代理、请求头等）
+    """
+
+    def __init__(self, url: str, downloader: Callable[[str, str], Awaitable[Optional[DownloadResult]]]):
+        self.url = url
+        self._downloader = downloader
+
+    async def save_to(self, save_path: str) -> Optional[DownloadResult]:
+        return await self._downloader(self.url, save_path)
+
+
+def _total_bytes(response: httpx.Response, offset: int) -> Optional[int]:
+    # 经过压缩传输时 Content-Length 与解压后的字节数对不上，不做长度校验
+    if response.headers.get("content-encoding", "identity") != "identity":
+        return None
+    if response.status_code == 206:
+        match = _CONTENT_RANGE_PATTERN.match(response.headers.get("content-range", ""))
+        if match and match.group(3) != "*":
+            return int(match.group(3))
+    content_length = response.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        return offset + int(content_length)
+    return None
+
+
+def _progress_logger(save_path: str) -> ProgressCallback:
+    """
+    默认的进度输出：每下载 MEDIA_DOWNLOAD_PROGRESS_LOG_BYTES 字节打印一次
+    """
+    step = config.MEDIA_DOWNLOAD_PROGRESS_LOG_BYTES
+    next_report = [step]
+
+    def report(written: int, total: Optional[int]):
+        if step <= 0:
+            return
+        if written < next_report[0] - step:
+            # 服务端不支持 Range 或 .part 被丢弃后从头下载，进度阈值跟着回退
+            next_report[0] = (written // step + 1) * step
+        if written < next_report[0]:
+            return
+        next_report[0] = (written // step + 1) * step
+        percent = f" ({written * 100 // total}%)" if total else ""
+        utils.logger.info(f"[stream_download] {save_path}: {written / 1024 / 1024:.1f}MB{percent}")
+
+    return report
+
+
+def _retry_delay(attempt: int) -> float:
+    """
+    第 attempt 次重试前的等待秒数（attempt 从 1 开始）
+    """
+    return config.MEDIA_DOWNLOAD_RETRY_BACKOFF_SEC * 2 ** (attempt - 1)
+
+
+async def stream_download(
+    client: httpx.AsyncClient,
+    url: str,
+    save_path: str,
+    headers: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    follow_redirects: bool = True,
+    progress: Optional[ProgressCallback] = None,
+) -> Optional[DownloadResult]:
+    """
+    流式下载到 save_path，失败返回 None（保留 .part 以便下次续传）
+    Args:
+        client: httpx 客户端
+        url: 媒体地址
+        save_path: 保存路径，目录需已存在
+        headers: 请求头
+        timeout: 超时时间
+        follow_redirects: 是否跟随重定向
+        progress: 进度回调 (已写入字节数, 总字节数或 None)，默认按 MEDIA_DOWNLOAD_PROGRESS_LOG_BYTES 打印日志
+
+    Returns:
+
+    """
+    part_path = save_path + PART_SUFFIX
+    progress = progress or _progress_logger(save_path)
+    chunk_size = config.MEDIA_DOWNLOAD_CHUNK_SIZE
+    resumed_from = 0
+    max_attempts = config.MEDIA_DOWNLOAD_MAX_RETRIES + 1
+    attempt = 0
+
+    while attempt < max_attempts:
+        if attempt:
+            await asyncio.sleep(_retry_delay(attempt))
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+        written, total = offset, None
+        try:
+            async with client.stream("GET", url, headers=request_headers, timeout=timeout,
+                                     follow_redirects=follow_redirects) as response:
+                if offset and response.status_code == 416:
+                    # .part 已经不比服务端文件短，说明与服务端文件对不上，丢弃后立即重新下载，不计入重试次数
+                    utils.logger.warning(f"[stream_download] range not satisfiable, restart {url}")
+                    os.remove(part_path)
+                    continue
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    # 服务端不支持 Range，从头下载
+                    offset = written = 0
+                resumed_from = offset
+                total = _total_bytes(response, offset)
+                async with aiofiles.open(part_path, "ab" if offset else "wb") as f:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        await f.write(chunk)
+                        written += len(chunk)
+                        progress(written, total)
+        except httpx.HTTPStatusError as exc:
+            utils.logger.error(f"[stream_download] {exc.response.status_code} for {url}")
+            if exc.response.status_code < 500:
+                return None
+            attempt += 1
+            continue
+        except httpx.HTTPError as exc:
+            # 连接中断等错误，已写入的部分保留在 .part 中，下一轮从断点续传
+            attempt += 1
+            utils.logger.warning(
+                f"[stream_download] {exc.__class__.__name__} for {url} after {written} bytes, "
+                f"attempt {attempt}/{max_attempts}"
+            )
+            continue
+
+        if total is not None and written < total:
+            utils.logger.warning(f"[stream_download] incomplete download {written}/{total} for {url}")
+            attempt += 1
+            continue
+        os.replace(part_path, save_path)
+        return DownloadResult(save_path, written, total, resumed_from)
+
+    utils.logger.error(f"[stream_download] download failed, keep {part_path} for resuming: {url}")
+    return None
+
+
+async def save_media(content: Union[bytes, MediaSource, None], save_path: str) -> bool:
+    """
+    存储层统一的媒体写入：MediaSource 流式下载，bytes 直接写入（同样先写 .part 再重命名），
+    开启 ENABLE_MEDIA_STORE 时交给 MediaStore 去重保存
+    Args:
+        content: 媒体内容或待下载的媒体
+        save_path: 保存路径
+
+    Returns:
+        是否保存成功
+    """
+    if content is None:
+        return False
+    if config.ENABLE_MEDIA_STORE:
+        store = MediaStore.get_instance()
+        if isinstance(content, MediaSource):
+            return await store.save_download(content.url, save_path, content.save_to)
+        await store.ingest_bytes(content, save_path)
+        return True
+    if isinstance(content, MediaSource):
+        return await content.save_to(save_path) is not None
+    part_path = save_path + PART_SUFFIX
+    async with aiofiles.open(part_path, "wb") as f:
+        await f.write(content)
+    os.replace(part_path, save_path)
+    return True
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/media_store.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+# -*- coding: utf-8 -*-
+# @Desc    : 按内容寻址的媒体存储，跨多次运行对图片/视频去重
+
+"""
+各平台的媒体文件按 data/<平台>/<images|videos>/<id>/<n>.ext 保存，之前没有任何已下载的记录，
+重复采集同一个关键词或创作者时每次都会重新下载全部图片和视频。开启 ENABLE_MEDIA_STORE 后：
+
+    MEDIA_STORE_PATH/
+        index.db              # url -> sha256 摘要
+        blobs/ab/abcdef....jpg
+
+- 文件内容按 sha256 保存在 blobs/ 下，内容相同的文件只保存一份；
+- 各帖子目录下原来的路径改为指向 blob 的硬链接或软链接，对使用方来说目录结构不变；
+- 下载前先查 url 索引，命中且 blob 存在时直接创建链接，不发起网络请求。
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import aiosqlite
+
+import config
+from tools import utils
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaStore:
+    """
+    按存储目录区分的单例，使用 get_instance() 获取
+    """
+
+    _instances: Dict[str, "MediaStore"] = {}
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.index_path = os.path.join(root, "index.db")
+        self._db: Optional[aiosqlite.Connection] = None
+        self._db_lock = asyncio.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "MediaStore":
+        root = config.MEDIA_STORE_PATH
+        if root not in cls._instances:
+            cls._instances[root] = cls(root)
+        return cls._instances[root]
+
+    @classmethod
+    async def close_all(cls):
+        """
+        关闭所有索引数据库连接
+        """
+        instances = list(cls._instances.values())
+        cls._instances.clear()
+        for instance in instances:
+            await instance.close()
+
+    @classmethod
+    async def is_cached(cls, url: str) -> bool:
+        """
+        url 是否已经下载过（未开启 ENABLE_MEDIA_STORE 时始终为 False）
+        """
+        if not config.ENABLE_MEDIA_STORE:
+            return False
+        return await cls.get_instance().lookup(url) is not None
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def _get_db(self) -> aiosqlite.Connection:
+        async with self._db_lock:
+            if self._db is None:
+                os.makedirs(self.blob_dir, exist_ok=True)
+                db = await aiosqlite.connect(self.index_path)
+                await db.execute("PRAGMA journal_mode=WAL")
+                await db.execute(
+                    "CREATE TABLE IF NOT EXISTS media_index ("
+                    "url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, "
+                    "ext TEXT NOT NULL, created_at INTEGER NOT NULL)"
+                )
+                await db.commit()
+                self._db = db
+        return self._db
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        if not config.MEDIA_STORE_IGNORE_URL_QUERY:
+            return url
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+    def blob_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest + ext)
+
+    async def lookup(self, url: str) -> Optional[str]:
+        """
+        返回 url 对应的 blob 路径，没有记录或 blob 已被删除时返回 None
+        """
+        db = await self._get_db()
+        async with db.execute("SELECT digest, ext FROM media_index WHERE url = ?", (self.normalize_url(url),)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        blob = self.blob_path(*row)
+        return blob if os.path.exists(blob) else None
+
+    async def remember(self, url: str, blob: str):
+        db = await self._get_db()
+        digest, ext = os.path.splitext(os.path.basename(blob))
+        await db.execute(
+            "INSERT OR REPLACE INTO media_index (url, digest, size, ext, created_at) VALUES (?, ?, ?, ?, ?)",
+            (self.normalize_url(url), digest, os.path.getsize(blob), ext, int(time.time())),
+        )
+        await db.commit()
+
+    async def ingest_file(self, path: str) -> str:
+        """
+        把已下载的文件移动到 blobs/ 下（内容已存在时直接删除），再在原路径创建链接，返回 blob 路径
+        """
+        digest = await asyncio.to_thread(_sha256_file, path)
+        blob = self.blob_path(digest, os.path.splitext(path)[1])
+        if os.path.exists(blob):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            shutil.move(path, blob)
+        self.materialize(blob, path)
+        return blob
+
+    async def ingest_bytes(self, content: bytes, save_path: str) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        blob = self.blob_path(digest, os.path.splitext(save_path)[1])
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            part_path = f"{blob}.{os.getpid()}.tmp"
+            with open(part_path, "wb") as f:
+                f.write(content)
+            os.replace(part_path, blob)
+        self.materialize(blob, save_path)
+        return blob
+
+    @staticmethod
+    def materialize(blob: str, save_path: str):
+        """
+        在 save_path 创建指向 blob 的链接，已存在的其他文件会被替换
+        """
+        if os.path.lexists(save_path):
+            if os.path.exists(save_path) and os.path.samefile(blob, save_path):
+                return
+            os.remove(save_path)
+        try:
+            if config.MEDIA_STORE_LINK_MODE == "symlink":
+                os.symlink(os.path.abspath(blob), save_path)
+            else:
+                os.link(blob, save_path)
+        except OSError as e:
+            # 跨文件系统不能硬链接、Windows 没有权限创建软链接时退回复制
+            utils.logger.warning(f"[MediaStore.materialize] link {save_path} failed, copy instead: {e}")
+            shutil.copyfile(blob, save_path)
+
+    async def save_download(self, url: str, save_path: str,
+                            download: Callable[[str], Awaitable[Optional[object]]]) -> bool:
+        """
+        url 已在索引中时直接链接，否则下载到 save_path 后入库
+        Args:
+            url: 媒体地址
+            save_path: 保存路径
+            download: 下载到指定路径的协程函数，失败时返回 None
+
+        Returns:
+            是否保存成功
+        """
+        blob = await self.lookup(url)
+        if blob is not None:
+            self.materialize(blob, save_path)
+            utils.logger.info(f"[MediaStore.save_download] {save_path} already downloaded, linked to {blob}")
+            return True
+        if await download(save_path) is None:
+            return False
+        blob = await self.ingest_file(save_path)
+        await self.remember(url, blob)
+        return True
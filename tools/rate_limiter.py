@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/rate_limiter.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 按（平台, 接口类别）划分的令牌桶限速
+
+"""
+原来的限速方式是在各处 await asyncio.sleep(CRAWLER_MAX_SLEEP_SEC)，并发任务各睡各的，
+实际请求速率既不可预期，又远低于允许的预算。这里为每个（平台, 接口类别）维护一个令牌桶，
+所有请求在发出前领取令牌，整体速率由配置的每秒请求数和突发容量决定，与并发数无关。
+
+开启 ENABLE_RATE_LIMITER 后，各处请求间隔改用 effective_sleep_sec()，默认返回 0，关闭固定等待；
+CRAWLER_MAX_SLEEP_SEC 本身不做修改，页面加载等待等非限速用途仍按原值执行。
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+import config
+from tools import utils
+
+# 接口类别按 URL（或调用方给出的提示，如 graphql 的 operationName）中的关键字判断，先匹配先得
+ENDPOINT_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("comment", ("comment", "reply")),
+    ("search", ("search",)),
+)
+DEFAULT_ENDPOINT = "default"
+
+
+def classify_endpoint(url: str, hint: str = "") -> str:
+    """
+    判断请求所属的接口类别
+    Args:
+        url: 请求地址
+        hint: 额外的判断依据
+
+    Returns:
+        search / comment / default
+    """
+    target = f"{url} {hint}".lower()
+    for endpoint, keywords in ENDPOINT_KEYWORDS:
+        if any(keyword in target for keyword in keywords):
+            return endpoint
+    return DEFAULT_ENDPOINT
+
+
+class TokenBucket:
+    """
+    令牌桶：以 rate 个/秒的速度补充令牌，最多积攒 capacity 个
+
+    领取时先扣减令牌再等待（令牌可以为负，表示已经预约到未来的时间点），
+    所以并发的调用方会按到达顺序依次放行，不需要加锁。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        预约令牌，返回需要等待的秒数
+        """
+        if self.rate <= 0:
+            return 0
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        self._tokens -= tokens
+        if self._tokens >= 0:
+            return 0
+        return -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """
+        领取令牌，必要时等待，返回实际等待的秒数
+        """
+        wait_seconds = self.reserve(tokens)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+        return wait_seconds
+
+
+class RateLimiter:
+    """
+    全局的令牌桶集合，按（平台, 接口类别）创建
+
+    限速规则 RATE_LIMIT_RULES 的 key 可以是 "平台:接口类别" 或 "平台"，都没有时使用默认速率
+    """
+
+    _buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    @classmethod
+    def get_bucket(cls, platform: str, endpoint: str = DEFAULT_ENDPOINT) -> TokenBucket:
+        key = (platform, endpoint)
+        bucket = cls._buckets.get(key)
+        if bucket is None:
+            rate, burst = cls.get_rule(platform, endpoint)
+            bucket = TokenBucket(rate, burst)
+            cls._buckets[key] = bucket
+        return bucket
+
+    @staticmethod
+    def get_rule(platform: str, endpoint: str) -> Tuple[float, float]:
+        """
+        返回（每秒请求数, 突发容量）
+        """
+        rules = config.RATE_LIMIT_RULES
+        for key in (f"{platform}:{endpoint}", platform):
+            if key in rules:
+                return rules[key]
+        return config.RATE_LIMIT_DEFAULT_RPS, config.RATE_LIMIT_DEFAULT_BURST
+
+    @classmethod
+    async def acquire(cls, platform: str, url: str = "", hint: str = "", endpoint: Optional[str] = None) -> float:
+        """
+        请求发出前调用，未开启 ENABLE_RATE_LIMITER 时直接返回
+        Args:
+            platform: 平台
+            url: 请求地址，用于判断接口类别
+            hint: 额外的接口类别判断依据
+            endpoint: 直接指定接口类别
+
+        Returns:
+            等待的秒数
+        """
+        if not config.ENABLE_RATE_LIMITER:
+            return 0
+        bucket = cls.get_bucket(platform, endpoint or classify_endpoint(url, hint))
+        wait_seconds = await bucket.acquire()
+        if config.RATE_LIMIT_JITTER_SEC > 0:
+            jitter = random.uniform(0, config.RATE_LIMIT_JITTER_SEC)
+            await asyncio.sleep(jitter)
+            wait_seconds += jitter
+        return wait_seconds
+
+    @classmethod
+    def reset(cls):
+        """
+        清空令牌桶，修改限速配置后调用
+        """
+        cls._buckets.clear()
+
+
+def effective_sleep_sec() -> float:
+    """
+    请求之间的固定等待秒数：开启限速后由令牌桶控制速率，返回 0（RATE_LIMIT_KEEP_FIXED_SLEEP 为 True 时保留原值）
+    """
+    if config.ENABLE_RATE_LIMITER and not config.RATE_LIMIT_KEEP_FIXED_SLEEP:
+        return 0
+    return config.CRAWLER_MAX_SLEEP_SEC
+
+
+def apply_rate_limit_config():
+    """
+    按当前配置重建令牌桶，在爬虫启动前调用
+    """
+    RateLimiter.reset()
+    if config.ENABLE_RATE_LIMITER and config.CRAWLER_MAX_SLEEP_SEC and not effective_sleep_sec():
+        utils.logger.info(
+            f"[apply_rate_limit_config] Rate limiter enabled, fixed sleep {config.CRAWLER_MAX_SLEEP_SEC}s between requests is turned off"
+        )